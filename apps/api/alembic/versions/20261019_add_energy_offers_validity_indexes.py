@@ -0,0 +1,48 @@
+"""Add composite indexes on energy_offers validity filters
+
+Le catalogue des offres courantes filtre sur is_active + valid_to, la désactivation des
+offres précédentes sur provider_id + offer_type + valid_to.
+
+Revision ID: c3d4e5f6g7h8
+Revises: b2c3d4e5f6g7
+Create Date: 2026-10-19
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+from sqlalchemy import inspect
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c3d4e5f6g7h8'
+down_revision: Union[str, None] = 'b2c3d4e5f6g7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def index_exists(index_name: str, table_name: str) -> bool:
+    """Vérifie si un index existe déjà sur une table."""
+    bind = op.get_bind()
+    inspector = inspect(bind)
+    indexes = inspector.get_indexes(table_name)
+    return any(idx["name"] == index_name for idx in indexes)
+
+
+def upgrade() -> None:
+    if not index_exists("idx_energy_offers_active_valid_to", "energy_offers"):
+        op.create_index(
+            "idx_energy_offers_active_valid_to", "energy_offers", ["is_active", "valid_to"], unique=False
+        )
+    if not index_exists("idx_energy_offers_provider_type_valid_to", "energy_offers"):
+        op.create_index(
+            "idx_energy_offers_provider_type_valid_to",
+            "energy_offers",
+            ["provider_id", "offer_type", "valid_to"],
+            unique=False,
+        )
+
+
+def downgrade() -> None:
+    op.drop_index("idx_energy_offers_provider_type_valid_to", table_name="energy_offers")
+    op.drop_index("idx_energy_offers_active_valid_to", table_name="energy_offers")
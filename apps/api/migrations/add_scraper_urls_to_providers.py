@@ -6,12 +6,12 @@ for each energy provider.
 """
 import asyncio
 from sqlalchemy import text
-from src.models.database import get_db
+from src.models.database import async_session_maker
 
 
 async def migrate():
     """Add scraper_urls column to energy_providers table"""
-    async for db in get_db():
+    async with async_session_maker() as db:
         try:
             # Add the scraper_urls column
             await db.execute(text("""
@@ -40,8 +40,6 @@ async def migrate():
             await db.rollback()
             print(f"❌ Migration failed: {e}")
             raise
-        finally:
-            break
 
 
 if __name__ == "__main__":
@@ -10,13 +10,13 @@ import asyncio
 import uuid
 from datetime import datetime, UTC
 from sqlalchemy import text, select
-from src.models.database import get_db
+from src.models.database import async_session_maker
 from src.models import EnergyProvider
 
 
 async def migrate():
     """Create/update ALPIQ provider with official PDF URLs"""
-    async for db in get_db():
+    async with async_session_maker() as db:
         try:
             # Check if ALPIQ provider exists
             result = await db.execute(
@@ -64,8 +64,6 @@ async def migrate():
             import traceback
             traceback.print_exc()
             raise
-        finally:
-            break
 
 
 if __name__ == "__main__":
@@ -6,12 +6,12 @@ comparison site instead of the old PDF URL.
 """
 import asyncio
 from sqlalchemy import text
-from src.models.database import get_db
+from src.models.database import async_session_maker
 
 
 async def migrate():
     """Update Engie scraper_urls to use HelloWatt"""
-    async for db in get_db():
+    async with async_session_maker() as db:
         try:
             # Update Engie scraper_urls to HelloWatt
             result = await db.execute(text("""
@@ -29,8 +29,6 @@ async def migrate():
             await db.rollback()
             print(f"❌ Migration failed: {e}")
             raise
-        finally:
-            break
 
 
 if __name__ == "__main__":
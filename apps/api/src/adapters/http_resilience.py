@@ -0,0 +1,123 @@
+"""Retry and circuit breaker primitives for outgoing HTTP calls
+
+Used by the MyElectricalData adapter (client mode) so that a transient gateway
+error does not fail a whole sync chunk, and a gateway outage does not get
+hammered by every PDL / chunk of the sync.
+"""
+
+import random
+import time
+from contextvars import ContextVar
+from datetime import UTC, datetime
+from email.utils import parsedate_to_datetime
+from typing import Optional
+
+# Status codes worth retrying on an idempotent request
+RETRYABLE_STATUS_CODES = frozenset({429, 500, 502, 503, 504})
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling a remote service whose circuit is open"""
+
+    def __init__(self, name: str, retry_in: float) -> None:
+        self.retry_in = retry_in
+        super().__init__(f"{name} unavailable (circuit open, retry in {retry_in:.0f}s)")
+
+
+class CircuitBreaker:
+    """Consecutive failure circuit breaker (closed -> open -> half-open)
+
+    After ``failure_threshold`` consecutive failures the circuit opens: calls are
+    refused for ``reset_timeout`` seconds, then a single trial call is let through.
+    Its success closes the circuit, its failure opens it again: every call allowed by
+    ``before_call`` must end with ``record_success`` or ``record_failure``, even when cancelled.
+    """
+
+    def __init__(self, name: str, failure_threshold: int, reset_timeout: float) -> None:
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self._opened_at: Optional[float] = None
+        self._trial_in_flight = False
+
+    @property
+    def state(self) -> str:
+        if self._opened_at is None:
+            return "closed"
+        if time.monotonic() - self._opened_at >= self.reset_timeout:
+            return "half_open"
+        return "open"
+
+    def before_call(self) -> None:
+        """Raise CircuitOpenError if the call must not be attempted"""
+        state = self.state
+        if state == "closed":
+            return
+        if state == "half_open" and not self._trial_in_flight:
+            self._trial_in_flight = True
+            return
+        assert self._opened_at is not None
+        raise CircuitOpenError(self.name, max(0.0, self._opened_at + self.reset_timeout - time.monotonic()))
+
+    def record_success(self) -> None:
+        self.failures = 0
+        self._opened_at = None
+        self._trial_in_flight = False
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        if self._trial_in_flight or self.failures >= self.failure_threshold:
+            self._opened_at = time.monotonic()
+        self._trial_in_flight = False
+
+
+class RetryBudget:
+    """Number of retries allowed for a unit of work (e.g. one sync run)"""
+
+    def __init__(self, retries: int) -> None:
+        self.remaining = retries
+
+    def consume(self) -> bool:
+        if self.remaining <= 0:
+            return False
+        self.remaining -= 1
+        return True
+
+
+# Budget of the current sync run (None = no shared budget, only the per-request attempts limit)
+_retry_budget: ContextVar[Optional[RetryBudget]] = ContextVar("retry_budget", default=None)
+
+
+def start_retry_budget(retries: int) -> RetryBudget:
+    """Share a retry budget between all requests made from the current context"""
+    budget = RetryBudget(retries)
+    _retry_budget.set(budget)
+    return budget
+
+
+def consume_retry() -> bool:
+    """Take one retry from the current budget (always allowed without budget)"""
+    budget = _retry_budget.get()
+    return budget is None or budget.consume()
+
+
+def backoff_delay(attempt: int, base: float, cap: float) -> float:
+    """Full-jitter exponential backoff for the given retry attempt (1-based)"""
+    return random.uniform(0, min(cap, base * 2 ** (attempt - 1)))
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Seconds to wait from a ``Retry-After`` header (delay in seconds or HTTP date)"""
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=UTC)
+    return max(0.0, (retry_at - datetime.now(UTC)).total_seconds())
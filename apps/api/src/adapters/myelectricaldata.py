@@ -14,12 +14,20 @@ The API provides:
 
 import asyncio
 import logging
+from collections import OrderedDict
 from datetime import datetime
 from typing import Any, Optional, cast
 
 import httpx
 
 from ..config import settings
+from .http_resilience import (
+    RETRYABLE_STATUS_CODES,
+    CircuitBreaker,
+    backoff_delay,
+    consume_retry,
+    parse_retry_after,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -31,19 +39,44 @@ class MyElectricalDataAdapter:
     instead of connecting directly to Enedis.
     """
 
-    def __init__(self) -> None:
+    def __init__(self, transport: Optional[httpx.AsyncBaseTransport] = None) -> None:
         self.base_url = settings.MED_API_URL.rstrip("/")
         self.client_id = settings.MED_CLIENT_ID
         self.client_secret = settings.MED_CLIENT_SECRET
         self._client: Optional[httpx.AsyncClient] = None
+        self._transport = transport
         self._access_token: Optional[str] = None
         self._token_expires_at: Optional[datetime] = None
         self._lock = asyncio.Lock()
+        # ETag of the last 200 response per resource (method + URL + params), for conditional requests.
+        # Delta syncs use a new ``since`` each time: least recently used resources are dropped.
+        self._etags: OrderedDict[str, str] = OrderedDict()
+        # Shared by all requests: an unreachable gateway stops the whole sync, not only one chunk
+        self.circuit_breaker = CircuitBreaker(
+            "MyElectricalData gateway",
+            failure_threshold=settings.MED_CIRCUIT_FAILURE_THRESHOLD,
+            reset_timeout=settings.MED_CIRCUIT_RESET_SECONDS,
+        )
 
     async def get_client(self) -> httpx.AsyncClient:
         """Get or create HTTP client"""
         if self._client is None:
-            self._client = httpx.AsyncClient(timeout=60.0)
+            http2 = settings.MED_HTTP2
+            if http2:
+                try:
+                    import h2  # noqa: F401
+                except ImportError:
+                    logger.warning("[MED] MED_HTTP2 enabled but the 'h2' package is not installed, using HTTP/1.1")
+                    http2 = False
+            self._client = httpx.AsyncClient(
+                timeout=settings.MED_HTTP_TIMEOUT_SECONDS,
+                limits=httpx.Limits(
+                    max_connections=settings.MED_HTTP_MAX_CONNECTIONS,
+                    max_keepalive_connections=settings.MED_HTTP_MAX_KEEPALIVE_CONNECTIONS,
+                ),
+                http2=http2,
+                transport=self._transport,
+            )
         return self._client
 
     async def close(self) -> None:
@@ -72,48 +105,69 @@ class MyElectricalDataAdapter:
             "User-Agent": "MyElectricalData-Client/1.0",
         }
 
+    def _resource_key(self, method: str, endpoint: str, params: Optional[dict[str, Any]]) -> str:
+        query = "&".join(f"{k}={v}" for k, v in sorted((params or {}).items()))
+        return f"{method} {endpoint}?{query}"
+
+    def forget_etags(self, endpoint: str) -> None:
+        """Drop stored ETags of an endpoint (forces a full response next time, e.g. after a failed import)"""
+        for key in [k for k in self._etags if k.split(" ", 1)[1].startswith(f"{endpoint}?")]:
+            del self._etags[key]
+
     async def _make_request(
         self,
         method: str,
         endpoint: str,
         params: Optional[dict[str, Any]] = None,
         json_data: Optional[dict[str, Any]] = None,
+        conditional: bool = False,
     ) -> dict[str, Any]:
-        """Make authenticated request to MyElectricalData API"""
+        """Make authenticated request to MyElectricalData API
+
+        With ``conditional=True`` the ETag of the previous response is sent as ``If-None-Match``;
+        a 304 returns ``{"success": True, "not_modified": True}`` without any body to parse.
+        """
         access_token = await self._ensure_authenticated()
         headers = self._get_headers(access_token)
 
         url = f"{self.base_url}{endpoint}"
+        resource_key = self._resource_key(method, endpoint, params)
+        if conditional and resource_key in self._etags:
+            headers["If-None-Match"] = self._etags[resource_key]
+            self._etags.move_to_end(resource_key)
 
         if settings.DEBUG:
             logger.debug(f"[MED] {method} {url}")
             if params:
                 logger.debug(f"[MED] Params: {params}")
 
-        client = await self.get_client()
-
         try:
-            response = await client.request(
-                method=method,
-                url=url,
-                headers=headers,
-                params=params,
-                json=json_data,
-            )
+            response = await self._send_with_retries(method, url, headers, params, json_data)
 
             if settings.DEBUG:
                 logger.debug(f"[MED] Response: {response.status_code}")
 
+            if conditional and response.status_code == 304:
+                return {"success": True, "not_modified": True}
+
             response.raise_for_status()
+            if conditional and response.headers.get("ETag"):
+                self._etags[resource_key] = response.headers["ETag"]
+                self._etags.move_to_end(resource_key)
+                while len(self._etags) > settings.MED_ETAG_CACHE_SIZE:
+                    self._etags.popitem(last=False)
             return cast(dict[str, Any], response.json())
 
         except httpx.HTTPStatusError as e:
             logger.error(f"[MED] API error: {e.response.status_code}")
             logger.error(f"[MED] Response: {e.response.text}")
 
-            # Try to parse error response
+            # Try to parse error response (proxies in front of the gateway may answer with HTML)
             try:
                 error_data = e.response.json()
+            except ValueError:
+                error_data = None
+            try:
                 if "error" in error_data:
                     raise ValueError(
                         f"{error_data.get('error')}: {error_data.get('error_description', '')}"
@@ -126,6 +180,77 @@ class MyElectricalDataAdapter:
             logger.error(f"[MED] Request error: {e}")
             raise
 
+    async def _send_with_retries(
+        self,
+        method: str,
+        url: str,
+        headers: dict[str, str],
+        params: Optional[dict[str, Any]],
+        json_data: Optional[dict[str, Any]],
+    ) -> httpx.Response:
+        """Send a request through the circuit breaker, retrying idempotent (GET) requests
+
+        Retries transient failures (timeouts, connection errors, 429/5xx) with jittered
+        exponential backoff or the delay given by ``Retry-After``, within the retry budget
+        of the current sync. The last response is returned (or the last error raised)
+        once retries are exhausted.
+        """
+        client = await self.get_client()
+        max_attempts = settings.MED_RETRY_MAX_ATTEMPTS if method.upper() == "GET" else 1
+        attempt = 0
+
+        while True:
+            attempt += 1
+            self.circuit_breaker.before_call()
+            try:
+                response = await client.request(
+                    method=method,
+                    url=url,
+                    headers=headers,
+                    params=params,
+                    json=json_data,
+                )
+            except httpx.TransportError as e:
+                self.circuit_breaker.record_failure()
+                if attempt >= max_attempts or not consume_retry():
+                    raise
+                delay = backoff_delay(
+                    attempt, settings.MED_RETRY_BACKOFF_BASE_SECONDS, settings.MED_RETRY_BACKOFF_MAX_SECONDS
+                )
+                logger.warning(f"[MED] {method} {url} failed ({e!r}), retry {attempt} in {delay:.1f}s")
+                await asyncio.sleep(delay)
+                continue
+            except BaseException:
+                # Cancelled or unexpected error: never leave a half-open trial pending, the circuit would stay shut
+                self.circuit_breaker.record_failure()
+                raise
+
+            if response.status_code not in RETRYABLE_STATUS_CODES:
+                self.circuit_breaker.record_success()
+                return response
+
+            # 429 means the gateway is up but throttling us: only 5xx count as failures
+            if response.status_code == 429:
+                self.circuit_breaker.record_success()
+            else:
+                self.circuit_breaker.record_failure()
+
+            retry_after = parse_retry_after(response.headers.get("Retry-After"))
+            if retry_after is not None and retry_after > settings.MED_RETRY_AFTER_MAX_SECONDS:
+                return response
+            if attempt >= max_attempts or not consume_retry():
+                return response
+
+            delay = (
+                retry_after
+                if retry_after is not None
+                else backoff_delay(
+                    attempt, settings.MED_RETRY_BACKOFF_BASE_SECONDS, settings.MED_RETRY_BACKOFF_MAX_SECONDS
+                )
+            )
+            logger.warning(f"[MED] {method} {url} returned {response.status_code}, retry {attempt} in {delay:.1f}s")
+            await asyncio.sleep(delay)
+
     # =========================================================================
     # PDL / Usage Points
     # =========================================================================
@@ -250,21 +375,24 @@ class MyElectricalDataAdapter:
     # =========================================================================
 
     async def get_tempo_calendar(
-        self, start: Optional[str] = None, end: Optional[str] = None
+        self, start: Optional[str] = None, end: Optional[str] = None, since: Optional[str] = None
     ) -> dict[str, Any]:
-        """Get Tempo calendar data
+        """Get Tempo calendar data (conditional request)
 
         Args:
             start: Start date (YYYY-MM-DD), defaults to start of current season
             end: End date (YYYY-MM-DD), defaults to end of current season
+            since: Delta sync watermark (ISO 8601), only days updated after it are returned
         """
         params = {}
         if start:
             params["start"] = start
         if end:
             params["end"] = end
+        if since:
+            params["since"] = since
 
-        return await self._make_request("GET", "/tempo/days", params=params or None)
+        return await self._make_request("GET", "/tempo/days", params=params or None, conditional=True)
 
     async def get_tempo_remaining(self) -> dict[str, Any]:
         """Get remaining Tempo days for current season"""
@@ -298,9 +426,10 @@ class MyElectricalDataAdapter:
         """Get current EcoWatt signals"""
         return await self._make_request("GET", "/ecowatt")
 
-    async def get_ecowatt_forecast(self) -> dict[str, Any]:
-        """Get EcoWatt forecast for next days"""
-        return await self._make_request("GET", "/ecowatt/forecast")
+    async def get_ecowatt_forecast(self, since: Optional[str] = None) -> dict[str, Any]:
+        """Get EcoWatt forecast for next days (conditional request, optional delta watermark)"""
+        params = {"since": since} if since else None
+        return await self._make_request("GET", "/ecowatt/forecast", params=params, conditional=True)
 
     # =========================================================================
     # Contribution
@@ -348,7 +477,7 @@ class MyElectricalDataAdapter:
         return await self._make_request("GET", "/energy/providers")
 
     async def get_energy_offers(self, provider_id: Optional[str] = None) -> dict[str, Any]:
-        """Get list of energy offers from the gateway
+        """Get list of energy offers from the gateway (conditional request)
 
         Args:
             provider_id: Optional provider ID to filter offers
@@ -359,7 +488,7 @@ class MyElectricalDataAdapter:
         params = {}
         if provider_id:
             params["provider_id"] = provider_id
-        return await self._make_request("GET", "/energy/offers", params=params or None)
+        return await self._make_request("GET", "/energy/offers", params=params or None, conditional=True)
 
     # =========================================================================
     # Consumption France (national data)
@@ -370,6 +499,7 @@ class MyElectricalDataAdapter:
         consumption_type: Optional[str] = None,
         start_date: Optional[str] = None,
         end_date: Optional[str] = None,
+        since: Optional[str] = None,
     ) -> dict[str, Any]:
         """Get French national consumption data from the gateway
 
@@ -377,6 +507,7 @@ class MyElectricalDataAdapter:
             consumption_type: Optional type filter (REALISED, ID, D-1, D-2)
             start_date: Start date (YYYY-MM-DD or ISO 8601)
             end_date: End date (YYYY-MM-DD or ISO 8601)
+            since: Delta sync watermark (ISO 8601), only records updated after it are returned
 
         Returns:
             Dict with consumption data
@@ -388,7 +519,9 @@ class MyElectricalDataAdapter:
             params["start_date"] = start_date
         if end_date:
             params["end_date"] = end_date
-        return await self._make_request("GET", "/consumption-france", params=params or None)
+        if since:
+            params["since"] = since
+        return await self._make_request("GET", "/consumption-france", params=params or None, conditional=True)
 
     async def get_consumption_france_current(self) -> dict[str, Any]:
         """Get current French national consumption from the gateway
@@ -407,6 +540,7 @@ class MyElectricalDataAdapter:
         production_type: Optional[str] = None,
         start_date: Optional[str] = None,
         end_date: Optional[str] = None,
+        since: Optional[str] = None,
     ) -> dict[str, Any]:
         """Get French renewable generation forecast from the gateway
 
@@ -414,6 +548,7 @@ class MyElectricalDataAdapter:
             production_type: Optional type filter (SOLAR, WIND_ONSHORE, WIND_OFFSHORE)
             start_date: Start date (YYYY-MM-DD or ISO 8601)
             end_date: End date (YYYY-MM-DD or ISO 8601)
+            since: Delta sync watermark (ISO 8601), only records updated after it are returned
 
         Returns:
             Dict with generation forecast data
@@ -425,7 +560,9 @@ class MyElectricalDataAdapter:
             params["start_date"] = start_date
         if end_date:
             params["end_date"] = end_date
-        return await self._make_request("GET", "/generation-forecast", params=params or None)
+        if since:
+            params["since"] = since
+        return await self._make_request("GET", "/generation-forecast", params=params or None, conditional=True)
 
     async def get_generation_forecast_mix(self) -> dict[str, Any]:
         """Get French renewable energy mix (solar + wind) from the gateway
@@ -11,6 +11,22 @@ class Settings(BaseSettings):
     # Database
     DATABASE_URL: str = "sqlite+aiosqlite:///./data/myelectricaldata.db"
     POSTGRES_PASSWORD: str = "changeme"
+    # Connection pool (PostgreSQL / asyncpg). Connections in use per process: DB_POOL_SIZE + DB_MAX_OVERFLOW
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 20
+    DB_POOL_TIMEOUT_SECONDS: float = 30.0  # Max wait for a free connection before failing the request
+    DB_POOL_RECYCLE_SECONDS: int = 1800
+    DB_POOL_PRE_PING: bool = True
+    # Prepared statements cached per asyncpg connection (0 disables, required behind PgBouncer in transaction mode)
+    DB_STATEMENT_CACHE_SIZE: int = 500
+    # SQLite: lock wait before "database is locked", WAL lets readers run during writes
+    SQLITE_BUSY_TIMEOUT_MS: int = 5000
+    SQLITE_WAL: bool = True
+    # Optional read replica (same schema, e.g. PostgreSQL streaming replica) for heavy read-only endpoints
+    DATABASE_REPLICA_URL: str = ""
+    DB_REPLICA_MAX_LAG_SECONDS: float = 5.0  # Reads go to the primary beyond this replication lag
+    DB_REPLICA_LAG_CHECK_SECONDS: float = 5.0  # Lag measured at most this often per process
+    DB_READ_YOUR_WRITES_SECONDS: int = 30  # A client that just wrote reads from the primary meanwhile
 
     @property
     def database_type(self) -> str:
@@ -22,6 +38,44 @@ class Settings(BaseSettings):
     # Redis Cache
     REDIS_URL: str = "redis://localhost:6379/0"
     CACHE_TTL_SECONDS: int = 86400
+    # Historical data (older than CACHE_RECENT_DAYS) cannot be corrected by Enedis anymore: keep it longer
+    CACHE_TTL_HISTORICAL_SECONDS: int = 604800
+    CACHE_RECENT_DAYS: int = 7
+    # Cache quotas in bytes (0 = unlimited), least recently used entries are evicted first
+    CACHE_QUOTA_PDL_BYTES: int = 0
+    CACHE_QUOTA_USER_BYTES: int = 0
+    # Read legacy per-day daily cache keys as a fallback and migrate them to the range layout
+    DAILY_CACHE_LEGACY_FALLBACK: bool = True
+    # Pre-serialised public responses (Tempo, EcoWatt, France): invalidated by RTE refreshes, TTL bounds
+    # the staleness of queries relative to "now"
+    RESPONSE_CACHE_TTL_SECONDS: int = 900
+    # Offer catalogue snapshot (GET /energy/offers): invalidated by offer writes, TTL is a safety net
+    OFFER_CATALOGUE_TTL_SECONDS: int = 3600
+    # In-process Tempo calendar index: invalidated by Tempo writes, TTL is a safety net
+    TEMPO_CALENDAR_TTL_SECONDS: int = 3600
+
+    # Response compression (brotli when the package is installed, gzip otherwise)
+    COMPRESSION_MINIMUM_SIZE: int = 1024  # Bytes, smaller responses are sent uncompressed
+    COMPRESSION_GZIP_LEVEL: int = 6
+    COMPRESSION_BROTLI_QUALITY: int = 4
+
+    # Price scrapers: providers refreshed concurrently, requests per provider host, parsed documents kept
+    SCRAPER_MAX_CONCURRENT_PROVIDERS: int = 4
+    SCRAPER_PER_HOST_CONCURRENCY: int = 2
+    SCRAPER_DOCUMENT_CACHE_TTL_SECONDS: int = 2592000
+    # Scraper jobs (preview / refresh) run by a worker pool on each replica, state and lock in Redis
+    SCRAPER_JOB_WORKERS: int = 1
+    SCRAPER_JOB_TTL_SECONDS: int = 3600  # Job state and result retention
+    SCRAPER_JOB_LOCK_TTL_SECONDS: int = 900  # Renewed while the job runs, frees the lock if a replica dies
+    SCRAPER_JOB_POLL_SECONDS: float = 1.0
+    SCRAPER_JOB_WAIT_TIMEOUT_SECONDS: int = 900  # Max time a ?wait=true request waits for its job
+
+    # Periodic background tasks (RTE caches, cache maintenance): one run per schedule across replicas
+    TASK_LOCK_TTL_SECONDS: int = 300  # Renewed while the task runs, frees the task if a replica dies
+    TASK_RETRY_SECONDS: int = 120  # Delay before retrying a failed run (or re-checking a task run elsewhere)
+    TASK_JITTER_RATIO: float = 0.1  # Random delay added to each wait, as a fraction of the wait
+    TASK_JITTER_MAX_SECONDS: float = 300.0
+    TASK_HISTORY_SIZE: int = 50  # Runs kept per task (admin API)
 
     # Enedis API
     ENEDIS_CLIENT_ID: str = ""
@@ -62,6 +116,21 @@ class Settings(BaseSettings):
     MED_API_URL: str = "https://www.v2.myelectricaldata.fr/api"
     MED_CLIENT_ID: str = ""      # Your client_id from MyElectricalData
     MED_CLIENT_SECRET: str = ""  # Your client_secret from MyElectricalData
+    # HTTP transport to the gateway (HTTP/2 requires the optional "h2" package)
+    MED_HTTP_TIMEOUT_SECONDS: float = 60.0
+    MED_HTTP_MAX_CONNECTIONS: int = 20
+    MED_HTTP_MAX_KEEPALIVE_CONNECTIONS: int = 10
+    MED_HTTP2: bool = False
+    MED_ETAG_CACHE_SIZE: int = 256  # ETags kept for conditional requests (one per resource and ``since``)
+    # Retries of idempotent requests (jittered exponential backoff), shared budget per sync run
+    MED_RETRY_MAX_ATTEMPTS: int = 4
+    MED_RETRY_BUDGET_PER_SYNC: int = 20
+    MED_RETRY_BACKOFF_BASE_SECONDS: float = 0.5
+    MED_RETRY_BACKOFF_MAX_SECONDS: float = 30.0
+    MED_RETRY_AFTER_MAX_SECONDS: float = 120.0  # Longer Retry-After values are not waited for
+    # Circuit breaker: stop calling the gateway after N consecutive failures, for N seconds
+    MED_CIRCUIT_FAILURE_THRESHOLD: int = 5
+    MED_CIRCUIT_RESET_SECONDS: float = 300.0
 
     # API Security
     # SECRET_KEY is required in production (no default value for security)
@@ -74,6 +143,7 @@ class Settings(BaseSettings):
     ENEDIS_RATE_LIMIT: int = 5  # requests per second
     USER_DAILY_LIMIT_NO_CACHE: int = 50
     USER_DAILY_LIMIT_WITH_CACHE: int = 1000
+    USAGE_STATS_RETENTION_DAYS: int = 30  # Days of per-user / per-endpoint usage history kept in Redis
 
     # Application
     API_HOST: str = "0.0.0.0"
@@ -108,6 +178,18 @@ class Settings(BaseSettings):
     SLACK_WEBHOOK_URL: str = ""
     SLACK_NOTIFICATIONS_ENABLED: bool = False
 
+    # Outbound notification queue (emails, Slack), delivered by background workers
+    NOTIFICATION_WORKERS: int = 1
+    NOTIFICATION_BATCH_SIZE: int = 50
+    NOTIFICATION_CONCURRENCY: int = 5  # Deliveries in flight per worker
+    NOTIFICATION_HTTP_TIMEOUT_SECONDS: float = 15.0
+    NOTIFICATION_MAX_ATTEMPTS: int = 6
+    NOTIFICATION_RETRY_BASE_SECONDS: float = 30.0
+    NOTIFICATION_RETRY_MAX_SECONDS: float = 1800.0
+    NOTIFICATION_DEAD_LETTER_TTL_SECONDS: int = 604800  # Failed messages kept for inspection (7 days)
+    NOTIFICATION_DIGEST_WINDOW_SECONDS: int = 60  # Contribution emails to one recipient within the window are merged
+    NOTIFICATION_WORKER_LEASE_SECONDS: int = 300  # Messages taken by a silent worker are requeued (> batch time)
+
     def is_admin(self, email: str) -> bool:
         """Check if an email is in the admin list"""
         if not self.ADMIN_EMAILS:
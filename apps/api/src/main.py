@@ -11,6 +11,8 @@ from fastapi.staticfiles import StaticFiles
 from .adapters import enedis_adapter
 from .config import APP_VERSION, settings
 from .logging_config import setup_logging
+from .middleware.compression import CompressionMiddleware
+from .middleware.read_your_writes import ReadYourWritesMiddleware
 from .models.database import init_db
 from .routers import (
     accounts_router,
@@ -30,6 +32,7 @@ from .routers.admin_rte import router as admin_rte_router
 from .schemas import APIResponse, ErrorDetail, HealthCheckResponse
 from .services import cache_service
 from .services.scheduler import start_background_tasks
+from .utils.responses import FastJSONResponse
 
 # Client mode imports (only when CLIENT_MODE is enabled)
 if settings.CLIENT_MODE:
@@ -140,6 +143,8 @@ app = FastAPI(
     # that break proxy routing (Vite proxy rewrites /api/path -> /path,
     # but redirect response /path/ doesn't get rewritten back to /api/path/)
     redirect_slashes=False,
+    # orjson serialisation for every JSON response (see utils/responses.py)
+    default_response_class=FastJSONResponse,
 )
 
 # Mount static files for custom Swagger CSS
@@ -266,6 +271,18 @@ async def fix_redirect_urls(request: Request, call_next: Callable) -> Response:
     return response
 
 
+# Read-replica pin of the clients that just wrote, recorded before their response is sent
+app.add_middleware(ReadYourWritesMiddleware)
+
+# Compression (gzip/brotli) - added last so it wraps every other middleware
+app.add_middleware(
+    CompressionMiddleware,
+    minimum_size=settings.COMPRESSION_MINIMUM_SIZE,
+    gzip_level=settings.COMPRESSION_GZIP_LEVEL,
+    brotli_quality=settings.COMPRESSION_BROTLI_QUALITY,
+)
+
+
 # Exception handlers
 @app.exception_handler(Exception)
 async def global_exception_handler(request: Request, exc: Exception) -> JSONResponse:
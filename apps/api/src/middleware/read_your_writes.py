@@ -0,0 +1,35 @@
+"""Read-your-writes pin of the read replica, recorded before the response is sent.
+
+The request session is closed by its dependency once the response has been sent (yield dependencies),
+so a client could get the response of its write and read from a lagging replica before the pin exists.
+This middleware records the pin when the response starts, from the session kept in the request state.
+"""
+from starlette.requests import HTTPConnection
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from ..models.database import pin_committed_writes
+
+
+class ReadYourWritesMiddleware:
+    """Pin the reads of a client that committed writes before its response starts"""
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        # Shared with the request: get_db stores the session in ``state.db``
+        state = scope.setdefault("state", {})
+        connection = HTTPConnection(scope)
+
+        async def send_pinned(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                session = state.get("db")
+                if session is not None:
+                    await pin_committed_writes(connection, session)
+            await send(message)
+
+        await self.app(scope, receive, send_pinned)
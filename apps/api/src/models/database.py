@@ -1,17 +1,369 @@
-from collections.abc import AsyncGenerator
-from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
+import asyncio
+import hashlib
+import logging
+import time
+from collections.abc import AsyncGenerator, AsyncIterator
+from contextlib import asynccontextmanager
+from typing import Any, Optional
+
+from sqlalchemy import event, text
+from sqlalchemy.engine import make_url
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine, AsyncSession, async_sessionmaker
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import AsyncAdaptedQueuePool, Pool
+from starlette.requests import HTTPConnection
+
 from .base import Base
 from ..config import settings
 
-engine = create_async_engine(settings.DATABASE_URL, echo=settings.DEBUG_SQL)
-async_session_maker = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+logger = logging.getLogger(__name__)
+
+
+class PoolMetrics:
+    """Checkout counters of the connection pool (GET /admin/database/pool)"""
+
+    def __init__(self) -> None:
+        self.checkouts = 0
+        self.timeouts = 0
+        self.connects = 0
+        self.invalidations = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+        self.hold_seconds_total = 0.0
+        self.hold_seconds_max = 0.0
+        self.checkins = 0
+
+    def record_wait(self, seconds: float, timed_out: bool = False) -> None:
+        if timed_out:
+            self.timeouts += 1
+        else:
+            self.checkouts += 1
+        self.wait_seconds_total += seconds
+        self.wait_seconds_max = max(self.wait_seconds_max, seconds)
+
+    def record_hold(self, seconds: float) -> None:
+        self.checkins += 1
+        self.hold_seconds_total += seconds
+        self.hold_seconds_max = max(self.hold_seconds_max, seconds)
+
+    def snapshot(self, pool: Pool) -> dict[str, Any]:
+        data: dict[str, Any] = {
+            "pool": type(pool).__name__,
+            "checkouts": self.checkouts,
+            "timeouts": self.timeouts,
+            "connects": self.connects,
+            "invalidations": self.invalidations,
+            "wait_ms_avg": round(self.wait_seconds_total / self.checkouts * 1000, 3) if self.checkouts else 0.0,
+            "wait_ms_max": round(self.wait_seconds_max * 1000, 3),
+            "hold_ms_avg": round(self.hold_seconds_total / self.checkins * 1000, 3) if self.checkins else 0.0,
+            "hold_ms_max": round(self.hold_seconds_max * 1000, 3),
+        }
+        if isinstance(pool, AsyncAdaptedQueuePool):
+            data.update({
+                "size": pool.size(),
+                "checked_out": pool.checkedout(),
+                "checked_in": pool.checkedin(),
+                "overflow": pool.overflow(),
+                "max_overflow": pool._max_overflow,
+            })
+        return data
+
+
+pool_metrics = PoolMetrics()
+
+
+class MeasuredQueuePool(AsyncAdaptedQueuePool):
+    """Queue pool recording how long each checkout waited for a connection"""
+
+    metrics: PoolMetrics = pool_metrics
+
+    def _do_get(self) -> Any:
+        started = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except PoolTimeoutError:
+            self.metrics.record_wait(time.perf_counter() - started, timed_out=True)
+            raise
+        self.metrics.record_wait(time.perf_counter() - started)
+        return connection
+
+
+def _instrument(engine: AsyncEngine, metrics: PoolMetrics) -> None:
+    @event.listens_for(engine.sync_engine, "connect")
+    def on_connect(dbapi_connection: Any, connection_record: Any) -> None:
+        metrics.connects += 1
+
+    @event.listens_for(engine.sync_engine, "checkout")
+    def on_checkout(dbapi_connection: Any, connection_record: Any, connection_proxy: Any) -> None:
+        connection_record.info["checked_out_at"] = time.perf_counter()
+
+    @event.listens_for(engine.sync_engine, "checkin")
+    def on_checkin(dbapi_connection: Any, connection_record: Any) -> None:
+        checked_out_at = connection_record.info.pop("checked_out_at", None)
+        if checked_out_at is not None:
+            metrics.record_hold(time.perf_counter() - checked_out_at)
+
+    @event.listens_for(engine.sync_engine, "invalidate")
+    def on_invalidate(dbapi_connection: Any, connection_record: Any, exception: Any) -> None:
+        metrics.invalidations += 1
+
+
+def _enable_sqlite_pragmas(engine: AsyncEngine) -> None:
+    @event.listens_for(engine.sync_engine, "connect")
+    def on_connect(dbapi_connection: Any, connection_record: Any) -> None:
+        cursor = dbapi_connection.cursor()
+        cursor.execute(f"PRAGMA busy_timeout={int(settings.SQLITE_BUSY_TIMEOUT_MS)}")
+        if settings.SQLITE_WAL:
+            # WAL: readers no longer block on writers, NORMAL is durable in WAL mode (no fsync per commit)
+            cursor.execute("PRAGMA journal_mode=WAL")
+            cursor.execute("PRAGMA synchronous=NORMAL")
+        cursor.close()
+
+
+def build_engine(database_url: str, metrics: PoolMetrics = pool_metrics) -> AsyncEngine:
+    """Async engine with the pool and driver options of the configured database"""
+    url = make_url(database_url)
+    kwargs: dict[str, Any] = {"echo": settings.DEBUG_SQL}
+    # The pool class carries its metrics (pools are re-created from their class on dispose)
+    pool_class = MeasuredQueuePool if metrics is pool_metrics else type(
+        "MeasuredQueuePool", (MeasuredQueuePool,), {"metrics": metrics}
+    )
+
+    if url.get_backend_name() == "sqlite":
+        in_memory = url.database in (None, "", ":memory:")
+        if not in_memory:
+            kwargs.update(
+                poolclass=pool_class,
+                pool_size=settings.DB_POOL_SIZE,
+                max_overflow=settings.DB_MAX_OVERFLOW,
+                pool_timeout=settings.DB_POOL_TIMEOUT_SECONDS,
+            )
+        engine = create_async_engine(url, **kwargs)
+        if not in_memory:
+            _enable_sqlite_pragmas(engine)
+    else:
+        kwargs.update(
+            poolclass=pool_class,
+            pool_size=settings.DB_POOL_SIZE,
+            max_overflow=settings.DB_MAX_OVERFLOW,
+            pool_timeout=settings.DB_POOL_TIMEOUT_SECONDS,
+            pool_recycle=settings.DB_POOL_RECYCLE_SECONDS,
+            pool_pre_ping=settings.DB_POOL_PRE_PING,
+        )
+        if url.get_driver_name() == "asyncpg":
+            # SQLAlchemy's prepared statement cache and asyncpg's own statement cache
+            if "prepared_statement_cache_size" not in url.query:
+                url = url.update_query_dict({"prepared_statement_cache_size": str(settings.DB_STATEMENT_CACHE_SIZE)})
+            kwargs["connect_args"] = {"statement_cache_size": settings.DB_STATEMENT_CACHE_SIZE}
+        engine = create_async_engine(url, **kwargs)
+
+    _instrument(engine, metrics)
+    return engine
+
+
+class PrimarySession(Session):
+    """Session of the primary database, remembers whether it committed writes (read-your-writes)"""
+
+
+@event.listens_for(PrimarySession, "after_flush")
+def _on_flush(session: Session, flush_context: Any) -> None:
+    session.info["pending_write"] = True
+
+
+@event.listens_for(PrimarySession, "do_orm_execute")
+def _on_execute(orm_execute_state: Any) -> None:
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        orm_execute_state.session.info["pending_write"] = True
+
+
+@event.listens_for(PrimarySession, "after_commit")
+def _on_commit(session: Session) -> None:
+    if session.info.pop("pending_write", False):
+        session.info["wrote"] = True
+
 
+@event.listens_for(PrimarySession, "after_rollback")
+def _on_rollback(session: Session) -> None:
+    session.info.pop("pending_write", None)
+
+
+engine = build_engine(settings.DATABASE_URL)
+async_session_maker = async_sessionmaker(
+    engine, class_=AsyncSession, sync_session_class=PrimarySession, expire_on_commit=False
+)
+
+# Optional read replica for heavy read-only endpoints (get_read_db)
+replica_pool_metrics = PoolMetrics()
+replica_engine = (
+    build_engine(settings.DATABASE_REPLICA_URL, replica_pool_metrics) if settings.DATABASE_REPLICA_URL else None
+)
+replica_session_maker = (
+    async_sessionmaker(replica_engine, class_=AsyncSession, expire_on_commit=False) if replica_engine else None
+)
+
+# Streaming replica lag, 0 when the replica has replayed everything it received
+REPLICA_LAG_QUERY = text(
+    "SELECT CASE WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 "
+    "ELSE EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()) END"
+)
+
+
+def client_identity(connection: HTTPConnection) -> Optional[str]:
+    """Stable id of the request's credential (session cookie or bearer token), None when anonymous"""
+    token = connection.cookies.get("access_token")
+    if not token:
+        authorization = connection.headers.get("authorization", "")
+        if authorization[:7].lower() == "bearer ":
+            token = authorization[7:]
+    return hashlib.sha256(token.encode()).hexdigest()[:32] if token else None
+
+
+class ReplicaRouter:
+    """Decide whether a read-only request may use the replica.
+
+    - the replica lag is measured at most every ``DB_REPLICA_LAG_CHECK_SECONDS``; beyond
+      ``DB_REPLICA_MAX_LAG_SECONDS`` (or when the replica is unreachable) reads go to the primary
+    - a client whose request committed writes reads from the primary for ``DB_READ_YOUR_WRITES_SECONDS``
+      (Redis key ``db:recent_write:{client}`` shared by the workers, in-process without Redis)
+    """
+
+    def __init__(self) -> None:
+        self.lag: Optional[float] = None
+        self._checked_at = 0.0
+        self._lock = asyncio.Lock()
+        self._recent_writes: dict[str, float] = {}
+        self.reads = {"replica": 0, "primary": 0}
+
+    async def replica_lag(self) -> Optional[float]:
+        """Replica lag in seconds (cached), None when it could not be measured"""
+        if replica_engine is None:
+            return None
+        if time.monotonic() - self._checked_at < settings.DB_REPLICA_LAG_CHECK_SECONDS:
+            return self.lag
+
+        async with self._lock:
+            if time.monotonic() - self._checked_at < settings.DB_REPLICA_LAG_CHECK_SECONDS:
+                return self.lag
+            try:
+                async with replica_engine.connect() as conn:
+                    if replica_engine.dialect.name == "postgresql":
+                        self.lag = float((await conn.execute(REPLICA_LAG_QUERY)).scalar() or 0)
+                    else:
+                        await conn.execute(text("SELECT 1"))
+                        self.lag = 0.0
+            except Exception as e:
+                logger.warning(f"[DB REPLICA] Lag check failed, reading from the primary: {e}")
+                self.lag = None
+            self._checked_at = time.monotonic()
+            return self.lag
+
+    async def mark_write(self, identity: str) -> None:
+        """Pin the reads of a client to the primary after its own writes"""
+        window = settings.DB_READ_YOUR_WRITES_SECONDS
+        from ..services.cache import cache_service
+
+        if cache_service.redis_client:
+            try:
+                await cache_service.redis_client.set(f"db:recent_write:{identity}", 1, ex=window)
+                return
+            except Exception as e:
+                logger.warning(f"[DB REPLICA] Failed to record write: {e}")
+        now = time.monotonic()
+        self._recent_writes = {k: t for k, t in self._recent_writes.items() if t > now}
+        self._recent_writes[identity] = now + window
+
+    async def wrote_recently(self, identity: str) -> bool:
+        if self._recent_writes.get(identity, 0) > time.monotonic():
+            return True
+        from ..services.cache import cache_service
+
+        if cache_service.redis_client:
+            try:
+                return bool(await cache_service.redis_client.exists(f"db:recent_write:{identity}"))
+            except Exception as e:
+                logger.warning(f"[DB REPLICA] Failed to read recent writes: {e}")
+                return True
+        return False
+
+    async def use_replica(self, connection: HTTPConnection) -> bool:
+        if replica_session_maker is None:
+            return False
+        identity = client_identity(connection)
+        if identity and await self.wrote_recently(identity):
+            return False
+        lag = await self.replica_lag()
+        return lag is not None and lag <= settings.DB_REPLICA_MAX_LAG_SECONDS
+
+    def snapshot(self) -> dict[str, Any]:
+        return {
+            "lag_seconds": self.lag,
+            "max_lag_seconds": settings.DB_REPLICA_MAX_LAG_SECONDS,
+            "reads": dict(self.reads),
+            "pool": replica_pool_metrics.snapshot(replica_engine.pool) if replica_engine else None,
+        }
+
+
+replica_router = ReplicaRouter()
+
+
+async def pin_committed_writes(connection: HTTPConnection, session: AsyncSession) -> None:
+    """Pin the client's reads to the primary if the request session committed writes (read-your-writes)"""
+    if session.info.pop("wrote", False) and replica_engine is not None:
+        identity = client_identity(connection)
+        if identity:
+            await replica_router.mark_write(identity)
+
+
+@asynccontextmanager
+async def _request_session(connection: HTTPConnection) -> AsyncIterator[AsyncSession]:
+    session = getattr(connection.state, "db", None)
+    if session is not None:
+        yield session
+        return
 
-async def get_db() -> AsyncGenerator[AsyncSession, None]:
     async with async_session_maker() as session:
+        connection.state.db = session
+        try:
+            yield session
+        finally:
+            connection.state.db = None
+            # Writes committed once the response had started (the others are pinned by ReadYourWritesMiddleware)
+            await pin_committed_writes(connection, session)
+            await session.close()
+
+
+async def get_db(connection: HTTPConnection) -> AsyncGenerator[AsyncSession, None]:
+    """Session of the current request, shared by every dependency that asks for one"""
+    async with _request_session(connection) as session:
+        yield session
+
+
+async def get_read_db(connection: HTTPConnection) -> AsyncGenerator[AsyncSession, None]:
+    """Session for read-only endpoints: the replica when configured and in sync, the primary otherwise
+
+    The primary is also used for a client that just wrote (read-your-writes). Endpoints whose results are
+    stored in versioned caches (response_cache, offer catalogue) keep get_db: a snapshot rebuilt from a
+    lagging replica right after an invalidation would be cached as the new version.
+    """
+    if not await replica_router.use_replica(connection):
+        replica_router.reads["primary"] += 1
+        async with _request_session(connection) as session:
+            yield session
+        return
+
+    replica_router.reads["replica"] += 1
+    session = getattr(connection.state, "read_db", None)
+    if session is not None:
+        yield session
+        return
+
+    async with replica_session_maker() as session:  # type: ignore[misc]
+        connection.state.read_db = session
         try:
             yield session
         finally:
+            connection.state.read_db = None
             await session.close()
 
 
@@ -1,4 +1,4 @@
-from sqlalchemy import String, Boolean, DateTime, Text, JSON, ForeignKey, Numeric
+from sqlalchemy import String, Boolean, DateTime, Text, JSON, ForeignKey, Index, Numeric
 from sqlalchemy.orm import Mapped, mapped_column
 from datetime import datetime, UTC
 from decimal import Decimal
@@ -33,6 +33,12 @@ class EnergyOffer(Base):
     """Energy offer (Offre tarifaire)"""
 
     __tablename__ = "energy_offers"
+    __table_args__ = (
+        # Current offers (is_active AND valid_to IS NULL OR valid_to >= now)
+        Index("idx_energy_offers_active_valid_to", "is_active", "valid_to"),
+        # Active offers of a provider and type (deactivation of previous offers, provider filter)
+        Index("idx_energy_offers_provider_type_valid_to", "provider_id", "offer_type", "valid_to"),
+    )
 
     id: Mapped[str] = mapped_column(String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
     provider_id: Mapped[str] = mapped_column(String(36), ForeignKey("energy_providers.id", ondelete="CASCADE"), nullable=False)
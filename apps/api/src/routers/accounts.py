@@ -29,10 +29,11 @@ from ..utils import (
     generate_client_id,
     generate_client_secret,
 )
+from ..utils.responses import APIResponseRoute
 
 logger = logging.getLogger(__name__)
 
-router = APIRouter(prefix="/accounts", tags=["Accounts"])
+router = APIRouter(prefix="/accounts", tags=["Accounts"], route_class=APIResponseRoute)
 
 
 @router.post("/signup", response_model=APIResponse, status_code=status.HTTP_201_CREATED)
@@ -13,11 +13,12 @@ from ..models.database import get_db
 from ..middleware import get_current_user
 from ..schemas import APIResponse
 from ..services.client_auth import get_or_create_local_user
+from ..utils.responses import APIResponseRoute
 import logging
 
 logger = logging.getLogger(__name__)
 
-router = APIRouter(prefix="/accounts", tags=["Accounts (Client Mode)"])
+router = APIRouter(prefix="/accounts", tags=["Accounts (Client Mode)"], route_class=APIResponseRoute)
 
 
 @router.get("/me", response_model=APIResponse)
@@ -1,93 +1,29 @@
 from fastapi import APIRouter, Depends, Request, HTTPException, Path, Query
+from fastapi.responses import StreamingResponse
 from sqlalchemy import select, func, and_
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 from datetime import datetime, UTC
 import logging
 import json
-import asyncio
-from typing import Optional, List, Any
+from typing import Optional, Any, AsyncGenerator
 from ..models import User, PDL, EnergyProvider, EnergyOffer
-from ..models.database import get_db
+from ..models.database import engine, get_db, get_read_db, pool_metrics, replica_engine, replica_router
 from ..middleware import require_admin, require_permission, get_current_user
 from ..schemas import APIResponse, ErrorDetail
 from ..services import rate_limiter, cache_service
+from ..services.daily_cache import daily_cache
 from ..services.price_update_service import PriceUpdateService
+from ..services.notification_queue import notification_queue
+from ..services.offer_catalogue import offer_catalogue
+from ..services.scraper_jobs import JobConflictError, scraper_jobs
+from ..services.task_coordinator import task_coordinator
 from ..config import settings
-import redis.asyncio as redis
+from ..utils.responses import APIResponseRoute
 
 logger = logging.getLogger(__name__)
 
-# Mutex pour bloquer les synchronisations simultanées de fournisseurs
-_scraper_lock = asyncio.Lock()
-_scraper_status: dict = {
-    "running": False,
-    "provider": None,
-    "started_at": None,
-    "current_step": None,
-    "steps": [],
-    "progress": 0
-}
-
-# Cache pour les offres scrapées (évite de re-scraper entre preview et refresh)
-# TTL de 5 minutes - les offres scrapées sont réutilisées si le refresh est fait rapidement
-SCRAPED_OFFERS_CACHE_TTL = 300  # 5 minutes
-
-
-async def _get_redis_client() -> redis.Redis:  # type: ignore[return-value]
-    """Get Redis client"""
-    return await redis.from_url(settings.REDIS_URL, encoding="utf-8", decode_responses=True)  # type: ignore[no-any-return]
-
-
-async def _cache_scraped_offers(provider: str, offers: List[dict]) -> None:
-    """Cache les offres scrapées pour éviter un double scraping"""
-    try:
-        client = await _get_redis_client()
-        cache_key = f"scraped_offers:{provider}"
-        await client.setex(cache_key, SCRAPED_OFFERS_CACHE_TTL, json.dumps(offers))
-        await client.close()
-        logger.info(f"Cached {len(offers)} scraped offers for {provider} (TTL: {SCRAPED_OFFERS_CACHE_TTL}s)")
-    except Exception as e:
-        logger.error(f"Failed to cache offers for {provider}: {e}")
-
-
-async def _get_cached_offers(provider: str) -> List[dict] | None:
-    """Récupère les offres scrapées du cache si disponibles"""
-    try:
-        client = await _get_redis_client()
-        cache_key = f"scraped_offers:{provider}"
-        cached = await client.get(cache_key)
-        await client.close()
-        if cached:
-            offers: List[dict] = json.loads(cached)
-            logger.info(f"Found {len(offers)} cached offers for {provider}")
-            return offers
-    except Exception as e:
-        logger.error(f"Failed to get cached offers for {provider}: {e}")
-    return None
-
-
-async def _clear_cached_offers(provider: str) -> None:
-    """Supprime les offres scrapées du cache après utilisation"""
-    try:
-        client = await _get_redis_client()
-        cache_key = f"scraped_offers:{provider}"
-        await client.delete(cache_key)
-        await client.close()
-        logger.info(f"Cleared cached offers for {provider}")
-    except Exception as e:
-        logger.error(f"Failed to clear cached offers for {provider}: {e}")
-
-
-def _update_scraper_progress(step: str, progress: int) -> None:
-    """Update scraper progress status"""
-    global _scraper_status
-    _scraper_status["current_step"] = step
-    _scraper_status["progress"] = progress
-    if step not in _scraper_status["steps"]:
-        _scraper_status["steps"].append(step)
-
-router = APIRouter(prefix="/admin", tags=["Admin"])
+router = APIRouter(prefix="/admin", tags=["Admin"], route_class=APIResponseRoute)
 
 
 @router.get("/users", response_model=APIResponse)
@@ -187,18 +123,20 @@ async def clear_user_cache(
     deleted_count = 0
     if cache_service.redis_client:
         for pdl in pdls:
-            # Clear ALL cache types for each PDL
+            # Clear ALL cache types for each PDL (resolved from the PDL key index)
             patterns = [
                 f"consumption:detail:{pdl.usage_point_id}:*",
+                f"consumption:detail:daily:{pdl.usage_point_id}:*",
                 f"consumption:daily:{pdl.usage_point_id}:*",
                 f"consumption:reading_type:{pdl.usage_point_id}",
+                f"consumption:aggregate:{pdl.usage_point_id}:*",
                 f"production:detail:{pdl.usage_point_id}:*",
+                f"production:detail:daily:{pdl.usage_point_id}:*",
                 f"production:daily:{pdl.usage_point_id}:*",
                 f"production:reading_type:{pdl.usage_point_id}",
+                f"production:aggregate:{pdl.usage_point_id}:*",
             ]
-            for pattern in patterns:
-                count = await cache_service.delete_pattern(pattern)
-                deleted_count += count
+            deleted_count += await cache_service.delete_usage_point_keys(pdl.usage_point_id, patterns)
 
     return APIResponse(
         success=True,
@@ -239,9 +177,7 @@ async def clear_user_blacklist(
                 f"enedis:blacklist:{pdl.usage_point_id}:*",
                 f"enedis:fail:{pdl.usage_point_id}:*",
             ]
-            for pattern in patterns:
-                count = await cache_service.delete_pattern(pattern)
-                deleted_count += count
+            deleted_count += await cache_service.delete_usage_point_keys(pdl.usage_point_id, patterns)
 
     return APIResponse(
         success=True,
@@ -362,10 +298,63 @@ async def clear_all_cache(
     )
 
 
+@router.get("/cache/usage", response_model=APIResponse)
+async def get_cache_usage(
+    user_id: Optional[str] = Query(None, description="Restrict to one user (UUID)"),
+    limit: int = Query(50, ge=1, le=1000, description="Number of users to return (largest first)"),
+    current_user: User = Depends(require_admin),
+    db: AsyncSession = Depends(get_db)
+) -> APIResponse:
+    """
+    Get cached data usage (bytes, keys) per user and per PDL (admin only).
+
+    Usage is read from the cache accounting index (no keyspace scan).
+    """
+    from ..services.cache_accounting import cache_accounting
+
+    if not cache_service.redis_client:
+        return APIResponse(
+            success=False,
+            error=ErrorDetail(code="CACHE_UNAVAILABLE", message="Cache is not available")
+        )
+
+    query = select(PDL.usage_point_id, PDL.name, User.id, User.email).join(User, PDL.user_id == User.id)
+    if user_id:
+        query = query.where(User.id == user_id)
+    rows = (await db.execute(query)).all()
+
+    usage = await cache_accounting.get_usage(cache_service.redis_client, [row[0] for row in rows])
+
+    users: dict[str, dict[str, Any]] = {}
+    for usage_point_id, name, owner_id, email in rows:
+        pdl_usage = usage.get(usage_point_id, {"bytes": 0, "keys": 0})
+        user_usage = users.setdefault(owner_id, {"user_id": owner_id, "email": email, "bytes": 0, "keys": 0, "pdls": []})
+        user_usage["bytes"] += pdl_usage["bytes"]
+        user_usage["keys"] += pdl_usage["keys"]
+        user_usage["pdls"].append({"usage_point_id": usage_point_id, "name": name, **pdl_usage})
+
+    ranked = sorted(users.values(), key=lambda u: u["bytes"], reverse=True)
+    for user_usage in ranked:
+        user_usage["pdls"].sort(key=lambda p: p["bytes"], reverse=True)
+
+    return APIResponse(
+        success=True,
+        data={
+            "users": ranked[:limit],
+            "total_bytes": sum(u["bytes"] for u in ranked),
+            "total_keys": sum(u["keys"] for u in ranked),
+            "quotas": {
+                "pdl_bytes": settings.CACHE_QUOTA_PDL_BYTES,
+                "user_bytes": settings.CACHE_QUOTA_USER_BYTES,
+            },
+        }
+    )
+
+
 @router.get("/users/stats", response_model=APIResponse)
 async def get_user_stats(
     current_user: User = Depends(require_permission('users')),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ) -> APIResponse:
     """Get user statistics (requires users permission)"""
 
@@ -582,7 +571,7 @@ async def toggle_user_debug_mode(
 @router.get("/stats", response_model=APIResponse)
 async def get_global_stats(
     current_user: User = Depends(require_permission('admin_dashboard')),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ) -> APIResponse:
     """Get global platform statistics (requires admin_dashboard permission)"""
 
@@ -657,63 +646,32 @@ async def get_global_stats(
     total_cached_calls = 0
     total_no_cache_calls = 0
     endpoint_stats = {}
-    user_stats = {}  # Track calls per user
 
     # Initialize all endpoints with 0
     for endpoint in all_endpoints:
         endpoint_stats[endpoint] = {"cached": 0, "no_cache": 0, "total": 0}
 
-    if cache_service.redis_client:
-        # Get all rate limit keys for today
-        pattern = f"rate_limit:*:*:*:{today}"
-        async for key in cache_service.redis_client.scan_iter(match=pattern):
-            value = await cache_service.redis_client.get(key)
-            if value:
-                count = int(value)
-                # Extract from key: rate_limit:user_id:endpoint:cache_type:date
-                key_str = key.decode('utf-8') if isinstance(key, bytes) else key
-                parts = key_str.split(':')
-                if len(parts) >= 5:
-                    user_id = parts[1]
-                    endpoint = parts[2]
-                    cache_type = parts[3]  # "cached" or "no_cache"
-
-                    # Track per-endpoint stats
-                    if endpoint not in endpoint_stats:
-                        endpoint_stats[endpoint] = {"cached": 0, "no_cache": 0, "total": 0}
-
-                    if cache_type == "cached":
-                        total_cached_calls += count
-                        endpoint_stats[endpoint]["cached"] += count
-                    else:
-                        total_no_cache_calls += count
-                        endpoint_stats[endpoint]["no_cache"] += count
-
-                    endpoint_stats[endpoint]["total"] += count
-
-                    # Track per-user stats
-                    if user_id not in user_stats:
-                        user_stats[user_id] = {"cached": 0, "no_cache": 0, "total": 0}
-
-                    if cache_type == "cached":
-                        user_stats[user_id]["cached"] += count
-                    else:
-                        user_stats[user_id]["no_cache"] += count
-
-                    user_stats[user_id]["total"] += count
+    # Today's usage from the per-day usage hashes (two HGETALL)
+    usage = await rate_limiter.get_daily_usage(today)
+    for endpoint, stats in usage["endpoints"].items():
+        endpoint_stats[endpoint] = stats
+    for stats in usage["users"].values():
+        total_cached_calls += stats["cached"]
+        total_no_cache_calls += stats["no_cache"]
 
     # Get top 20 users by total calls
     top_users = []
-    if user_stats:
-        # Get user details from DB
-        sorted_user_ids = sorted(user_stats.items(), key=lambda x: x[1]["total"], reverse=True)[:20]
+    if usage["users"]:
+        sorted_user_ids = sorted(usage["users"].items(), key=lambda x: x[1]["total"], reverse=True)[:20]
 
-        for user_id, stats in sorted_user_ids:
-            user_result = await db.execute(
-                select(User).options(selectinload(User.role)).where(User.id == user_id)
-            )
-            user = user_result.scalar_one_or_none()
+        # Get user details from DB (one query)
+        user_result = await db.execute(
+            select(User).options(selectinload(User.role)).where(User.id.in_([user_id for user_id, _ in sorted_user_ids]))
+        )
+        users_by_id = {user.id: user for user in user_result.scalars().all()}
 
+        for user_id, stats in sorted_user_ids:
+            user = users_by_id.get(user_id)
             if user:
                 top_users.append({
                     "user_id": user.id,
@@ -727,6 +685,9 @@ async def get_global_stats(
                     "total_calls": stats["total"]
                 })
 
+    # Daily totals of the retained history
+    usage_history = await rate_limiter.get_usage_history()
+
     return APIResponse(
         success=True,
         data={
@@ -740,6 +701,7 @@ async def get_global_stats(
             },
             "endpoint_stats": endpoint_stats,
             "top_users": top_users,
+            "usage_history": usage_history,
             "date": today
         }
     )
@@ -785,6 +747,49 @@ async def refresh_ecowatt_cache(
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.get("/notifications/queue", response_model=APIResponse)
+async def get_notification_queue_stats(
+    current_user: User = Depends(require_permission('admin_dashboard'))
+) -> APIResponse:
+    """Depth of the outbound notification queue (emails, Slack) per state"""
+    return APIResponse(success=True, data=await notification_queue.stats())
+
+
+@router.get("/database/pool", response_model=APIResponse)
+async def get_database_pool_stats(
+    current_user: User = Depends(require_permission('admin_dashboard'))
+) -> APIResponse:
+    """Connection pools of this process: checkouts, wait and hold times, connections in use, replica lag"""
+    return APIResponse(success=True, data={
+        **pool_metrics.snapshot(engine.pool),
+        "replica": replica_router.snapshot() if replica_engine is not None else None,
+    })
+
+
+@router.get("/tasks", response_model=APIResponse)
+async def get_background_tasks(
+    runs: int = Query(10, ge=1, le=100, description="Recent runs returned per task"),
+    current_user: User = Depends(require_permission('admin_dashboard'))
+) -> APIResponse:
+    """Periodic background tasks: schedule, run in progress, recent runs and their durations"""
+    return APIResponse(success=True, data=await task_coordinator.status(runs))
+
+
+@router.get("/tasks/{task_name}/runs", response_model=APIResponse)
+async def get_background_task_runs(
+    task_name: str = Path(..., description="Task name (e.g. tempo, ecowatt, cache_maintenance)"),
+    limit: int = Query(50, ge=1, le=500, description="Maximum number of runs to retrieve"),
+    current_user: User = Depends(require_permission('admin_dashboard'))
+) -> APIResponse:
+    """Run history of a periodic background task, newest first"""
+    if task_name not in task_coordinator.tasks:
+        return APIResponse(
+            success=False,
+            error=ErrorDetail(code="TASK_NOT_FOUND", message=f"Unknown background task: {task_name}")
+        )
+    return APIResponse(success=True, data=await task_coordinator.history(task_name, limit))
+
+
 @router.get("/logs", response_model=APIResponse)
 async def get_logs(
     level: Optional[str] = Query(None, description="Filter by log level (info, warning, error, critical, debug)"),
@@ -918,317 +923,154 @@ async def get_sync_status(
     Get the current synchronization status for energy provider offers
 
     Returns whether a sync is running, which provider is being synced, and when it started.
-    Requires 'offers' permission.
+    The state is shared by all API replicas (Redis). Requires 'offers' permission.
 
     Returns:
         APIResponse with sync status information
     """
+    job = await scraper_jobs.current_job() if cache_service.redis_client else None
     return APIResponse(
         success=True,
         data={
-            "sync_in_progress": _scraper_lock.locked(),
-            "provider": _scraper_status["provider"],
-            "started_at": _scraper_status["started_at"],
-            "current_step": _scraper_status["current_step"],
-            "steps": _scraper_status["steps"],
-            "progress": _scraper_status["progress"]
+            "sync_in_progress": job is not None,
+            "job_id": job["id"] if job else None,
+            "provider": job["provider"] if job else None,
+            "started_at": (job["started_at"] or job["created_at"]) if job else None,
+            "current_step": job["current_step"] if job else None,
+            "steps": job["steps"] if job else [],
+            "progress": job["progress"] if job else 0,
         }
     )
 
 
+async def _run_scraper_job(kind: str, provider: Optional[str], wait: bool) -> APIResponse:
+    """Submit a scraper job; with ``wait`` answer with its result, otherwise with its id"""
+    if provider and provider not in PriceUpdateService.SCRAPERS:
+        return APIResponse(
+            success=False,
+            error=ErrorDetail(
+                code="INVALID_PROVIDER",
+                message=f"Unknown provider: {provider}. Available: {', '.join(PriceUpdateService.SCRAPERS.keys())}"
+            )
+        )
+    if not cache_service.redis_client:
+        return APIResponse(
+            success=False,
+            error=ErrorDetail(code="SERVICE_UNAVAILABLE", message="Redis is required to run scraping jobs")
+        )
+
+    try:
+        job = await scraper_jobs.submit(kind, provider)
+    except JobConflictError as e:
+        # Vérifier si une synchronisation est déjà en cours (sur n'importe quel replica)
+        return APIResponse(success=False, error=ErrorDetail(code="SYNC_IN_PROGRESS", message=str(e)))
+
+    if not wait:
+        return APIResponse(success=True, data={"job_id": job["id"], "status": job["status"]})
+
+    job = await scraper_jobs.wait(job["id"], settings.SCRAPER_JOB_WAIT_TIMEOUT_SECONDS)
+    if job and job["result"]:
+        return APIResponse(**job["result"])
+    return APIResponse(
+        success=False,
+        error=ErrorDetail(
+            code="JOB_TIMEOUT",
+            message=f"Job {job['id'] if job else ''} still running, poll /admin/offers/jobs/{{job_id}}"
+        )
+    )
+
+
 @router.get("/offers/preview", response_model=APIResponse)
 async def preview_offers_update(
     provider: Optional[str] = Query(None, description="Provider name (EDF, Enercoop, TotalEnergies). If not specified, all providers will be previewed."),
+    wait: bool = Query(True, description="Wait for the preview result. If false, return the job id immediately."),
     current_user: User = Depends(require_permission('offers')),
-    db: AsyncSession = Depends(get_db)
 ) -> APIResponse:
     """
     Preview energy provider offers update WITHOUT saving to database (DRY RUN)
 
     This endpoint scrapes the latest tariffs from provider websites and compares them
     with current database offers, showing what would be created, updated, or deactivated.
+    The scraping runs as a background job (see /admin/offers/jobs/{job_id}).
     Requires 'offers' permission.
 
     Args:
         provider: Optional provider name to preview. If None, all providers are previewed.
+        wait: Wait for the job result (default) or return its id immediately
 
     Returns:
         APIResponse with preview comparison between current and scraped offers
     """
-    global _scraper_status
-
-    # Vérifier si une synchronisation est déjà en cours
-    if _scraper_lock.locked():
-        return APIResponse(
-            success=False,
-            error=ErrorDetail(
-                code="SYNC_IN_PROGRESS",
-                message=f"Une synchronisation est déjà en cours pour le fournisseur '{_scraper_status['provider']}' depuis {_scraper_status['started_at']}"
-            )
-        )
-
-    async with _scraper_lock:
-        try:
-            _scraper_status = {
-                "running": True,
-                "provider": provider or "all",
-                "started_at": datetime.now(UTC).isoformat(),
-                "current_step": "Initialisation",
-                "steps": ["Initialisation"],
-                "progress": 5
-            }
-
-            service = PriceUpdateService(db)
-
-            if provider:
-                # Preview single provider
-                if provider not in PriceUpdateService.SCRAPERS:
-                    return APIResponse(
-                        success=False,
-                        error=ErrorDetail(
-                            code="INVALID_PROVIDER",
-                            message=f"Unknown provider: {provider}. Available: {', '.join(PriceUpdateService.SCRAPERS.keys())}"
-                        )
-                    )
-
-                _update_scraper_progress(f"Téléchargement des tarifs {provider}", 20)
-                preview_result = await service.preview_provider_update(provider)
-                _update_scraper_progress("Analyse des changements", 80)
-
-                if not preview_result.get("success"):
-                    return APIResponse(
-                        success=False,
-                        error=ErrorDetail(
-                            code="PREVIEW_FAILED",
-                            message=preview_result.get("error", "Unknown error")  # type: ignore
-                        )
-                    )
-
-                # Cache scraped offers for later refresh (avoids re-scraping)
-                if preview_result.get("scraped_offers"):
-                    await _cache_scraped_offers(provider, preview_result["scraped_offers"])
-
-                return APIResponse(
-                    success=True,
-                    data={
-                        "preview": {
-                            provider: {
-                                "offers_to_create": preview_result["offers_to_create"],
-                                "offers_to_update": preview_result["offers_to_update"],
-                                "offers_to_deactivate": preview_result["offers_to_deactivate"],
-                                "used_fallback": preview_result.get("used_fallback", False),
-                                "fallback_reason": preview_result.get("fallback_reason"),
-                                "summary": {
-                                    "total_offers": preview_result["summary"]["total_scraped"],
-                                    "new": preview_result["summary"]["new"],
-                                    "updated": preview_result["summary"]["updated"],
-                                    "deactivated": preview_result["summary"]["deactivated"],
-                                }
-                            }
-                        },
-                        "timestamp": datetime.now(UTC).isoformat()
-                    }
-                )
-            else:
-                # Preview all providers
-                preview_results = {}
-                providers_list = list(PriceUpdateService.SCRAPERS.keys())
-                total_providers = len(providers_list)
-
-                for idx, provider_name in enumerate(providers_list):
-                    progress = 10 + int((idx / total_providers) * 80)
-                    _update_scraper_progress(f"Téléchargement {provider_name} ({idx + 1}/{total_providers})", progress)
-
-                    try:
-                        preview_result = await service.preview_provider_update(provider_name)
-
-                        if preview_result.get("success"):
-                            preview_results[provider_name] = {
-                                "offers_to_create": preview_result["offers_to_create"],
-                                "offers_to_update": preview_result["offers_to_update"],
-                                "offers_to_deactivate": preview_result["offers_to_deactivate"],
-                                "summary": {
-                                    "total_offers": preview_result["summary"]["total_scraped"],
-                                    "new": preview_result["summary"]["new"],
-                                    "updated": preview_result["summary"]["updated"],
-                                    "deactivated": preview_result["summary"]["deactivated"],
-                                }
-                            }
-                        else:
-                            preview_results[provider_name] = {
-                                "error": preview_result.get("error", "Unknown error"),
-                                "offers_to_create": [],
-                                "offers_to_update": [],
-                                "offers_to_deactivate": [],
-                                "summary": {
-                                    "total_offers": 0,
-                                    "new": 0,
-                                    "updated": 0,
-                                    "deactivated": 0,
-                                }
-                            }
-                    except Exception as e:
-                        logger.error(f"Error previewing {provider_name}: {e}", exc_info=True)
-                        preview_results[provider_name] = {
-                            "error": str(e),
-                            "offers_to_create": [],
-                            "offers_to_update": [],
-                            "offers_to_deactivate": [],
-                            "summary": {
-                                "total_offers": 0,
-                                "new": 0,
-                                "updated": 0,
-                                "deactivated": 0,
-                            }
-                        }
-
-                return APIResponse(
-                    success=True,
-                    data={
-                        "preview": preview_results,
-                        "timestamp": datetime.now(UTC).isoformat()
-                    }
-                )
-
-        except Exception as e:
-            logger.error(f"Error previewing offers: {e}", exc_info=True)
-            return APIResponse(
-                success=False,
-                error=ErrorDetail(
-                    code="PREVIEW_ERROR",
-                    message=str(e)
-                )
-            )
-        finally:
-            _scraper_status = {"running": False, "provider": None, "started_at": None, "current_step": None, "steps": [], "progress": 0}
+    return await _run_scraper_job("preview", provider, wait)
 
 
 @router.post("/offers/refresh", response_model=APIResponse)
 async def refresh_offers(
     provider: Optional[str] = Query(None, description="Provider name (EDF, Enercoop, TotalEnergies). If not specified, all providers will be updated."),
+    wait: bool = Query(True, description="Wait for the refresh result. If false, return the job id immediately."),
     current_user: User = Depends(require_permission('offers')),
-    db: AsyncSession = Depends(get_db)
 ) -> APIResponse:
     """
     Refresh energy provider offers from external sources
 
     This endpoint scrapes the latest tariffs from provider websites and updates the database.
+    The scraping runs as a background job (see /admin/offers/jobs/{job_id}).
     Requires 'offers' permission.
 
     Args:
         provider: Optional provider name to update. If None, all providers are updated.
+        wait: Wait for the job result (default) or return its id immediately
 
     Returns:
         APIResponse with update results
     """
-    global _scraper_status
+    return await _run_scraper_job("refresh", provider, wait)
 
-    # Vérifier si une synchronisation est déjà en cours
-    if _scraper_lock.locked():
-        return APIResponse(
-            success=False,
-            error=ErrorDetail(
-                code="SYNC_IN_PROGRESS",
-                message=f"Une synchronisation est déjà en cours pour le fournisseur '{_scraper_status['provider']}' depuis {_scraper_status['started_at']}"
-            )
-        )
 
-    async with _scraper_lock:
-        try:
-            _scraper_status = {
-                "running": True,
-                "provider": provider or "all",
-                "started_at": datetime.now(UTC).isoformat(),
-                "current_step": "Initialisation",
-                "steps": ["Initialisation"],
-                "progress": 5
-            }
+@router.get("/offers/jobs/{job_id}", response_model=APIResponse)
+async def get_scraper_job(
+    job_id: str = Path(..., description="Scraper job id"),
+    current_user: User = Depends(require_permission('offers')),
+) -> APIResponse:
+    """Get the status, progress and (once finished) result of a scraper job"""
+    job = await scraper_jobs.get_job(job_id) if cache_service.redis_client else None
+    if not job:
+        return APIResponse(success=False, error=ErrorDetail(code="JOB_NOT_FOUND", message=f"Unknown or expired job: {job_id}"))
+    return APIResponse(success=True, data=job)
 
-            service = PriceUpdateService(db)
-
-            if provider:
-                # Update single provider
-                if provider not in PriceUpdateService.SCRAPERS:
-                    return APIResponse(
-                        success=False,
-                        error=ErrorDetail(
-                            code="INVALID_PROVIDER",
-                            message=f"Unknown provider: {provider}. Available: {', '.join(PriceUpdateService.SCRAPERS.keys())}"
-                        )
-                    )
 
-                # Check for cached offers from preview (avoids re-scraping)
-                cached_offers = await _get_cached_offers(provider)
-
-                if cached_offers:
-                    # Continue from where preview left off (80%)
-                    # Preview: 0% → 20% (download) → 80% (analysis done)
-                    # Refresh with cache: 80% → 90% (DB update) → 100% (done)
-                    _update_scraper_progress(f"Utilisation des données en cache pour {provider}", 82)
-                else:
-                    _update_scraper_progress(f"Téléchargement des tarifs {provider}", 20)
-
-                result = await service.update_provider(provider, cached_offers=cached_offers)
-
-                # Progress depends on whether we used cache
-                _update_scraper_progress("Mise à jour de la base de données", 90 if cached_offers else 80)
-
-                # Clear cache after use
-                if cached_offers:
-                    await _clear_cached_offers(provider)
-
-                if not result.get("success"):
-                    return APIResponse(
-                        success=False,
-                        error=ErrorDetail(
-                            code="UPDATE_FAILED",
-                            message=result.get("error", "Unknown error")  # type: ignore
-                        )
-                    )
+@router.get("/offers/jobs/{job_id}/events")
+async def stream_scraper_job(
+    job_id: str = Path(..., description="Scraper job id"),
+    current_user: User = Depends(require_permission('offers')),
+) -> StreamingResponse:
+    """Stream the progress of a scraper job as Server-Sent Events
 
-                _update_scraper_progress("Terminé", 100)
-                return APIResponse(
-                    success=True,
-                    data={
-                        "message": f"Successfully updated {provider}" + (" (from cache)" if cached_offers else ""),
-                        "result": result,
-                        "used_cache": cached_offers is not None
-                    }
-                )
+    Event types:
+    - progress: {status, current_step, steps, progress}
+    - complete: Final job state, including the result
+    - error: Unknown or expired job
+    """
+    async def generate_events() -> AsyncGenerator[str, None]:
+        if not cache_service.redis_client or not await scraper_jobs.get_job(job_id):
+            yield f"event: error\ndata: {json.dumps({'message': f'Unknown or expired job: {job_id}'})}\n\n"
+            return
+        async for job in scraper_jobs.stream(job_id):
+            if job["status"] in ("completed", "failed"):
+                yield f"event: complete\ndata: {json.dumps(job)}\n\n"
             else:
-                # Update all providers
-                _update_scraper_progress("Mise à jour de tous les fournisseurs", 10)
-                results = await service.update_all_providers()
-
-                successful = sum(1 for r in results.values() if r.get("success"))
-                failed = len(results) - successful
-
-                total_created = sum(r.get("offers_created", 0) for r in results.values() if r.get("success"))
-                total_updated = sum(r.get("offers_updated", 0) for r in results.values() if r.get("success"))
-
-                return APIResponse(
-                    success=True,
-                    data={
-                        "message": f"Updated {successful} providers ({failed} failed)",
-                        "providers_updated": successful,
-                        "providers_failed": failed,
-                        "total_offers_created": total_created,
-                        "total_offers_updated": total_updated,
-                        "results": results
-                    }
-                )
-
-        except Exception as e:
-            logger.error(f"Error refreshing offers: {e}", exc_info=True)
-            return APIResponse(
-                success=False,
-                error=ErrorDetail(
-                    code="REFRESH_ERROR",
-                    message=str(e)
-                )
-            )
-        finally:
-            _scraper_status = {"running": False, "provider": None, "started_at": None, "current_step": None, "steps": [], "progress": 0}
+                event = {k: job[k] for k in ("status", "current_step", "steps", "progress")}
+                yield f"event: progress\ndata: {json.dumps(event)}\n\n"
+
+    return StreamingResponse(
+        generate_events(),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "Connection": "keep-alive",
+            "X-Accel-Buffering": "no",  # Désactiver le buffering nginx
+        },
+    )
 
 
 @router.delete("/offers/purge", response_model=APIResponse)
@@ -1286,6 +1128,7 @@ async def purge_provider_offers(
             await db.delete(offer)
 
         await db.commit()
+        await offer_catalogue.invalidate()
 
         logger.info(f"[ADMIN] User {current_user.email} purged {offers_count} offers from provider {provider}")
 
@@ -1660,20 +1503,11 @@ async def get_user_shared_cache_data(
     cache_entries_count = 0
 
     if data_type in ["consumption", "production"]:
-        # Get daily data from cache
+        # Get daily data from cache (whole range in one bitmap read + pipelined HMGET)
         if start_date and end_date:
             try:
-                current = datetime.strptime(start_date, "%Y-%m-%d")
-                end = datetime.strptime(end_date, "%Y-%m-%d")
-
-                while current <= end:
-                    date_str = current.strftime("%Y-%m-%d")
-                    cache_key = f"{data_type}:daily:{pdl.usage_point_id}:{date_str}"
-                    data = await cache_service.get(cache_key, user.client_secret)
-                    if data:
-                        cached_data.append({"date": date_str, "data": data})
-                        cache_entries_count += 1
-                    current += timedelta(days=1)
+                start = datetime.strptime(start_date, "%Y-%m-%d").date()
+                end = datetime.strptime(end_date, "%Y-%m-%d").date()
             except ValueError:
                 return APIResponse(
                     success=False,
@@ -1682,17 +1516,18 @@ async def get_user_shared_cache_data(
                         message="Dates must be in YYYY-MM-DD format"
                     )
                 )
+            newest_first = False
         else:
             # Return last 7 days by default
-            today = datetime.now(UTC)
-            for i in range(7):
-                date_obj = today - timedelta(days=i)
-                date_str = date_obj.strftime("%Y-%m-%d")
-                cache_key = f"{data_type}:daily:{pdl.usage_point_id}:{date_str}"
-                data = await cache_service.get(cache_key, user.client_secret)
-                if data:
-                    cached_data.append({"date": date_str, "data": data})
-                    cache_entries_count += 1
+            end = datetime.now(UTC).date()
+            start = end - timedelta(days=6)
+            newest_first = True
+
+        readings, _ = await daily_cache.get_range(data_type, pdl.usage_point_id, start, end, user.client_secret)
+        if newest_first:
+            readings.reverse()
+        cached_data = [{"date": reading["date"][:10], "data": reading} for reading in readings]
+        cache_entries_count = len(cached_data)
 
     elif data_type == "contract":
         cache_key = f"contract:{pdl.usage_point_id}"
@@ -1772,20 +1607,15 @@ async def get_user_cache_stats(
             "production_detail": 0,
         }
 
-        # Count cache entries
+        # Count cache entries (from the PDL key index, daily = month hashes, detail = per-day entries)
         if cache_service.redis_client:
             patterns = {
-                "consumption_daily": f"consumption:daily:{pdl.usage_point_id}:*",
-                "consumption_detail": f"consumption:detail:{pdl.usage_point_id}:*",
-                "production_daily": f"production:daily:{pdl.usage_point_id}:*",
-                "production_detail": f"production:detail:{pdl.usage_point_id}:*",
+                "consumption_daily": f"consumption:daily:{pdl.usage_point_id}:month:*",
+                "consumption_detail": f"consumption:detail:daily:{pdl.usage_point_id}:*",
+                "production_daily": f"production:daily:{pdl.usage_point_id}:month:*",
+                "production_detail": f"production:detail:daily:{pdl.usage_point_id}:*",
             }
-
-            for key_type, pattern in patterns.items():
-                count = 0
-                async for _ in cache_service.redis_client.scan_iter(match=pattern):
-                    count += 1
-                pdl_stats[key_type] = count
+            pdl_stats.update(await cache_service.count_usage_point_keys(pdl.usage_point_id, patterns))
 
         stats.append(pdl_stats)
 
@@ -1935,6 +1765,7 @@ async def admin_fetch_enedis_data(
             )
 
     # Fetch data from Enedis
+    cached_count = 0
     try:
         if data_type == "consumption":
             enedis_data = await enedis_adapter.get_consumption_daily(
@@ -1954,14 +1785,10 @@ async def admin_fetch_enedis_data(
         # Cache the data with user's client_secret
         if enedis_data and "meter_reading" in enedis_data:
             readings = enedis_data["meter_reading"].get("interval_reading", [])
-            cached_count = 0
-
-            for reading in readings:
-                if "date" in reading:
-                    date_str = reading["date"]
-                    cache_key = f"{data_type}:daily:{pdl.usage_point_id}:{date_str}"
-                    await cache_service.set(cache_key, reading, user.client_secret)
-                    cached_count += 1
+            # One cipher, one pipeline for the whole range
+            cached_count = await daily_cache.set_readings(
+                data_type, pdl.usage_point_id, readings, user.client_secret
+            )
 
             logger.info(
                 f"[ADMIN_FETCH] Admin {current_user.email} fetched {data_type} data "
@@ -1980,7 +1807,7 @@ async def admin_fetch_enedis_data(
                     "end": end_date
                 },
                 "enedis_data": enedis_data,
-                "cached_days": cached_count if 'cached_count' in dir() else 0
+                "cached_days": cached_count
             }
         )
 
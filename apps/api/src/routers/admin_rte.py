@@ -21,10 +21,11 @@ from ..models.database import get_db
 from ..middleware import require_permission
 from ..schemas import APIResponse, ErrorDetail
 from ..config import settings
+from ..utils.responses import APIResponseRoute
 
 logger = logging.getLogger(__name__)
 
-router = APIRouter(prefix="/admin/rte", tags=["Admin - RTE APIs"])
+router = APIRouter(prefix="/admin/rte", tags=["Admin - RTE APIs"], route_class=APIResponseRoute)
 
 # Configuration des API RTE
 RTE_APIS = {
@@ -7,24 +7,27 @@ Supports both server mode (direct RTE API) and client mode (via gateway).
 import logging
 from datetime import UTC, datetime, timedelta
 
-from fastapi import APIRouter, Depends, Query
+from fastapi import APIRouter, Depends, Query, Request, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from ..config import settings
 from ..middleware import require_action
 from ..models import User
-from ..models.database import get_db
+from ..models.database import get_db, get_read_db
 from ..schemas import APIResponse, ErrorDetail
+from ..services.response_cache import response_cache
 from ..services.rte import rte_service
+from ..utils.responses import APIResponseRoute
 
 logger = logging.getLogger(__name__)
 
-router = APIRouter(prefix="/consumption-france", tags=["Consumption France"])
+router = APIRouter(prefix="/consumption-france", tags=["Consumption France"], route_class=APIResponseRoute)
 
 
 @router.get("", response_model=APIResponse)
 @router.get("/", response_model=APIResponse, include_in_schema=False)
 async def get_consumption_france(
+    request: Request,
     type: str | None = Query(
         None,
         description="Type de données (REALISED, ID, D-1, D-2)",
@@ -48,8 +51,15 @@ async def get_consumption_france(
             "tomorrow": {"summary": "Demain", "value": "2024-01-16"},
         },
     ),
+    since: str | None = Query(
+        None,
+        description="Delta sync: only rows updated after this instant (ISO 8601, exclusive)",
+        openapi_examples={
+            "last_sync": {"summary": "Last sync watermark", "value": "2024-10-01T06:00:00+00:00"},
+        },
+    ),
     db: AsyncSession = Depends(get_db),
-) -> APIResponse:
+) -> Response:
     """
     Récupérer les données de consommation électrique nationale française.
 
@@ -61,6 +71,13 @@ async def get_consumption_france(
 
     Les données sont en MW et représentent la consommation totale France métropolitaine.
     """
+    return await response_cache.serve(request, "consumption_france", lambda: _build_consumption_france(type, start_date, end_date, since, db))
+
+
+async def _build_consumption_france(
+    type: str | None, start_date: str | None, end_date: str | None, since: str | None, db: AsyncSession
+) -> APIResponse:
+    """Build the consumption france response (cached by get_consumption_france)"""
     try:
         # Parser les dates si fournies
         start_dt = None
@@ -82,12 +99,19 @@ async def get_consumption_france(
         if not end_dt:
             end_dt = datetime.now(UTC) + timedelta(days=1)
 
+        updated_since = None
+        if since:
+            updated_since = datetime.fromisoformat(since.replace("Z", "+00:00"))
+            if updated_since.tzinfo is None:
+                updated_since = updated_since.replace(tzinfo=UTC)
+
         # Récupérer les données depuis le cache
         consumption_data = await rte_service.get_consumption_france(
             db,
             consumption_type=type,
             start_date=start_dt,
             end_date=end_dt,
+            updated_since=updated_since,
         )
 
         # Grouper par type
@@ -101,6 +125,7 @@ async def get_consumption_france(
                     "end_date": record.end_date.isoformat() if record.end_date else None,
                     "value": record.value,
                     "updated_date": record.updated_date.isoformat() if record.updated_date else None,
+                    "updated_at": record.updated_at.isoformat() if record.updated_at else None,
                 }
             )
 
@@ -130,7 +155,7 @@ async def get_consumption_france(
 
 @router.get("/current", response_model=APIResponse)
 async def get_current_consumption(
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ) -> APIResponse:
     """
     Récupérer la consommation actuelle (dernière valeur réalisée).
@@ -182,7 +207,7 @@ async def get_consumption_forecast(
         le=7,
         description="Nombre de jours de prévision (1-7)",
     ),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ) -> APIResponse:
     """
     Récupérer les prévisions de consommation nationale.
@@ -214,6 +239,7 @@ async def get_consumption_forecast(
                     "end_date": record.end_date.isoformat() if record.end_date else None,
                     "value": record.value,
                     "updated_date": record.updated_date.isoformat() if record.updated_date else None,
+                    "updated_at": record.updated_at.isoformat() if record.updated_at else None,
                 }
             )
 
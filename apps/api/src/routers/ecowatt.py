@@ -4,23 +4,25 @@ EcoWatt API endpoints
 
 from datetime import datetime, date, timedelta, UTC
 from typing import List, Optional, Any
-from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, and_
 import logging
 
 from ..config import settings
-from ..models.database import get_db
+from ..models.database import get_db, get_read_db
 from ..middleware import get_current_user, require_action
 from ..models import User
 from ..models.ecowatt import EcoWatt, EcoWattResponse
 from ..schemas import APIResponse
 from ..services import rate_limiter, cache_service
+from ..services.response_cache import response_cache
 from ..services.rte import rte_service
+from ..utils.responses import APIResponseRoute
 
 logger = logging.getLogger(__name__)
 
-router = APIRouter(prefix="/ecowatt", tags=["EcoWatt"])
+router = APIRouter(prefix="/ecowatt", tags=["EcoWatt"], route_class=APIResponseRoute)
 
 # Throttling configuration
 ECOWATT_REFRESH_COOLDOWN = 900  # 15 minutes in seconds
@@ -30,7 +32,7 @@ ECOWATT_REFRESH_COOLDOWN = 900  # 15 minutes in seconds
 async def get_current_ecowatt(
     request: Request,
     current_user: User = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ) -> Optional[EcoWattResponse]:
     """
     Get current EcoWatt signal for today
@@ -78,9 +80,13 @@ async def get_ecowatt_forecast(
             "tomorrow": {"summary": "Tomorrow only", "description": "Next day only", "value": 1}
         }
     ),
+    since: Optional[datetime] = Query(
+        default=None,
+        description="Delta sync: only signals updated after this instant (ISO 8601, exclusive)",
+    ),
     current_user: User = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
-) -> APIResponse:
+) -> Response:
     """
     Get EcoWatt forecast for the next N days (max 7)
 
@@ -95,6 +101,12 @@ async def get_ecowatt_forecast(
     if not is_allowed:
         raise HTTPException(status_code=429, detail=f"Rate limit exceeded: {current_count}/{limit} requests today")
 
+    # Same payload for every user: served from the pre-serialised response cache
+    return await response_cache.serve(request, "ecowatt", lambda: _build_ecowatt_forecast(days, since, db))
+
+
+async def _build_ecowatt_forecast(days: int, since: Optional[datetime], db: AsyncSession) -> APIResponse:
+    """Build the EcoWatt forecast response (cached by get_ecowatt_forecast)"""
     # Query database for forecast
     today = date.today()
     end_date = today + timedelta(days=days)
@@ -105,6 +117,10 @@ async def get_ecowatt_forecast(
             EcoWatt.periode < end_date
         )
     ).order_by(EcoWatt.periode)
+    if since:
+        # updated_at is stored as naive UTC
+        since_naive = since.astimezone(UTC).replace(tzinfo=None) if since.tzinfo else since
+        query = query.where(EcoWatt.updated_at > since_naive)
 
     result = await db.execute(query)
     ecowatt_data = result.scalars().all()
@@ -134,7 +150,7 @@ async def get_ecowatt_history(
         }
     ),
     current_user: User = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ) -> List[EcoWattResponse]:
     """
     Get historical EcoWatt data between two dates
@@ -184,7 +200,7 @@ async def get_ecowatt_statistics(
         }
     ),
     current_user: User = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ) -> dict[str, Any]:
     """
     Get EcoWatt statistics for a given year
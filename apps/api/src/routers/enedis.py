@@ -1,15 +1,26 @@
+import asyncio
+from collections import deque
+from dataclasses import dataclass
 from datetime import datetime, UTC, timedelta
-from typing import cast, Optional
-from fastapi import APIRouter, Depends, Query, Request, Path
+from typing import Any, AsyncIterator, cast, Optional
+from fastapi import APIRouter, Depends, Query, Request, Response, Path
+from fastapi.responses import StreamingResponse
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 from ..models import User, Token, PDL
 from ..models.database import get_db
+from ..config import settings
 from ..schemas import APIResponse, ErrorDetail, CacheDeleteResponse
 from ..middleware import get_current_user, get_impersonation_context, get_encryption_key
 from ..adapters import enedis_adapter
 from ..adapters.demo_adapter import demo_adapter
 from ..services import cache_service, rate_limiter
+from ..services.cache_accounting import cache_accounting
+from ..services.daily_cache import daily_cache
+from ..services.detail_cache import get_detail_days, is_day_complete, set_detail_days
+from ..services.aggregation import AggregateQuery, aggregate_load_curve
+from ..services.load_curve import render_load_curve
+from ..utils.responses import APIResponseRoute, event_stream_response, wants_event_stream
 import logging
 
 
@@ -49,8 +60,11 @@ async def increment_date_fail_count(usage_point_id: str, date: str) -> int:
     if not redis_client:
         return 0
 
-    # Increment counter
-    count = await redis_client.incr(key)
+    # Increment counter and index the key under its PDL (cleared by admin without SCAN)
+    async with redis_client.pipeline(transaction=False) as pipe:
+        pipe.incr(key)
+        cache_accounting.queue_register(pipe, key)
+        count = (await pipe.execute())[0]
 
     # Set expiry to 24 hours on first increment
     if count == 1:
@@ -81,7 +95,10 @@ async def blacklist_date(usage_point_id: str, date: str) -> None:
     if not redis_client:
         return
 
-    await redis_client.setex(key, 86400, "1")  # 24 hours
+    async with redis_client.pipeline(transaction=False) as pipe:
+        pipe.setex(key, 86400, "1")  # 24 hours
+        cache_accounting.queue_register(pipe, key)
+        await pipe.execute()
     log_with_pdl("warning", usage_point_id, f"[BLACKLIST] Date {date} blacklisted after 5+ failures")
 
 router = APIRouter(
@@ -92,6 +109,7 @@ router = APIRouter(
         403: {"description": "Forbidden - PDL does not belong to user"},
         429: {"description": "Rate limit exceeded"},
     },
+    route_class=APIResponseRoute,
 )
 
 
@@ -473,12 +491,23 @@ async def get_consumption_daily(
     # If dates are too old, we can only serve from cache
     if dates_too_old and error_response:
         # Try to serve from cache only
-        cache_key = f"consumption:daily:{usage_point_id}:{start}:{end}"
-        cached_data = await cache_service.get(cache_key, encryption_key)
+        try:
+            cached_readings, _ = await daily_cache.get_range(
+                "consumption",
+                usage_point_id,
+                datetime.strptime(start, "%Y-%m-%d").date(),
+                datetime.strptime(end, "%Y-%m-%d").date(),
+                encryption_key,
+            )
+        except ValueError:
+            cached_readings = []
 
-        if cached_data:
+        if cached_readings:
             log_with_pdl("info", usage_point_id, f"[CACHE] Serving old data from cache for ({start} to {end})")
-            return APIResponse(success=True, data=cached_data)
+            reading_type = await cache_service.get(f"consumption:reading_type:{usage_point_id}", encryption_key)
+            if not reading_type:
+                reading_type = {"unit": "W", "measurement_kind": "power"}
+            return APIResponse(success=True, data={"meter_reading": {"interval_reading": cached_readings, "reading_type": reading_type}})
         else:
             # No cache available for old data
             return error_response
@@ -502,31 +531,17 @@ async def get_consumption_daily(
         assert error_response is not None
         return error_response
 
-    # New granular cache system: check cache day by day
-    from datetime import datetime, timedelta
-
-    all_readings = []
-    missing_dates = []
+    # Range cache: one bitmap read for hits/misses, one pipelined HMGET per month
+    all_readings: list[dict[str, Any]] = []
+    missing_dates: list[str] = []
 
     if use_cache:
-        # Generate list of dates to check
         start_date = datetime.strptime(start, "%Y-%m-%d")
         end_date = datetime.strptime(end, "%Y-%m-%d")
-        current_date = start_date
-
-        while current_date <= end_date:
-            date_str = current_date.strftime("%Y-%m-%d")
-            cache_key = f"consumption:daily:{usage_point_id}:{date_str}"
-            cached_reading = await cache_service.get(cache_key, encryption_key)
-
-            if cached_reading:
-                all_readings.append(cached_reading)
-                log_if_debug(effective_user, "debug", f"[CACHE HIT] Daily data for on {date_str}", pdl=usage_point_id)
-            else:
-                missing_dates.append(date_str)
-                log_if_debug(effective_user, "debug", f"[CACHE MISS] Daily data for on {date_str}", pdl=usage_point_id)
-
-            current_date += timedelta(days=1)
+        all_readings, missing_dates = await daily_cache.get_range(
+            "consumption", usage_point_id, start_date.date(), end_date.date(), encryption_key
+        )
+        log_if_debug(effective_user, "debug", f"[CACHE] Daily data: {len(all_readings)} hit(s), {len(missing_dates)} miss(es) for ({start} to {end})", pdl=usage_point_id)
 
         # If we have all data from cache, return it
         if not missing_dates:
@@ -614,21 +629,16 @@ async def get_consumption_daily(
                     elif "interval_reading" in data:
                         fetched_readings = data["interval_reading"]
 
-                # Cache each reading individually by date and add to all_readings
+                # Merge fetched readings into the range cache (single pipeline) and add to all_readings
                 # Only include readings that were originally requested (in missing_dates)
                 if use_cache and fetched_readings:
+                    cached_days = await daily_cache.set_readings("consumption", usage_point_id, fetched_readings, encryption_key)
+                    log_if_debug(effective_user, "debug", f"[CACHE SET] Daily data for {cached_days} day(s) ({api_start} to {api_end})", pdl=usage_point_id)
+
                     for reading in fetched_readings:
                         date_str = reading.get("date", "")[:10]  # Extract YYYY-MM-DD
-                        if date_str:
-                            cache_key = f"consumption:daily:{usage_point_id}:{date_str}"
-                            await cache_service.set(cache_key, reading, encryption_key)
-                            log_if_debug(effective_user, "debug", f"[CACHE SET] Daily data for on {date_str}", pdl=usage_point_id)
-
-                            # Only add to all_readings if it was actually requested
-                            if date_str in missing_dates:
-                                all_readings.append(reading)
-                            else:
-                                log_if_debug(effective_user, "debug", f"[CACHE ONLY] Data for {date_str} cached but not added to response (wasn't requested)", pdl=usage_point_id)
+                        if date_str in missing_dates:
+                            all_readings.append(reading)
                 else:
                     # Not using cache, just add to all_readings (filter by missing_dates)
                     for reading in fetched_readings:
@@ -741,36 +751,24 @@ async def get_consumption_detail(
     route = request.scope.get("route")
     endpoint_path = route.path if route else request.url.path
 
-    # NEW: Check cache for each timestamp (ultra-granular cache check)
-    cached_readings = []
+    # Check the per-day cache (one entry per day, all days read with a single MGET)
+    cached_readings: list[dict[str, Any]] = []
     missing_dates = []
 
     if use_cache:
-        # For each day, check all possible timestamps (48 readings per day at 30-min intervals)
+        cached_days = await get_detail_days("consumption", usage_point_id, date_list, encryption_key)
         for date_str in date_list:
-            day_complete = True
-            day_readings = []
-
-            # Generate all 48 timestamps for this day (00:00, 00:30, 01:00, ..., 23:30)
-            for hour in range(24):
-                for minute in [0, 30]:
-                    timestamp = f"{date_str}T{hour:02d}:{minute:02d}"
-                    cache_key = f"consumption:detail:{usage_point_id}:{timestamp}"
-                    cached_reading = await cache_service.get(cache_key, encryption_key)
-
-                    if cached_reading:
-                        day_readings.append(cached_reading)
-                    else:
-                        day_complete = False
+            daily_cached = cached_days.get(date_str)
+            day_readings = daily_cached["readings"] if daily_cached else []
 
-            if day_complete and len(day_readings) > 0:
+            if daily_cached and is_day_complete(daily_cached):
                 cached_readings.extend(day_readings)
                 log_if_debug(effective_user, "debug", f"[CACHE HIT] {date_str} (all {len(day_readings)} readings)", pdl=usage_point_id)
             else:
                 # Add partial readings we found
                 if day_readings:
                     cached_readings.extend(day_readings)
-                    log_if_debug(effective_user, "debug", f"[CACHE PARTIAL] {date_str} ({len(day_readings)}/48 readings)", pdl=usage_point_id)
+                    log_if_debug(effective_user, "debug", f"[CACHE PARTIAL] {date_str} ({len(day_readings)}/{daily_cached.get('expected_count', 48)} readings)", pdl=usage_point_id)
                 else:
                     log_if_debug(effective_user, "debug", f"[CACHE MISS] {date_str}", pdl=usage_point_id)
                 missing_dates.append(date_str)
@@ -814,6 +812,8 @@ async def get_consumption_detail(
 
         # Fetch each range from Enedis
         for range_start, range_end in date_ranges:
+            # Days to cache: the widened fetch below also returns readings of a day that may be cached complete
+            last_missing_date = range_end
             try:
                 # Enedis API doesn't accept start=end, so add 1 day minimum
                 if range_start == range_end:
@@ -867,22 +867,12 @@ async def get_consumption_detail(
                     elif "interval_reading" in data:
                         readings = data["interval_reading"]
 
-                # NEW: Cache each reading individually by timestamp (ultra-granular cache)
+                # Cache readings grouped by day (1 cache entry per day, single pipeline)
                 if use_cache and readings:
-                    for reading in readings:
-                        # Get full timestamp: "2025-10-08T20:00:00" or "2025-10-08 20:00:00"
-                        timestamp = reading.get("date", "")
-                        if timestamp:
-                            # Normalize timestamp format (replace space with T)
-                            timestamp = timestamp.replace(" ", "T")
-                            # Remove seconds if present for consistent key format
-                            if len(timestamp) > 16:
-                                timestamp = timestamp[:16]  # Keep only YYYY-MM-DDTHH:MM
-
-                            cache_key = f"consumption:detail:{usage_point_id}:{timestamp}"
-                            await cache_service.set(cache_key, reading, encryption_key)
-
-                    log_with_pdl("info", usage_point_id, f"[CACHE SET] {range_start} to {range_end} ({len(readings)} individual readings cached)")
+                    cached_days_count = await set_detail_days(
+                        "consumption", usage_point_id, readings, encryption_key, range_start, last_missing_date
+                    )
+                    log_with_pdl("info", usage_point_id, f"[CACHE SET] {range_start} to {range_end} ({len(readings)} readings in {cached_days_count} days)")
 
                 all_readings.extend(readings)
 
@@ -900,57 +890,44 @@ async def get_consumption_detail(
     return APIResponse(success=True, data={"meter_reading": {"interval_reading": all_readings}})
 
 
-@router.get("/consumption/detail/batch/{usage_point_id}", response_model=APIResponse)
-async def get_consumption_detail_batch(
-    request: Request,
-    usage_point_id: str = Path(
-        ...,
-        description="Point de livraison (14 chiffres). 💡 **Astuce**: Utilisez d'abord `GET /pdl/` pour lister vos PDL disponibles.",
-        openapi_examples={
-            "standard_pdl": {"summary": "Standard PDL", "value": "12345678901234"},
-            "test_pdl": {"summary": "Test PDL", "value": "00000000000000"}
-        }
-    ),
-    start: str = Query(
-        ...,
-        description="Start date (YYYY-MM-DD) - Can be up to 2 years in the past",
-        openapi_examples={
-            "two_years": {"summary": "2 years back", "value": "2023-01-01"},
-            "recent_month": {"summary": "Recent month", "value": "2024-10-01"}
-        }
-    ),
-    end: str = Query(
-        ...,
-        description="End date (YYYY-MM-DD)",
-        openapi_examples={
-            "today": {"summary": "Today", "value": "2024-12-31"},
-            "recent_month": {"summary": "Month end", "value": "2024-10-31"}
-        }
-    ),
-    use_cache: bool = Query(
-        True,
-        description="Use cached data if available (recommended for batch requests)",
-        openapi_examples={
-            "with_cache": {"summary": "Use cache", "value": True},
-            "without_cache": {"summary": "Fresh data", "value": False}
-        }
-    ),
-    current_user: User = Depends(get_current_user),
-    impersonated_user: Optional[User] = Depends(get_impersonation_context),
-    db: AsyncSession = Depends(get_db),
-) -> APIResponse:
-    """
-    Get detailed consumption data (load curve) for a large date range (max 2 years).
+# Detail batch (load curve over up to 2 years), shared by the JSON and streaming endpoints
+@dataclass
+class DetailBatch:
+    """Detail batch request, validated and ready to fetch (date range capped, token resolved)"""
 
-    This endpoint automatically splits large date ranges into weekly chunks (7 days max per Enedis API call)
-    and returns all data aggregated. This eliminates the need for the frontend to make multiple requests.
+    data_type: str
+    usage_point_id: str
+    start: str
+    end: str
+    dates: list[str]
+    today: datetime
+    oldest_allowed: datetime
+    adapter: Any
+    is_demo: bool
+    access_token: Optional[str]
+    encryption_key: str
+    effective_user: User
 
-    Features:
-    - Automatic chunking into 7-day periods (Enedis API limit)
-    - Granular day-by-day caching
-    - ADAM-ERR0123 error handling with progressive retry
-    - Returns all data in a single response
-    """
+    @property
+    def tag(self) -> str:
+        return "BATCH" if self.data_type == "consumption" else "BATCH PRODUCTION"
+
+    async def fetch(self, start: str, end: str) -> Any:
+        fetch = self.adapter.get_consumption_detail if self.data_type == "consumption" else self.adapter.get_production_detail
+        return await fetch(self.usage_point_id, start, end, self.encryption_key if self.is_demo else self.access_token)
+
+
+async def prepare_detail_batch(
+    data_type: str,
+    usage_point_id: str,
+    start: str,
+    end: str,
+    current_user: User,
+    impersonated_user: Optional[User],
+    db: AsyncSession,
+) -> DetailBatch | APIResponse:
+    """Cap the date range to the 2 years Enedis keeps and resolve the access token (APIResponse on error)"""
+    tag = "BATCH" if data_type == "consumption" else "BATCH PRODUCTION"
     # Get encryption key and effective user for impersonation support
     encryption_key = get_encryption_key(current_user, impersonated_user)
     effective_user = impersonated_user or current_user
@@ -969,19 +946,19 @@ async def get_consumption_detail_batch(
     # Oldest allowed = today - 2 years (exact)
     oldest_allowed = today.replace(year=today.year - 2)
 
-    logger.info(f"[BATCH DATE LIMIT] Today Paris: {today_paris.strftime('%Y-%m-%d %H:%M:%S %Z')}, Yesterday: {yesterday.strftime('%Y-%m-%d')}, Oldest allowed (today - 2 years): {oldest_allowed.strftime('%Y-%m-%d')}")
+    logger.info(f"[{tag} DATE LIMIT] Today Paris: {today_paris.strftime('%Y-%m-%d %H:%M:%S %Z')}, Yesterday: {yesterday.strftime('%Y-%m-%d')}, Oldest allowed (today - 2 years): {oldest_allowed.strftime('%Y-%m-%d')}")
 
     # Cap start date to oldest_allowed (2 years from yesterday)
     start_date_obj = datetime.strptime(start, "%Y-%m-%d")
     if start_date_obj < oldest_allowed:
         start = oldest_allowed.strftime("%Y-%m-%d")
-        log_with_pdl("warning", usage_point_id, f"[BATCH] Start date adjusted from {start_date_obj.strftime('%Y-%m-%d')} to {start} (2-year limit)")
+        log_with_pdl("warning", usage_point_id, f"[{tag}] Start date adjusted from {start_date_obj.strftime('%Y-%m-%d')} to {start} (2-year limit)")
 
     # Cap end date to yesterday
     end_date_obj = datetime.strptime(end, "%Y-%m-%d")
     if end_date_obj > yesterday:
         end = yesterday.strftime("%Y-%m-%d")
-        log_with_pdl("warning", usage_point_id, f"[BATCH] End date adjusted from {end_date_obj.strftime('%Y-%m-%d')} to {end} (data only available up to J-1)")
+        log_with_pdl("warning", usage_point_id, f"[{tag}] End date adjusted from {end_date_obj.strftime('%Y-%m-%d')} to {end} (data only available up to J-1)")
 
     # Enforce maximum 729 days (today - 2 years to yesterday)
     # This prevents excessive date ranges
@@ -993,15 +970,16 @@ async def get_consumption_detail_batch(
         # Adjust start date to be exactly 729 days before end date
         start_date_obj = end_date_obj - timedelta(days=728)  # 728 days + end day = 729 total
         start = start_date_obj.strftime("%Y-%m-%d")
-        log_with_pdl("warning", usage_point_id, f"[BATCH] Date range exceeded 729 days, adjusted start to {start} (729 days from {end})")
+        log_with_pdl("warning", usage_point_id, f"[{tag}] Date range exceeded 729 days, adjusted start to {start} (729 days from {end})")
 
     # Check if date range is within allowed period (2 years for detail endpoint)
-    is_valid, error_response = validate_date_range(start, end, max_years=2, endpoint_type="Detail (Batch)")
+    endpoint_type = "Detail (Batch)" if data_type == "consumption" else "Production Detail (Batch)"
+    is_valid, error_response = validate_date_range(start, end, max_years=2, endpoint_type=endpoint_type)
     if not is_valid:
         assert error_response is not None
         return error_response
 
-    # Get adapter for user (demo or real)
+    # Get adapter for user (demo or real) - use effective_user for impersonation
     adapter, is_demo = await get_adapter_for_user(effective_user)
 
     # Get valid token
@@ -1022,53 +1000,251 @@ async def get_consumption_detail_batch(
         all_dates.append(current_date.strftime("%Y-%m-%d"))
         current_date += timedelta(days=1)
 
-    log_if_debug(effective_user, "info", f"[BATCH] Requested {len(all_dates)} days from {start} to {end}", pdl=usage_point_id)
+    log_if_debug(effective_user, "info", f"[{tag}] Requested {len(all_dates)} days from {start} to {end}", pdl=usage_point_id)
+
+    return DetailBatch(
+        data_type=data_type,
+        usage_point_id=usage_point_id,
+        start=start,
+        end=end,
+        dates=all_dates,
+        today=today,
+        oldest_allowed=oldest_allowed,
+        adapter=adapter,
+        is_demo=is_demo,
+        access_token=access_token,
+        encryption_key=encryption_key,
+        effective_user=effective_user,
+    )
+
+
+async def fetch_detail_chunk(
+    batch: DetailBatch, use_cache: bool, chunk_idx: int, total_chunks: int, chunk_start: str, chunk_end: str
+) -> dict[str, Any]:
+    """Fetch one chunk (up to 7 consecutive days) with the ADAM-ERR0123 retry walk, blacklist and cache write.
+
+    Returns a ``chunk`` event (readings) or a ``chunk_failed`` event.
+    """
+    chunk_event = {"index": chunk_idx + 1, "chunks": total_chunks, "start": chunk_start, "end": chunk_end}
+    usage_point_id = batch.usage_point_id
+    effective_user = batch.effective_user
+    tag = batch.tag
+    today = batch.today
+    try:
+        # Target end date for this chunk
+        chunk_end_date = datetime.strptime(chunk_end, "%Y-%m-%d")
+
+        # Calculate chunk size for logging
+        chunk_start_date = datetime.strptime(chunk_start, "%Y-%m-%d")
+        chunk_size = (chunk_end_date - chunk_start_date).days + 1
+        log_if_debug(effective_user, "info", f"[{tag} FETCH {chunk_idx+1}/{total_chunks}] {chunk_start} to {chunk_end} ({chunk_size} days)", pdl=usage_point_id)
+
+        # Fetch with retry logic for ADAM-ERR0123
+        current_start = datetime.strptime(chunk_start, "%Y-%m-%d")
+        retry_count = 0
+        max_retries = 7
+        chunk_data = None
+
+        while current_start <= chunk_end_date and retry_count < max_retries:
+            current_start_str = current_start.strftime("%Y-%m-%d")
+
+            # IMPORTANT: Calculate fetch_end for each attempt
+            # Add 1 day to get the 23:30 reading of the last day, but respect 7-day Enedis limit
+            days_in_period = (chunk_end_date - current_start).days
+            if days_in_period > 6:  # More than 7 days (0-6 = 7 days)
+                # Limit to 7 days from current_start
+                fetch_end_date = current_start + timedelta(days=7)
+            else:
+                # Use chunk_end + 1 day to get last 23:30 reading
+                fetch_end_date = chunk_end_date + timedelta(days=1)
+
+            # CRITICAL: Never request data beyond today (Enedis returns J-1 data when end=today)
+            # We use TODAY (not yesterday) as the cap because Enedis API requires end > start
+            # and returns data up to J-1 of the end date
+            if fetch_end_date > today:
+                fetch_end_date = today
+
+            fetch_end = fetch_end_date.strftime("%Y-%m-%d")
+
+            # CRITICAL: Enedis requires at least 2 days (start != end)
+            # If we would skip, extend start backwards to ensure we have a valid range
+            if current_start_str == fetch_end:
+                # Extend start 1 day backwards to get a 2-day range
+                extended_start = current_start - timedelta(days=1)
+                current_start_str = extended_start.strftime("%Y-%m-%d")
+                log_with_pdl("info", usage_point_id, f"[{tag} EXTEND] Extended start from {current_start.strftime('%Y-%m-%d')} to {current_start_str} to ensure min 2-day range")
+
+            try:
+                chunk_data = await batch.fetch(current_start_str, fetch_end)
+
+                # Check for errors that should trigger immediate blacklist
+                if isinstance(chunk_data, dict) and "error" in chunk_data:
+                    error_code = chunk_data.get("error", "")
+
+                    # no_data_found: Blacklist the entire week immediately
+                    if error_code == "no_data_found":
+                        log_with_pdl("warning", usage_point_id, f"[{tag} BLACKLIST] no_data_found for {current_start_str} to {fetch_end}, blacklisting entire period")
+
+                        # Blacklist all dates in the requested range
+                        current_date = datetime.strptime(current_start_str, "%Y-%m-%d")
+                        end_date = datetime.strptime(fetch_end, "%Y-%m-%d")
+                        while current_date < end_date:
+                            date_str = current_date.strftime("%Y-%m-%d")
+                            await blacklist_date(usage_point_id, date_str)
+                            current_date += timedelta(days=1)
+
+                        # Skip this entire chunk
+                        break
+
+                    # ADAM-ERR0123: Retry with next day
+                    elif error_code == "ADAM-ERR0123":
+                        log_with_pdl("warning", usage_point_id, f"[{tag} RETRY] ADAM-ERR0123 for {current_start_str}, trying next day...")
+
+                        # Increment fail counter for this date
+                        fail_count = await increment_date_fail_count(usage_point_id, current_start_str)
+                        log_if_debug(effective_user, "debug", f"[{tag} FAIL COUNT] {current_start_str} now has {fail_count} failures", pdl=usage_point_id)
+
+                        # Blacklist if > 5 failures
+                        if fail_count > 5:
+                            await blacklist_date(usage_point_id, current_start_str)
+
+                        current_start += timedelta(days=1)
+                        retry_count += 1
+                        continue
+
+                # Success! Break out of retry loop
+                break
+
+            except Exception as e:
+                error_msg = str(e)
+                log_with_pdl("error", usage_point_id, f"[{tag} ERROR] Failed to fetch {current_start_str} to {fetch_end}: {e}")
+
+                # Check if this is a no_data_found error - blacklist entire period immediately
+                if "no_data_found" in error_msg:
+                    log_with_pdl("warning", usage_point_id, f"[{tag} BLACKLIST] no_data_found for {current_start_str} to {fetch_end}, blacklisting entire period")
+
+                    # Blacklist all dates in the requested range
+                    current_date = datetime.strptime(current_start_str, "%Y-%m-%d")
+                    end_date = datetime.strptime(fetch_end, "%Y-%m-%d")
+                    while current_date < end_date:
+                        date_str = current_date.strftime("%Y-%m-%d")
+                        await blacklist_date(usage_point_id, date_str)
+                        current_date += timedelta(days=1)
+
+                    # Skip this entire chunk
+                    break
+
+                # For other errors: increment fail counter and retry
+                fail_count = await increment_date_fail_count(usage_point_id, current_start_str)
+                log_if_debug(effective_user, "debug", f"[{tag} FAIL COUNT] {current_start_str} now has {fail_count} failures", pdl=usage_point_id)
+
+                # Blacklist if > 5 failures
+                if fail_count > 5:
+                    await blacklist_date(usage_point_id, current_start_str)
+
+                # Try next day
+                current_start += timedelta(days=1)
+                retry_count += 1
+
+        # If we exhausted all retries, log and skip this chunk
+        if retry_count >= max_retries:
+            log_with_pdl("warning", usage_point_id, f"[{tag} SKIP] Skipped chunk {chunk_start} to {chunk_end} after {retry_count} retries")
+            return {"type": "chunk_failed", **chunk_event}
+
+        # Extract readings from chunk_data
+        readings = []
+        if isinstance(chunk_data, dict):
+            if "meter_reading" in chunk_data and "interval_reading" in chunk_data["meter_reading"]:
+                readings = chunk_data["meter_reading"]["interval_reading"]
+            elif "interval_reading" in chunk_data:
+                readings = chunk_data["interval_reading"]
+
+        # Cache readings grouped by day (1 cache entry per day, written in a single pipeline)
+        if use_cache and readings:
+            # Only the chunk's days: the next chunk's first day is partial here (its 00:00 reading)
+            cached_days_count = await set_detail_days(
+                batch.data_type, usage_point_id, readings, batch.encryption_key, chunk_start, chunk_end
+            )
+            log_if_debug(effective_user, "debug", f"[{tag} CACHE SET] {chunk_start} to {chunk_end} ({len(readings)} readings in {cached_days_count} days)", pdl=usage_point_id)
+
+    except Exception as e:
+        log_with_pdl("error", usage_point_id, f"[{tag} ERROR] Failed chunk {chunk_start} to {chunk_end}: {e}")
+        return {"type": "chunk_failed", **chunk_event}
+
+    return {"type": "chunk", **chunk_event, "readings": readings}
+
+
+async def iter_detail_batch(
+    batch: DetailBatch,
+    request: Request,
+    use_cache: bool,
+    current_user: User,
+    cache_slice_days: Optional[int] = None,
+) -> AsyncIterator[dict[str, Any]]:
+    """Run a detail batch and yield its events as they happen:
+
+    - ``cached``: ``readings`` read from the per-day cache (``cache_slice_days`` days per MGET, all at once if None)
+    - ``plan``: cache report (``cache_hit``, ``cache_partial``, ``cache_miss``, ``blacklisted``, ``to_fetch``, ``chunks``)
+    - ``rate_limited``: ``response`` is the rate-limit error, nothing is fetched
+    - ``chunk``: ``readings`` of a chunk fetched from Enedis (``index``/``chunks``, ``start``/``end``), already cached
+    - ``chunk_failed``: chunk skipped after retries or on error
+
+    Chunks are fetched concurrently and yielded in date order; only the chunks in flight are held in memory.
+    """
+    usage_point_id = batch.usage_point_id
+    effective_user = batch.effective_user
+    data_type = batch.data_type
+    tag = batch.tag
+    all_dates = batch.dates
+    start, end = batch.start, batch.end
 
     # Check cache for each day using OPTIMIZED per-day cache keys
     # OLD format (slow): consumption:detail:{pdl}:{date}T{hour}:{minute} = single reading (312 queries/day)
-    # NEW format (fast): consumption:detail:daily:{pdl}:{date} = all readings for day (1 query/day)
-    cached_readings = []
+    # NEW format (fast): consumption:detail:daily:{pdl}:{date} = all readings for day (all days in 1 MGET)
+    # Legacy keys are rewritten into the new format by the background compaction task
     missing_dates = []
     cache_hit_count = 0
     cache_miss_count = 0
     cache_partial_count = 0
 
     if use_cache:
-        for date_str in all_dates:
-            # Try NEW per-day cache format first (fast: 1 query per day)
-            daily_cache_key = f"consumption:detail:daily:{usage_point_id}:{date_str}"
-            daily_cached = await cache_service.get(daily_cache_key, encryption_key)
-
-            if daily_cached and isinstance(daily_cached, dict) and "readings" in daily_cached:
-                day_readings = daily_cached["readings"]
-                expected_count = daily_cached.get("expected_count", 48)
-                min_required = int(expected_count * 0.9)
-
-                if len(day_readings) >= min_required:
-                    cached_readings.extend(day_readings)
-                    cache_hit_count += 1
-                elif len(day_readings) > 0:
-                    cached_readings.extend(day_readings)
-                    cache_partial_count += 1
-                    missing_dates.append(date_str)
+        slice_size = cache_slice_days or len(all_dates) or 1
+        for slice_start in range(0, len(all_dates), slice_size):
+            slice_dates = all_dates[slice_start:slice_start + slice_size]
+            cached_days = await get_detail_days(data_type, usage_point_id, slice_dates, batch.encryption_key)
+            cached_readings = []
+            for date_str in slice_dates:
+                daily_cached = cached_days.get(date_str)
+
+                if daily_cached:
+                    day_readings = daily_cached["readings"]
+
+                    if is_day_complete(daily_cached):
+                        cached_readings.extend(day_readings)
+                        cache_hit_count += 1
+                    elif len(day_readings) > 0:
+                        cached_readings.extend(day_readings)
+                        cache_partial_count += 1
+                        missing_dates.append(date_str)
+                    else:
+                        cache_miss_count += 1
+                        missing_dates.append(date_str)
                 else:
+                    # Cache miss with new format
                     cache_miss_count += 1
                     missing_dates.append(date_str)
-            else:
-                # Cache miss with new format
-                cache_miss_count += 1
-                missing_dates.append(date_str)
+            if cached_readings:
+                yield {"type": "cached", "readings": cached_readings}
     else:
-        missing_dates = all_dates
+        missing_dates = list(all_dates)
 
     # Filter out dates that are too old (> 2 years from yesterday)
     # This can happen if cache contains old data from before the 2-year limit was enforced
-    # Reuse the oldest_allowed variable calculated at the beginning of the function (line 797)
     original_missing_count = len(missing_dates)
-    missing_dates = [d for d in missing_dates if datetime.strptime(d, "%Y-%m-%d") >= oldest_allowed]
+    missing_dates = [d for d in missing_dates if datetime.strptime(d, "%Y-%m-%d") >= batch.oldest_allowed]
 
     if original_missing_count > len(missing_dates):
-        log_with_pdl("warning", usage_point_id, f"[BATCH] Filtered out {original_missing_count - len(missing_dates)} dates that are too old (> 2 years from yesterday: {oldest_allowed.strftime('%Y-%m-%d')})")
+        log_with_pdl("warning", usage_point_id, f"[{tag}] Filtered out {original_missing_count - len(missing_dates)} dates that are too old (> 2 years from yesterday: {batch.oldest_allowed.strftime('%Y-%m-%d')})")
 
     # Filter out blacklisted dates (dates that have failed > 5 times)
     blacklisted_dates = []
@@ -1083,50 +1259,29 @@ async def get_consumption_detail_batch(
         missing_dates = non_blacklisted_dates
 
     # Log cache summary report with clear formatting
-    log_if_debug(effective_user, "info", "[BATCH CACHE REPORT] ═══════════════════════════════════════════════════════════", pdl=usage_point_id)
-    log_if_debug(effective_user, "info", f"[BATCH CACHE REPORT] Period: {start} → {end} ({len(all_dates)} days)", pdl=usage_point_id)
-    log_if_debug(effective_user, "info", "[BATCH CACHE REPORT] ───────────────────────────────────────────────────────────", pdl=usage_point_id)
-    log_if_debug(effective_user, "info", f"[BATCH CACHE REPORT] ✓ CACHE HIT:     {cache_hit_count:4d} days ({cache_hit_count*100//len(all_dates) if len(all_dates) > 0 else 0:3d}%)", pdl=usage_point_id)
-    log_if_debug(effective_user, "info", f"[BATCH CACHE REPORT] ◐ CACHE PARTIAL: {cache_partial_count:4d} days ({cache_partial_count*100//len(all_dates) if len(all_dates) > 0 else 0:3d}%)", pdl=usage_point_id)
-    log_if_debug(effective_user, "info", f"[BATCH CACHE REPORT] ✗ CACHE MISS:    {cache_miss_count:4d} days ({cache_miss_count*100//len(all_dates) if len(all_dates) > 0 else 0:3d}%)", pdl=usage_point_id)
-    log_if_debug(effective_user, "info", f"[BATCH CACHE REPORT] ⊗ BLACKLISTED:   {len(blacklisted_dates):4d} days ({len(blacklisted_dates)*100//len(all_dates) if len(all_dates) > 0 else 0:3d}%)", pdl=usage_point_id)
-    log_if_debug(effective_user, "info", "[BATCH CACHE REPORT] ───────────────────────────────────────────────────────────", pdl=usage_point_id)
-    log_if_debug(effective_user, "info", f"[BATCH CACHE REPORT] → TO FETCH:      {len(missing_dates):4d} days (after filtering blacklisted)", pdl=usage_point_id)
+    log_if_debug(effective_user, "info", f"[{tag} CACHE REPORT] ═══════════════════════════════════════════════════════════", pdl=usage_point_id)
+    log_if_debug(effective_user, "info", f"[{tag} CACHE REPORT] Period: {start} → {end} ({len(all_dates)} days)", pdl=usage_point_id)
+    log_if_debug(effective_user, "info", f"[{tag} CACHE REPORT] ───────────────────────────────────────────────────────────", pdl=usage_point_id)
+    log_if_debug(effective_user, "info", f"[{tag} CACHE REPORT] ✓ CACHE HIT:     {cache_hit_count:4d} days ({cache_hit_count*100//len(all_dates) if len(all_dates) > 0 else 0:3d}%)", pdl=usage_point_id)
+    log_if_debug(effective_user, "info", f"[{tag} CACHE REPORT] ◐ CACHE PARTIAL: {cache_partial_count:4d} days ({cache_partial_count*100//len(all_dates) if len(all_dates) > 0 else 0:3d}%)", pdl=usage_point_id)
+    log_if_debug(effective_user, "info", f"[{tag} CACHE REPORT] ✗ CACHE MISS:    {cache_miss_count:4d} days ({cache_miss_count*100//len(all_dates) if len(all_dates) > 0 else 0:3d}%)", pdl=usage_point_id)
+    log_if_debug(effective_user, "info", f"[{tag} CACHE REPORT] ⊗ BLACKLISTED:   {len(blacklisted_dates):4d} days ({len(blacklisted_dates)*100//len(all_dates) if len(all_dates) > 0 else 0:3d}%)", pdl=usage_point_id)
+    log_if_debug(effective_user, "info", f"[{tag} CACHE REPORT] ───────────────────────────────────────────────────────────", pdl=usage_point_id)
+    log_if_debug(effective_user, "info", f"[{tag} CACHE REPORT] → TO FETCH:      {len(missing_dates):4d} days (after filtering blacklisted)", pdl=usage_point_id)
 
     if blacklisted_dates:
-        log_if_debug(effective_user, "info", "[BATCH CACHE REPORT] ───────────────────────────────────────────────────────────", pdl=usage_point_id)
+        log_if_debug(effective_user, "info", f"[{tag} CACHE REPORT] ───────────────────────────────────────────────────────────", pdl=usage_point_id)
         if len(blacklisted_dates) <= 10:
-            log_if_debug(effective_user, "info", f"[BATCH CACHE REPORT] Blacklisted dates: {', '.join(blacklisted_dates)}", pdl=usage_point_id)
+            log_if_debug(effective_user, "info", f"[{tag} CACHE REPORT] Blacklisted dates: {', '.join(blacklisted_dates)}", pdl=usage_point_id)
         else:
-            log_if_debug(effective_user, "info", f"[BATCH CACHE REPORT] Blacklisted dates (first 5): {', '.join(blacklisted_dates[:5])}", pdl=usage_point_id)
-            log_if_debug(effective_user, "info", f"[BATCH CACHE REPORT] Blacklisted dates (last 5):  {', '.join(blacklisted_dates[-5:])}", pdl=usage_point_id)
+            log_if_debug(effective_user, "info", f"[{tag} CACHE REPORT] Blacklisted dates (first 5): {', '.join(blacklisted_dates[:5])}", pdl=usage_point_id)
+            log_if_debug(effective_user, "info", f"[{tag} CACHE REPORT] Blacklisted dates (last 5):  {', '.join(blacklisted_dates[-5:])}", pdl=usage_point_id)
 
-    log_if_debug(effective_user, "info", "[BATCH CACHE REPORT] ═══════════════════════════════════════════════════════════", pdl=usage_point_id)
+    log_if_debug(effective_user, "info", f"[{tag} CACHE REPORT] ═══════════════════════════════════════════════════════════", pdl=usage_point_id)
 
     # Debug: Log first and last missing dates
     if missing_dates:
-        log_if_debug(effective_user, "info", f"[BATCH DEBUG] First missing: {missing_dates[0]}, Last missing: {missing_dates[-1]}, Total: {len(missing_dates)}", pdl=usage_point_id)
-
-    # If we have all data from cache, return it immediately
-    if not missing_dates:
-        log_if_debug(effective_user, "info", "[BATCH] All data served from cache", pdl=usage_point_id)
-        return APIResponse(success=True, data={"meter_reading": {"interval_reading": cached_readings}})
-
-    # Check rate limit only if we need to fetch from Enedis
-    route = request.scope.get("route")
-    endpoint_path = route.path if route else request.url.path
-    is_allowed, error_response = await check_rate_limit(current_user.id, use_cache, current_user.is_admin, endpoint_path)
-    if not is_allowed:
-        # If rate limited and we have some cached data, return what we have
-        if cached_readings:
-            log_with_pdl("warning", usage_point_id, "[BATCH RATE LIMITED] Returning partial cached data")
-            return APIResponse(
-                success=True,
-                data={"meter_reading": {"interval_reading": cached_readings}},
-                error=ErrorDetail(code="PARTIAL_DATA", message="Rate limit exceeded. Returning cached data only.")
-            )
-        assert error_response is not None
-        return error_response
+        log_if_debug(effective_user, "info", f"[{tag} DEBUG] First missing: {missing_dates[0]}, Last missing: {missing_dates[-1]}, Total: {len(missing_dates)}", pdl=usage_point_id)
 
     # Split missing dates into weekly chunks (max 7 days per Enedis API call)
     # IMPORTANT: Group only CONSECUTIVE dates together
@@ -1154,198 +1309,105 @@ async def get_consumption_detail_batch(
         week_chunks.append((chunk_start, chunk_end))
         i = j  # Move to next non-consecutive date
 
+    yield {
+        "type": "plan",
+        "days": len(all_dates),
+        "cache_hit": cache_hit_count,
+        "cache_partial": cache_partial_count,
+        "cache_miss": cache_miss_count,
+        "blacklisted": len(blacklisted_dates),
+        "to_fetch": len(missing_dates),
+        "chunks": len(week_chunks),
+    }
+
+    # If we have all data from cache, stop here
+    if not missing_dates:
+        return
+
+    # Check rate limit only if we need to fetch from Enedis
+    route = request.scope.get("route")
+    endpoint_path = route.path if route else request.url.path
+    is_allowed, error_response = await check_rate_limit(current_user.id, use_cache, current_user.is_admin, endpoint_path)
+    if not is_allowed:
+        yield {"type": "rate_limited", "response": error_response}
+        return
+
     total_chunks = len(week_chunks)
-    log_if_debug(effective_user, "info", f"[BATCH] Split into {total_chunks} chunks from {len(missing_dates)} missing dates", pdl=usage_point_id)
+    log_if_debug(effective_user, "info", f"[{tag}] Split into {total_chunks} chunks from {len(missing_dates)} missing dates", pdl=usage_point_id)
 
-    # Fetch each chunk from Enedis with retry logic for ADAM-ERR0123
-    all_readings = []
+    # Fetch chunks concurrently, up to the adapter's rate limit (the limiter paces the calls),
+    # and hand them over in order. At most `concurrency` chunks are held in memory.
+    concurrency = max(1, getattr(getattr(batch.adapter, "rate_limiter", None), "max_calls", settings.ENEDIS_RATE_LIMIT))
+    pending: deque[asyncio.Task] = deque()
+    try:
+        for chunk_idx, (chunk_start, chunk_end) in enumerate(week_chunks):
+            pending.append(asyncio.create_task(
+                fetch_detail_chunk(batch, use_cache, chunk_idx, total_chunks, chunk_start, chunk_end)
+            ))
+            if len(pending) >= concurrency:
+                yield await pending.popleft()
+        while pending:
+            yield await pending.popleft()
+    finally:
+        # Client gone (stream closed): do not leave fetches running
+        for task in pending:
+            task.cancel()
+
+
+async def collect_detail_batch(
+    batch: DetailBatch,
+    request: Request,
+    use_cache: bool,
+    current_user: User,
+    response_format: Optional[str],
+) -> APIResponse | Response:
+    """Single response of a detail batch (all readings, sorted by date)"""
+    usage_point_id = batch.usage_point_id
+    tag = batch.tag
+    cached_readings: list[dict[str, Any]] = []
+    all_readings: list[dict[str, Any]] = []
+    to_fetch = 0
+    total_chunks = 0
     fetched_count = 0
     error_encountered = False
-
-    for chunk_idx, (chunk_start, chunk_end) in enumerate(week_chunks):
-        try:
-            # Target end date for this chunk
-            chunk_end_date = datetime.strptime(chunk_end, "%Y-%m-%d")
-
-            # Calculate chunk size for logging
-            chunk_start_date = datetime.strptime(chunk_start, "%Y-%m-%d")
-            chunk_size = (chunk_end_date - chunk_start_date).days + 1
-            log_if_debug(effective_user, "info", f"[BATCH FETCH {chunk_idx+1}/{len(week_chunks)}] {chunk_start} to {chunk_end} ({chunk_size} days)", pdl=usage_point_id)
-
-            # Fetch with retry logic for ADAM-ERR0123
-            current_start = datetime.strptime(chunk_start, "%Y-%m-%d")
-            retry_count = 0
-            max_retries = 7
-            chunk_data = None
-
-            while current_start <= chunk_end_date and retry_count < max_retries:
-                current_start_str = current_start.strftime("%Y-%m-%d")
-
-                # IMPORTANT: Calculate fetch_end for each attempt
-                # Add 1 day to get the 23:30 reading of the last day, but respect 7-day Enedis limit
-                days_in_period = (chunk_end_date - current_start).days
-                if days_in_period > 6:  # More than 7 days (0-6 = 7 days)
-                    # Limit to 7 days from current_start
-                    fetch_end_date = current_start + timedelta(days=7)
-                else:
-                    # Use chunk_end + 1 day to get last 23:30 reading
-                    fetch_end_date = chunk_end_date + timedelta(days=1)
-
-                # CRITICAL: Never request data beyond today (Enedis returns J-1 data when end=today)
-                # We use TODAY (not yesterday) as the cap because Enedis API requires end > start
-                # and returns data up to J-1 of the end date
-                if fetch_end_date > today:
-                    fetch_end_date = today
-
-                fetch_end = fetch_end_date.strftime("%Y-%m-%d")
-
-                # CRITICAL: Enedis requires at least 2 days (start != end)
-                # If we would skip, extend start backwards to ensure we have a valid range
-                if current_start_str == fetch_end:
-                    # Extend start 1 day backwards to get a 2-day range
-                    extended_start = current_start - timedelta(days=1)
-                    current_start_str = extended_start.strftime("%Y-%m-%d")
-                    log_with_pdl("info", usage_point_id, f"[BATCH EXTEND] Extended start from {current_start.strftime('%Y-%m-%d')} to {current_start_str} to ensure min 2-day range")
-
-                try:
-                    if is_demo:
-                        chunk_data = await adapter.get_consumption_detail(usage_point_id, current_start_str, fetch_end, encryption_key)
-                    else:
-                        chunk_data = await adapter.get_consumption_detail(usage_point_id, current_start_str, fetch_end, access_token)
-
-                    # Check for errors that should trigger immediate blacklist
-                    if isinstance(chunk_data, dict) and "error" in chunk_data:
-                        error_code = chunk_data.get("error", "")
-
-                        # no_data_found: Blacklist the entire week immediately
-                        if error_code == "no_data_found":
-                            log_with_pdl("warning", usage_point_id, f"[BATCH BLACKLIST] no_data_found for {current_start_str} to {fetch_end}, blacklisting entire period")
-
-                            # Blacklist all dates in the requested range
-                            current_date = datetime.strptime(current_start_str, "%Y-%m-%d")
-                            end_date = datetime.strptime(fetch_end, "%Y-%m-%d")
-                            while current_date < end_date:
-                                date_str = current_date.strftime("%Y-%m-%d")
-                                await blacklist_date(usage_point_id, date_str)
-                                current_date += timedelta(days=1)
-
-                            # Skip this entire chunk
-                            break
-
-                        # ADAM-ERR0123: Retry with next day
-                        elif error_code == "ADAM-ERR0123":
-                            log_with_pdl("warning", usage_point_id, f"[BATCH RETRY] ADAM-ERR0123 for {current_start_str}, trying next day...")
-
-                            # Increment fail counter for this date
-                            fail_count = await increment_date_fail_count(usage_point_id, current_start_str)
-                            log_if_debug(effective_user, "debug", f"[BATCH FAIL COUNT] {current_start_str} now has {fail_count} failures", pdl=usage_point_id)
-
-                            # Blacklist if > 5 failures
-                            if fail_count > 5:
-                                await blacklist_date(usage_point_id, current_start_str)
-
-                            current_start += timedelta(days=1)
-                            retry_count += 1
-                            continue
-
-                    # Success! Break out of retry loop
-                    break
-
-                except Exception as e:
-                    error_msg = str(e)
-                    log_with_pdl("error", usage_point_id, f"[BATCH ERROR] Failed to fetch {current_start_str} to {fetch_end}: {e}")
-
-                    # Check if this is a no_data_found error - blacklist entire period immediately
-                    if "no_data_found" in error_msg:
-                        log_with_pdl("warning", usage_point_id, f"[BATCH BLACKLIST] no_data_found for {current_start_str} to {fetch_end}, blacklisting entire period")
-
-                        # Blacklist all dates in the requested range
-                        current_date = datetime.strptime(current_start_str, "%Y-%m-%d")
-                        end_date = datetime.strptime(fetch_end, "%Y-%m-%d")
-                        while current_date < end_date:
-                            date_str = current_date.strftime("%Y-%m-%d")
-                            await blacklist_date(usage_point_id, date_str)
-                            current_date += timedelta(days=1)
-
-                        # Skip this entire chunk
-                        break
-
-                    # For other errors: increment fail counter and retry
-                    fail_count = await increment_date_fail_count(usage_point_id, current_start_str)
-                    log_if_debug(effective_user, "debug", f"[BATCH FAIL COUNT] {current_start_str} now has {fail_count} failures", pdl=usage_point_id)
-
-                    # Blacklist if > 5 failures
-                    if fail_count > 5:
-                        await blacklist_date(usage_point_id, current_start_str)
-
-                    # Try next day
-                    current_start += timedelta(days=1)
-                    retry_count += 1
-
-            # If we exhausted all retries, log and continue to next chunk
-            if retry_count >= max_retries:
-                log_with_pdl("warning", usage_point_id, f"[BATCH SKIP] Skipped chunk {chunk_start} to {chunk_end} after {retry_count} retries")
-                error_encountered = True
-                continue
-
-            # Extract readings from chunk_data
-            readings = []
-            if isinstance(chunk_data, dict):
-                if "meter_reading" in chunk_data and "interval_reading" in chunk_data["meter_reading"]:
-                    readings = chunk_data["meter_reading"]["interval_reading"]
-                elif "interval_reading" in chunk_data:
-                    readings = chunk_data["interval_reading"]
-
-            # Cache readings grouped by day (OPTIMIZED: 1 cache entry per day instead of per timestamp)
-            if use_cache and readings:
-                # Group readings by date
-                readings_by_date: dict[str, list] = {}
-                interval_length = "PT30M"  # Default
-
-                for reading in readings:
-                    timestamp = reading.get("date", "")
-                    if timestamp:
-                        # Extract date part (YYYY-MM-DD)
-                        date_part = timestamp.replace("T", " ").split(" ")[0]
-                        if date_part not in readings_by_date:
-                            readings_by_date[date_part] = []
-                        readings_by_date[date_part].append(reading)
-
-                        # Detect interval length from first reading
-                        if "interval_length" in reading:
-                            interval_length = reading["interval_length"]
-
-                # Determine expected count based on interval
-                expected_count = 48  # Default PT30M
-                if interval_length == "PT10M":
-                    expected_count = 144
-                elif interval_length == "PT15M":
-                    expected_count = 96
-                elif interval_length == "PT30M":
-                    expected_count = 48
-                elif interval_length == "PT60M":
-                    expected_count = 24
-
-                # Store each day's readings as a single cache entry
-                for date_str, day_readings in readings_by_date.items():
-                    daily_cache_key = f"consumption:detail:daily:{usage_point_id}:{date_str}"
-                    cache_data = {
-                        "readings": day_readings,
-                        "expected_count": expected_count,
-                        "interval_length": interval_length,
-                        "count": len(day_readings)
-                    }
-                    await cache_service.set(daily_cache_key, cache_data, encryption_key)
-
-                log_if_debug(effective_user, "debug", f"[BATCH CACHE SET] {chunk_start} to {chunk_end} ({len(readings)} readings in {len(readings_by_date)} days)", pdl=usage_point_id)
-
-            all_readings.extend(readings)
+    rate_limit_response: Optional[APIResponse] = None
+
+    async for event in iter_detail_batch(batch, request, use_cache, current_user):
+        if event["type"] == "cached":
+            cached_readings.extend(event["readings"])
+        elif event["type"] == "plan":
+            to_fetch, total_chunks = event["to_fetch"], event["chunks"]
+        elif event["type"] == "rate_limited":
+            rate_limit_response = event["response"]
+        elif event["type"] == "chunk":
+            all_readings.extend(event["readings"])
             fetched_count += 1
-
-        except Exception as e:
-            log_with_pdl("error", usage_point_id, f"[BATCH ERROR] Failed chunk {chunk_start} to {chunk_end}: {e}")
+        elif event["type"] == "chunk_failed":
             error_encountered = True
-            # Continue with next chunk
+
+    # If we have all data from cache, return it immediately
+    if not to_fetch:
+        log_if_debug(batch.effective_user, "info", f"[{tag}] All data served from cache", pdl=usage_point_id)
+        return render_load_curve(
+            request,
+            APIResponse(success=True, data={"meter_reading": {"interval_reading": cached_readings}}),
+            response_format,
+        )
+
+    if rate_limit_response:
+        # If rate limited and we have some cached data, return what we have
+        if cached_readings:
+            log_with_pdl("warning", usage_point_id, f"[{tag} RATE LIMITED] Returning partial cached data")
+            return render_load_curve(
+                request,
+                APIResponse(
+                    success=True,
+                    data={"meter_reading": {"interval_reading": cached_readings}},
+                    error=ErrorDetail(code="PARTIAL_DATA", message="Rate limit exceeded. Returning cached data only.")
+                ),
+                response_format,
+            )
+        return rate_limit_response
 
     # Combine cached readings with newly fetched readings
     all_readings.extend(cached_readings)
@@ -1353,14 +1415,14 @@ async def get_consumption_detail_batch(
     # Sort by timestamp
     all_readings.sort(key=lambda x: x.get("date", ""))
 
-    log_if_debug(effective_user, "info", f"[BATCH COMPLETE] Total readings: {len(all_readings)}, Fetched chunks: {fetched_count}/{len(week_chunks)}", pdl=usage_point_id)
+    log_if_debug(batch.effective_user, "info", f"[{tag} COMPLETE] Total readings: {len(all_readings)}, Fetched chunks: {fetched_count}/{total_chunks}", pdl=usage_point_id)
 
     if not all_readings:
         return APIResponse(
             success=False,
             error=ErrorDetail(
                 code="NO_DATA",
-                message="No consumption data available for this period. This may be before the meter activation date."
+                message=f"No {batch.data_type} data available for this period. This may be before the meter activation date."
             )
         )
 
@@ -1368,16 +1430,116 @@ async def get_consumption_detail_batch(
     response_data = {"meter_reading": {"interval_reading": all_readings}}
 
     if error_encountered:
-        return APIResponse(
-            success=True,
-            data=response_data,
-            error=ErrorDetail(
-                code="PARTIAL_DATA",
-                message=f"Some data could not be fetched (possibly before activation date). Returning {len(all_readings)} readings."
-            )
+        return render_load_curve(
+            request,
+            APIResponse(
+                success=True,
+                data=response_data,
+                error=ErrorDetail(
+                    code="PARTIAL_DATA",
+                    message=f"Some data could not be fetched (possibly before activation date). Returning {len(all_readings)} readings."
+                )
+            ),
+            response_format,
         )
 
-    return APIResponse(success=True, data=response_data)
+    return render_load_curve(request, APIResponse(success=True, data=response_data), response_format)
+
+
+def stream_detail_batch(
+    batch: DetailBatch, request: Request, use_cache: bool, current_user: User, mode: Optional[str]
+) -> StreamingResponse:
+    """Streaming response of a detail batch: cached days first, then each chunk as Enedis returns it"""
+
+    async def events() -> AsyncIterator[dict[str, Any]]:
+        total = 0
+        partial = False
+        try:
+            async for event in iter_detail_batch(batch, request, use_cache, current_user, cache_slice_days=7):
+                if event["type"] == "cached":
+                    total += len(event["readings"])
+                    yield {"type": "readings", "source": "cache", "readings": event["readings"]}
+                elif event["type"] == "plan":
+                    yield {"type": "start", "start": batch.start, "end": batch.end, **{k: v for k, v in event.items() if k != "type"}}
+                elif event["type"] == "rate_limited":
+                    partial = True
+                    yield {"type": "error", **event["response"].error.model_dump()}
+                elif event["type"] == "chunk":
+                    total += len(event["readings"])
+                    yield {"type": "readings", "source": "enedis", "readings": sorted(event["readings"], key=lambda x: x.get("date", ""))}
+                    yield {"type": "progress", **{k: v for k, v in event.items() if k not in ("type", "readings")}}
+                elif event["type"] == "chunk_failed":
+                    partial = True
+                    yield {"type": "progress", "failed": True, **{k: v for k, v in event.items() if k != "type"}}
+        except Exception as e:
+            log_with_pdl("error", batch.usage_point_id, f"[{batch.tag} STREAM] Stream interrupted: {e}")
+            partial = True
+            yield {"type": "error", "code": "STREAM_ERROR", "message": "Stream interrupted, data is incomplete"}
+        yield {"type": "end", "readings": total, "partial": partial}
+
+    return event_stream_response(events(), sse=wants_event_stream(request, mode))
+
+
+@router.get("/consumption/detail/batch/{usage_point_id}", response_model=APIResponse)
+async def get_consumption_detail_batch(
+    request: Request,
+    usage_point_id: str = Path(
+        ...,
+        description="Point de livraison (14 chiffres). 💡 **Astuce**: Utilisez d'abord `GET /pdl/` pour lister vos PDL disponibles.",
+        openapi_examples={
+            "standard_pdl": {"summary": "Standard PDL", "value": "12345678901234"},
+            "test_pdl": {"summary": "Test PDL", "value": "00000000000000"}
+        }
+    ),
+    start: str = Query(
+        ...,
+        description="Start date (YYYY-MM-DD) - Can be up to 2 years in the past",
+        openapi_examples={
+            "two_years": {"summary": "2 years back", "value": "2023-01-01"},
+            "recent_month": {"summary": "Recent month", "value": "2024-10-01"}
+        }
+    ),
+    end: str = Query(
+        ...,
+        description="End date (YYYY-MM-DD)",
+        openapi_examples={
+            "today": {"summary": "Today", "value": "2024-12-31"},
+            "recent_month": {"summary": "Month end", "value": "2024-10-31"}
+        }
+    ),
+    use_cache: bool = Query(
+        True,
+        description="Use cached data if available (recommended for batch requests)",
+        openapi_examples={
+            "with_cache": {"summary": "Use cache", "value": True},
+            "without_cache": {"summary": "Fresh data", "value": False}
+        }
+    ),
+    response_format: Optional[str] = Query(
+        None,
+        alias="format",
+        description="Response format: json (default), columnar or msgpack (see also the Accept header)",
+    ),
+    current_user: User = Depends(get_current_user),
+    impersonated_user: Optional[User] = Depends(get_impersonation_context),
+    db: AsyncSession = Depends(get_db),
+) -> APIResponse | Response:
+    """
+    Get detailed consumption data (load curve) for a large date range (max 2 years).
+
+    This endpoint automatically splits large date ranges into weekly chunks (7 days max per Enedis API call)
+    and returns all data aggregated. This eliminates the need for the frontend to make multiple requests.
+
+    Features:
+    - Automatic chunking into 7-day periods (Enedis API limit)
+    - Granular day-by-day caching
+    - ADAM-ERR0123 error handling with progressive retry
+    - Returns all data in a single response
+    """
+    batch = await prepare_detail_batch("consumption", usage_point_id, start, end, current_user, impersonated_user, db)
+    if isinstance(batch, APIResponse):
+        return batch
+    return await collect_detail_batch(batch, request, use_cache, current_user, response_format)
 
 
 @router.get("/power/{usage_point_id}", response_model=APIResponse)
@@ -1577,10 +1739,15 @@ async def get_production_detail_batch(
             "without_cache": {"summary": "Fresh data", "value": False}
         }
     ),
+    response_format: Optional[str] = Query(
+        None,
+        alias="format",
+        description="Response format: json (default), columnar or msgpack (see also the Accept header)",
+    ),
     current_user: User = Depends(get_current_user),
     impersonated_user: Optional[User] = Depends(get_impersonation_context),
     db: AsyncSession = Depends(get_db),
-) -> APIResponse:
+) -> APIResponse | Response:
     """
     Get detailed production data (load curve) for a large date range (max 2 years).
 
@@ -1593,429 +1760,186 @@ async def get_production_detail_batch(
     - ADAM-ERR0123 error handling with progressive retry
     - Returns all data in a single response
     """
-    # Get encryption key and effective user for impersonation support
-    encryption_key = get_encryption_key(current_user, impersonated_user)
-    effective_user = impersonated_user or current_user
-
-    # Adjust date range: cap end date to yesterday (J-1) and ensure start is before end
-    start, end = adjust_date_range(start, end)
-
-    # IMPORTANT: Enforce 2-year limit from TODAY (not yesterday)
-    # Use Paris timezone since Enedis blocks data at midnight Paris time
-    from zoneinfo import ZoneInfo
-    paris_tz = ZoneInfo("Europe/Paris")
-    today_paris = datetime.now(paris_tz).replace(hour=0, minute=0, second=0, microsecond=0)
-    # Convert to naive datetime for comparison (remove timezone info)
-    today = today_paris.replace(tzinfo=None)
-    yesterday = today - timedelta(days=1)
-    # Oldest allowed = today - 2 years (exact)
-    oldest_allowed = today.replace(year=today.year - 2)
-
-    logger.info(f"[BATCH PRODUCTION DATE LIMIT] Today Paris: {today_paris.strftime('%Y-%m-%d %H:%M:%S %Z')}, Yesterday: {yesterday.strftime('%Y-%m-%d')}, Oldest allowed (today - 2 years): {oldest_allowed.strftime('%Y-%m-%d')}")
-
-    # Cap start date to oldest_allowed (2 years from yesterday)
-    start_date_obj = datetime.strptime(start, "%Y-%m-%d")
-    if start_date_obj < oldest_allowed:
-        start = oldest_allowed.strftime("%Y-%m-%d")
-        log_with_pdl("warning", usage_point_id, f"[BATCH PRODUCTION] Start date adjusted from {start_date_obj.strftime('%Y-%m-%d')} to {start} (2-year limit)")
-
-    # Cap end date to yesterday
-    end_date_obj = datetime.strptime(end, "%Y-%m-%d")
-    if end_date_obj > yesterday:
-        end = yesterday.strftime("%Y-%m-%d")
-        log_with_pdl("warning", usage_point_id, f"[BATCH PRODUCTION] End date adjusted from {end_date_obj.strftime('%Y-%m-%d')} to {end} (data only available up to J-1)")
-
-    # Enforce maximum 729 days (today - 2 years to yesterday)
-    # This prevents excessive date ranges
-    start_date_obj = datetime.strptime(start, "%Y-%m-%d")
-    end_date_obj = datetime.strptime(end, "%Y-%m-%d")
-    date_range_days = (end_date_obj - start_date_obj).days + 1
-
-    if date_range_days > 729:
-        # Adjust start date to be exactly 729 days before end date
-        start_date_obj = end_date_obj - timedelta(days=728)  # 728 days + end day = 729 total
-        start = start_date_obj.strftime("%Y-%m-%d")
-        log_with_pdl("warning", usage_point_id, f"[BATCH PRODUCTION] Date range exceeded 729 days, adjusted start to {start} (729 days from {end})")
-
-    # Check if date range is within allowed period (2 years for detail endpoint)
-    is_valid, error_response = validate_date_range(start, end, max_years=2, endpoint_type="Production Detail (Batch)")
-    if not is_valid:
-        assert error_response is not None
-        return error_response
-
-    # Get adapter for user (demo or real) - use effective_user for impersonation
-    adapter, is_demo = await get_adapter_for_user(effective_user)
-
-    # Get valid token
-    access_token = None
-    if not is_demo:
-        token_result = await get_valid_token(usage_point_id, effective_user, db)
-        if isinstance(token_result, str):
-            access_token = token_result
-        else:
-            return make_token_error_response(token_result)
-
-    # Generate list of all dates in range
-    start_date = datetime.strptime(start, "%Y-%m-%d")
-    end_date = datetime.strptime(end, "%Y-%m-%d")
-    all_dates = []
-    current_date = start_date
-    while current_date <= end_date:
-        all_dates.append(current_date.strftime("%Y-%m-%d"))
-        current_date += timedelta(days=1)
+    batch = await prepare_detail_batch("production", usage_point_id, start, end, current_user, impersonated_user, db)
+    if isinstance(batch, APIResponse):
+        return batch
+    return await collect_detail_batch(batch, request, use_cache, current_user, response_format)
 
-    log_if_debug(effective_user, "info", f"[BATCH PRODUCTION] Requested {len(all_dates)} days from {start} to {end}", pdl=usage_point_id)
-
-    # Check cache for each day using OPTIMIZED per-day cache keys
-    # OLD format (slow): production:detail:{pdl}:{date}T{hour}:{minute} = single reading (312 queries/day)
-    # NEW format (fast): production:detail:daily:{pdl}:{date} = all readings for day (1 query/day)
-    cached_readings = []
-    missing_dates = []
-    cache_hit_count = 0
-    cache_miss_count = 0
-    cache_partial_count = 0
-
-    if use_cache:
-        for date_str in all_dates:
-            # Try NEW per-day cache format first (fast: 1 query per day)
-            daily_cache_key = f"production:detail:daily:{usage_point_id}:{date_str}"
-            daily_cached = await cache_service.get(daily_cache_key, encryption_key)
-
-            if daily_cached and isinstance(daily_cached, dict) and "readings" in daily_cached:
-                day_readings = daily_cached["readings"]
-                expected_count = daily_cached.get("expected_count", 48)
-                min_required = int(expected_count * 0.9)
-
-                if len(day_readings) >= min_required:
-                    cached_readings.extend(day_readings)
-                    cache_hit_count += 1
-                elif len(day_readings) > 0:
-                    cached_readings.extend(day_readings)
-                    cache_partial_count += 1
-                    missing_dates.append(date_str)
-                else:
-                    cache_miss_count += 1
-                    missing_dates.append(date_str)
-            else:
-                # Cache miss with new format
-                cache_miss_count += 1
-                missing_dates.append(date_str)
-    else:
-        missing_dates = all_dates
-
-    # Filter out dates that are too old (> 2 years from yesterday)
-    # This can happen if cache contains old data from before the 2-year limit was enforced
-    # Reuse the oldest_allowed variable calculated at the beginning of the function
-    original_missing_count = len(missing_dates)
-    missing_dates = [d for d in missing_dates if datetime.strptime(d, "%Y-%m-%d") >= oldest_allowed]
-
-    if original_missing_count > len(missing_dates):
-        log_with_pdl("warning", usage_point_id, f"[BATCH PRODUCTION] Filtered out {original_missing_count - len(missing_dates)} dates that are too old (> 2 years from yesterday: {oldest_allowed.strftime('%Y-%m-%d')})")
-
-    # Filter out blacklisted dates (dates that have failed > 5 times)
-    blacklisted_dates = []
-    if missing_dates:
-        non_blacklisted_dates = []
-        for date in missing_dates:
-            if await is_date_blacklisted(usage_point_id, date):
-                blacklisted_dates.append(date)
-            else:
-                non_blacklisted_dates.append(date)
-
-        missing_dates = non_blacklisted_dates
-
-    # Log cache summary report with clear formatting
-    log_if_debug(effective_user, "info", "[BATCH PRODUCTION CACHE REPORT] ═══════════════════════════════════════════════════════════", pdl=usage_point_id)
-    log_if_debug(effective_user, "info", f"[BATCH PRODUCTION CACHE REPORT] Period: {start} → {end} ({len(all_dates)} days)", pdl=usage_point_id)
-    log_if_debug(effective_user, "info", "[BATCH PRODUCTION CACHE REPORT] ───────────────────────────────────────────────────────────", pdl=usage_point_id)
-    log_if_debug(effective_user, "info", f"[BATCH PRODUCTION CACHE REPORT] ✓ CACHE HIT:     {cache_hit_count:4d} days ({cache_hit_count*100//len(all_dates) if len(all_dates) > 0 else 0:3d}%)", pdl=usage_point_id)
-    log_if_debug(effective_user, "info", f"[BATCH PRODUCTION CACHE REPORT] ◐ CACHE PARTIAL: {cache_partial_count:4d} days ({cache_partial_count*100//len(all_dates) if len(all_dates) > 0 else 0:3d}%)", pdl=usage_point_id)
-    log_if_debug(effective_user, "info", f"[BATCH PRODUCTION CACHE REPORT] ✗ CACHE MISS:    {cache_miss_count:4d} days ({cache_miss_count*100//len(all_dates) if len(all_dates) > 0 else 0:3d}%)", pdl=usage_point_id)
-    log_if_debug(effective_user, "info", f"[BATCH PRODUCTION CACHE REPORT] ⊗ BLACKLISTED:   {len(blacklisted_dates):4d} days ({len(blacklisted_dates)*100//len(all_dates) if len(all_dates) > 0 else 0:3d}%)", pdl=usage_point_id)
-    log_if_debug(effective_user, "info", "[BATCH PRODUCTION CACHE REPORT] ───────────────────────────────────────────────────────────", pdl=usage_point_id)
-    log_if_debug(effective_user, "info", f"[BATCH PRODUCTION CACHE REPORT] → TO FETCH:      {len(missing_dates):4d} days (after filtering blacklisted)", pdl=usage_point_id)
 
-    if blacklisted_dates:
-        log_if_debug(effective_user, "info", "[BATCH PRODUCTION CACHE REPORT] ───────────────────────────────────────────────────────────", pdl=usage_point_id)
-        if len(blacklisted_dates) <= 10:
-            log_if_debug(effective_user, "info", f"[BATCH PRODUCTION CACHE REPORT] Blacklisted dates: {', '.join(blacklisted_dates)}", pdl=usage_point_id)
-        else:
-            log_if_debug(effective_user, "info", f"[BATCH PRODUCTION CACHE REPORT] Blacklisted dates (first 5): {', '.join(blacklisted_dates[:5])}", pdl=usage_point_id)
-            log_if_debug(effective_user, "info", f"[BATCH PRODUCTION CACHE REPORT] Blacklisted dates (last 5):  {', '.join(blacklisted_dates[-5:])}", pdl=usage_point_id)
-
-    log_if_debug(effective_user, "info", "[BATCH PRODUCTION CACHE REPORT] ═══════════════════════════════════════════════════════════", pdl=usage_point_id) # Empty line with PDL for better readability
-
-    # If we have all data from cache, return it immediately
-    if not missing_dates:
-        log_if_debug(effective_user, "info", "[BATCH PRODUCTION] All data served from cache", pdl=usage_point_id)
-        return APIResponse(success=True, data={"meter_reading": {"interval_reading": cached_readings}})
-
-    # Check rate limit only if we need to fetch from Enedis
-    route = request.scope.get("route")
-    endpoint_path = route.path if route else request.url.path
-    is_allowed, error_response = await check_rate_limit(current_user.id, use_cache, current_user.is_admin, endpoint_path)
-    if not is_allowed:
-        # If rate limited and we have some cached data, return what we have
-        if cached_readings:
-            log_with_pdl("warning", usage_point_id, "[BATCH PRODUCTION RATE LIMITED] Returning partial cached data")
-            return APIResponse(
-                success=True,
-                data={"meter_reading": {"interval_reading": cached_readings}},
-                error=ErrorDetail(code="PARTIAL_DATA", message="Rate limit exceeded. Returning cached data only.")
-            )
-        assert error_response is not None
-        return error_response
-
-    # Split missing dates into weekly chunks (max 7 days per Enedis API call)
-    # IMPORTANT: Group only CONSECUTIVE dates together
-    week_chunks = []
-    i = 0
-    while i < len(missing_dates):
-        chunk_start = missing_dates[i]
-        chunk_dates = [missing_dates[i]]
-
-        # Find consecutive dates (up to 7 days)
-        j = i + 1
-        while j < len(missing_dates) and len(chunk_dates) < 7:
-            prev_date = datetime.strptime(missing_dates[j-1], "%Y-%m-%d")
-            curr_date = datetime.strptime(missing_dates[j], "%Y-%m-%d")
-
-            # Check if dates are consecutive (difference of 1 day)
-            if (curr_date - prev_date).days == 1:
-                chunk_dates.append(missing_dates[j])
-                j += 1
-            else:
-                # Not consecutive, start a new chunk
-                break
-
-        chunk_end = chunk_dates[-1]
-        week_chunks.append((chunk_start, chunk_end))
-        i = j  # Move to next non-consecutive date
-
-    total_chunks = len(week_chunks)
-    log_if_debug(effective_user, "info", f"[BATCH PRODUCTION] Split into {total_chunks} chunks from {len(missing_dates)} missing dates", pdl=usage_point_id)
-
-    # Fetch each chunk from Enedis with retry logic for ADAM-ERR0123
-    all_readings = []
-    fetched_count = 0
-    error_encountered = False
-
-    for chunk_idx, (chunk_start, chunk_end) in enumerate(week_chunks):
-        try:
-            # Target end date for this chunk
-            chunk_end_date = datetime.strptime(chunk_end, "%Y-%m-%d")
-
-            # Calculate chunk size for logging
-            chunk_start_date = datetime.strptime(chunk_start, "%Y-%m-%d")
-            chunk_size = (chunk_end_date - chunk_start_date).days + 1
-            log_if_debug(effective_user, "info", f"[BATCH PRODUCTION FETCH {chunk_idx+1}/{len(week_chunks)}] {chunk_start} to {chunk_end} ({chunk_size} days)", pdl=usage_point_id)
-
-            # Fetch with retry logic for ADAM-ERR0123
-            current_start = datetime.strptime(chunk_start, "%Y-%m-%d")
-            retry_count = 0
-            max_retries = 7
-            chunk_data = None
-
-            while current_start <= chunk_end_date and retry_count < max_retries:
-                current_start_str = current_start.strftime("%Y-%m-%d")
-
-                # IMPORTANT: Calculate fetch_end for each attempt
-                # Add 1 day to get the 23:30 reading of the last day, but respect 7-day Enedis limit
-                days_in_period = (chunk_end_date - current_start).days
-                if days_in_period > 6:  # More than 7 days (0-6 = 7 days)
-                    # Limit to 7 days from current_start
-                    fetch_end_date = current_start + timedelta(days=7)
-                else:
-                    # Use chunk_end + 1 day to get last 23:30 reading
-                    fetch_end_date = chunk_end_date + timedelta(days=1)
-
-                # CRITICAL: Never request data beyond today (Enedis returns J-1 data when end=today)
-                # We use TODAY (not yesterday) as the cap because Enedis API requires end > start
-                # and returns data up to J-1 of the end date
-                if fetch_end_date > today:
-                    fetch_end_date = today
-
-                fetch_end = fetch_end_date.strftime("%Y-%m-%d")
-
-                # CRITICAL: Enedis requires at least 2 days (start != end)
-                # If we would skip, extend start backwards to ensure we have a valid range
-                if current_start_str == fetch_end:
-                    # Extend start 1 day backwards to get a 2-day range
-                    extended_start = current_start - timedelta(days=1)
-                    current_start_str = extended_start.strftime("%Y-%m-%d")
-                    log_with_pdl("info", usage_point_id, f"[BATCH PRODUCTION EXTEND] Extended start from {current_start.strftime('%Y-%m-%d')} to {current_start_str} to ensure min 2-day range")
-
-                try:
-                    if is_demo:
-                        chunk_data = await adapter.get_production_detail(usage_point_id, current_start_str, fetch_end, encryption_key)
-                    else:
-                        chunk_data = await adapter.get_production_detail(usage_point_id, current_start_str, fetch_end, access_token)
-
-                    # Check for errors that should trigger immediate blacklist
-                    if isinstance(chunk_data, dict) and "error" in chunk_data:
-                        error_code = chunk_data.get("error", "")
-
-                        # no_data_found: Blacklist the entire week immediately
-                        if error_code == "no_data_found":
-                            log_with_pdl("warning", usage_point_id, f"[BATCH PRODUCTION BLACKLIST] no_data_found for {current_start_str} to {fetch_end}, blacklisting entire period")
+@router.get("/consumption/detail/stream/{usage_point_id}", response_model=APIResponse)
+async def stream_consumption_detail_batch(
+    request: Request,
+    usage_point_id: str = Path(..., description="Point de livraison (14 chiffres)"),
+    start: str = Query(..., description="Start date (YYYY-MM-DD) - Can be up to 2 years in the past"),
+    end: str = Query(..., description="End date (YYYY-MM-DD)"),
+    use_cache: bool = Query(True, description="Use cached data if available"),
+    mode: Optional[str] = Query(None, description="Stream format: ndjson (default) or sse (see also the Accept header)"),
+    current_user: User = Depends(get_current_user),
+    impersonated_user: Optional[User] = Depends(get_impersonation_context),
+    db: AsyncSession = Depends(get_db),
+) -> APIResponse | StreamingResponse:
+    """
+    Stream the detailed consumption data (load curve) of a large date range (max 2 years).
 
-                            # Blacklist all dates in the requested range
-                            current_date = datetime.strptime(current_start_str, "%Y-%m-%d")
-                            end_date = datetime.strptime(fetch_end, "%Y-%m-%d")
-                            while current_date < end_date:
-                                date_str = current_date.strftime("%Y-%m-%d")
-                                await blacklist_date(usage_point_id, date_str)
-                                current_date += timedelta(days=1)
+    Same data as `/consumption/detail/batch`, delivered as it becomes available instead of in one response:
+    cached days first, then each weekly chunk as soon as Enedis returns it (and it is cached).
 
-                            # Skip this entire chunk
-                            break
+    Format: NDJSON (`application/x-ndjson`, one JSON event per line) or Server-Sent Events
+    (`mode=sse` or `Accept: text/event-stream`, the SSE event name is the event type). Events:
+    - `start`: cache report (`days`, `cache_hit`, `cache_partial`, `to_fetch`, `chunks`...)
+    - `readings`: `source` (cache / enedis) and `readings` (Enedis interval readings)
+    - `progress`: `index` / `chunks` of the chunk just fetched, `failed` if it was skipped
+    - `error`: `code` / `message` (rate limit: only cached data is sent)
+    - `end`: total `readings` and `partial`
 
-                        # ADAM-ERR0123: Retry with next day
-                        elif error_code == "ADAM-ERR0123":
-                            log_with_pdl("warning", usage_point_id, f"[BATCH PRODUCTION RETRY] ADAM-ERR0123 for {current_start_str}, trying next day...")
+    Readings of partially cached days may be sent twice (cache, then Enedis): de-duplicate by `date`.
+    """
+    batch = await prepare_detail_batch("consumption", usage_point_id, start, end, current_user, impersonated_user, db)
+    if isinstance(batch, APIResponse):
+        return batch
+    return stream_detail_batch(batch, request, use_cache, current_user, mode)
 
-                            # Increment fail counter for this date
-                            fail_count = await increment_date_fail_count(usage_point_id, current_start_str)
-                            log_if_debug(effective_user, "debug", f"[BATCH PRODUCTION FAIL COUNT] {current_start_str} now has {fail_count} failures", pdl=usage_point_id)
 
-                            # Blacklist if > 5 failures
-                            if fail_count > 5:
-                                await blacklist_date(usage_point_id, current_start_str)
+@router.get("/production/detail/stream/{usage_point_id}", response_model=APIResponse)
+async def stream_production_detail_batch(
+    request: Request,
+    usage_point_id: str = Path(..., description="Point de livraison (14 chiffres)"),
+    start: str = Query(..., description="Start date (YYYY-MM-DD) - Can be up to 2 years in the past"),
+    end: str = Query(..., description="End date (YYYY-MM-DD)"),
+    use_cache: bool = Query(True, description="Use cached data if available"),
+    mode: Optional[str] = Query(None, description="Stream format: ndjson (default) or sse (see also the Accept header)"),
+    current_user: User = Depends(get_current_user),
+    impersonated_user: Optional[User] = Depends(get_impersonation_context),
+    db: AsyncSession = Depends(get_db),
+) -> APIResponse | StreamingResponse:
+    """
+    Stream the detailed production data (load curve) of a large date range (max 2 years).
 
-                            current_start += timedelta(days=1)
-                            retry_count += 1
-                            continue
+    Same data as `/production/detail/batch`, delivered as it becomes available instead of in one response:
+    cached days first, then each weekly chunk as soon as Enedis returns it (and it is cached).
 
-                    # Success! Break out of retry loop
-                    break
+    Format: NDJSON (`application/x-ndjson`, one JSON event per line) or Server-Sent Events
+    (`mode=sse` or `Accept: text/event-stream`, the SSE event name is the event type). Events:
+    - `start`: cache report (`days`, `cache_hit`, `cache_partial`, `to_fetch`, `chunks`...)
+    - `readings`: `source` (cache / enedis) and `readings` (Enedis interval readings)
+    - `progress`: `index` / `chunks` of the chunk just fetched, `failed` if it was skipped
+    - `error`: `code` / `message` (rate limit: only cached data is sent)
+    - `end`: total `readings` and `partial`
 
-                except Exception as e:
-                    error_msg = str(e)
-                    log_with_pdl("error", usage_point_id, f"[BATCH PRODUCTION ERROR] Failed to fetch {current_start_str} to {fetch_end}: {e}")
+    Readings of partially cached days may be sent twice (cache, then Enedis): de-duplicate by `date`.
+    """
+    batch = await prepare_detail_batch("production", usage_point_id, start, end, current_user, impersonated_user, db)
+    if isinstance(batch, APIResponse):
+        return batch
+    return stream_detail_batch(batch, request, use_cache, current_user, mode)
 
-                    # Check if this is a no_data_found error - blacklist entire period immediately
-                    if "no_data_found" in error_msg:
-                        log_with_pdl("warning", usage_point_id, f"[BATCH PRODUCTION BLACKLIST] no_data_found for {current_start_str} to {fetch_end}, blacklisting entire period")
 
-                        # Blacklist all dates in the requested range
-                        current_date = datetime.strptime(current_start_str, "%Y-%m-%d")
-                        end_date = datetime.strptime(fetch_end, "%Y-%m-%d")
-                        while current_date < end_date:
-                            date_str = current_date.strftime("%Y-%m-%d")
-                            await blacklist_date(usage_point_id, date_str)
-                            current_date += timedelta(days=1)
+# Load curve aggregation (charts)
+async def _aggregate(
+    data_type: str,
+    request: Request,
+    usage_point_id: str,
+    start: str,
+    end: str,
+    bucket: Optional[str],
+    functions: Optional[str],
+    split_hp_hc: bool,
+    downsample: Optional[str],
+    points: int,
+    current_user: User,
+    impersonated_user: Optional[User],
+    db: AsyncSession,
+) -> APIResponse | Response:
+    """Shared implementation of the consumption / production aggregate endpoints"""
+    try:
+        query = AggregateQuery.parse(bucket, functions, split_hp_hc, downsample, points)
+    except ValueError as e:
+        return APIResponse(success=False, error=ErrorDetail(code="INVALID_PARAMETER", message=str(e)))
 
-                        # Skip this entire chunk
-                        break
+    pdl, _ = await get_pdl_with_owner(usage_point_id, current_user, impersonated_user, db)
+    if not pdl:
+        return APIResponse(
+            success=False,
+            error=ErrorDetail(code="ACCESS_DENIED", message="Access denied: PDL not found or does not belong to you.")
+        )
 
-                    # For other errors: increment fail counter and retry
-                    fail_count = await increment_date_fail_count(usage_point_id, current_start_str)
-                    log_if_debug(effective_user, "debug", f"[BATCH PRODUCTION FAIL COUNT] {current_start_str} now has {fail_count} failures", pdl=usage_point_id)
-
-                    # Blacklist if > 5 failures
-                    if fail_count > 5:
-                        await blacklist_date(usage_point_id, current_start_str)
-
-                    # Try next day
-                    current_start += timedelta(days=1)
-                    retry_count += 1
-
-            # If we exhausted all retries, log and continue to next chunk
-            if retry_count >= max_retries:
-                log_with_pdl("warning", usage_point_id, f"[BATCH PRODUCTION SKIP] Skipped chunk {chunk_start} to {chunk_end} after {retry_count} retries")
-                error_encountered = True
-                continue
-
-            # Extract readings from chunk_data
-            readings = []
-            if isinstance(chunk_data, dict):
-                if "meter_reading" in chunk_data and "interval_reading" in chunk_data["meter_reading"]:
-                    readings = chunk_data["meter_reading"]["interval_reading"]
-                elif "interval_reading" in chunk_data:
-                    readings = chunk_data["interval_reading"]
-
-            # Cache readings grouped by day (OPTIMIZED: 1 cache entry per day instead of per timestamp)
-            if use_cache and readings:
-                # Group readings by date
-                readings_by_date: dict[str, list] = {}
-                interval_length = "PT30M"  # Default
-
-                for reading in readings:
-                    timestamp = reading.get("date", "")
-                    if timestamp:
-                        # Extract date part (YYYY-MM-DD)
-                        date_part = timestamp.replace("T", " ").split(" ")[0]
-                        if date_part not in readings_by_date:
-                            readings_by_date[date_part] = []
-                        readings_by_date[date_part].append(reading)
-
-                        # Detect interval length from first reading
-                        if "interval_length" in reading:
-                            interval_length = reading["interval_length"]
-
-                # Determine expected count based on interval
-                expected_count = 48  # Default PT30M
-                if interval_length == "PT10M":
-                    expected_count = 144
-                elif interval_length == "PT15M":
-                    expected_count = 96
-                elif interval_length == "PT30M":
-                    expected_count = 48
-                elif interval_length == "PT60M":
-                    expected_count = 24
-
-                # Store each day's readings as a single cache entry
-                for date_str, day_readings in readings_by_date.items():
-                    daily_cache_key = f"production:detail:daily:{usage_point_id}:{date_str}"
-                    cache_data = {
-                        "readings": day_readings,
-                        "expected_count": expected_count,
-                        "interval_length": interval_length,
-                        "count": len(day_readings)
-                    }
-                    await cache_service.set(daily_cache_key, cache_data, encryption_key)
-
-                log_if_debug(effective_user, "debug", f"[BATCH PRODUCTION CACHE SET] {chunk_start} to {chunk_end} ({len(readings)} readings in {len(readings_by_date)} days)", pdl=usage_point_id)
-
-            all_readings.extend(readings)
-            fetched_count += 1
+    # Readings come from the batch endpoint: same date capping, per-day cache, Enedis fetch and blacklist
+    batch = get_consumption_detail_batch if data_type == "consumption" else get_production_detail_batch
+    start, end = adjust_date_range(start, end)
+    return await aggregate_load_curve(
+        data_type,
+        usage_point_id,
+        start,
+        end,
+        query,
+        get_encryption_key(current_user, impersonated_user),
+        pdl.offpeak_hours,
+        lambda: batch(
+            request,
+            usage_point_id=usage_point_id,
+            start=start,
+            end=end,
+            use_cache=True,
+            response_format="json",
+            current_user=current_user,
+            impersonated_user=impersonated_user,
+            db=db,
+        ),
+    )
 
-        except Exception as e:
-            log_with_pdl("error", usage_point_id, f"[BATCH PRODUCTION ERROR] Failed chunk {chunk_start} to {chunk_end}: {e}")
-            error_encountered = True
-            # Continue with next chunk
 
-    # Combine cached readings with newly fetched readings
-    all_readings.extend(cached_readings)
+AGGREGATE_DESCRIPTION = """
+    Aggregated load curve for charts, computed server-side from the detail readings (max 2 years).
 
-    # Sort by timestamp
-    all_readings.sort(key=lambda x: x.get("date", ""))
+    - `bucket`: hour, day, week (starting on monday) or month
+    - `agg`: comma-separated functions: `sum` (energy, Wh), `mean`, `min`, `max`, `pNN` (power, W)
+    - `split_hp_hc`: add the `hc` / `hp` energy (Wh) of each bucket using the PDL off-peak hours
+    - `downsample` + `points`: power curve reduced to about `points` points (`lttb` or `minmax`)
 
-    log_if_debug(effective_user, "info", f"[BATCH PRODUCTION COMPLETE] Total readings: {len(all_readings)}, Fetched chunks: {fetched_count}/{len(week_chunks)}", pdl=usage_point_id)
+    Results are cached by range and query.
+"""
 
-    if not all_readings:
-        return APIResponse(
-            success=False,
-            error=ErrorDetail(
-                code="NO_DATA",
-                message="No production data available for this period. This may be before the meter activation date."
-            )
-        )
 
-    # Return success with optional warning if some chunks failed
-    response_data = {"meter_reading": {"interval_reading": all_readings}}
+@router.get("/consumption/aggregate/{usage_point_id}", response_model=APIResponse, description=AGGREGATE_DESCRIPTION)
+async def get_consumption_aggregate(
+    request: Request,
+    usage_point_id: str = Path(..., description="Point de livraison (14 chiffres)"),
+    start: str = Query(..., description="Start date (YYYY-MM-DD) - Can be up to 2 years in the past"),
+    end: str = Query(..., description="End date (YYYY-MM-DD)"),
+    bucket: Optional[str] = Query("day", description="Bucket: hour, day, week or month (empty: no aggregation)"),
+    functions: Optional[str] = Query(None, alias="agg", description="Aggregate functions, e.g. sum,mean,max,p95"),
+    split_hp_hc: bool = Query(False, description="Split the energy of each bucket into HC / HP"),
+    downsample: Optional[str] = Query(None, description="Downsampling of the power curve: lttb or minmax"),
+    points: int = Query(1000, description="Target number of points when downsampling"),
+    current_user: User = Depends(get_current_user),
+    impersonated_user: Optional[User] = Depends(get_impersonation_context),
+    db: AsyncSession = Depends(get_db),
+) -> APIResponse | Response:
+    return await _aggregate(
+        "consumption", request, usage_point_id, start, end, bucket, functions, split_hp_hc, downsample, points,
+        current_user, impersonated_user, db,
+    )
 
-    if error_encountered:
-        return APIResponse(
-            success=True,
-            data=response_data,
-            error=ErrorDetail(
-                code="PARTIAL_DATA",
-                message=f"Some data could not be fetched (possibly before activation date). Returning {len(all_readings)} readings."
-            )
-        )
 
-    return APIResponse(success=True, data=response_data)
+@router.get("/production/aggregate/{usage_point_id}", response_model=APIResponse, description=AGGREGATE_DESCRIPTION)
+async def get_production_aggregate(
+    request: Request,
+    usage_point_id: str = Path(..., description="Point de livraison (14 chiffres)"),
+    start: str = Query(..., description="Start date (YYYY-MM-DD) - Can be up to 2 years in the past"),
+    end: str = Query(..., description="End date (YYYY-MM-DD)"),
+    bucket: Optional[str] = Query("day", description="Bucket: hour, day, week or month (empty: no aggregation)"),
+    functions: Optional[str] = Query(None, alias="agg", description="Aggregate functions, e.g. sum,mean,max,p95"),
+    split_hp_hc: bool = Query(False, description="Split the energy of each bucket into HC / HP"),
+    downsample: Optional[str] = Query(None, description="Downsampling of the power curve: lttb or minmax"),
+    points: int = Query(1000, description="Target number of points when downsampling"),
+    current_user: User = Depends(get_current_user),
+    impersonated_user: Optional[User] = Depends(get_impersonation_context),
+    db: AsyncSession = Depends(get_db),
+) -> APIResponse | Response:
+    return await _aggregate(
+        "production", request, usage_point_id, start, end, bucket, functions, split_hp_hc, downsample, points,
+        current_user, impersonated_user, db,
+    )
 
 
 # Customer data endpoints
@@ -2253,7 +2177,7 @@ async def delete_cache(
         )
 
     # Delete all consumption cache keys for this PDL
-    # Cache keys format: consumption:detail:{usage_point_id}:{date}
+    # Cache keys format: consumption:{type}:{usage_point_id}:{...} (resolved from the PDL key index)
     pattern = f"consumption:*:{usage_point_id}:*"
     deleted_keys = await cache_service.delete_pattern(pattern)
 
@@ -13,21 +13,26 @@ the frontend can use the same API calls in both modes.
 
 import logging
 from datetime import date, datetime, timedelta
+from typing import Any, AsyncIterator
 
-from fastapi import APIRouter, Depends, Path, Query
+from fastapi import APIRouter, Depends, Path, Query, Request, Response
+from fastapi.responses import StreamingResponse
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from ..adapters.myelectricaldata import get_med_adapter
-from ..middleware import get_current_user
+from ..middleware import get_current_user, get_encryption_key
 from ..models import PDL, User
 from ..models.database import get_db
 from ..schemas import APIResponse, ErrorDetail
+from ..services.aggregation import AggregateQuery, aggregate_load_curve
+from ..services.load_curve import render_load_curve
 from ..services.local_data import (
     LocalDataService,
     format_daily_response,
     format_detail_response,
 )
+from ..utils.responses import APIResponseRoute, event_stream_response, wants_event_stream
 
 logger = logging.getLogger(__name__)
 
@@ -38,6 +43,7 @@ router = APIRouter(
         401: {"description": "Unauthorized - Invalid or missing authentication"},
         403: {"description": "Forbidden - PDL does not belong to user"},
     },
+    route_class=APIResponseRoute,
 )
 
 
@@ -678,13 +684,17 @@ async def get_power(
 
 @router.get("/consumption/detail/batch/{usage_point_id}", response_model=APIResponse)
 async def get_consumption_detail_batch(
+    request: Request,
     usage_point_id: str = Path(..., description="Point de livraison (14 chiffres)"),
     start: str = Query(..., description="Date de début (YYYY-MM-DD)"),
     end: str = Query(..., description="Date de fin (YYYY-MM-DD)"),
     use_cache: bool = Query(True, description="Utiliser le cache local et ne fetcher que les données manquantes"),
+    response_format: str | None = Query(
+        None, alias="format", description="Format de réponse : json (défaut), columnar ou msgpack"
+    ),
     current_user: User = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
-) -> APIResponse:
+) -> APIResponse | Response:
     """Get detailed consumption data in batch (handles long date ranges)
 
     Stratégie local-first : consulte la base locale, identifie les trous,
@@ -725,9 +735,10 @@ async def get_consumption_detail_batch(
                     f"[{usage_point_id}] Batch detail consumption servi depuis le cache local "
                     f"({len(local_data)} enregistrements)"
                 )
-                return APIResponse(
-                    success=True,
-                    data=format_detail_response(usage_point_id, start, end, all_readings, from_cache=True),
+                return render_load_curve(
+                    request,
+                    APIResponse(success=True, data=format_detail_response(usage_point_id, start, end, all_readings, from_cache=True)),
+                    response_format,
                 )
 
             # Fetcher uniquement les plages manquantes en chunks de 7 jours
@@ -778,9 +789,10 @@ async def get_consumption_detail_batch(
         # Trier par date
         all_readings.sort(key=lambda x: x.get("date", ""))
 
-        return APIResponse(
-            success=True,
-            data=format_detail_response(usage_point_id, start, end, all_readings, from_cache=False),
+        return render_load_curve(
+            request,
+            APIResponse(success=True, data=format_detail_response(usage_point_id, start, end, all_readings, from_cache=False)),
+            response_format,
         )
 
     except Exception as e:
@@ -793,13 +805,17 @@ async def get_consumption_detail_batch(
 
 @router.get("/production/detail/batch/{usage_point_id}", response_model=APIResponse)
 async def get_production_detail_batch(
+    request: Request,
     usage_point_id: str = Path(..., description="Point de livraison (14 chiffres)"),
     start: str = Query(..., description="Date de début (YYYY-MM-DD)"),
     end: str = Query(..., description="Date de fin (YYYY-MM-DD)"),
     use_cache: bool = Query(True, description="Utiliser le cache local et ne fetcher que les données manquantes"),
+    response_format: str | None = Query(
+        None, alias="format", description="Format de réponse : json (défaut), columnar ou msgpack"
+    ),
     current_user: User = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
-) -> APIResponse:
+) -> APIResponse | Response:
     """Get detailed production data in batch (handles long date ranges)
 
     Stratégie local-first : consulte la base locale, identifie les trous,
@@ -840,9 +856,10 @@ async def get_production_detail_batch(
                     f"[{usage_point_id}] Batch detail production servi depuis le cache local "
                     f"({len(local_data)} enregistrements)"
                 )
-                return APIResponse(
-                    success=True,
-                    data=format_detail_response(usage_point_id, start, end, all_readings, from_cache=True),
+                return render_load_curve(
+                    request,
+                    APIResponse(success=True, data=format_detail_response(usage_point_id, start, end, all_readings, from_cache=True)),
+                    response_format,
                 )
 
             # Fetcher uniquement les plages manquantes en chunks de 7 jours
@@ -893,9 +910,10 @@ async def get_production_detail_batch(
         # Trier par date
         all_readings.sort(key=lambda x: x.get("date", ""))
 
-        return APIResponse(
-            success=True,
-            data=format_detail_response(usage_point_id, start, end, all_readings, from_cache=False),
+        return render_load_curve(
+            request,
+            APIResponse(success=True, data=format_detail_response(usage_point_id, start, end, all_readings, from_cache=False)),
+            response_format,
         )
 
     except Exception as e:
@@ -904,3 +922,224 @@ async def get_production_detail_batch(
             success=False,
             error=ErrorDetail(code="GATEWAY_ERROR", message=str(e)),
         )
+
+
+# =========================================================================
+# Streaming des courbes de charge (NDJSON / SSE)
+# =========================================================================
+
+STREAM_SLICE_READINGS = 7 * 48  # Une semaine au pas 30 min par évènement
+
+
+async def _stream_detail(
+    data_type: str,
+    request: Request,
+    usage_point_id: str,
+    start: str,
+    end: str,
+    use_cache: bool,
+    mode: str | None,
+    current_user: User,
+    db: AsyncSession,
+) -> APIResponse | StreamingResponse:
+    """Implémentation commune des endpoints de streaming consommation / production
+
+    Même format d'évènements que le mode serveur : ``start``, ``readings`` (base locale puis passerelle),
+    ``progress``, ``error`` et ``end``.
+    """
+    if not await verify_pdl_ownership(usage_point_id, current_user, db):
+        return APIResponse(
+            success=False,
+            error=ErrorDetail(
+                code="ACCESS_DENIED",
+                message="Access denied: PDL not found or does not belong to you.",
+            ),
+        )
+
+    try:
+        start_date = parse_date(start)
+        end_date = parse_date(end)
+    except ValueError as e:
+        return APIResponse(
+            success=False,
+            error=ErrorDetail(code="INVALID_DATE", message=str(e)),
+        )
+
+    # La base locale est lue avant de streamer (la session n'est plus utilisée ensuite)
+    local_data: list[dict] = []
+    missing_ranges = [(start_date, end_date)]
+    if use_cache:
+        local_service = LocalDataService(db)
+        get_local = local_service.get_consumption_detail if data_type == "consumption" else local_service.get_production_detail
+        local_data, missing_ranges = await get_local(usage_point_id, start_date, end_date)
+
+    chunks = []
+    for range_start, range_end in missing_ranges:
+        current_start = range_start
+        while current_start < range_end:
+            chunk_end = min(current_start + timedelta(days=7), range_end)
+            chunks.append((current_start, chunk_end))
+            current_start = chunk_end
+
+    async def events() -> AsyncIterator[dict[str, Any]]:
+        total = len(local_data)
+        partial = False
+        yield {"type": "start", "start": start, "end": end, "local_readings": len(local_data), "chunks": len(chunks)}
+        for index in range(0, len(local_data), STREAM_SLICE_READINGS):
+            yield {"type": "readings", "source": "local", "readings": local_data[index:index + STREAM_SLICE_READINGS]}
+
+        adapter = get_med_adapter()
+        fetch = adapter.get_consumption_detail if data_type == "consumption" else adapter.get_production_detail
+        for index, (chunk_start, chunk_end) in enumerate(chunks, start=1):
+            progress = {"type": "progress", "index": index, "chunks": len(chunks), "start": chunk_start.isoformat(), "end": chunk_end.isoformat()}
+            try:
+                response = await fetch(usage_point_id, chunk_start.isoformat(), chunk_end.isoformat())
+                readings = sorted(extract_readings_from_response(response), key=lambda x: x.get("date", ""))
+            except Exception as chunk_error:
+                logger.warning(f"[{usage_point_id}] Chunk {chunk_start} - {chunk_end} échoué: {chunk_error}")
+                partial = True
+                yield {**progress, "failed": True}
+                continue
+            total += len(readings)
+            yield {"type": "readings", "source": "gateway", "readings": readings}
+            yield progress
+        yield {"type": "end", "readings": total, "partial": partial}
+
+    return event_stream_response(events(), sse=wants_event_stream(request, mode))
+
+
+@router.get("/consumption/detail/stream/{usage_point_id}", response_model=APIResponse)
+async def stream_consumption_detail_batch(
+    request: Request,
+    usage_point_id: str = Path(..., description="Point de livraison (14 chiffres)"),
+    start: str = Query(..., description="Date de début (YYYY-MM-DD)"),
+    end: str = Query(..., description="Date de fin (YYYY-MM-DD)"),
+    use_cache: bool = Query(True, description="Utiliser le cache local et ne fetcher que les données manquantes"),
+    mode: str | None = Query(None, description="Format du flux : ndjson (défaut) ou sse (voir aussi l'en-tête Accept)"),
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+) -> APIResponse | StreamingResponse:
+    """Stream detailed consumption data: local data first, then each gateway chunk as it arrives"""
+    return await _stream_detail("consumption", request, usage_point_id, start, end, use_cache, mode, current_user, db)
+
+
+@router.get("/production/detail/stream/{usage_point_id}", response_model=APIResponse)
+async def stream_production_detail_batch(
+    request: Request,
+    usage_point_id: str = Path(..., description="Point de livraison (14 chiffres)"),
+    start: str = Query(..., description="Date de début (YYYY-MM-DD)"),
+    end: str = Query(..., description="Date de fin (YYYY-MM-DD)"),
+    use_cache: bool = Query(True, description="Utiliser le cache local et ne fetcher que les données manquantes"),
+    mode: str | None = Query(None, description="Format du flux : ndjson (défaut) ou sse (voir aussi l'en-tête Accept)"),
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+) -> APIResponse | StreamingResponse:
+    """Stream detailed production data: local data first, then each gateway chunk as it arrives"""
+    return await _stream_detail("production", request, usage_point_id, start, end, use_cache, mode, current_user, db)
+
+
+# =========================================================================
+# Agrégation côté serveur (graphiques)
+# =========================================================================
+
+
+async def _aggregate(
+    data_type: str,
+    request: Request,
+    usage_point_id: str,
+    start: str,
+    end: str,
+    bucket: str | None,
+    functions: str | None,
+    split_hp_hc: bool,
+    downsample: str | None,
+    points: int,
+    current_user: User,
+    db: AsyncSession,
+) -> APIResponse | Response:
+    """Implémentation commune des endpoints d'agrégation consommation / production"""
+    try:
+        query = AggregateQuery.parse(bucket, functions, split_hp_hc, downsample, points)
+    except ValueError as e:
+        return APIResponse(success=False, error=ErrorDetail(code="INVALID_PARAMETER", message=str(e)))
+
+    result = await db.execute(
+        select(PDL).where(
+            PDL.user_id == current_user.id,
+            PDL.usage_point_id == usage_point_id,
+            PDL.is_active == True,  # noqa: E712
+        )
+    )
+    pdl = result.scalar_one_or_none()
+    if not pdl:
+        return APIResponse(
+            success=False,
+            error=ErrorDetail(
+                code="ACCESS_DENIED",
+                message="Access denied: PDL not found or does not belong to you.",
+            ),
+        )
+
+    # Les mesures viennent de l'endpoint batch (base locale puis passerelle pour les trous)
+    batch = get_consumption_detail_batch if data_type == "consumption" else get_production_detail_batch
+    return await aggregate_load_curve(
+        data_type,
+        usage_point_id,
+        start,
+        end,
+        query,
+        get_encryption_key(current_user, None),
+        pdl.offpeak_hours,
+        lambda: batch(
+            request,
+            usage_point_id=usage_point_id,
+            start=start,
+            end=end,
+            use_cache=True,
+            response_format="json",
+            current_user=current_user,
+            db=db,
+        ),
+    )
+
+
+@router.get("/consumption/aggregate/{usage_point_id}", response_model=APIResponse)
+async def get_consumption_aggregate(
+    request: Request,
+    usage_point_id: str = Path(..., description="Point de livraison (14 chiffres)"),
+    start: str = Query(..., description="Date de début (YYYY-MM-DD)"),
+    end: str = Query(..., description="Date de fin (YYYY-MM-DD)"),
+    bucket: str | None = Query("day", description="Regroupement : hour, day, week ou month (vide : aucun)"),
+    functions: str | None = Query(None, alias="agg", description="Fonctions d'agrégation, ex. sum,mean,max,p95"),
+    split_hp_hc: bool = Query(False, description="Répartir l'énergie de chaque période en HC / HP"),
+    downsample: str | None = Query(None, description="Sous-échantillonnage de la courbe : lttb ou minmax"),
+    points: int = Query(1000, description="Nombre de points visé pour le sous-échantillonnage"),
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+) -> APIResponse | Response:
+    """Courbe de charge agrégée côté serveur (voir services/aggregation.py)"""
+    return await _aggregate(
+        "consumption", request, usage_point_id, start, end, bucket, functions, split_hp_hc, downsample, points,
+        current_user, db,
+    )
+
+
+@router.get("/production/aggregate/{usage_point_id}", response_model=APIResponse)
+async def get_production_aggregate(
+    request: Request,
+    usage_point_id: str = Path(..., description="Point de livraison (14 chiffres)"),
+    start: str = Query(..., description="Date de début (YYYY-MM-DD)"),
+    end: str = Query(..., description="Date de fin (YYYY-MM-DD)"),
+    bucket: str | None = Query("day", description="Regroupement : hour, day, week ou month (vide : aucun)"),
+    functions: str | None = Query(None, alias="agg", description="Fonctions d'agrégation, ex. sum,mean,max,p95"),
+    split_hp_hc: bool = Query(False, description="Répartir l'énergie de chaque période en HC / HP"),
+    downsample: str | None = Query(None, description="Sous-échantillonnage de la courbe : lttb ou minmax"),
+    points: int = Query(1000, description="Nombre de points visé pour le sous-échantillonnage"),
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+) -> APIResponse | Response:
+    """Courbe de charge de production agrégée côté serveur (voir services/aggregation.py)"""
+    return await _aggregate(
+        "production", request, usage_point_id, start, end, bucket, functions, split_hp_hc, downsample, points,
+        current_user, db,
+    )
@@ -1,21 +1,29 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query, Path, Body
-from sqlalchemy import select, func
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Path, Body, Request, Response
+from sqlalchemy import select, func, or_, update
 from sqlalchemy.ext.asyncio import AsyncSession
+from dataclasses import dataclass, field
 from datetime import datetime, UTC
 from ..models import User, EnergyProvider, EnergyOffer, OfferContribution, ContributionMessage
-from ..models.database import get_db
+from ..models.database import get_db, get_read_db
 from ..schemas import APIResponse, ErrorDetail
 from ..middleware import get_current_user, require_permission, require_action, require_not_demo
 from ..services.email import email_service
 from ..services.slack import slack_service
 from ..services.offers import get_all_offer_types
+from ..services.offer_catalogue import offer_catalogue, serialize_offer
 from ..config import settings
+from ..utils.responses import APIResponseRoute
 import logging
+import uuid
 
 
 logger = logging.getLogger(__name__)
 
-router = APIRouter(prefix="/energy", tags=["Energy Offers"])
+router = APIRouter(prefix="/energy", tags=["Energy Offers"], route_class=APIResponseRoute)
+
+# Notifications envoyées au même destinataire dans la fenêtre de digest : regroupées en un seul email
+CONTRIBUTIONS_SUBMITTED_DIGEST_SUBJECT = "Nouvelles contributions communautaires - MyElectricalData"
+CONTRIBUTIONS_REVIEWED_DIGEST_SUBJECT = "Vos contributions ont été examinées - MyElectricalData"
 
 
 def parse_iso_datetime(value: str | None) -> datetime | None:
@@ -29,8 +37,78 @@ def parse_iso_datetime(value: str | None) -> datetime | None:
         return None
 
 
-async def deactivate_previous_offers(
-    db: AsyncSession,
+@dataclass
+class ContributionContext:
+    """Fournisseurs et offres préchargés pour appliquer des contributions sans requête par contribution.
+
+    Les offres créées pendant l'application (``created_offers``) ne sont jamais désactivées par une
+    autre contribution du même lot : un lot correspond à un même changement de tarif.
+    """
+
+    providers_by_id: dict[str, EnergyProvider] = field(default_factory=dict)
+    providers_by_name: dict[str, EnergyProvider] = field(default_factory=dict)
+    offers_by_id: dict[str, EnergyOffer] = field(default_factory=dict)
+    created_offers: list[EnergyOffer] = field(default_factory=list)
+    deleted_offer_ids: set[str] = field(default_factory=set)
+
+    def add_provider(self, provider: EnergyProvider) -> None:
+        self.providers_by_id[provider.id] = provider
+        self.providers_by_name[provider.name] = provider
+
+    def provider_offers(self, provider_id: str) -> list[EnergyOffer]:
+        return [
+            offer for offer in self.offers_by_id.values()
+            if offer.provider_id == provider_id and offer.id not in self.deleted_offer_ids
+        ]
+
+    def find_offer(self, provider_id: str, offer_type: str, power_kva: int) -> EnergyOffer | None:
+        """Offre d'un fournisseur par type et puissance (colonne power_kva, puis suffixe du nom)"""
+        candidates = [offer for offer in self.provider_offers(provider_id) if offer.offer_type == offer_type]
+        for offer in candidates:
+            if offer.power_kva == power_kva:
+                return offer
+        power_pattern = f"- {power_kva} kVA".lower()
+        for offer in candidates:
+            if offer.name.lower().endswith(power_pattern):
+                return offer
+        return None
+
+
+async def load_contribution_context(db: AsyncSession, contributions: list[OfferContribution]) -> ContributionContext:
+    """Précharge en deux requêtes ``IN`` les fournisseurs et offres touchés par des contributions"""
+    context = ContributionContext()
+
+    provider_ids = {c.existing_provider_id for c in contributions if c.existing_provider_id}
+    provider_names = {
+        c.provider_name for c in contributions if c.contribution_type == "NEW_PROVIDER" and c.provider_name
+    }
+    offer_ids = {c.existing_offer_id for c in contributions if c.existing_offer_id}
+
+    if provider_ids or provider_names:
+        result = await db.execute(
+            select(EnergyProvider).where(
+                or_(EnergyProvider.id.in_(provider_ids), EnergyProvider.name.in_(provider_names))
+            )
+        )
+        for provider in result.scalars().all():
+            context.add_provider(provider)
+
+    # Toutes les offres des fournisseurs concernés (désactivation, suppression) et les offres référencées
+    all_provider_ids = set(context.providers_by_id)
+    if all_provider_ids or offer_ids:
+        result = await db.execute(
+            select(EnergyOffer).where(
+                or_(EnergyOffer.provider_id.in_(all_provider_ids), EnergyOffer.id.in_(offer_ids))
+            )
+        )
+        for offer in result.scalars().all():
+            context.offers_by_id[offer.id] = offer
+
+    return context
+
+
+def deactivate_previous_offers(
+    context: ContributionContext,
     provider_id: str,
     offer_type: str,
     valid_from: datetime
@@ -42,7 +120,7 @@ async def deactivate_previous_offers(
     Les offres ne sont jamais supprimées pour conserver l'historique.
 
     Args:
-        db: Session de base de données
+        context: Offres préchargées (voir load_contribution_context)
         provider_id: ID du fournisseur
         offer_type: Type d'offre (BASE, HC_HP, TEMPO, etc.)
         valid_from: Date de début de la nouvelle offre (devient valid_to des anciennes)
@@ -50,19 +128,13 @@ async def deactivate_previous_offers(
     Returns:
         Nombre d'offres désactivées
     """
-    query = select(EnergyOffer).where(
-        EnergyOffer.provider_id == provider_id,
-        EnergyOffer.offer_type == offer_type,
-        EnergyOffer.valid_to.is_(None),  # Seulement les offres actives (sans date de fin)
-    )
-    result = await db.execute(query)
-    previous_offers = result.scalars().all()
-
     count = 0
-    for offer in previous_offers:
-        offer.valid_to = valid_from
-        count += 1
-        logger.info(f"[CONTRIBUTION] Désactivation offre: {offer.name} (id={offer.id}) - valid_to={valid_from}")
+    for offer in context.provider_offers(provider_id):
+        # Seulement les offres actives (sans date de fin)
+        if offer.offer_type == offer_type and offer.valid_to is None:
+            offer.valid_to = valid_from
+            count += 1
+            logger.info(f"[CONTRIBUTION] Désactivation offre: {offer.name} (id={offer.id}) - valid_to={valid_from}")
 
     return count
 
@@ -71,6 +143,7 @@ async def apply_contribution_changes(
     contribution: OfferContribution,
     db: AsyncSession,
     reviewer_id: str,
+    context: ContributionContext | None = None,
 ) -> str:
     """Applique les changements d'une contribution et la marque comme approuvée.
 
@@ -81,17 +154,29 @@ async def apply_contribution_changes(
         contribution: La contribution à appliquer
         db: Session de base de données (ne fait PAS de commit)
         reviewer_id: ID de l'utilisateur qui approuve
+        context: Fournisseurs et offres préchargés (lot), chargés pour cette contribution si absent
 
     Returns:
         Message descriptif de l'action effectuée
     """
+    if context is None:
+        context = await load_contribution_context(db, [contribution])
+
     provider_id = contribution.existing_provider_id
 
     # Création de fournisseur si nécessaire
     if contribution.contribution_type == "NEW_PROVIDER" and contribution.provider_name:
-        provider = EnergyProvider(name=contribution.provider_name, website=contribution.provider_website)
-        db.add(provider)
-        await db.flush()
+        provider = context.providers_by_name.get(contribution.provider_name)
+        if provider:
+            # Fournisseur existant (ou créé par une contribution précédente du lot)
+            logger.info(f"[CONTRIBUTION] Reusing existing provider: {provider.name} (id={provider.id})")
+        else:
+            # id attribué ici : pas de flush nécessaire avant de créer les offres
+            provider = EnergyProvider(
+                id=str(uuid.uuid4()), name=contribution.provider_name, website=contribution.provider_website
+            )
+            db.add(provider)
+            context.add_provider(provider)
         provider_id = provider.id
 
     if not provider_id:
@@ -101,8 +186,8 @@ async def apply_contribution_changes(
 
     # Désactiver les offres existantes pour l'historique
     if contribution.contribution_type in ["NEW_OFFER", "NEW_PROVIDER"]:
-        deactivated_count = await deactivate_previous_offers(
-            db, provider_id, contribution.offer_type, valid_from_date
+        deactivated_count = deactivate_previous_offers(
+            context, provider_id, contribution.offer_type, valid_from_date
         )
         if deactivated_count > 0:
             logger.info(f"[CONTRIBUTION] Désactivé {deactivated_count} offres précédentes pour {provider_id}/{contribution.offer_type}")
@@ -161,6 +246,7 @@ async def apply_contribution_changes(
                     price_updated_at=datetime.now(UTC),
                 )
                 db.add(offer)
+                context.created_offers.append(offer)
             if valid_to_date:
                 logger.info(f"[CONTRIBUTION] Created historical offers: {contribution.offer_name} valid_to={valid_to_date}")
         else:
@@ -212,6 +298,7 @@ async def apply_contribution_changes(
                 price_updated_at=datetime.now(UTC),
             )
             db.add(offer)
+            context.created_offers.append(offer)
             if valid_to_date:
                 logger.info(f"[CONTRIBUTION] Created historical offer: {contribution.offer_name} valid_to={valid_to_date}")
 
@@ -219,16 +306,15 @@ async def apply_contribution_changes(
         if contribution.offer_name and "[SUPPRESSION FOURNISSEUR]" in contribution.offer_name:
             # Suppression du fournisseur et de toutes ses offres
             if contribution.existing_provider_id:
-                offers_result = await db.execute(
+                # Requête (autoflush) plutôt que le contexte : inclut les offres créées plus tôt dans le lot
+                result = await db.execute(
                     select(EnergyOffer).where(EnergyOffer.provider_id == contribution.existing_provider_id)
                 )
-                offers_to_delete = offers_result.scalars().all()
+                offers_to_delete = list(result.scalars().all())
                 for offer in offers_to_delete:
                     await db.delete(offer)
-                provider_result = await db.execute(
-                    select(EnergyProvider).where(EnergyProvider.id == contribution.existing_provider_id)
-                )
-                provider_to_delete = provider_result.scalar_one_or_none()
+                    context.deleted_offer_ids.add(offer.id)
+                provider_to_delete = context.providers_by_id.get(contribution.existing_provider_id)
                 if provider_to_delete:
                     await db.delete(provider_to_delete)
                     logger.info(
@@ -236,13 +322,22 @@ async def apply_contribution_changes(
                         f"with {len(offers_to_delete)} offers"
                     )
 
+        elif contribution.offer_name and contribution.offer_name.startswith("[RENOMMAGE]"):
+            # Renommage d'une offre : "[RENOMMAGE] Nouveau nom"
+            offer_maybe = context.offers_by_id.get(contribution.existing_offer_id or "")
+            if offer_maybe:
+                new_name = contribution.offer_name.replace("[RENOMMAGE] ", "")
+                old_name = offer_maybe.name
+                offer_maybe.name = new_name
+                offer_maybe.updated_at = datetime.now(UTC)
+                logger.info(f"[CONTRIBUTION] Renamed offer: '{old_name}' → '{new_name}'")
+            else:
+                logger.warning(f"[CONTRIBUTION] Offer not found for rename: {contribution.existing_offer_id}")
+
         elif contribution.offer_name and contribution.offer_name.startswith("[REACTIVATION]"):
             # Réactivation d'une offre expirée
             if contribution.existing_offer_id:
-                offer_result = await db.execute(
-                    select(EnergyOffer).where(EnergyOffer.id == contribution.existing_offer_id)
-                )
-                offer_maybe = offer_result.scalar_one_or_none()
+                offer_maybe = context.offers_by_id.get(contribution.existing_offer_id)
                 if offer_maybe:
                     offer_maybe.valid_to = None
                     offer_maybe.is_active = True
@@ -256,30 +351,13 @@ async def apply_contribution_changes(
             offer_to_delete = None
 
             if contribution.existing_offer_id:
-                offer_result = await db.execute(
-                    select(EnergyOffer).where(EnergyOffer.id == contribution.existing_offer_id)
-                )
-                offer_to_delete = offer_result.scalar_one_or_none()
+                offer_to_delete = context.offers_by_id.get(contribution.existing_offer_id)
 
+            # Sinon par fournisseur + type + puissance (colonne power_kva puis nom "... - X kVA")
             if not offer_to_delete and contribution.existing_provider_id and contribution.offer_type and contribution.power_kva is not None:
-                delete_query = select(EnergyOffer).where(
-                    EnergyOffer.provider_id == contribution.existing_provider_id,
-                    EnergyOffer.offer_type == contribution.offer_type,
-                    EnergyOffer.power_kva == contribution.power_kva,
+                offer_to_delete = context.find_offer(
+                    contribution.existing_provider_id, contribution.offer_type, contribution.power_kva
                 )
-                delete_result = await db.execute(delete_query)
-                offer_to_delete = delete_result.scalar_one_or_none()
-
-            if not offer_to_delete and contribution.existing_provider_id and contribution.offer_type and contribution.power_kva is not None:
-                power_pattern = f"- {contribution.power_kva} kVA"
-                all_offers_query = select(EnergyOffer).where(
-                    EnergyOffer.provider_id == contribution.existing_provider_id,
-                    EnergyOffer.offer_type == contribution.offer_type,
-                    EnergyOffer.name.ilike(f"%{power_pattern}"),
-                )
-                all_offers_result = await db.execute(all_offers_query)
-                offers_found = all_offers_result.scalars().all()
-                offer_to_delete = offers_found[0] if offers_found else None
 
             if offer_to_delete:
                 # Marquer comme expirée au lieu de supprimer (conservation de l'historique)
@@ -292,8 +370,7 @@ async def apply_contribution_changes(
 
         elif contribution.existing_offer_id:
             # Mise à jour d'une offre existante
-            offer_result = await db.execute(select(EnergyOffer).where(EnergyOffer.id == contribution.existing_offer_id))
-            offer_maybe = offer_result.scalar_one_or_none()
+            offer_maybe = context.offers_by_id.get(contribution.existing_offer_id)
 
             if offer_maybe:
                 pricing = contribution.pricing_data or {}
@@ -391,7 +468,7 @@ async def list_pricing_types() -> APIResponse:
 
 
 @router.get("/providers", response_model=APIResponse)
-async def list_providers(db: AsyncSession = Depends(get_db)) -> APIResponse:
+async def list_providers(db: AsyncSession = Depends(get_read_db)) -> APIResponse:
     """List all active energy providers"""
     result = await db.execute(select(EnergyProvider).where(EnergyProvider.is_active.is_(True)))
     providers = result.scalars().all()
@@ -413,27 +490,27 @@ async def list_providers(db: AsyncSession = Depends(get_db)) -> APIResponse:
 
 @router.get("/offers", response_model=APIResponse)
 async def list_offers(
+    request: Request,
     provider_id: str | None = Query(None, description="Filter by provider ID", openapi_examples={"provider_uuid": {"summary": "Provider UUID", "value": "550e8400-e29b-41d4-a716-446655440000"}}),
+    offer_type: str | None = Query(None, description="Filter by offer type", openapi_examples={"tempo": {"summary": "Tempo offers", "value": "TEMPO"}}),
     include_history: bool = Query(False, description="Include historical offers", openapi_examples={"with_history": {"summary": "Include history", "value": True}, "current_only": {"summary": "Current offers only", "value": False}}),
     db: AsyncSession = Depends(get_db)
-) -> APIResponse:
-    """List energy offers, optionally filtered by provider
+) -> Response:
+    """List energy offers, optionally filtered by provider and/or offer type
 
-    By default, returns only active offers valid for the current period (valid_to IS NULL or valid_to >= NOW)
+    By default, returns only active offers valid for the current period (valid_to IS NULL or valid_to >= NOW),
+    served from the cached catalogue snapshot with ETag support (If-None-Match -> 304).
     Set include_history=true to get all offers including inactive/expired ones
     """
-    query = select(EnergyOffer)
-
     if not include_history:
-        # Par défaut : uniquement les offres actives et dans leur période de validité
-        query = query.where(EnergyOffer.is_active.is_(True))
-        now = datetime.now(UTC)
-        query = query.where(
-            (EnergyOffer.valid_to.is_(None)) | (EnergyOffer.valid_to >= now)
-        )
+        return await offer_catalogue.serve(request, db, provider_id, offer_type)
+
+    query = select(EnergyOffer)
 
     if provider_id:
         query = query.where(EnergyOffer.provider_id == provider_id)
+    if offer_type:
+        query = query.where(EnergyOffer.offer_type == offer_type)
 
     # Order by valid_from DESC to show most recent first
     query = query.order_by(EnergyOffer.valid_from.desc())
@@ -441,46 +518,9 @@ async def list_offers(
     result = await db.execute(query)
     offers = result.scalars().all()
 
-    return APIResponse(
-        success=True,
-        data=[
-            {
-                "id": o.id,
-                "provider_id": o.provider_id,
-                "name": o.name,
-                "offer_type": o.offer_type,
-                "description": o.description,
-                "subscription_price": o.subscription_price,
-                "base_price": o.base_price,
-                "hc_price": o.hc_price,
-                "hp_price": o.hp_price,
-                "base_price_weekend": o.base_price_weekend,
-                "hc_price_weekend": o.hc_price_weekend,
-                "hp_price_weekend": o.hp_price_weekend,
-                "tempo_blue_hc": o.tempo_blue_hc,
-                "tempo_blue_hp": o.tempo_blue_hp,
-                "tempo_white_hc": o.tempo_white_hc,
-                "tempo_white_hp": o.tempo_white_hp,
-                "tempo_red_hc": o.tempo_red_hc,
-                "tempo_red_hp": o.tempo_red_hp,
-                "ejp_normal": o.ejp_normal,
-                "ejp_peak": o.ejp_peak,
-                "hc_price_winter": o.hc_price_winter,
-                "hp_price_winter": o.hp_price_winter,
-                "hc_price_summer": o.hc_price_summer,
-                "hp_price_summer": o.hp_price_summer,
-                "peak_day_price": o.peak_day_price,
-                "hc_schedules": o.hc_schedules,
-                "power_kva": o.power_kva,
-                "price_updated_at": o.price_updated_at.isoformat() if o.price_updated_at else None,
-                "valid_from": o.valid_from.isoformat() if o.valid_from else None,
-                "valid_to": o.valid_to.isoformat() if o.valid_to else None,
-                "offer_url": o.offer_url,
-                "is_active": o.is_active,
-                "created_at": o.created_at.isoformat() if o.created_at else None,
-            }
-            for o in offers
-        ],
+    return Response(
+        content=APIResponse(success=True, data=[serialize_offer(o) for o in offers]).model_dump_json(),
+        media_type="application/json",
     )
 
 
@@ -1219,6 +1259,7 @@ async def approve_contribution(
     try:
         await apply_contribution_changes(contribution, db, current_user.id)
         await db.commit()
+        await offer_catalogue.invalidate()
 
         return APIResponse(success=True, data={"message": "Contribution approved successfully"})
 
@@ -1275,13 +1316,82 @@ async def reject_contribution(
     return APIResponse(success=True, data={"message": "Contribution rejected"})
 
 
+async def load_pending_contributions(
+    db: AsyncSession, contribution_ids: list[str]
+) -> tuple[list[OfferContribution], dict[str, User], int]:
+    """Charge en une requête ``IN`` les contributions en attente d'un lot et leurs contributeurs.
+
+    Returns:
+        (contributions en attente dans l'ordre demandé, contributeurs par id, nombre d'ids ignorés)
+    """
+    result = await db.execute(select(OfferContribution).where(OfferContribution.id.in_(contribution_ids)))
+    contributions_by_id = {c.id: c for c in result.scalars().all()}
+
+    pending: list[OfferContribution] = []
+    skipped = 0
+    for contribution_id in dict.fromkeys(contribution_ids):
+        contribution = contributions_by_id.get(contribution_id)
+        if not contribution:
+            skipped += 1
+            logger.warning(f"[BULK] Contribution {contribution_id} not found")
+        elif contribution.status != "pending":
+            skipped += 1
+            logger.info(f"[BULK] Contribution {contribution_id} already reviewed (status: {contribution.status})")
+        else:
+            pending.append(contribution)
+
+    contributors: dict[str, User] = {}
+    contributor_ids = {c.contributor_user_id for c in pending}
+    if contributor_ids:
+        users_result = await db.execute(select(User).where(User.id.in_(contributor_ids)))
+        contributors = {user.id: user for user in users_result.scalars().all()}
+
+    return pending, contributors, skipped
+
+
+def group_by_contributor(
+    contributions: list[OfferContribution], contributors: dict[str, User]
+) -> dict[str, tuple[User, list[OfferContribution]]]:
+    """Regroupe les contributions par contributeur pour envoyer 1 email par personne"""
+    grouped: dict[str, tuple[User, list[OfferContribution]]] = {}
+    for contribution in contributions:
+        contributor = contributors.get(contribution.contributor_user_id)
+        if contributor:
+            grouped.setdefault(str(contributor.id), (contributor, []))[1].append(contribution)
+    return grouped
+
+
+async def send_bulk_notifications(
+    grouped: dict[str, tuple[User, list[OfferContribution]]], reason: str | None = None
+) -> None:
+    """Met en file les emails groupés d'un traitement en lot (services/notification_queue.py)
+
+    Sans ``reason`` : emails d'approbation, sinon emails de rejet avec le motif.
+    """
+    for contributor, contributions_list in grouped.values():
+        try:
+            if reason is None:
+                await send_batch_approval_notification(contributions_list, contributor)
+            elif len(contributions_list) == 1:
+                await send_rejection_notification(contributions_list[0], contributor, reason)
+            else:
+                await send_batch_rejection_notification(contributions_list, contributor, reason)
+        except Exception as e:
+            logger.error(f"[BULK] Failed to send notification to {contributor.email}: {str(e)}")
+
+
 @router.post("/contributions/bulk-approve", response_model=APIResponse)
 async def bulk_approve_contributions(
     body: dict = Body(...),
     current_user: User = Depends(require_permission('contributions')),
     db: AsyncSession = Depends(get_db)
 ) -> APIResponse:
-    """Approve multiple contributions in bulk (requires contributions permission)"""
+    """Approve multiple contributions in bulk (requires contributions permission)
+
+    Contributions, contributors, providers and offers are preloaded with a few ``IN`` queries,
+    changes are applied in memory and written in a single transaction. Notification emails
+    are queued for the notification workers.
+    """
     contribution_ids = body.get("contribution_ids", [])
 
     if not contribution_ids:
@@ -1290,275 +1400,23 @@ async def bulk_approve_contributions(
     if not isinstance(contribution_ids, list):
         return APIResponse(success=False, error=ErrorDetail(code="INVALID_TYPE", message="contribution_ids must be an array"))
 
-    processed = 0
-    skipped = 0
+    pending, contributors, skipped = await load_pending_contributions(db, contribution_ids)
+    context = await load_contribution_context(db, pending)
+
     errors = []
-    email_errors = []
-    # Regrouper les contributions approuvées par contributeur pour envoyer 1 email par personne
-    approved_by_contributor: dict[str, tuple[User, list[OfferContribution]]] = {}
+    approved: list[OfferContribution] = []
 
-    for contribution_id in contribution_ids:
+    for contribution in pending:
         try:
-            result = await db.execute(select(OfferContribution).where(OfferContribution.id == contribution_id))
-            contribution = result.scalar_one_or_none()
-
-            if not contribution:
-                skipped += 1
-                logger.warning(f"[BULK APPROVE] Contribution {contribution_id} not found")
-                continue
-
-            if contribution.status != "pending":
-                skipped += 1
-                logger.info(f"[BULK APPROVE] Contribution {contribution_id} already reviewed (status: {contribution.status})")
-                continue
-
-            # Handle provider creation if needed
-            provider_id = contribution.existing_provider_id
-
-            if contribution.contribution_type == "NEW_PROVIDER" and contribution.provider_name:
-                # Check if provider already exists (may have been created by a previous contribution in this batch)
-                existing_provider_result = await db.execute(
-                    select(EnergyProvider).where(EnergyProvider.name == contribution.provider_name)
-                )
-                existing_provider = existing_provider_result.scalar_one_or_none()
-
-                if existing_provider:
-                    # Reuse existing provider
-                    provider_id = existing_provider.id
-                    logger.info(f"[BULK APPROVE] Reusing existing provider: {contribution.provider_name} (id={provider_id})")
-                else:
-                    # Create new provider
-                    provider = EnergyProvider(name=contribution.provider_name, website=contribution.provider_website)
-                    db.add(provider)
-                    await db.flush()
-                    provider_id = provider.id
-                    logger.info(f"[BULK APPROVE] Created new provider: {contribution.provider_name} (id={provider_id})")
-
-            if not provider_id:
-                skipped += 1
-                logger.warning(f"[BULK APPROVE] Contribution {contribution_id} has no provider_id")
-                continue
-
-            # Create or update offer
-            pricing = contribution.pricing_data
-
-            if contribution.contribution_type in ["NEW_OFFER", "NEW_PROVIDER"]:
-                # Create new offer
-                valid_from_date = contribution.valid_from or datetime.now(UTC)
-
-                # Extraire valid_to de pricing_data si présent (offres historiques)
-                valid_to_date = None
-                valid_to_raw = pricing.pop("valid_to", None) if pricing else None
-                if valid_to_raw:
-                    try:
-                        if isinstance(valid_to_raw, str):
-                            valid_to_date = datetime.fromisoformat(valid_to_raw.replace("Z", "+00:00"))
-                            if valid_to_date.tzinfo is None:
-                                valid_to_date = valid_to_date.replace(tzinfo=UTC)
-                    except (ValueError, TypeError):
-                        logger.warning(f"[BULK APPROVE] Invalid valid_to format: {valid_to_raw}")
-
-                offer = EnergyOffer(
-                    provider_id=provider_id,
-                    name=contribution.offer_name,
-                    offer_type=contribution.offer_type,
-                    description=contribution.description,
-                    subscription_price=pricing.get("subscription_price", 0),
-                    base_price=pricing.get("base_price"),
-                    hc_price=pricing.get("hc_price"),
-                    hp_price=pricing.get("hp_price"),
-                    base_price_weekend=pricing.get("base_price_weekend"),
-                    hc_price_weekend=pricing.get("hc_price_weekend"),
-                    hp_price_weekend=pricing.get("hp_price_weekend"),
-                    tempo_blue_hc=pricing.get("tempo_blue_hc"),
-                    tempo_blue_hp=pricing.get("tempo_blue_hp"),
-                    tempo_white_hc=pricing.get("tempo_white_hc"),
-                    tempo_white_hp=pricing.get("tempo_white_hp"),
-                    tempo_red_hc=pricing.get("tempo_red_hc"),
-                    tempo_red_hp=pricing.get("tempo_red_hp"),
-                    ejp_normal=pricing.get("ejp_normal"),
-                    ejp_peak=pricing.get("ejp_peak"),
-                    hc_price_winter=pricing.get("hc_price_winter"),
-                    hp_price_winter=pricing.get("hp_price_winter"),
-                    hc_price_summer=pricing.get("hc_price_summer"),
-                    hp_price_summer=pricing.get("hp_price_summer"),
-                    peak_day_price=pricing.get("peak_day_price"),
-                    hc_schedules=contribution.hc_schedules,
-                    power_kva=contribution.power_kva,
-                    valid_from=valid_from_date,
-                    valid_to=valid_to_date,
-                    offer_url=contribution.price_sheet_url,
-                    price_updated_at=datetime.now(UTC),
-                )
-                db.add(offer)
-                if valid_to_date:
-                    logger.info(f"[BULK APPROVE] Created historical offer: {contribution.offer_name} valid_to={valid_to_date}")
-
-            elif contribution.contribution_type == "UPDATE_OFFER":
-                # Check if this is a provider deletion request (offer_name contains [SUPPRESSION FOURNISSEUR])
-                if contribution.offer_name and "[SUPPRESSION FOURNISSEUR]" in contribution.offer_name:
-                    # Delete provider and all its offers
-                    if contribution.existing_provider_id:
-                        # First delete all offers for this provider
-                        offers_result = await db.execute(
-                            select(EnergyOffer).where(EnergyOffer.provider_id == contribution.existing_provider_id)
-                        )
-                        offers_to_delete = offers_result.scalars().all()
-
-                        for offer in offers_to_delete:
-                            await db.delete(offer)
-
-                        # Then delete the provider
-                        provider_result = await db.execute(
-                            select(EnergyProvider).where(EnergyProvider.id == contribution.existing_provider_id)
-                        )
-                        provider_to_delete = provider_result.scalar_one_or_none()
-
-                        if provider_to_delete:
-                            await db.delete(provider_to_delete)
-                            logger.info(
-                                f"[BULK APPROVE] Deleted provider: {provider_to_delete.name} (id={contribution.existing_provider_id}), "
-                                f"with {len(offers_to_delete)} offers"
-                            )
-                        else:
-                            logger.warning(
-                                f"[BULK APPROVE] Provider to delete not found: id={contribution.existing_provider_id}"
-                            )
-                # Check if this is a rename request (offer_name starts with [RENOMMAGE])
-                elif contribution.offer_name and contribution.offer_name.startswith("[RENOMMAGE]"):
-                    if contribution.existing_offer_id:
-                        offer_result = await db.execute(select(EnergyOffer).where(EnergyOffer.id == contribution.existing_offer_id))
-                        offer_maybe = offer_result.scalar_one_or_none()
-
-                        if offer_maybe:
-                            # Extract new name from "[RENOMMAGE] NewName"
-                            new_name = contribution.offer_name.replace("[RENOMMAGE] ", "")
-                            old_name = offer_maybe.name
-                            offer_maybe.name = new_name
-                            offer_maybe.updated_at = datetime.now(UTC)
-                            logger.info(f"[BULK APPROVE] Renamed offer: '{old_name}' → '{new_name}'")
-                        else:
-                            logger.warning(f"[BULK APPROVE] Offer not found for rename: {contribution.existing_offer_id}")
-
-                # Check if this is a reactivation request (offer_name starts with [REACTIVATION])
-                elif contribution.offer_name and contribution.offer_name.startswith("[REACTIVATION]"):
-                    if contribution.existing_offer_id:
-                        offer_result = await db.execute(select(EnergyOffer).where(EnergyOffer.id == contribution.existing_offer_id))
-                        offer_maybe = offer_result.scalar_one_or_none()
-
-                        if offer_maybe:
-                            offer_maybe.valid_to = None
-                            offer_maybe.is_active = True
-                            offer_maybe.updated_at = datetime.now(UTC)
-                            logger.info(
-                                f"[BULK APPROVE] Reactivated offer: {offer_maybe.name} (id={offer_maybe.id})"
-                            )
-                        else:
-                            logger.warning(f"[BULK APPROVE] Offer not found for reactivation: {contribution.existing_offer_id}")
-
-                # Check if this is a deletion request (offer_name starts with [SUPPRESSION])
-                elif contribution.offer_name and contribution.offer_name.startswith("[SUPPRESSION]"):
-                    offer_to_delete = None
-
-                    # Méthode 1 : chercher par existing_offer_id (le plus fiable)
-                    if contribution.existing_offer_id:
-                        offer_result = await db.execute(
-                            select(EnergyOffer).where(EnergyOffer.id == contribution.existing_offer_id)
-                        )
-                        offer_to_delete = offer_result.scalar_one_or_none()
-
-                    # Méthode 2 : chercher par provider_id + offer_type + power_kva
-                    if not offer_to_delete and contribution.existing_provider_id and contribution.offer_type and contribution.power_kva is not None:
-                        delete_query = select(EnergyOffer).where(
-                            EnergyOffer.provider_id == contribution.existing_provider_id,
-                            EnergyOffer.offer_type == contribution.offer_type,
-                            EnergyOffer.power_kva == contribution.power_kva
-                        )
-                        delete_result = await db.execute(delete_query)
-                        offer_to_delete = delete_result.scalar_one_or_none()
-
-                    # Méthode 3 : chercher par pattern de nom
-                    if not offer_to_delete and contribution.existing_provider_id and contribution.offer_type and contribution.power_kva is not None:
-                        power_pattern = f"- {contribution.power_kva} kVA"
-                        all_offers_query = select(EnergyOffer).where(
-                            EnergyOffer.provider_id == contribution.existing_provider_id,
-                            EnergyOffer.offer_type == contribution.offer_type,
-                            EnergyOffer.name.ilike(f"%{power_pattern}")
-                        )
-                        all_offers_result = await db.execute(all_offers_query)
-                        offers_found = all_offers_result.scalars().all()
-                        offer_to_delete = offers_found[0] if offers_found else None
-
-                    if offer_to_delete:
-                        # Marquer comme expirée au lieu de supprimer (conservation de l'historique)
-                        offer_to_delete.valid_to = datetime.now(UTC)
-                        offer_to_delete.updated_at = datetime.now(UTC)
-                        logger.info(
-                            f"[BULK APPROVE] Désactivation offre (suppression): {offer_to_delete.name} (id={offer_to_delete.id}) "
-                            f"- valid_to={offer_to_delete.valid_to}"
-                        )
-                    else:
-                        logger.warning(
-                            f"[BULK APPROVE] Offer not found for deletion: provider={contribution.existing_provider_id}, "
-                            f"type={contribution.offer_type}, power={contribution.power_kva} kVA, "
-                            f"existing_offer_id={contribution.existing_offer_id}"
-                        )
-                elif contribution.existing_offer_id:
-                    # Update existing offer
-                    offer_result = await db.execute(select(EnergyOffer).where(EnergyOffer.id == contribution.existing_offer_id))
-                    offer_maybe = offer_result.scalar_one_or_none()
-
-                    if offer_maybe:
-                        offer = offer_maybe
-                        offer.name = contribution.offer_name
-                        offer.offer_type = contribution.offer_type
-                        offer.description = contribution.description
-                        offer.subscription_price = pricing.get("subscription_price", 0)
-                        offer.base_price = pricing.get("base_price")
-                        offer.hc_price = pricing.get("hc_price")
-                        offer.hp_price = pricing.get("hp_price")
-                        offer.tempo_blue_hc = pricing.get("tempo_blue_hc")
-                        offer.tempo_blue_hp = pricing.get("tempo_blue_hp")
-                        offer.tempo_white_hc = pricing.get("tempo_white_hc")
-                        offer.tempo_white_hp = pricing.get("tempo_white_hp")
-                        offer.tempo_red_hc = pricing.get("tempo_red_hc")
-                        offer.tempo_red_hp = pricing.get("tempo_red_hp")
-                        offer.ejp_normal = pricing.get("ejp_normal")
-                        offer.ejp_peak = pricing.get("ejp_peak")
-                        offer.base_price_weekend = pricing.get("base_price_weekend")
-                        offer.hc_price_weekend = pricing.get("hc_price_weekend")
-                        offer.hp_price_weekend = pricing.get("hp_price_weekend")
-                        offer.hc_price_winter = pricing.get("hc_price_winter")
-                        offer.hp_price_winter = pricing.get("hp_price_winter")
-                        offer.hc_price_summer = pricing.get("hc_price_summer")
-                        offer.hp_price_summer = pricing.get("hp_price_summer")
-                        offer.peak_day_price = pricing.get("peak_day_price")
-                        offer.hc_schedules = contribution.hc_schedules
-                        if contribution.valid_from:
-                            offer.valid_from = contribution.valid_from
-                        offer.updated_at = datetime.now(UTC)
-
-            # Mark contribution as approved
-            contribution.status = "approved"
-            contribution.reviewed_by = current_user.id
-            contribution.reviewed_at = datetime.now(UTC)
-
-            processed += 1
-
-            # Collecter pour envoi groupé
-            contributor_result = await db.execute(select(User).where(User.id == contribution.contributor_user_id))
-            contributor = contributor_result.scalar_one_or_none()
-            if contributor:
-                user_id = str(contributor.id)
-                if user_id not in approved_by_contributor:
-                    approved_by_contributor[user_id] = (contributor, [])
-                approved_by_contributor[user_id][1].append(contribution)
-
+            await apply_contribution_changes(contribution, db, current_user.id, context)
+            approved.append(contribution)
+        except ValueError as e:
+            skipped += 1
+            logger.warning(f"[BULK APPROVE] Contribution {contribution.id} skipped: {str(e)}")
         except Exception as e:
-            logger.error(f"[BULK APPROVE] Error processing contribution {contribution_id}: {str(e)}")
-            errors.append({"contribution_id": contribution_id, "error": str(e)})
+            logger.error(f"[BULK APPROVE] Error processing contribution {contribution.id}: {str(e)}")
+            errors.append({"contribution_id": contribution.id, "error": str(e)})
             skipped += 1
-            continue
 
     try:
         await db.commit()
@@ -1567,13 +1425,12 @@ async def bulk_approve_contributions(
         logger.error(f"[BULK APPROVE] Commit failed: {str(e)}")
         return APIResponse(success=False, error=ErrorDetail(code="DATABASE_ERROR", message=f"Failed to commit changes: {str(e)}"))
 
-    # Envoyer un seul email groupé par contributeur (après le commit)
-    for user_id, (contributor, contributions_list) in approved_by_contributor.items():
-        try:
-            await send_batch_approval_notification(contributions_list, contributor)
-        except Exception as e:
-            logger.error(f"[BULK APPROVE] Failed to send approval notification to {contributor.email}: {str(e)}")
-            email_errors.append({"email": contributor.email, "count": len(contributions_list), "error": str(e)})
+    processed = len(approved)
+    if processed:
+        await offer_catalogue.invalidate()
+
+    # Un seul email groupé par contributeur (après le commit, mis en file)
+    await send_bulk_notifications(group_by_contributor(approved, contributors))
 
     message = f"{processed} contributions traitées"
     if skipped > 0:
@@ -1588,7 +1445,7 @@ async def bulk_approve_contributions(
             "skipped": skipped,
             "message": message,
             "errors": errors if errors else None,
-            "email_errors": email_errors if email_errors else None,
+            "email_errors": None,
         }
     )
 
@@ -1599,7 +1456,11 @@ async def bulk_reject_contributions(
     current_user: User = Depends(require_permission('contributions')),
     db: AsyncSession = Depends(get_db)
 ) -> APIResponse:
-    """Reject multiple contributions in bulk (requires contributions permission)"""
+    """Reject multiple contributions in bulk (requires contributions permission)
+
+    A single set-based UPDATE marks the pending contributions as rejected; notification
+    emails are queued for the notification workers.
+    """
     contribution_ids = body.get("contribution_ids", [])
     reason = body.get("reason", "")
 
@@ -1612,68 +1473,39 @@ async def bulk_reject_contributions(
     if not reason:
         return APIResponse(success=False, error=ErrorDetail(code="MISSING_FIELD", message="reason is required"))
 
-    processed = 0
-    skipped = 0
-    email_errors = []
-    # Regrouper les contributions rejetées par contributeur pour envoyer 1 email par personne
-    rejected_by_contributor: dict[str, tuple[User, list[OfferContribution]]] = {}
-
-    for contribution_id in contribution_ids:
-        try:
-            result = await db.execute(select(OfferContribution).where(OfferContribution.id == contribution_id))
-            contribution = result.scalar_one_or_none()
-
-            if not contribution:
-                skipped += 1
-                logger.warning(f"[BULK REJECT] Contribution {contribution_id} not found")
-                continue
-
-            if contribution.status != "pending":
-                skipped += 1
-                logger.info(f"[BULK REJECT] Contribution {contribution_id} already reviewed (status: {contribution.status})")
-                continue
-
-            # Get the contributor to send them an email
-            contributor_result = await db.execute(select(User).where(User.id == contribution.contributor_user_id))
-            contributor = contributor_result.scalar_one_or_none()
-
-            # Mark contribution as rejected
-            contribution.status = "rejected"
-            contribution.reviewed_by = current_user.id
-            contribution.reviewed_at = datetime.now(UTC)
-            contribution.review_comment = reason
-
-            processed += 1
-
-            # Collecter pour envoi groupé
-            if contributor:
-                user_id = str(contributor.id)
-                if user_id not in rejected_by_contributor:
-                    rejected_by_contributor[user_id] = (contributor, [])
-                rejected_by_contributor[user_id][1].append(contribution)
-
-        except Exception as e:
-            logger.error(f"[BULK REJECT] Error processing contribution {contribution_id}: {str(e)}")
-            skipped += 1
-            continue
+    pending, contributors, skipped = await load_pending_contributions(db, contribution_ids)
+    reviewed_at = datetime.now(UTC)
+    rejected_ids: set[str] = set()
 
     try:
+        if pending:
+            # status == "pending" re-vérifié : une revue concurrente n'est pas écrasée
+            result = await db.execute(
+                update(OfferContribution)
+                .where(OfferContribution.id.in_([c.id for c in pending]), OfferContribution.status == "pending")
+                .values(status="rejected", reviewed_by=current_user.id, reviewed_at=reviewed_at, review_comment=reason)
+                .returning(OfferContribution.id)
+                .execution_options(synchronize_session=False)
+            )
+            rejected_ids = set(result.scalars().all())
         await db.commit()
     except Exception as e:
         await db.rollback()
         logger.error(f"[BULK REJECT] Commit failed: {str(e)}")
         return APIResponse(success=False, error=ErrorDetail(code="DATABASE_ERROR", message=f"Failed to commit changes: {str(e)}"))
 
-    # Envoyer un seul email groupé par contributeur (après le commit)
-    for user_id, (contributor, contributions_list) in rejected_by_contributor.items():
-        try:
-            if len(contributions_list) == 1:
-                await send_rejection_notification(contributions_list[0], contributor, reason)
-            else:
-                await send_batch_rejection_notification(contributions_list, contributor, reason)
-        except Exception as e:
-            logger.error(f"[BULK REJECT] Failed to send rejection notification to {contributor.email}: {str(e)}")
-            email_errors.append({"email": contributor.email, "count": len(contributions_list), "error": str(e)})
+    rejected = [c for c in pending if c.id in rejected_ids]
+    for contribution in rejected:
+        contribution.status = "rejected"
+        contribution.reviewed_by = current_user.id
+        contribution.reviewed_at = reviewed_at
+        contribution.review_comment = reason
+
+    processed = len(rejected)
+    skipped += len(pending) - processed
+
+    # Un seul email groupé par contributeur (après le commit, mis en file)
+    await send_bulk_notifications(group_by_contributor(rejected, contributors), reason)
 
     message = f"{processed} contributions traitées"
     if skipped > 0:
@@ -1687,7 +1519,7 @@ async def bulk_reject_contributions(
             "processed": processed,
             "skipped": skipped,
             "message": message,
-            "email_errors": email_errors if email_errors else None,
+            "email_errors": None,
         }
     )
 
@@ -1857,6 +1689,7 @@ async def update_offer(
 
         await db.commit()
         await db.refresh(offer)
+        await offer_catalogue.invalidate()
 
         return APIResponse(success=True, data={"message": "Offer updated successfully", "offer_id": offer.id})
 
@@ -1884,6 +1717,7 @@ async def delete_offer(
     try:
         await db.delete(offer)
         await db.commit()
+        await offer_catalogue.invalidate()
 
         return APIResponse(success=True, data={"message": "Offer deleted successfully"})
 
@@ -2009,6 +1843,7 @@ async def delete_provider(
         # Then delete the provider
         await db.delete(provider)
         await db.commit()
+        await offer_catalogue.invalidate()
 
         return APIResponse(
             success=True,
@@ -2102,7 +1937,10 @@ MyElectricalData
     # Send to all admins
     for admin_email in admin_emails:
         try:
-            await email_service.send_email(admin_email, subject, html_content, text_content)
+            await email_service.send_email(
+                admin_email, subject, html_content, text_content,
+                digest="contribution_submitted", digest_subject=CONTRIBUTIONS_SUBMITTED_DIGEST_SUBJECT,
+            )
             logger.info(f"[CONTRIBUTION] Notification sent to admin: {admin_email}")
         except Exception as e:
             logger.error(f"[CONTRIBUTION] Failed to send email to {admin_email}: {str(e)}")
@@ -2209,7 +2047,10 @@ MyElectricalData
 
     for admin_email in admin_emails:
         try:
-            await email_service.send_email(admin_email, subject, html_content, text_content)
+            await email_service.send_email(
+                admin_email, subject, html_content, text_content,
+                digest="contribution_submitted", digest_subject=CONTRIBUTIONS_SUBMITTED_DIGEST_SUBJECT,
+            )
             logger.info(f"[CONTRIBUTION] Notification batch envoyée à : {admin_email}")
         except Exception as e:
             logger.error(f"[CONTRIBUTION] Erreur envoi batch à {admin_email}: {str(e)}")
@@ -2295,7 +2136,10 @@ MyElectricalData - Base de données communautaire des offres d'électricité
     """
 
     try:
-        await email_service.send_email(contributor.email, subject, html_content, text_content)
+        await email_service.send_email(
+            contributor.email, subject, html_content, text_content,
+            digest="contribution_reviewed", digest_subject=CONTRIBUTIONS_REVIEWED_DIGEST_SUBJECT,
+        )
         logger.info(f"[CONTRIBUTION] Rejection notification sent to contributor: {contributor.email}")
     except Exception as e:
         logger.error(f"[CONTRIBUTION] Failed to send rejection email to {contributor.email}: {str(e)}")
@@ -2402,7 +2246,10 @@ MyElectricalData - Base de données communautaire des offres d'électricité
     """
 
     try:
-        await email_service.send_email(contributor.email, subject, html_content, text_content)
+        await email_service.send_email(
+            contributor.email, subject, html_content, text_content,
+            digest="contribution_reviewed", digest_subject=CONTRIBUTIONS_REVIEWED_DIGEST_SUBJECT,
+        )
         logger.info(f"[CONTRIBUTION] Batch rejection notification ({total} contributions) sent to: {contributor.email}")
     except Exception as e:
         logger.error(f"[CONTRIBUTION] Failed to send batch rejection email to {contributor.email}: {str(e)}")
@@ -2506,7 +2353,10 @@ MyElectricalData - Base de données communautaire des offres d'électricité
     """
 
     try:
-        await email_service.send_email(contributor.email, subject, html_content, text_content)
+        await email_service.send_email(
+            contributor.email, subject, html_content, text_content,
+            digest="contribution_reviewed", digest_subject=CONTRIBUTIONS_REVIEWED_DIGEST_SUBJECT,
+        )
         logger.info(f"[CONTRIBUTION] Batch approval notification ({total} contributions) sent to: {contributor.email}")
     except Exception as e:
         logger.error(f"[CONTRIBUTION] Failed to send batch approval email to {contributor.email}: {str(e)}")
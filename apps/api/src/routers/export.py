@@ -17,10 +17,11 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from ..models.client_mode import ExportConfig, ExportType
 from ..models.database import get_db
+from ..utils.responses import APIResponseRoute
 
 logger = logging.getLogger(__name__)
 
-router = APIRouter(prefix="/export", tags=["export"])
+router = APIRouter(prefix="/export", tags=["export"], route_class=APIResponseRoute)
 
 
 # =============================================================================
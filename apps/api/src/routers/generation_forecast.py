@@ -7,24 +7,27 @@ Supports both server mode (direct RTE API) and client mode (via gateway).
 import logging
 from datetime import UTC, datetime, timedelta
 
-from fastapi import APIRouter, Depends, Query
+from fastapi import APIRouter, Depends, Query, Request, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from ..config import settings
 from ..middleware import require_action
 from ..models import User
-from ..models.database import get_db
+from ..models.database import get_db, get_read_db
 from ..schemas import APIResponse, ErrorDetail
+from ..services.response_cache import response_cache
 from ..services.rte import rte_service
+from ..utils.responses import APIResponseRoute
 
 logger = logging.getLogger(__name__)
 
-router = APIRouter(prefix="/generation-forecast", tags=["Generation Forecast"])
+router = APIRouter(prefix="/generation-forecast", tags=["Generation Forecast"], route_class=APIResponseRoute)
 
 
 @router.get("", response_model=APIResponse)
 @router.get("/", response_model=APIResponse, include_in_schema=False)
 async def get_generation_forecast(
+    request: Request,
     production_type: str | None = Query(
         None,
         description="Type de production (SOLAR, WIND)",
@@ -56,8 +59,15 @@ async def get_generation_forecast(
             "in_3_days": {"summary": "Dans 3 jours", "value": "2024-01-18"},
         },
     ),
+    since: str | None = Query(
+        None,
+        description="Delta sync: only rows updated after this instant (ISO 8601, exclusive)",
+        openapi_examples={
+            "last_sync": {"summary": "Last sync watermark", "value": "2024-10-01T06:00:00+00:00"},
+        },
+    ),
     db: AsyncSession = Depends(get_db),
-) -> APIResponse:
+) -> Response:
     """
     Récupérer les prévisions de production électrique par filière.
 
@@ -74,6 +84,18 @@ async def get_generation_forecast(
 
     Les données sont en MW.
     """
+    return await response_cache.serve(request, "generation_forecast", lambda: _build_generation_forecast(production_type, forecast_type, start_date, end_date, since, db))
+
+
+async def _build_generation_forecast(
+    production_type: str | None,
+    forecast_type: str | None,
+    start_date: str | None,
+    end_date: str | None,
+    since: str | None,
+    db: AsyncSession,
+) -> APIResponse:
+    """Build the generation forecast response (cached by get_generation_forecast)"""
     try:
         # Parser les dates si fournies
         start_dt = None
@@ -95,6 +117,12 @@ async def get_generation_forecast(
         if not end_dt:
             end_dt = start_dt + timedelta(days=3)
 
+        updated_since = None
+        if since:
+            updated_since = datetime.fromisoformat(since.replace("Z", "+00:00"))
+            if updated_since.tzinfo is None:
+                updated_since = updated_since.replace(tzinfo=UTC)
+
         # Récupérer les données depuis le cache
         forecast_data = await rte_service.get_generation_forecast(
             db,
@@ -102,6 +130,7 @@ async def get_generation_forecast(
             forecast_type=forecast_type,
             start_date=start_dt,
             end_date=end_dt,
+            updated_since=updated_since,
         )
 
         # Grouper par production_type et forecast_type
@@ -118,6 +147,7 @@ async def get_generation_forecast(
                     "end_date": record.end_date.isoformat() if record.end_date else None,
                     "value": record.value,
                     "updated_date": record.updated_date.isoformat() if record.updated_date else None,
+                    "updated_at": record.updated_at.isoformat() if record.updated_at else None,
                 }
             )
 
@@ -159,7 +189,7 @@ async def get_solar_forecast(
         le=7,
         description="Nombre de jours de prévision (1-7)",
     ),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ) -> APIResponse:
     """
     Récupérer les prévisions de production solaire.
@@ -188,6 +218,7 @@ async def get_solar_forecast(
                     "end_date": record.end_date.isoformat() if record.end_date else None,
                     "value": record.value,
                     "updated_date": record.updated_date.isoformat() if record.updated_date else None,
+                    "updated_at": record.updated_at.isoformat() if record.updated_at else None,
                 }
             )
 
@@ -222,7 +253,7 @@ async def get_wind_forecast(
         le=7,
         description="Nombre de jours de prévision (1-7)",
     ),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ) -> APIResponse:
     """
     Récupérer les prévisions de production éolienne.
@@ -251,6 +282,7 @@ async def get_wind_forecast(
                     "end_date": record.end_date.isoformat() if record.end_date else None,
                     "value": record.value,
                     "updated_date": record.updated_date.isoformat() if record.updated_date else None,
+                    "updated_at": record.updated_at.isoformat() if record.updated_at else None,
                 }
             )
 
@@ -287,7 +319,7 @@ async def get_renewable_mix(
             "d-1": {"summary": "Prévision J-1", "value": "D-1"},
         },
     ),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ) -> APIResponse:
     """
     Récupérer le mix renouvelable prévu (solaire + éolien).
@@ -9,10 +9,11 @@ from fastapi import APIRouter, Depends, Query
 from ..middleware import require_permission
 from ..models import User
 from ..schemas import APIResponse
+from ..utils.responses import APIResponseRoute
 
 logger = logging.getLogger(__name__)
 
-router = APIRouter(prefix="/admin", tags=["Admin"])
+router = APIRouter(prefix="/admin", tags=["Admin"], route_class=APIResponseRoute)
 
 LOG_FILE = Path("/logs/app.log")
 
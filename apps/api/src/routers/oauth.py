@@ -16,10 +16,11 @@ from ..models import PDL, Token, User
 from ..models.database import get_db
 from ..schemas import APIResponse, ErrorDetail
 from ..services.cache import cache_service
+from ..utils.responses import APIResponseRoute
 
 logger = logging.getLogger(__name__)
 
-router = APIRouter(prefix="/oauth", tags=["OAuth"])
+router = APIRouter(prefix="/oauth", tags=["OAuth"], route_class=APIResponseRoute)
 
 # TTL for OAuth state mapping (10 minutes)
 OAUTH_STATE_TTL = 600
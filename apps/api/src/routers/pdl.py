@@ -10,6 +10,8 @@ from ..schemas.requests import AdminPDLCreate
 from ..middleware import get_current_user, require_permission, require_not_demo
 from ..routers.enedis import get_valid_token
 from ..adapters import enedis_adapter
+from ..services.offpeak import format_ranges
+from ..utils.responses import APIResponseRoute
 import logging
 
 
@@ -28,7 +30,7 @@ def log_with_pdl(level: str, pdl: str, message: str) -> None:
     elif level == "debug":
         logger.debug(prefixed_message)
 
-router = APIRouter(prefix="/pdl", tags=["PDL Management"])
+router = APIRouter(prefix="/pdl", tags=["PDL Management"], route_class=APIResponseRoute)
 
 
 class PDLUpdateContract(BaseModel):
@@ -174,56 +176,7 @@ async def create_pdl(
 
                             # Parse offpeak hours - format: "HC (22H00-6H00)" or "HC (22H00-6H00;12h00-14h00)"
                             # Convert Enedis format to array of "HH:MM-HH:MM" strings
-                            parsed_ranges = []
-
-                            if isinstance(offpeak, str):
-                                import re
-                                # Extract content inside parentheses after "HC"
-                                match = re.search(r'HC\s*\(([^)]+)\)', offpeak, flags=re.IGNORECASE)
-                                if match:
-                                    content = match.group(1)
-                                    # Split by semicolon to get multiple ranges
-                                    ranges = content.split(';')
-
-                                    for range_str in ranges:
-                                        range_str = range_str.strip()
-                                        # Match format like "22H00-6H00" or "12h00-14h00"
-                                        range_match = re.search(r'(\d{1,2})[hH](\d{2})\s*-\s*(\d{1,2})[hH](\d{2})', range_str)
-                                        if range_match:
-                                            start_h = range_match.group(1).zfill(2)
-                                            start_m = range_match.group(2)
-                                            end_h = range_match.group(3).zfill(2)
-                                            end_m = range_match.group(4)
-                                            parsed_ranges.append(f"{start_h}:{start_m}-{end_h}:{end_m}")
-
-                            elif isinstance(offpeak, dict):
-                                # Legacy dict format - convert values to array
-                                import re
-                                for value in offpeak.values():
-                                    if isinstance(value, str):
-                                        # Try new format with parentheses
-                                        match = re.search(r'HC\s*\(([^)]+)\)', value, flags=re.IGNORECASE)
-                                        if match:
-                                            content = match.group(1)
-                                            ranges = content.split(';')
-                                            for range_str in ranges:
-                                                range_str = range_str.strip()
-                                                range_match = re.search(r'(\d{1,2})[hH](\d{2})\s*-\s*(\d{1,2})[hH](\d{2})', range_str)
-                                                if range_match:
-                                                    start_h = range_match.group(1).zfill(2)
-                                                    start_m = range_match.group(2)
-                                                    end_h = range_match.group(3).zfill(2)
-                                                    end_m = range_match.group(4)
-                                                    parsed_ranges.append(f"{start_h}:{start_m}-{end_h}:{end_m}")
-                                        else:
-                                            # Try old format without parentheses
-                                            range_match = re.search(r'(\d{1,2})[h:](\d{2})\s*-\s*(\d{1,2})[h:](\d{2})', value)
-                                            if range_match:
-                                                start_h = range_match.group(1).zfill(2)
-                                                start_m = range_match.group(2)
-                                                end_h = range_match.group(3).zfill(2)
-                                                end_m = range_match.group(4)
-                                                parsed_ranges.append(f"{start_h}:{start_m}-{end_h}:{end_m}")
+                            parsed_ranges = format_ranges(offpeak) if isinstance(offpeak, (str, dict)) else []
 
                             if parsed_ranges:
                                 pdl.offpeak_hours = {"ranges": parsed_ranges}  # type: ignore
@@ -906,56 +859,7 @@ async def fetch_contract_from_enedis(
 
                         # Parse offpeak hours - format: "HC (22H00-6H00)" or "HC (22H00-6H00;12h00-14h00)"
                         # Convert Enedis format to array of "HH:MM-HH:MM" strings
-                        parsed_ranges = []
-
-                        if isinstance(offpeak, str):
-                            import re
-                            # Extract content inside parentheses after "HC"
-                            match = re.search(r'HC\s*\(([^)]+)\)', offpeak, flags=re.IGNORECASE)
-                            if match:
-                                content = match.group(1)
-                                # Split by semicolon to get multiple ranges
-                                ranges = content.split(';')
-
-                                for range_str in ranges:
-                                    range_str = range_str.strip()
-                                    # Match format like "22H00-6H00" or "12h00-14h00"
-                                    range_match = re.search(r'(\d{1,2})[hH](\d{2})\s*-\s*(\d{1,2})[hH](\d{2})', range_str)
-                                    if range_match:
-                                        start_h = range_match.group(1).zfill(2)
-                                        start_m = range_match.group(2)
-                                        end_h = range_match.group(3).zfill(2)
-                                        end_m = range_match.group(4)
-                                        parsed_ranges.append(f"{start_h}:{start_m}-{end_h}:{end_m}")
-
-                        elif isinstance(offpeak, dict):
-                            # Legacy dict format - convert values to array
-                            import re
-                            for value in offpeak.values():
-                                if isinstance(value, str):
-                                    # Try new format with parentheses
-                                    match = re.search(r'HC\s*\(([^)]+)\)', value, flags=re.IGNORECASE)
-                                    if match:
-                                        content = match.group(1)
-                                        ranges = content.split(';')
-                                        for range_str in ranges:
-                                            range_str = range_str.strip()
-                                            range_match = re.search(r'(\d{1,2})[hH](\d{2})\s*-\s*(\d{1,2})[hH](\d{2})', range_str)
-                                            if range_match:
-                                                start_h = range_match.group(1).zfill(2)
-                                                start_m = range_match.group(2)
-                                                end_h = range_match.group(3).zfill(2)
-                                                end_m = range_match.group(4)
-                                                parsed_ranges.append(f"{start_h}:{start_m}-{end_h}:{end_m}")
-                                    else:
-                                        # Try old format without parentheses
-                                        range_match = re.search(r'(\d{1,2})[h:](\d{2})\s*-\s*(\d{1,2})[h:](\d{2})', value)
-                                        if range_match:
-                                            start_h = range_match.group(1).zfill(2)
-                                            start_m = range_match.group(2)
-                                            end_h = range_match.group(3).zfill(2)
-                                            end_m = range_match.group(4)
-                                            parsed_ranges.append(f"{start_h}:{start_m}-{end_h}:{end_m}")
+                        parsed_ranges = format_ranges(offpeak) if isinstance(offpeak, (str, dict)) else []
 
                         if parsed_ranges:
                             pdl.offpeak_hours = {"ranges": parsed_ranges}  # type: ignore
@@ -6,12 +6,13 @@ from ..models import User, Role, Permission
 from ..models.database import get_db
 from ..schemas import APIResponse, ErrorDetail, RoleCreate, RoleUpdate
 from ..middleware import get_current_user
+from ..utils.responses import APIResponseRoute
 import logging
 
 
 logger = logging.getLogger(__name__)
 
-router = APIRouter(prefix="/admin/roles", tags=["Roles"])
+router = APIRouter(prefix="/admin/roles", tags=["Roles"], route_class=APIResponseRoute)
 
 
 def _serialize_role(role: Role) -> dict:
@@ -14,10 +14,11 @@ from ..models.database import get_db, async_session_maker
 from ..services.sync import SyncService
 
 from ..services.client_auth import get_or_create_local_user
+from ..utils.responses import APIResponseRoute
 
 logger = logging.getLogger(__name__)
 
-router = APIRouter(prefix="/sync", tags=["sync"])
+router = APIRouter(prefix="/sync", tags=["sync"], route_class=APIResponseRoute)
 
 
 @router.post("/pdl-list")
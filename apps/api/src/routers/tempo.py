@@ -3,24 +3,28 @@
 import logging
 from datetime import UTC, datetime, timedelta
 
-from fastapi import APIRouter, Depends, Query
+from fastapi import APIRouter, Depends, Query, Request, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from ..config import settings
 from ..middleware import require_action
 from ..models import User
-from ..models.database import get_db
+from ..models.database import get_db, get_read_db
 from ..schemas import APIResponse, ErrorDetail
+from ..services.response_cache import response_cache
 from ..services.rte import rte_service
+from ..services.tempo_calendar import tempo_calendar
+from ..utils.responses import APIResponseRoute
 
 logger = logging.getLogger(__name__)
 
-router = APIRouter(prefix="/tempo", tags=["Tempo Calendar"])
+router = APIRouter(prefix="/tempo", tags=["Tempo Calendar"], route_class=APIResponseRoute)
 
 
 @router.get("", response_model=APIResponse)
 @router.get("/", response_model=APIResponse, include_in_schema=False)
 async def get_tempo_calendar(
+    request: Request,
     start: str | None = Query(
         None,
         description="Start date (YYYY-MM-DD)",
@@ -36,13 +40,18 @@ async def get_tempo_calendar(
         },
     ),
     db: AsyncSession = Depends(get_db),
-) -> APIResponse:
+) -> Response:
     """
     Get Tempo Calendar (public endpoint for client mode sync)
 
     Returns all Tempo days, optionally filtered by date range.
     Used by client mode to sync tempo data from the server.
     """
+    return await response_cache.serve(request, "tempo", lambda: _build_tempo_calendar(start, end, db))
+
+
+async def _build_tempo_calendar(start: str | None, end: str | None, db: AsyncSession) -> APIResponse:
+    """Build the tempo calendar response (cached by get_tempo_calendar)"""
     try:
         # Parse dates if provided
         start_dt = None
@@ -77,6 +86,7 @@ async def get_tempo_calendar(
 
 @router.get("/days", response_model=APIResponse)
 async def get_tempo_days(
+    request: Request,
     start_date: str | None = Query(
         None,
         description="Start date (YYYY-MM-DD)",
@@ -93,15 +103,30 @@ async def get_tempo_days(
             "current_month": {"summary": "End of October", "value": "2024-10-31"},
         },
     ),
+    since: str | None = Query(
+        None,
+        description="Delta sync: only rows updated after this instant (ISO 8601, exclusive)",
+        openapi_examples={
+            "last_sync": {"summary": "Last sync watermark", "value": "2024-10-01T06:00:00+00:00"},
+        },
+    ),
     db: AsyncSession = Depends(get_db),
-) -> APIResponse:
+) -> Response:
     """
     Get Tempo Calendar days from cache (public endpoint)
 
     Args:
         start_date: Optional start date (YYYY-MM-DD)
         end_date: Optional end date (YYYY-MM-DD)
+        since: Optional delta sync watermark (only days updated after it)
     """
+    return await response_cache.serve(request, "tempo", lambda: _build_tempo_days(start_date, end_date, since, db))
+
+
+async def _build_tempo_days(
+    start_date: str | None, end_date: str | None, since: str | None, db: AsyncSession
+) -> APIResponse:
+    """Build the tempo days response (cached by get_tempo_days)"""
     try:
         # Parse dates if provided
         start_dt = None
@@ -112,8 +137,14 @@ async def get_tempo_days(
         if end_date:
             end_dt = datetime.fromisoformat(end_date).replace(tzinfo=UTC)
 
+        updated_since = None
+        if since:
+            updated_since = datetime.fromisoformat(since.replace("Z", "+00:00"))
+            if updated_since.tzinfo is None:
+                updated_since = updated_since.replace(tzinfo=UTC)
+
         # Get data from cache
-        tempo_days = await rte_service.get_tempo_days(db, start_dt, end_dt)
+        tempo_days = await rte_service.get_tempo_days(db, start_dt, end_dt, updated_since)
 
         return APIResponse(
             success=True,
@@ -136,7 +167,7 @@ async def get_tempo_days(
 
 
 @router.get("/today", response_model=APIResponse)
-async def get_today_tempo(db: AsyncSession = Depends(get_db)) -> APIResponse:
+async def get_today_tempo(db: AsyncSession = Depends(get_read_db)) -> APIResponse:
     """Get today's TEMPO color (public endpoint)"""
     try:
         today = datetime.now(UTC).replace(hour=0, minute=0, second=0, microsecond=0)
@@ -163,7 +194,7 @@ async def get_today_tempo(db: AsyncSession = Depends(get_db)) -> APIResponse:
 
 
 @router.get("/week", response_model=APIResponse)
-async def get_week_tempo(db: AsyncSession = Depends(get_db)) -> APIResponse:
+async def get_week_tempo(db: AsyncSession = Depends(get_read_db)) -> APIResponse:
     """Get last 7 days + tomorrow TEMPO colors from cache (public endpoint)"""
     try:
         # Get last 7 days + tomorrow (including today and historical data)
@@ -259,6 +290,8 @@ async def clear_all_tempo_data(
         result = await db.execute(delete(TempoDay))
         deleted_count = result.rowcount
         await db.commit()
+        await response_cache.bump_version("tempo")
+        await tempo_calendar.invalidate()
 
         return APIResponse(
             success=True,
@@ -0,0 +1,359 @@
+"""Server-side aggregation and downsampling of load curves (charts).
+
+Readings are the Enedis detail readings (``date`` = end of the interval, ``value`` = mean power in W
+over ``interval_length``). They are turned into NumPy arrays once, then:
+
+- aggregated per ``hour`` / ``day`` / ``week`` (monday) / ``month`` bucket:
+  ``sum`` is the energy in Wh, ``mean`` / ``min`` / ``max`` / ``pNN`` are computed on the power in W,
+  ``hc`` / ``hp`` split the energy with the PDL's off-peak schedule (reading timestamp, as the web app)
+- downsampled to a target number of points with LTTB or min/max (power curve, W)
+
+Results are cached per PDL, range and query (``{data_type}:aggregate:{pdl}:{start}:{end}:{query}``),
+encrypted with the owner's key, with the TTL of the range's last day. With ``split_hp_hc`` the query id
+includes the compiled off-peak schedule, so changing the PDL's off-peak hours is not served stale HC/HP.
+
+Micro-benchmark (from apps/api): ``python -m src.services.aggregation``
+"""
+import hashlib
+import logging
+import re
+from dataclasses import dataclass
+from datetime import date
+from typing import Any, Awaitable, Callable, Optional
+
+import numpy as np
+from fastapi import Response
+
+from ..schemas import APIResponse
+from .cache import cache_service
+from .offpeak import MINUTES_PER_DAY, OffpeakSchedule, compile_schedule
+
+logger = logging.getLogger(__name__)
+
+BUCKETS = ("hour", "day", "week", "month")
+DOWNSAMPLING = ("lttb", "minmax")
+DEFAULT_FUNCTIONS = ("sum", "mean", "max")
+MAX_POINTS = 10000
+
+_PERCENTILE_RE = re.compile(r"^p(\d{1,2}(?:\.\d+)?|100)$")
+_INTERVAL_RE = re.compile(r"^PT?(\d+)([MH])$")
+_BUCKET_UNITS = {"hour": "datetime64[h]", "day": "datetime64[D]", "month": "datetime64[M]"}
+_BUCKET_FORMATS = {"hour": 16, "day": 10, "week": 10, "month": 7}
+
+
+@dataclass(frozen=True)
+class AggregateQuery:
+    """Validated aggregation parameters"""
+
+    bucket: Optional[str] = "day"
+    functions: tuple[str, ...] = DEFAULT_FUNCTIONS
+    split_hp_hc: bool = False
+    downsample: Optional[str] = None
+    points: int = 1000
+
+    @classmethod
+    def parse(
+        cls,
+        bucket: Optional[str],
+        functions: Optional[str],
+        split_hp_hc: bool,
+        downsample: Optional[str],
+        points: int,
+    ) -> "AggregateQuery":
+        """Build a query from the request parameters (raises ValueError on invalid values)"""
+        bucket = bucket.lower() if bucket else None
+        if bucket and bucket not in BUCKETS:
+            raise ValueError(f"Invalid bucket '{bucket}', expected one of: {', '.join(BUCKETS)}")
+        downsample = downsample.lower() if downsample else None
+        if downsample and downsample not in DOWNSAMPLING:
+            raise ValueError(f"Invalid downsample '{downsample}', expected one of: {', '.join(DOWNSAMPLING)}")
+        if not bucket and not downsample:
+            raise ValueError("At least one of bucket or downsample is required")
+        if not 3 <= points <= MAX_POINTS:
+            raise ValueError(f"points must be between 3 and {MAX_POINTS}")
+
+        parsed = tuple(dict.fromkeys(f.strip().lower() for f in (functions or "").split(",") if f.strip()))
+        for function in parsed:
+            if function not in ("sum", "mean", "min", "max") and not _PERCENTILE_RE.match(function):
+                raise ValueError(f"Invalid aggregate function '{function}' (sum, mean, min, max or pNN)")
+        return cls(bucket, parsed or DEFAULT_FUNCTIONS, split_hp_hc, downsample, points)
+
+    def cache_id(self, offpeak_hours: Any = None) -> str:
+        shape = f"{self.bucket}|{','.join(self.functions)}|{self.split_hp_hc}|{self.downsample}|{self.points}"
+        digest = hashlib.sha1(shape.encode())
+        if self.split_hp_hc:
+            digest.update(compile_schedule(offpeak_hours).bitmap)
+        return digest.hexdigest()[:16]
+
+
+def _interval_minutes(interval_length: Optional[str]) -> int:
+    match = _INTERVAL_RE.match(interval_length or "")
+    if not match:
+        return 30
+    return int(match.group(1)) * (60 if match.group(2) == "H" else 1)
+
+
+def load_curve_arrays(readings: list[dict[str, Any]]) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Sorted, de-duplicated (timestamps ``datetime64[m]``, power W, energy Wh) of detail readings"""
+    valid = [r for r in readings if r.get("date") and r.get("value") is not None]
+    if not valid:
+        return np.array([], dtype="datetime64[m]"), np.array([], dtype=float), np.array([], dtype=float)
+
+    timestamps = np.array([str(r["date"])[:16].replace(" ", "T") for r in valid], dtype="datetime64[m]")
+    power = np.array([r["value"] for r in valid], dtype=float)
+    minutes = np.array([_interval_minutes(r.get("interval_length")) for r in valid], dtype=float)
+
+    # Keep the first reading of each timestamp (cache and fresh readings may overlap)
+    timestamps, first = np.unique(timestamps, return_index=True)
+    power, minutes = power[first], minutes[first]
+    return timestamps, power, power * minutes / 60
+
+
+def bucket_starts(timestamps: np.ndarray, bucket: str) -> np.ndarray:
+    """Start of the bucket of each reading. A reading belongs to the bucket its interval starts in
+    (the 00:00 reading closes the previous day)."""
+    interval_starts = timestamps - np.timedelta64(1, "m")
+    if bucket == "week":
+        days = interval_starts.astype("datetime64[D]")
+        # 1970-01-01 was a thursday: shift to the previous monday
+        return days - ((days.astype(np.int64) + 3) % 7).astype("timedelta64[D]")
+    return interval_starts.astype(_BUCKET_UNITS[bucket])
+
+
+def _percentiles(sorted_values: np.ndarray, starts: np.ndarray, counts: np.ndarray, q: float) -> np.ndarray:
+    # Linear interpolation inside each group of the group-sorted values (same as np.percentile)
+    position = starts + (counts - 1) * q / 100
+    low = np.floor(position).astype(np.int64)
+    high = np.minimum(low + 1, starts + counts - 1)
+    return sorted_values[low] + (sorted_values[high] - sorted_values[low]) * (position - low)
+
+
+def aggregate(
+    timestamps: np.ndarray,
+    power: np.ndarray,
+    energy: np.ndarray,
+    bucket: str,
+    functions: tuple[str, ...] = DEFAULT_FUNCTIONS,
+    offpeak: Optional[OffpeakSchedule] = None,
+) -> list[dict[str, Any]]:
+    """One dict per bucket: ``date``, ``count`` and the requested functions (+ ``hc`` / ``hp`` if ``offpeak``)"""
+    if not len(timestamps):
+        return []
+
+    keys = bucket_starts(timestamps, bucket)
+    # Timestamps are sorted, so are the buckets: groups are contiguous
+    boundaries = np.flatnonzero(np.r_[True, keys[1:] != keys[:-1]])
+    counts = np.diff(np.r_[boundaries, len(keys)])
+    columns: dict[str, np.ndarray] = {}
+
+    group = np.repeat(np.arange(len(boundaries)), counts)
+    sorted_power = None
+    for function in functions:
+        if function == "sum":
+            columns[function] = np.add.reduceat(energy, boundaries)
+        elif function == "mean":
+            columns[function] = np.add.reduceat(power, boundaries) / counts
+        elif function == "min":
+            columns[function] = np.minimum.reduceat(power, boundaries)
+        elif function == "max":
+            columns[function] = np.maximum.reduceat(power, boundaries)
+        else:
+            if sorted_power is None:
+                sorted_power = power[np.lexsort((power, group))]
+            columns[function] = _percentiles(sorted_power, boundaries, counts, float(function[1:]))
+
+    if offpeak is not None:
+        # Minute of the week of each reading (monday = 0), vectorised equivalent of schedule.at()
+        days = timestamps.astype("datetime64[D]")
+        weekday = (days.astype(np.int64) + 3) % 7
+        minute = (timestamps - days).astype(np.int64)
+        is_hc = np.frombuffer(offpeak.bitmap, dtype=np.uint8)[weekday * MINUTES_PER_DAY + minute].astype(bool)
+        columns["hc"] = np.add.reduceat(np.where(is_hc, energy, 0.0), boundaries)
+        columns["hp"] = np.add.reduceat(np.where(is_hc, 0.0, energy), boundaries)
+
+    dates = np.datetime_as_string(keys[boundaries], unit="m")
+    width = _BUCKET_FORMATS[bucket]
+    rounded = {name: np.round(values, 3).tolist() for name, values in columns.items()}
+    return [
+        {"date": dates[i][:width].replace("T", " "), "count": int(counts[i]), **{name: values[i] for name, values in rounded.items()}}
+        for i in range(len(boundaries))
+    ]
+
+
+def lttb(x: np.ndarray, y: np.ndarray, threshold: int) -> np.ndarray:
+    """Indices kept by Largest-Triangle-Three-Buckets"""
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+
+    edges = np.floor(np.linspace(1, n - 1, threshold - 1)).astype(np.int64)
+    selected = np.empty(threshold, dtype=np.int64)
+    selected[0], selected[-1] = 0, n - 1
+    previous = 0
+    for i in range(threshold - 2):
+        start, end = edges[i], edges[i + 1]
+        # Average point of the next bucket (the last point for the last bucket)
+        next_start, next_end = end, edges[i + 2] if i + 2 < len(edges) else n
+        avg_x = x[next_start:next_end].mean()
+        avg_y = y[next_start:next_end].mean()
+        area = np.abs(
+            (x[previous] - avg_x) * (y[start:end] - y[previous])
+            - (x[previous] - x[start:end]) * (avg_y - y[previous])
+        )
+        previous = start + int(np.argmax(area))
+        selected[i + 1] = previous
+    return selected
+
+
+def minmax(y: np.ndarray, threshold: int) -> np.ndarray:
+    """Indices of the min and max of ``threshold // 2`` equal buckets (keeps peaks)"""
+    n = len(y)
+    buckets = threshold // 2
+    if threshold >= n or buckets < 1:
+        return np.arange(n)
+
+    edges = np.floor(np.linspace(0, n, buckets + 1)).astype(np.int64)
+    size = int(np.max(np.diff(edges)))
+    # Pad every bucket to the same size to take min/max row-wise
+    index = np.minimum(edges[:-1, None] + np.arange(size), edges[1:, None] - 1)
+    windows = y[index]
+    picked = np.concatenate([
+        index[np.arange(buckets), np.argmin(windows, axis=1)],
+        index[np.arange(buckets), np.argmax(windows, axis=1)],
+    ])
+    return np.unique(picked)
+
+
+def downsample(timestamps: np.ndarray, power: np.ndarray, method: str, points: int) -> list[dict[str, Any]]:
+    """Power curve reduced to about ``points`` points: ``[{"date", "value"}]``"""
+    if method == "lttb":
+        selected = lttb(timestamps.astype(np.int64).astype(float), power, points)
+    else:
+        selected = minmax(power, points)
+    dates = np.datetime_as_string(timestamps[selected], unit="s")
+    values = power[selected].tolist()
+    return [{"date": dates[i].replace("T", " "), "value": values[i]} for i in range(len(selected))]
+
+
+def compute(readings: list[dict[str, Any]], query: AggregateQuery, offpeak_hours: Any = None) -> dict[str, Any]:
+    """Aggregated buckets and/or downsampled points of detail readings"""
+    timestamps, power, energy = load_curve_arrays(readings)
+    result: dict[str, Any] = {"readings": int(len(timestamps))}
+    if query.bucket:
+        result["bucket"] = query.bucket
+        result["functions"] = list(query.functions)
+        result["buckets"] = aggregate(
+            timestamps, power, energy, query.bucket, query.functions,
+            offpeak=compile_schedule(offpeak_hours) if query.split_hp_hc else None,
+        )
+    if query.downsample:
+        result["downsample"] = query.downsample
+        result["points"] = downsample(timestamps, power, query.downsample, query.points)
+    return result
+
+
+def aggregate_cache_key(
+    data_type: str, usage_point_id: str, start: str, end: str, query: AggregateQuery, offpeak_hours: Any = None
+) -> str:
+    return f"{data_type}:aggregate:{usage_point_id}:{start}:{end}:{query.cache_id(offpeak_hours)}"
+
+
+async def aggregate_load_curve(
+    data_type: str,
+    usage_point_id: str,
+    start: str,
+    end: str,
+    query: AggregateQuery,
+    encryption_key: str,
+    offpeak_hours: Any,
+    fetch_readings: Callable[[], Awaitable[APIResponse | Response]],
+) -> APIResponse | Response:
+    """Cached aggregate of a PDL load curve; readings come from ``fetch_readings`` (detail batch endpoint)"""
+    cache_key = aggregate_cache_key(data_type, usage_point_id, start, end, query, offpeak_hours)
+    cached = await cache_service.get(cache_key, encryption_key)
+    if cached:
+        return APIResponse(success=True, data=cached)
+
+    response = await fetch_readings()
+    if not isinstance(response, APIResponse) or not response.success:
+        return response
+
+    meter_reading = (response.data or {}).get("meter_reading", {})
+    data = {
+        "usage_point_id": usage_point_id,
+        "start": start,
+        "end": end,
+        "unit": {"sum": "Wh", "hc": "Wh", "hp": "Wh", "power": "W"},
+        **compute(meter_reading.get("interval_reading") or [], query, offpeak_hours),
+    }
+
+    # Partial ranges (rate limit, Enedis errors) are not cached
+    if response.error is None:
+        try:
+            ttl = cache_service.ttl_for_day(date.fromisoformat(end))
+        except ValueError:
+            ttl = None
+        await cache_service.set(cache_key, data, encryption_key, ttl=ttl)
+    else:
+        logger.info(f"[{usage_point_id}] [AGGREGATE] Partial {data_type} data, result not cached")
+    return APIResponse(success=True, data=data, error=response.error)
+
+
+def _benchmark(days: int = 730) -> None:
+    import time
+    from datetime import datetime, timedelta
+
+    start = datetime(2024, 1, 1, 0, 30)
+    readings = [
+        {
+            "value": str(500 + (i * 37) % 900),
+            "date": (start + timedelta(minutes=30 * i)).isoformat(sep=" "),
+            "interval_length": "PT30M",
+            "measure_type": "B",
+        }
+        for i in range(days * 48)
+    ]
+    offpeak = {"default": "22:00-06:00"}
+
+    def best(fn: Callable[[], Any], repeat: int = 5) -> tuple[Any, float]:
+        timings = []
+        for _ in range(repeat):
+            t0 = time.perf_counter()
+            result = fn()
+            timings.append(time.perf_counter() - t0)
+        return result, min(timings) * 1000
+
+    # Reference: per-reading Python loop (what the web app does in the browser)
+    def python_daily() -> dict[str, list[float]]:
+        schedule = compile_schedule(offpeak)
+        days_: dict[str, list[float]] = {}
+        for r in readings:
+            ts = datetime.fromisoformat(r["date"])
+            key = (ts - timedelta(minutes=1)).date().isoformat()
+            energy = float(r["value"]) * 0.5
+            bucket = days_.setdefault(key, [0.0, 0.0, 0.0])
+            bucket[0] += energy
+            bucket[1 if schedule.at(ts) else 2] += energy
+        return days_
+
+    reference, python_ms = best(python_daily)
+    arrays, arrays_ms = best(lambda: load_curve_arrays(readings))
+    ts, power, energy = arrays
+    buckets, numpy_ms = best(
+        lambda: aggregate(ts, power, energy, "day", ("sum", "mean", "max", "p95"), offpeak=compile_schedule(offpeak))
+    )
+    _, lttb_ms = best(lambda: downsample(ts, power, "lttb", 1000))
+    _, minmax_ms = best(lambda: downsample(ts, power, "minmax", 1000))
+
+    assert abs(buckets[10]["hc"] - reference[buckets[10]["date"]][1]) < 1e-6
+
+    print(f"{len(readings)} readings ({days} days)")
+    print(f"python daily sum + HC/HP        {python_ms:8.1f} ms")
+    print(f"numpy arrays (parse readings)   {arrays_ms:8.1f} ms")
+    print(f"numpy daily sum/mean/max/p95/HC {numpy_ms:8.1f} ms")
+    print(f"lttb 1000 points                {lttb_ms:8.1f} ms")
+    print(f"minmax 1000 points              {minmax_ms:8.1f} ms")
+
+
+if __name__ == "__main__":
+    _benchmark()
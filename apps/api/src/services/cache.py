@@ -1,9 +1,12 @@
 import json
 import logging
 import redis.asyncio as redis
+from datetime import date, datetime, timedelta
+from fnmatch import fnmatchcase
 from typing import Any, Optional, cast
 from cryptography.fernet import Fernet
 from ..config import settings
+from .cache_accounting import cache_accounting, usage_point_id_from_key
 
 logger = logging.getLogger(__name__)
 
@@ -35,6 +38,11 @@ class CacheService:
         if self.redis_client:
             await self.redis_client.close()
 
+    def ttl_for_day(self, day: date) -> int:
+        """TTL for data of a given day: recent days may still be corrected by Enedis, older ones cannot"""
+        recent_limit = datetime.now().date() - timedelta(days=settings.CACHE_RECENT_DAYS)
+        return self.ttl if day >= recent_limit else max(self.ttl, settings.CACHE_TTL_HISTORICAL_SECONDS)
+
     def _get_cipher(self, encryption_key: str) -> Fernet:
         """Get Fernet cipher with user's client_secret as key"""
         # Derive a valid Fernet key from client_secret
@@ -71,18 +79,76 @@ class CacheService:
             encrypted_data = cipher.encrypt(json_data)
 
             cache_ttl = ttl if ttl is not None else self.ttl
-            await self.redis_client.setex(key, cache_ttl, encrypted_data)
+            async with self.redis_client.pipeline(transaction=False) as pipe:
+                pipe.setex(key, cache_ttl, encrypted_data)
+                usage_point_id = await cache_accounting.queue_record(self.redis_client, pipe, key)
+                results = await pipe.execute()
+            if usage_point_id:
+                await cache_accounting.after_write(self.redis_client, {usage_point_id: int(results[-1] or 0)})
             return True
         except Exception:
             return False
 
+    async def get_many(self, keys: list[str], encryption_key: str) -> list[Optional[dict[str, Any]]]:
+        """Get and decrypt several cached values with a single MGET (None for missing entries)"""
+        if not self.redis_client or not keys:
+            return [None] * len(keys)
+
+        try:
+            encrypted_values = await self.redis_client.mget(keys)
+        except Exception:
+            return [None] * len(keys)
+
+        cipher = self._get_cipher(encryption_key)
+        values: list[Optional[dict[str, Any]]] = []
+        for encrypted_data in encrypted_values:
+            if not encrypted_data:
+                values.append(None)
+                continue
+            try:
+                values.append(cast(dict[str, Any], json.loads(cipher.decrypt(encrypted_data).decode())))
+            except Exception:
+                values.append(None)
+
+        await cache_accounting.touch(self.redis_client, [key for key, value in zip(keys, values) if value is not None])
+        return values
+
+    async def set_many(self, items: dict[str, Any], encryption_key: str, ttl: Optional[int] = None) -> int:
+        """Encrypt several values with one cipher and write them in a single pipeline.
+
+        Returns the number of keys written.
+        """
+        if not self.redis_client or not items:
+            return 0
+
+        try:
+            cipher = self._get_cipher(encryption_key)
+            cache_ttl = ttl if ttl is not None else self.ttl
+            async with self.redis_client.pipeline(transaction=False) as pipe:
+                for key, value in items.items():
+                    pipe.setex(key, cache_ttl, cipher.encrypt(json.dumps(value).encode()))
+                accounted = [await cache_accounting.queue_record(self.redis_client, pipe, key) for key in items]
+                results = await pipe.execute()
+
+            usage_by_pdl = {
+                usage_point_id: int(used_bytes or 0)
+                for usage_point_id, used_bytes in zip([p for p in accounted if p], results[len(items):])
+            }
+            await cache_accounting.after_write(self.redis_client, usage_by_pdl)
+            return len(items)
+        except Exception:
+            return 0
+
     async def delete(self, key: str) -> bool:
         """Delete cached value"""
         if not self.redis_client:
             return False
 
         try:
-            await self.redis_client.delete(key)
+            async with self.redis_client.pipeline(transaction=False) as pipe:
+                pipe.delete(key)
+                await cache_accounting.queue_record(self.redis_client, pipe, key)
+                await pipe.execute()
             return True
         except Exception:
             return False
@@ -113,21 +179,51 @@ class CacheService:
             return False
 
     async def delete_pattern(self, pattern: str) -> int:
-        """Delete all keys matching pattern"""
+        """Delete all keys matching pattern.
+
+        Patterns scoped to a PDL are resolved from the PDL key index; other patterns
+        (global wipes, logs) fall back to a keyspace SCAN.
+        """
         if not self.redis_client:
             return 0
 
+        usage_point_id = usage_point_id_from_key(pattern)
+        if usage_point_id:
+            return await self.delete_usage_point_keys(usage_point_id, [pattern])
+
         try:
             keys = []
-            async for key in self.redis_client.scan_iter(match=pattern):
-                keys.append(key)
+            async for key in self.redis_client.scan_iter(match=pattern, count=1000):
+                keys.append(key.decode() if isinstance(key, bytes) else key)
 
             if keys:
-                return cast(int, await self.redis_client.delete(*keys))
+                return await cache_accounting.delete_keys(self.redis_client, keys)
             return 0
         except Exception:
             return 0
 
+    async def delete_usage_point_keys(self, usage_point_id: str, patterns: Optional[list[str]] = None) -> int:
+        """Delete the keys of a PDL matching any of the glob patterns (all its keys if None), from the PDL index"""
+        if not self.redis_client:
+            return 0
+
+        try:
+            return await cache_accounting.delete_pdl_keys(self.redis_client, [usage_point_id], patterns)
+        except Exception as e:
+            logger.warning(f"[{usage_point_id}] [CACHE] Failed to delete keys: {e}")
+            return 0
+
+    async def count_usage_point_keys(self, usage_point_id: str, patterns: dict[str, str]) -> dict[str, int]:
+        """Count the keys of a PDL matching each named glob pattern, from the PDL index"""
+        counts = dict.fromkeys(patterns, 0)
+        if not self.redis_client:
+            return counts
+
+        keys = (await cache_accounting.keys_by_pdl(self.redis_client, [usage_point_id]))[usage_point_id]
+        for name, pattern in patterns.items():
+            counts[name] = sum(1 for key in keys if fnmatchcase(key, pattern))
+        return counts
+
     def make_cache_key(self, usage_point_id: str, endpoint: str, **kwargs: Any) -> str:
         """Generate cache key"""
         parts = [usage_point_id, endpoint]
@@ -0,0 +1,347 @@
+"""Per-PDL accounting of cached Enedis data (bytes, key count, LRU order) and quota eviction.
+
+Side index kept for every PDL that has cached data (no keyspace scan needed to report usage):
+- ``cache_index:{pdl}:sizes`` : HASH cache key -> size in bytes
+- ``cache_index:{pdl}:usage`` : HASH ``bytes`` / ``keys`` running totals
+- ``cache_index:{pdl}:lru``   : ZSET cache key -> last write/read timestamp
+- ``cache_index:{pdl}:aux``   : SET of the PDL's keys that are not accounted (range bitmaps,
+  blacklist / fail markers) so they can still be listed and deleted
+- ``cache_index:pdls``        : SET of PDLs having an index
+
+Per-user usage is the sum of the user's PDLs (PDL -> user mapping comes from the database).
+Cache keys are attributed to a PDL from the 14-digit usage point id they contain.
+Listing, counting and deleting the keys of a PDL only reads its index (no keyspace SCAN).
+"""
+import logging
+import re
+from fnmatch import fnmatchcase
+import time
+from typing import Any, Optional
+
+import redis.asyncio as redis
+
+from ..config import settings
+
+logger = logging.getLogger(__name__)
+
+INDEX_PREFIX = "cache_index"
+PDL_SET_KEY = f"{INDEX_PREFIX}:pdls"
+BACKFILL_FLAG_KEY = f"{INDEX_PREFIX}:backfilled"
+DELETE_BATCH_SIZE = 500
+USAGE_POINT_ID_RE = re.compile(r"(?:^|:)(\d{14})(?=:|$)")
+
+# Records the current size of a cache key in the PDL index (or removes it if the key is gone)
+# KEYS: sizes hash, usage hash, lru zset, pdl set, cache key / ARGV: timestamp, usage point id
+# Returns the PDL total bytes after the update
+_RECORD_SCRIPT = """
+local key_type = redis.call('TYPE', KEYS[5])['ok']
+local old = redis.call('HGET', KEYS[1], KEYS[5])
+if key_type == 'none' then
+    if old then
+        redis.call('HDEL', KEYS[1], KEYS[5])
+        redis.call('ZREM', KEYS[3], KEYS[5])
+        redis.call('HINCRBY', KEYS[2], 'bytes', -tonumber(old))
+        redis.call('HINCRBY', KEYS[2], 'keys', -1)
+    end
+    return tonumber(redis.call('HGET', KEYS[2], 'bytes') or 0)
+end
+local size = 0
+if key_type == 'string' then
+    size = redis.call('STRLEN', KEYS[5])
+elseif key_type == 'hash' then
+    for _, value in ipairs(redis.call('HVALS', KEYS[5])) do
+        size = size + string.len(value)
+    end
+end
+redis.call('HSET', KEYS[1], KEYS[5], size)
+redis.call('ZADD', KEYS[3], ARGV[1], KEYS[5])
+redis.call('SADD', KEYS[4], ARGV[2])
+if old then
+    redis.call('HINCRBY', KEYS[2], 'bytes', size - tonumber(old))
+else
+    redis.call('HINCRBY', KEYS[2], 'bytes', size)
+    redis.call('HINCRBY', KEYS[2], 'keys', 1)
+end
+return tonumber(redis.call('HGET', KEYS[2], 'bytes'))
+"""
+
+
+def usage_point_id_from_key(key: str) -> Optional[str]:
+    """Extract the usage point id (PDL) a cache key belongs to, if any"""
+    if key.startswith(f"{INDEX_PREFIX}:"):
+        return None
+    match = USAGE_POINT_ID_RE.search(key)
+    return match.group(1) if match else None
+
+
+def sizes_key(usage_point_id: str) -> str:
+    return f"{INDEX_PREFIX}:{usage_point_id}:sizes"
+
+
+def usage_key(usage_point_id: str) -> str:
+    return f"{INDEX_PREFIX}:{usage_point_id}:usage"
+
+
+def lru_key(usage_point_id: str) -> str:
+    return f"{INDEX_PREFIX}:{usage_point_id}:lru"
+
+
+def aux_key(usage_point_id: str) -> str:
+    return f"{INDEX_PREFIX}:{usage_point_id}:aux"
+
+
+def is_accounted(key: str) -> bool:
+    """Whether a key counts towards quotas (bitmaps and blacklist markers are only indexed)"""
+    return not (key.startswith("enedis:") or key.endswith(":bitmap"))
+
+
+def _decode(value: Any) -> str:
+    return value.decode() if isinstance(value, bytes) else str(value)
+
+
+class CacheAccountingService:
+    """Maintain the per-PDL cache index and enforce quotas"""
+
+    def __init__(self) -> None:
+        self._record_script: Any = None
+        self._script_client: Optional[redis.Redis] = None
+
+    def _script(self, redis_client: redis.Redis) -> Any:
+        if self._record_script is None or self._script_client is not redis_client:
+            self._record_script = redis_client.register_script(_RECORD_SCRIPT)
+            self._script_client = redis_client
+        return self._record_script
+
+    async def queue_record(self, redis_client: redis.Redis, pipe: Any, key: str) -> Optional[str]:
+        """Queue the accounting of a written key in a pipeline. Returns its PDL (None if not attributable)."""
+        usage_point_id = usage_point_id_from_key(key)
+        if not usage_point_id:
+            return None
+        await self._script(redis_client)(
+            keys=[sizes_key(usage_point_id), usage_key(usage_point_id), lru_key(usage_point_id), PDL_SET_KEY, key],
+            args=[time.time(), usage_point_id],
+            client=pipe,
+        )
+        return usage_point_id
+
+    def queue_register(self, pipe: Any, key: str) -> Optional[str]:
+        """Queue the indexing of a key that is not accounted. Returns its PDL (None if not attributable)."""
+        usage_point_id = usage_point_id_from_key(key)
+        if not usage_point_id:
+            return None
+        pipe.sadd(aux_key(usage_point_id), key)
+        pipe.sadd(PDL_SET_KEY, usage_point_id)
+        return usage_point_id
+
+    async def after_write(self, redis_client: redis.Redis, usage_by_pdl: dict[str, int]) -> None:
+        """Evict least recently used entries of PDLs over their quota"""
+        quota = settings.CACHE_QUOTA_PDL_BYTES
+        if quota <= 0:
+            return
+        for usage_point_id, used_bytes in usage_by_pdl.items():
+            if used_bytes > quota:
+                evicted = await self.evict_lru(redis_client, [usage_point_id], quota)
+                logger.info(f"[{usage_point_id}] [CACHE QUOTA] Evicted {evicted} entries ({used_bytes} > {quota} bytes)")
+
+    async def record(self, redis_client: redis.Redis, keys: list[str]) -> dict[str, int]:
+        """Account keys written outside of CacheService (single pipeline). Returns PDL -> total bytes."""
+        usage_by_pdl: dict[str, int] = {}
+        pdls: list[Optional[str]] = []
+        async with redis_client.pipeline(transaction=False) as pipe:
+            for key in keys:
+                pdls.append(await self.queue_record(redis_client, pipe, key))
+            results = await pipe.execute()
+        for usage_point_id, used_bytes in zip([p for p in pdls if p], results):
+            usage_by_pdl[usage_point_id] = int(used_bytes or 0)
+        await self.after_write(redis_client, usage_by_pdl)
+        return usage_by_pdl
+
+    async def touch(self, redis_client: redis.Redis, keys: list[str]) -> None:
+        """Mark keys as recently used (LRU order), ignoring keys not in the index"""
+        now = time.time()
+        by_pdl: dict[str, dict[str, float]] = {}
+        for key in keys:
+            usage_point_id = usage_point_id_from_key(key)
+            if usage_point_id:
+                by_pdl.setdefault(usage_point_id, {})[key] = now
+        if not by_pdl:
+            return
+        try:
+            async with redis_client.pipeline(transaction=False) as pipe:
+                for usage_point_id, members in by_pdl.items():
+                    pipe.zadd(lru_key(usage_point_id), members, xx=True)
+                await pipe.execute()
+        except Exception as e:
+            logger.debug(f"[CACHE ACCOUNTING] Failed to touch keys: {e}")
+
+    async def evict_lru(self, redis_client: redis.Redis, usage_point_ids: list[str], max_bytes: int) -> int:
+        """Delete the least recently used entries across PDLs until their total is under max_bytes.
+
+        Returns the number of evicted keys.
+        """
+        evicted = 0
+        while True:
+            usage = await self.get_usage(redis_client, usage_point_ids)
+            total = sum(u["bytes"] for u in usage.values())
+            if total <= max_bytes:
+                return evicted
+
+            # Oldest candidates of each PDL, merged by last use
+            async with redis_client.pipeline(transaction=False) as pipe:
+                for usage_point_id in usage_point_ids:
+                    pipe.zrange(lru_key(usage_point_id), 0, 49, withscores=True)
+                oldest_by_pdl = await pipe.execute()
+
+            candidates = sorted(
+                ((score, _decode(member)) for members in oldest_by_pdl for member, score in members),
+                key=lambda c: c[0],
+            )[:50]
+            if not candidates:
+                return evicted
+
+            async with redis_client.pipeline(transaction=False) as pipe:
+                for _, key in candidates:
+                    pipe.delete(key)
+                    await self.queue_record(redis_client, pipe, key)
+                await pipe.execute()
+            evicted += len(candidates)
+
+    async def reconcile(self, redis_client: redis.Redis, usage_point_id: str) -> int:
+        """Drop index entries of keys that expired or were deleted. Returns the number of removed entries."""
+        keys = (await self.keys_by_pdl(redis_client, [usage_point_id]))[usage_point_id]
+        if not keys:
+            return 0
+
+        async with redis_client.pipeline(transaction=False) as pipe:
+            for key in keys:
+                pipe.exists(key)
+            exists = await pipe.execute()
+
+        gone = [key for key, present in zip(keys, exists) if not present]
+        if gone:
+            await self.forget(redis_client, gone)
+        return len(gone)
+
+    async def forget(self, redis_client: redis.Redis, keys: list[str]) -> None:
+        """Remove deleted or expired keys from their PDL index"""
+        async with redis_client.pipeline(transaction=False) as pipe:
+            for key in keys:
+                if is_accounted(key):
+                    await self.queue_record(redis_client, pipe, key)
+                elif usage_point_id := usage_point_id_from_key(key):
+                    pipe.srem(aux_key(usage_point_id), key)
+            await pipe.execute()
+
+    async def keys_by_pdl(self, redis_client: redis.Redis, usage_point_ids: list[str]) -> dict[str, list[str]]:
+        """Indexed keys (accounted and auxiliary) of several PDLs with a single pipeline"""
+        async with redis_client.pipeline(transaction=False) as pipe:
+            for usage_point_id in usage_point_ids:
+                pipe.zrange(lru_key(usage_point_id), 0, -1)
+                pipe.smembers(aux_key(usage_point_id))
+            results = await pipe.execute()
+
+        return {
+            usage_point_id: sorted({_decode(k) for k in results[2 * index]} | {_decode(k) for k in results[2 * index + 1]})
+            for index, usage_point_id in enumerate(usage_point_ids)
+        }
+
+    async def delete_keys(self, redis_client: redis.Redis, keys: list[str]) -> int:
+        """Delete keys and their index entries in pipelined batches. Returns the number of deleted keys."""
+        deleted = 0
+        for batch_start in range(0, len(keys), DELETE_BATCH_SIZE):
+            batch = keys[batch_start:batch_start + DELETE_BATCH_SIZE]
+            async with redis_client.pipeline(transaction=False) as pipe:
+                pipe.delete(*batch)
+                for key in batch:
+                    if is_accounted(key):
+                        await self.queue_record(redis_client, pipe, key)
+                    elif usage_point_id := usage_point_id_from_key(key):
+                        pipe.srem(aux_key(usage_point_id), key)
+                results = await pipe.execute()
+            deleted += int(results[0] or 0)
+        return deleted
+
+    async def delete_pdl_keys(
+        self, redis_client: redis.Redis, usage_point_ids: list[str], patterns: Optional[list[str]] = None
+    ) -> int:
+        """Delete the indexed keys of PDLs matching any of the glob patterns (all keys if no pattern)"""
+        keys_by_pdl = await self.keys_by_pdl(redis_client, usage_point_ids)
+        keys = [
+            key
+            for pdl_keys in keys_by_pdl.values()
+            for key in pdl_keys
+            if patterns is None or any(fnmatchcase(key, pattern) for pattern in patterns)
+        ]
+        return await self.delete_keys(redis_client, keys) if keys else 0
+
+    async def backfill(self, redis_client: redis.Redis) -> int:
+        """Index keys written before the index existed (one-off keyspace SCAN). Returns the number of indexed keys."""
+        if await redis_client.exists(BACKFILL_FLAG_KEY):
+            return 0
+
+        indexed = 0
+        batch: list[str] = []
+        async for raw_key in redis_client.scan_iter(count=1000):
+            key = _decode(raw_key)
+            if usage_point_id_from_key(key):
+                batch.append(key)
+            if len(batch) >= DELETE_BATCH_SIZE:
+                indexed += await self._index_existing(redis_client, batch)
+                batch = []
+        if batch:
+            indexed += await self._index_existing(redis_client, batch)
+
+        await redis_client.set(BACKFILL_FLAG_KEY, "1")
+        logger.info(f"[CACHE ACCOUNTING] Backfilled the PDL index with {indexed} existing keys")
+        return indexed
+
+    async def _index_existing(self, redis_client: redis.Redis, keys: list[str]) -> int:
+        async with redis_client.pipeline(transaction=False) as pipe:
+            for key in keys:
+                if is_accounted(key):
+                    await self.queue_record(redis_client, pipe, key)
+                else:
+                    self.queue_register(pipe, key)
+            await pipe.execute()
+        return len(keys)
+
+    async def get_usage(self, redis_client: redis.Redis, usage_point_ids: list[str]) -> dict[str, dict[str, int]]:
+        """Cache usage (bytes, keys) of several PDLs with a single pipeline"""
+        async with redis_client.pipeline(transaction=False) as pipe:
+            for usage_point_id in usage_point_ids:
+                pipe.hmget(usage_key(usage_point_id), ["bytes", "keys"])
+            results = await pipe.execute()
+
+        return {
+            usage_point_id: {"bytes": max(int(values[0] or 0), 0), "keys": max(int(values[1] or 0), 0)}
+            for usage_point_id, values in zip(usage_point_ids, results)
+        }
+
+    async def indexed_pdls(self, redis_client: redis.Redis) -> list[str]:
+        """PDLs having cached data in the index"""
+        return sorted(_decode(m) for m in await redis_client.smembers(PDL_SET_KEY))
+
+    async def run_maintenance(self, redis_client: redis.Redis, pdls_by_user: dict[str, list[str]]) -> dict[str, int]:
+        """Backfill the index once, reconcile every PDL index, then enforce per-PDL and per-user quotas"""
+        stats = {"pdls": 0, "stale_entries": 0, "evicted": 0}
+
+        await self.backfill(redis_client)
+        for usage_point_id in await self.indexed_pdls(redis_client):
+            stats["stale_entries"] += await self.reconcile(redis_client, usage_point_id)
+            stats["pdls"] += 1
+            if settings.CACHE_QUOTA_PDL_BYTES > 0:
+                stats["evicted"] += await self.evict_lru(
+                    redis_client, [usage_point_id], settings.CACHE_QUOTA_PDL_BYTES
+                )
+
+        if settings.CACHE_QUOTA_USER_BYTES > 0:
+            for user_id, usage_point_ids in pdls_by_user.items():
+                evicted = await self.evict_lru(redis_client, usage_point_ids, settings.CACHE_QUOTA_USER_BYTES)
+                if evicted:
+                    logger.info(f"[CACHE QUOTA] Evicted {evicted} entries for user {user_id}")
+                stats["evicted"] += evicted
+
+        return stats
+
+
+cache_accounting = CacheAccountingService()
@@ -0,0 +1,233 @@
+"""Range-oriented cache for daily readings (consumption/production).
+
+Layout (one PDL, one data type):
+- ``{data_type}:daily:{pdl}:month:{YYYY-MM}`` : Redis hash, field ``DD`` = encrypted reading
+- ``{data_type}:daily:{pdl}:bitmap``          : Redis bitmap, 1 bit per day since ``BITMAP_EPOCH``
+
+A whole range is resolved with one GETRANGE on the bitmap (hits/misses), then one
+pipelined HMGET per month for the present days. Writes are merged into the month
+hashes with a single pipeline.
+
+Legacy per-day keys (``{data_type}:daily:{pdl}:{YYYY-MM-DD}``) are read as a fallback
+for missing days and migrated into the new layout on the fly.
+"""
+import json
+import logging
+from calendar import monthrange
+from datetime import date, datetime, timedelta
+from typing import Any, Optional
+
+from ..config import settings
+from .cache import cache_service
+from .cache_accounting import cache_accounting
+
+logger = logging.getLogger(__name__)
+
+BITMAP_EPOCH = date(2000, 1, 1)
+
+
+def day_offset(day: date) -> int:
+    """Bit offset of a day in the presence bitmap"""
+    return (day - BITMAP_EPOCH).days
+
+
+def present_days_from_bitmap(bitmap: bytes, start: date, end: date) -> set[date]:
+    """Decode the days present in [start, end] from a GETRANGE slice.
+
+    ``bitmap`` must start at the byte containing ``start`` (i.e. byte ``day_offset(start) // 8``).
+    Redis bit ordering is big-endian within a byte (offset 0 = most significant bit).
+    """
+    present: set[date] = set()
+    first_byte = day_offset(start) // 8
+    current = start
+    while current <= end:
+        offset = day_offset(current)
+        byte_index = offset // 8 - first_byte
+        if byte_index < len(bitmap) and bitmap[byte_index] & (0x80 >> (offset % 8)):
+            present.add(current)
+        current += timedelta(days=1)
+    return present
+
+
+class DailyRangeCache:
+    """Per-PDL, per-month hash cache for daily readings"""
+
+    def _month_key(self, data_type: str, usage_point_id: str, month: str) -> str:
+        return f"{data_type}:daily:{usage_point_id}:month:{month}"
+
+    def _bitmap_key(self, data_type: str, usage_point_id: str) -> str:
+        return f"{data_type}:daily:{usage_point_id}:bitmap"
+
+    def _legacy_key(self, data_type: str, usage_point_id: str, date_str: str) -> str:
+        return f"{data_type}:daily:{usage_point_id}:{date_str}"
+
+    async def get_range(
+        self,
+        data_type: str,
+        usage_point_id: str,
+        start: date,
+        end: date,
+        encryption_key: str,
+    ) -> tuple[list[dict[str, Any]], list[str]]:
+        """Get cached readings for [start, end].
+
+        Returns (readings sorted by date, missing dates as YYYY-MM-DD).
+        """
+        all_dates = []
+        current = start
+        while current <= end:
+            all_dates.append(current)
+            current += timedelta(days=1)
+
+        redis_client = cache_service.redis_client
+        if not redis_client or not all_dates:
+            return [], [d.isoformat() for d in all_dates]
+
+        readings: dict[date, dict[str, Any]] = {}
+        try:
+            cipher = cache_service._get_cipher(encryption_key)
+
+            # 1. Hits/misses for the whole range in one call
+            bitmap_key = self._bitmap_key(data_type, usage_point_id)
+            first_byte = day_offset(start) // 8
+            last_byte = day_offset(end) // 8
+            bitmap = await redis_client.getrange(bitmap_key, first_byte, last_byte) or b""
+            present = present_days_from_bitmap(bitmap, start, end)
+
+            # 2. Read present days, one HMGET per month, in a single round trip
+            if present:
+                by_month: dict[str, list[date]] = {}
+                for day in sorted(present):
+                    by_month.setdefault(day.strftime("%Y-%m"), []).append(day)
+
+                async with redis_client.pipeline(transaction=False) as pipe:
+                    for month, days in by_month.items():
+                        pipe.hmget(self._month_key(data_type, usage_point_id, month), [d.strftime("%d") for d in days])
+                    results = await pipe.execute()
+
+                hit_months = []
+                for month, days, values in zip(by_month, by_month.values(), results):
+                    if any(values):
+                        hit_months.append(self._month_key(data_type, usage_point_id, month))
+                    for day, value in zip(days, values):
+                        if not value:
+                            continue
+                        try:
+                            readings[day] = json.loads(cipher.decrypt(value).decode())
+                        except Exception:
+                            # Undecryptable entry (e.g. secret regenerated): treat as a miss
+                            continue
+
+                await cache_accounting.touch(redis_client, hit_months)
+
+            # 3. Migration path: fall back to legacy per-day keys for the remaining days
+            if settings.DAILY_CACHE_LEGACY_FALLBACK:
+                legacy_days = [d for d in all_dates if d not in readings]
+                if legacy_days:
+                    migrated = await self._migrate_legacy(
+                        data_type, usage_point_id, legacy_days, encryption_key, cipher
+                    )
+                    readings.update(migrated)
+        except Exception as e:
+            logger.warning(f"[{usage_point_id}] [DAILY CACHE] Range read failed: {e}")
+
+        missing = [d.isoformat() for d in all_dates if d not in readings]
+        return [readings[d] for d in sorted(readings)], missing
+
+    async def set_readings(
+        self,
+        data_type: str,
+        usage_point_id: str,
+        readings: list[dict[str, Any]],
+        encryption_key: str,
+        ttl: Optional[int] = None,
+    ) -> int:
+        """Merge readings into the month hashes and mark them in the bitmap.
+
+        Returns the number of days written.
+        """
+        redis_client = cache_service.redis_client
+        if not redis_client or not readings:
+            return 0
+
+        by_month: dict[str, dict[str, bytes]] = {}
+        month_ttls: dict[str, int] = {}
+        offsets: list[int] = []
+
+        try:
+            cipher = cache_service._get_cipher(encryption_key)
+            for reading in readings:
+                date_str = reading.get("date", "")[:10]
+                if not date_str:
+                    continue
+                day = datetime.strptime(date_str, "%Y-%m-%d").date()
+                encrypted = cipher.encrypt(json.dumps(reading).encode())
+                month = day.strftime("%Y-%m")
+                by_month.setdefault(month, {})[day.strftime("%d")] = encrypted
+                offsets.append(day_offset(day))
+                if month not in month_ttls:
+                    # A month that can hold recent days (still correctable) keeps the short TTL
+                    month_end = day.replace(day=monthrange(day.year, day.month)[1])
+                    month_ttls[month] = ttl if ttl is not None else cache_service.ttl_for_day(month_end)
+
+            if not offsets:
+                return 0
+
+            bitmap_key = self._bitmap_key(data_type, usage_point_id)
+            month_keys = [self._month_key(data_type, usage_point_id, month) for month in by_month]
+            async with redis_client.pipeline(transaction=False) as pipe:
+                for month_key, (month, fields) in zip(month_keys, by_month.items()):
+                    pipe.hset(month_key, mapping=fields)
+                    pipe.expire(month_key, month_ttls[month])
+                for offset in offsets:
+                    pipe.setbit(bitmap_key, offset, 1)
+                # The bitmap may outlive month hashes: a set bit without hash field is a miss
+                pipe.expire(bitmap_key, max(cache_service.ttl, settings.CACHE_TTL_HISTORICAL_SECONDS, *month_ttls.values()))
+                # Only month hashes are accounted (evicting the bitmap would orphan them)
+                cache_accounting.queue_register(pipe, bitmap_key)
+                for month_key in month_keys:
+                    await cache_accounting.queue_record(redis_client, pipe, month_key)
+                results = await pipe.execute()
+
+            await cache_accounting.after_write(redis_client, {usage_point_id: int(results[-1] or 0)})
+            return len(offsets)
+        except Exception as e:
+            logger.warning(f"[{usage_point_id}] [DAILY CACHE] Range write failed: {e}")
+            return 0
+
+    async def _migrate_legacy(
+        self,
+        data_type: str,
+        usage_point_id: str,
+        days: list[date],
+        encryption_key: str,
+        cipher: Any,
+    ) -> dict[date, dict[str, Any]]:
+        """Read legacy per-day keys with one MGET, rewrite them into the range layout and delete them"""
+        redis_client = cache_service.redis_client
+        if not redis_client:
+            return {}
+
+        legacy_keys = [self._legacy_key(data_type, usage_point_id, d.isoformat()) for d in days]
+        values = await redis_client.mget(legacy_keys)
+
+        found: dict[date, dict[str, Any]] = {}
+        found_keys = []
+        for day, key, value in zip(days, legacy_keys, values):
+            if not value:
+                continue
+            try:
+                found[day] = json.loads(cipher.decrypt(value).decode())
+                found_keys.append(key)
+            except Exception:
+                continue
+
+        if found:
+            await self.set_readings(data_type, usage_point_id, list(found.values()), encryption_key)
+            await cache_accounting.delete_keys(redis_client, found_keys)
+            logger.info(f"[{usage_point_id}] [DAILY CACHE] Migrated {len(found)} legacy per-day keys")
+
+        return found
+
+
+daily_cache = DailyRangeCache()
@@ -0,0 +1,236 @@
+"""Per-day cache for load curve (detail) readings.
+
+Format: ``{data_type}:detail:daily:{pdl}:{YYYY-MM-DD}`` = all readings of the day, encrypted
+with the owner's client_secret::
+
+    {"readings": [...], "expected_count": 48, "interval_length": "PT30M", "count": 48}
+
+The legacy format stored one key per reading (``{data_type}:detail:{pdl}:{YYYY-MM-DD}T{HH}:{MM}``,
+~48 keys per day). ``compact_legacy_detail_keys`` rewrites those keys into the per-day format
+and deletes them.
+"""
+import json
+import logging
+import re
+from collections import defaultdict
+from datetime import date
+from typing import Any, Optional
+
+import redis.asyncio as redis
+from sqlalchemy import select
+
+from ..models import PDL, User
+from ..models.database import async_session_maker
+from .cache import cache_service
+from .cache_accounting import cache_accounting
+
+logger = logging.getLogger(__name__)
+
+LEGACY_DETAIL_KEY_RE = re.compile(
+    r"^(consumption|production):detail:(\d{14}):(\d{4}-\d{2}-\d{2})T(\d{2}):(\d{2})$"
+)
+
+EXPECTED_COUNT_BY_INTERVAL = {
+    "PT10M": 144,
+    "PT15M": 96,
+    "PT30M": 48,
+    "PT60M": 24,
+}
+
+
+def detail_daily_key(data_type: str, usage_point_id: str, date_str: str) -> str:
+    """Cache key of the per-day detail entry"""
+    return f"{data_type}:detail:daily:{usage_point_id}:{date_str}"
+
+
+def reading_timestamp(reading: dict[str, Any]) -> str:
+    """Normalized reading timestamp (YYYY-MM-DDTHH:MM), used to de-duplicate readings"""
+    return str(reading.get("date", "")).replace(" ", "T")[:16]
+
+
+def build_daily_entries(readings: list[dict[str, Any]]) -> dict[str, dict[str, Any]]:
+    """Group readings by day into per-day cache entries (keyed by YYYY-MM-DD)"""
+    readings_by_date: dict[str, list] = defaultdict(list)
+    interval_length = "PT30M"  # Default
+
+    for reading in readings:
+        timestamp = reading.get("date", "")
+        if timestamp:
+            readings_by_date[timestamp.replace("T", " ").split(" ")[0]].append(reading)
+            if "interval_length" in reading:
+                interval_length = reading["interval_length"]
+
+    expected_count = EXPECTED_COUNT_BY_INTERVAL.get(interval_length, 48)
+
+    return {
+        date_str: {
+            "readings": day_readings,
+            "expected_count": expected_count,
+            "interval_length": interval_length,
+            "count": len(day_readings),
+        }
+        for date_str, day_readings in readings_by_date.items()
+    }
+
+
+def is_day_complete(entry: dict[str, Any]) -> bool:
+    """A cached day is complete when it holds at least 90% of the expected readings (DST days differ)"""
+    return len(entry.get("readings", [])) >= int(entry.get("expected_count", 48) * 0.9)
+
+
+async def get_detail_days(
+    data_type: str, usage_point_id: str, dates: list[str], encryption_key: str
+) -> dict[str, dict[str, Any]]:
+    """Read the per-day entries of several days with a single MGET (missing days are omitted)"""
+    keys = [detail_daily_key(data_type, usage_point_id, date_str) for date_str in dates]
+    values = await cache_service.get_many(keys, encryption_key)
+    return {
+        date_str: value
+        for date_str, value in zip(dates, values)
+        if isinstance(value, dict) and "readings" in value
+    }
+
+
+async def set_detail_days(
+    data_type: str,
+    usage_point_id: str,
+    readings: list[dict[str, Any]],
+    encryption_key: str,
+    first_day: Optional[str] = None,
+    last_day: Optional[str] = None,
+) -> int:
+    """Cache readings as per-day entries (one pipeline per TTL class). Returns the number of days written.
+
+    Entries replace the cached day, so only the days in ``[first_day, last_day]`` are written when given:
+    a fetch ending at ``last_day + 1`` also returns the 00:00 reading of that day, which must not
+    overwrite the complete day cached by the neighbouring fetch.
+    """
+    items_by_ttl: dict[int, dict[str, Any]] = defaultdict(dict)
+    for date_str, entry in build_daily_entries(readings).items():
+        if (first_day and date_str < first_day) or (last_day and date_str > last_day):
+            continue
+        ttl = cache_service.ttl_for_day(date.fromisoformat(date_str))
+        items_by_ttl[ttl][detail_daily_key(data_type, usage_point_id, date_str)] = entry
+
+    written = 0
+    for ttl, items in items_by_ttl.items():
+        written += await cache_service.set_many(items, encryption_key, ttl=ttl)
+    return written
+
+
+async def compact_legacy_detail_keys(batch_size: int = 50, scan_count: int = 1000) -> dict[str, int]:
+    """Rewrite legacy per-reading detail keys into the per-day format and delete them.
+
+    Each SCAN page (about ``scan_count`` keys) is compacted, written and deleted before the next page
+    is read, so memory stays bounded whatever the number of legacy keys. Keys of a page are grouped by
+    (data_type, PDL, day); each batch of ``batch_size`` days is read, merged with any existing per-day
+    entry (a day split across pages is completed by the next page) and written back with pipelines.
+    Days whose owner is unknown (PDL deleted) are simply dropped.
+    """
+    stats = {"legacy_keys": 0, "days_compacted": 0, "keys_deleted": 0}
+    redis_client = cache_service.redis_client
+    if not redis_client:
+        return stats
+
+    # Owner's client_secret of each PDL seen so far (needed to decrypt / re-encrypt), None when unknown
+    secrets_by_pdl: dict[str, Optional[str]] = {}
+    for pattern in ("consumption:detail:*T*", "production:detail:*T*"):
+        cursor = 0
+        while True:
+            cursor, raw_keys = await redis_client.scan(cursor, match=pattern, count=scan_count)
+            groups: dict[tuple[str, str, str], list[str]] = defaultdict(list)
+            for raw_key in raw_keys:
+                key = raw_key.decode() if isinstance(raw_key, bytes) else raw_key
+                match = LEGACY_DETAIL_KEY_RE.match(key)
+                if match:
+                    groups[(match.group(1), match.group(2), match.group(3))].append(key)
+            if groups:
+                await _compact_groups(redis_client, groups, secrets_by_pdl, batch_size, stats)
+            if cursor == 0:
+                break
+
+    if stats["legacy_keys"]:
+        logger.info(
+            f"[DETAIL CACHE] Compacted {stats['legacy_keys']} legacy keys "
+            f"into {stats['days_compacted']} per-day entries"
+        )
+    return stats
+
+
+async def _compact_groups(
+    redis_client: redis.Redis,
+    groups: dict[tuple[str, str, str], list[str]],
+    secrets_by_pdl: dict[str, Optional[str]],
+    batch_size: int,
+    stats: dict[str, int],
+) -> None:
+    """Compact the legacy keys of one SCAN page, grouped by (data_type, PDL, day)"""
+    stats["legacy_keys"] += sum(len(keys) for keys in groups.values())
+
+    # 1. Resolve the owners of the PDLs not seen on previous pages
+    unknown_pdls = {pdl for _, pdl, _ in groups} - secrets_by_pdl.keys()
+    if unknown_pdls:
+        async with async_session_maker() as db:
+            result = await db.execute(
+                select(PDL.usage_point_id, User.client_secret)
+                .join(User, PDL.user_id == User.id)
+                .where(PDL.usage_point_id.in_(unknown_pdls))
+            )
+            secrets_by_pdl.update(dict.fromkeys(unknown_pdls))
+            secrets_by_pdl.update({row[0]: row[1] for row in result.all()})
+
+    # 2. Compact in batches of days
+    group_items = list(groups.items())
+    for batch_start in range(0, len(group_items), batch_size):
+        batch = group_items[batch_start:batch_start + batch_size]
+
+        async with redis_client.pipeline(transaction=False) as pipe:
+            for (data_type, pdl, date_str), keys in batch:
+                pipe.mget(keys)
+                pipe.get(detail_daily_key(data_type, pdl, date_str))
+            raw_results = await pipe.execute()
+
+        new_entries: dict[str, bytes] = {}
+        keys_to_delete: list[str] = []
+        for index, ((data_type, pdl, date_str), keys) in enumerate(batch):
+            keys_to_delete.extend(keys)
+            secret = secrets_by_pdl.get(pdl)
+            if not secret:
+                continue
+
+            cipher = cache_service._get_cipher(secret)
+            legacy_values, existing_value = raw_results[2 * index], raw_results[2 * index + 1]
+
+            merged: dict[str, dict[str, Any]] = {}
+            for value in legacy_values:
+                if value:
+                    try:
+                        reading = json.loads(cipher.decrypt(value).decode())
+                        merged[reading_timestamp(reading)] = reading
+                    except Exception:
+                        continue
+            if existing_value:
+                try:
+                    for reading in json.loads(cipher.decrypt(existing_value).decode()).get("readings", []):
+                        merged[reading_timestamp(reading)] = reading
+                except Exception:
+                    pass
+
+            if not merged:
+                continue
+
+            entry = build_daily_entries([merged[ts] for ts in sorted(merged)]).get(date_str)
+            if entry:
+                new_entries[detail_daily_key(data_type, pdl, date_str)] = cipher.encrypt(json.dumps(entry).encode())
+
+        async with redis_client.pipeline(transaction=False) as pipe:
+            for key, encrypted in new_entries.items():
+                pipe.setex(key, cache_service.ttl_for_day(date.fromisoformat(key[-10:])), encrypted)
+            if keys_to_delete:
+                pipe.delete(*keys_to_delete)
+            await pipe.execute()
+        # Account the new entries and drop the deleted legacy keys from the index
+        await cache_accounting.record(redis_client, list(new_entries) + keys_to_delete)
+
+        stats["days_compacted"] += len(new_entries)
+        stats["keys_deleted"] += len(keys_to_delete)
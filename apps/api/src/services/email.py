@@ -1,5 +1,6 @@
 import httpx
 from ..config import settings
+from .notification_queue import notification_queue
 import logging
 
 
@@ -21,23 +22,45 @@ class EmailService:
         subject: str,
         html_content: str,
         text_content: str | None = None,
+        digest: str | None = None,
+        digest_subject: str | None = None,
     ) -> bool:
-        """Send an email via Mailgun"""
+        """Queue an email for delivery (see services/notification_queue.py), or send it when no queue runs
+
+        Args:
+            digest: Digest kind: emails of the same kind to the same recipient are sent as one email
+            digest_subject: Subject of the digest email
+        """
+        if not notification_queue.queued:
+            return await self.deliver_email(to_email, subject, html_content, text_content)
+        return await notification_queue.enqueue_email(
+            to_email, subject, html_content, text_content, digest, digest_subject
+        )
+
+    async def deliver_email(
+        self,
+        to_email: str,
+        subject: str,
+        html_content: str,
+        text_content: str | None = None,
+        client: httpx.AsyncClient | None = None,
+    ) -> bool:
+        """Send an email via Mailgun (called by the notification workers)"""
         try:
-            async with httpx.AsyncClient() as client:
-                response = await client.post(
-                    f"{self.base_url}/messages",
-                    auth=("api", self.api_key),
-                    data={
-                        "from": self.from_email,
-                        "to": to_email,
-                        "subject": subject,
-                        "html": html_content,
-                        "text": text_content or "",
-                    },
-                )
-                response.raise_for_status()
-                return True
+            data = {
+                "from": self.from_email,
+                "to": to_email,
+                "subject": subject,
+                "html": html_content,
+                "text": text_content or "",
+            }
+            if client is None:
+                async with httpx.AsyncClient() as own_client:
+                    response = await own_client.post(f"{self.base_url}/messages", auth=("api", self.api_key), data=data)
+            else:
+                response = await client.post(f"{self.base_url}/messages", auth=("api", self.api_key), data=data)
+            response.raise_for_status()
+            return True
         except Exception as e:
             logger.error(f"[EMAIL] Failed to send email to {to_email}: {str(e)}")
             return False
@@ -37,9 +37,11 @@ from typing import Any
 
 import aiomqtt
 import websockets
-from sqlalchemy import String, cast, func, select
+from sqlalchemy import func, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from ..offpeak import compile_schedule
+from ..tempo_calendar import season_bounds, tempo_calendar
 from .base import BaseExporter
 
 logger = logging.getLogger(__name__)
@@ -821,7 +823,7 @@ class HomeAssistantExporter(BaseExporter):
         - sensor.myelectricaldata_tempo_price_red_hp
         - sensor.myelectricaldata_tempo_price_red_hc
         """
-        from ...models.tempo_day import TempoDay, TempoColor
+        from ...models.tempo_day import TempoColor
 
         today = date.today()
         tomorrow = today + timedelta(days=1)
@@ -837,12 +839,10 @@ class HomeAssistantExporter(BaseExporter):
         # RTE TEMPO: Today's and Tomorrow's color
         # =====================================================================
 
+        calendar = await tempo_calendar.get(db)
+
         # Today's color
-        result = await db.execute(
-            select(TempoDay).where(TempoDay.id == today_str)
-        )
-        today_tempo = result.scalar_one_or_none()
-        today_color = today_tempo.color.value if today_tempo else "UNKNOWN"
+        today_color = calendar.color(today) or "UNKNOWN"
 
         await self._publish_sensor_old_format(
             client,
@@ -860,11 +860,7 @@ class HomeAssistantExporter(BaseExporter):
         count += 1
 
         # Tomorrow's color
-        result = await db.execute(
-            select(TempoDay).where(TempoDay.id == tomorrow_str)
-        )
-        tomorrow_tempo = result.scalar_one_or_none()
-        tomorrow_color = tomorrow_tempo.color.value if tomorrow_tempo else "UNKNOWN"
+        tomorrow_color = calendar.color(tomorrow) or "UNKNOWN"
 
         await self._publish_sensor_old_format(
             client,
@@ -886,40 +882,21 @@ class HomeAssistantExporter(BaseExporter):
         # =====================================================================
 
         # Tempo season: Sept 1 to Aug 31
-        if today.month >= 9:
-            season_start = date(today.year, 9, 1)
-            season_end = date(today.year + 1, 8, 31)
-        else:
-            season_start = date(today.year - 1, 9, 1)
-            season_end = date(today.year, 8, 31)
-
+        season_start, season_end = season_bounds(today)
         season_start_str = season_start.isoformat()
         season_end_str = season_end.isoformat()
 
+        # Count used days this season (before today) and remaining days (including today until season end)
+        used_counts = calendar.counts(season_start, today - timedelta(days=1))
+        remaining_counts = calendar.counts(today, season_end)
+
         # Days count per color (consumed + remaining)
         days_data: dict[str, dict[str, int]] = {}
 
         for color in TempoColor:
             color_name = color.value.lower()
-
-            # Count used days this season (before today)
-            result = await db.execute(
-                select(func.count(TempoDay.id))
-                .where(TempoDay.id >= season_start_str)
-                .where(TempoDay.id < today_str)
-                .where(cast(TempoDay.color, String) == color.value)
-            )
-            used = result.scalar() or 0
-
-            # Count remaining days (including today until season end)
-            result = await db.execute(
-                select(func.count(TempoDay.id))
-                .where(TempoDay.id >= today_str)
-                .where(TempoDay.id <= season_end_str)
-                .where(cast(TempoDay.color, String) == color.value)
-            )
-            remaining = result.scalar() or 0
-
+            used = used_counts[color.value]
+            remaining = remaining_counts[color.value]
             quota = TEMPO_QUOTAS.get(color.value, 0)
 
             days_data[color_name] = {
@@ -2434,7 +2411,7 @@ class HomeAssistantExporter(BaseExporter):
 
         from ...models.client_mode import ConsumptionData, ContractData, DataGranularity
         from ...models.pdl import PDL
-        from ...models.tempo_day import TempoColor, TempoDay
+        from ...models.tempo_day import TempoColor
 
         tz_paris = ZoneInfo("Europe/Paris")
 
@@ -2502,14 +2479,8 @@ class HomeAssistantExporter(BaseExporter):
             logger.info(f"[HA-WS] No records found for {pdl}")
             return {}
 
-        # 3. For TEMPO, load the color calendar
-        tempo_colors: dict[str, TempoColor] = {}
-        if "TEMPO" in pricing_option:
-            tempo_result = await db.execute(select(TempoDay))
-            for day in tempo_result.scalars().all():
-                # Store by date string YYYY-MM-DD
-                day_str = day.date.strftime("%Y-%m-%d") if hasattr(day.date, 'strftime') else str(day.date)[:10]
-                tempo_colors[day_str] = day.color
+        # 3. For TEMPO, get the color calendar index
+        calendar = await tempo_calendar.get(db) if "TEMPO" in pricing_option else None
 
         # 4. Initialize stats buckets based on pricing option
         stats_by_tariff: dict[str, list[dict[str, Any]]] = {}
@@ -2533,28 +2504,8 @@ class HomeAssistantExporter(BaseExporter):
             stats_by_tariff["base"] = []
             cumulative_by_tariff["base"] = 0.0
 
-        # 5. Helper to determine if an hour is in off-peak period
-        def is_offpeak_hour(hour: int, minute: int = 0) -> bool:
-            """Check if given time is in off-peak hours"""
-            if not offpeak_hours:
-                # Default: 22h-6h = heures creuses
-                return hour < 6 or hour >= 22
-
-            time_minutes = hour * 60 + minute
-            for period in offpeak_hours:
-                start_parts = period.get("start", "22:00").split(":")
-                end_parts = period.get("end", "06:00").split(":")
-                start_minutes = int(start_parts[0]) * 60 + int(start_parts[1]) if len(start_parts) >= 2 else 22 * 60
-                end_minutes = int(end_parts[0]) * 60 + int(end_parts[1]) if len(end_parts) >= 2 else 6 * 60
-
-                # Handle overnight periods (e.g., 22:00 -> 06:00)
-                if start_minutes > end_minutes:
-                    if time_minutes >= start_minutes or time_minutes < end_minutes:
-                        return True
-                else:
-                    if start_minutes <= time_minutes < end_minutes:
-                        return True
-            return False
+        # 5. Off-peak schedule, compiled once (default: 22h-6h = heures creuses)
+        offpeak = compile_schedule(offpeak_hours, default="22:00-06:00")
 
         # 6. Helper to convert W → Wh based on interval_length
         def convert_w_to_wh(value_w: int, raw_data: dict | None) -> float:
@@ -2620,15 +2571,13 @@ class HomeAssistantExporter(BaseExporter):
                     else:
                         tempo_date = record.date
 
-                date_str = tempo_date.strftime("%Y-%m-%d")
-                color = tempo_colors.get(date_str, TempoColor.BLUE)
-                color_name = color.value.lower() if hasattr(color, 'value') else str(color).lower()
-                tariff_tag = f"{color_name}_{period}"
+                color = calendar.color(tempo_date) if calendar else None
+                tariff_tag = f"{(color or TempoColor.BLUE.value).lower()}_{period}"
 
             elif pricing_option in ("HC/HP", "HCHP", "EJP"):
                 # HC/HP: use off-peak hours from contract
                 # Use start of hour for tariff determination
-                if is_offpeak_hour(hour, 0):
+                if offpeak.is_offpeak(hour * 60):
                     tariff_tag = "hc"
                 else:
                     tariff_tag = "hp"
@@ -2657,12 +2606,10 @@ class HomeAssistantExporter(BaseExporter):
                                 h_tempo_date = record.date - timedelta(days=1)
                             else:
                                 h_tempo_date = record.date
-                        h_date_str = h_tempo_date.strftime("%Y-%m-%d")
-                        h_color = tempo_colors.get(h_date_str, TempoColor.BLUE)
-                        h_color_name = h_color.value.lower() if hasattr(h_color, 'value') else str(h_color).lower()
-                        h_tariff_tag = f"{h_color_name}_{h_period}"
+                        h_color = calendar.color(h_tempo_date) if calendar else None
+                        h_tariff_tag = f"{(h_color or TempoColor.BLUE.value).lower()}_{h_period}"
                     elif pricing_option in ("HC/HP", "HCHP", "EJP"):
-                        h_tariff_tag = "hc" if is_offpeak_hour(h, 0) else "hp"
+                        h_tariff_tag = "hc" if offpeak.is_offpeak(h * 60) else "hp"
                     else:
                         h_tariff_tag = "base"
 
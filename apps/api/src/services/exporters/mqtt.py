@@ -25,6 +25,7 @@ import aiomqtt
 from sqlalchemy import String, cast, func, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from ..tempo_calendar import season_bounds, tempo_calendar
 from .base import BaseExporter
 
 logger = logging.getLogger(__name__)
@@ -387,37 +388,22 @@ class MQTTExporter(BaseExporter):
 
     async def _get_tempo_data(self, db: AsyncSession) -> dict[str, Any] | None:
         """Get Tempo data"""
-        from ...models.tempo import TempoDay
-
         today = date.today()
         tomorrow = today + timedelta(days=1)
+        calendar = await tempo_calendar.get(db)
 
-        # Get today's color
-        stmt = select(TempoDay).where(TempoDay.date == today)
-        result = await db.execute(stmt)
-        today_row = result.scalar_one_or_none()
+        today_color = calendar.color(today)
+        tomorrow_color = calendar.color(tomorrow)
 
-        # Get tomorrow's color
-        stmt = select(TempoDay).where(TempoDay.date == tomorrow)
-        result = await db.execute(stmt)
-        tomorrow_row = result.scalar_one_or_none()
-
-        if not today_row and not tomorrow_row:
+        if not today_color and not tomorrow_color:
             return None
 
         # Calculate remaining days for current season
         # Tempo season: Sept 1 to Aug 31
-        month = today.month
-        season_start = date(today.year if month >= 9 else today.year - 1, 9, 1)
-        season_end = date(today.year + 1 if month >= 9 else today.year, 8, 31)
+        season_start, season_end = season_bounds(today)
 
         # Count used days by color
-        stmt = select(TempoDay.color, func.count(TempoDay.id)).where(
-            TempoDay.date >= season_start,
-            TempoDay.date <= today,
-        ).group_by(TempoDay.color)
-        result = await db.execute(stmt)
-        used = {row[0]: row[1] for row in result.all()}
+        used = calendar.counts(season_start, today)
 
         remaining = {
             "blue": TEMPO_QUOTAS["BLUE"] - used.get("BLUE", 0),
@@ -427,11 +413,11 @@ class MQTTExporter(BaseExporter):
 
         return {
             "today": {
-                "color": today_row.color if today_row else "UNKNOWN",
+                "color": today_color or "UNKNOWN",
                 "date": today.isoformat(),
             },
             "tomorrow": {
-                "color": tomorrow_row.color if tomorrow_row else "UNKNOWN",
+                "color": tomorrow_color or "UNKNOWN",
                 "date": tomorrow.isoformat(),
             },
             "remaining": remaining,
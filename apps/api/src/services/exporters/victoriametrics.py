@@ -17,9 +17,10 @@ from datetime import date, datetime, timedelta
 from typing import Any, Optional
 
 import httpx
-from sqlalchemy import String, cast, func, select
+from sqlalchemy import func, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from ..tempo_calendar import season_bounds, tempo_calendar
 from .base import BaseExporter
 
 logger = logging.getLogger(__name__)
@@ -503,21 +504,18 @@ class VictoriaMetricsExporter(BaseExporter):
 
     async def _build_tempo_global_lines(self, db: AsyncSession, now_ns: int) -> list[str]:
         """Build InfluxDB lines for global Tempo data"""
-        from ...models.tempo_day import TempoDay, TempoColor
+        from ...models.tempo_day import TempoColor
 
         lines = []
         today = date.today()
         tomorrow = today + timedelta(days=1)
+        calendar = await tempo_calendar.get(db)
 
         # Color map for numeric values (for graphing)
         color_values = {"BLUE": 1, "WHITE": 2, "RED": 3, "UNKNOWN": 0}
 
         # Today's color
-        today_str = today.isoformat()
-        result = await db.execute(select(TempoDay).where(TempoDay.id == today_str))
-        today_tempo = result.scalar_one_or_none()
-
-        today_color = today_tempo.color.value if today_tempo else "UNKNOWN"
+        today_color = calendar.color(today) or "UNKNOWN"
         lines.append(self._to_line_protocol(
             measurement="tempo_color",
             tags={"day": "today"},
@@ -526,11 +524,7 @@ class VictoriaMetricsExporter(BaseExporter):
         ))
 
         # Tomorrow's color
-        tomorrow_str = tomorrow.isoformat()
-        result = await db.execute(select(TempoDay).where(TempoDay.id == tomorrow_str))
-        tomorrow_tempo = result.scalar_one_or_none()
-
-        tomorrow_color = tomorrow_tempo.color.value if tomorrow_tempo else "UNKNOWN"
+        tomorrow_color = calendar.color(tomorrow) or "UNKNOWN"
         lines.append(self._to_line_protocol(
             measurement="tempo_color",
             tags={"day": "tomorrow"},
@@ -539,21 +533,11 @@ class VictoriaMetricsExporter(BaseExporter):
         ))
 
         # Tempo season stats (Sept 1 to Aug 31)
-        if today.month >= 9:
-            season_start = date(today.year, 9, 1)
-        else:
-            season_start = date(today.year - 1, 9, 1)
-
-        season_start_str = season_start.isoformat()
+        season_start, _ = season_bounds(today)
+        totals = calendar.counts(season_start, today)
 
         for color in TempoColor:
-            result = await db.execute(
-                select(func.count(TempoDay.id))
-                .where(TempoDay.id >= season_start_str)
-                .where(TempoDay.id <= today_str)
-                .where(cast(TempoDay.color, String) == color.value)
-            )
-            total = result.scalar() or 0
+            total = totals[color.value]
             quota = TEMPO_QUOTAS.get(color.value, 0)
             remaining = max(0, quota - total)
 
@@ -0,0 +1,215 @@
+"""Compact representations of load-curve responses (``meter_reading.interval_reading``).
+
+Opt-in, selected with ``?format=`` or the ``Accept`` header:
+- ``json`` (default): unchanged Enedis layout, one dict per reading
+- ``columnar`` (``application/vnd.myelectricaldata.columnar+json``): ``meter_reading.interval_reading``
+  is replaced by ``meter_reading.columnar``::
+
+      {"start": "2024-01-01 00:30:00", "step": 1800, "interval_length": "PT30M", "measure_type": "B",
+       "values": [812, 790, ...], "breaks": [{"index": 4210, "date": "...", "step": 600, ...}]}
+
+  Reading ``i`` is at ``date(i - 1) + step``; a ``break`` restarts the series at ``index`` with its
+  own ``date``, ``step``, ``interval_length`` and ``measure_type`` (gaps, DST, interval changes).
+- ``msgpack`` (``application/msgpack``): the columnar response encoded with MessagePack
+
+Micro-benchmark (from apps/api): ``python -m src.services.load_curve``
+"""
+import logging
+from datetime import datetime, timedelta
+from typing import Any, Optional
+
+from fastapi import Request, Response
+from pydantic_core import to_json, to_jsonable_python
+
+from ..schemas import APIResponse
+
+logger = logging.getLogger(__name__)
+
+COLUMNAR_MEDIA_TYPE = "application/vnd.myelectricaldata.columnar+json"
+MSGPACK_MEDIA_TYPES = ("application/msgpack", "application/x-msgpack", "application/vnd.msgpack")
+FORMATS = ("json", "columnar", "msgpack")
+
+
+def _number(value: Any) -> Optional[float | int]:
+    if value is None or isinstance(value, (int, float)):
+        return value
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        try:
+            return float(value)
+        except (TypeError, ValueError):
+            return None
+
+
+def _parse_date(value: str) -> datetime:
+    return datetime.fromisoformat(value)
+
+
+def encode_columnar(readings: list[dict[str, Any]]) -> dict[str, Any]:
+    """Columnar form of a sorted list of Enedis interval readings"""
+    if not readings:
+        return {"start": None, "step": 0, "interval_length": None, "measure_type": None, "values": [], "breaks": []}
+
+    dates = [_parse_date(r["date"]) for r in readings]
+    values = [_number(r.get("value")) for r in readings]
+
+    def step_at(i: int, fallback: int) -> int:
+        return int((dates[i + 1] - dates[i]).total_seconds()) if i + 1 < len(dates) else fallback
+
+    first = readings[0]
+    step = step_at(0, 0)
+    interval_length = first.get("interval_length")
+    measure_type = first.get("measure_type")
+    breaks = []
+
+    for i in range(1, len(readings)):
+        reading = readings[i]
+        if (
+            int((dates[i] - dates[i - 1]).total_seconds()) != step
+            or reading.get("interval_length") != interval_length
+            or reading.get("measure_type") != measure_type
+        ):
+            step = step_at(i, step)
+            interval_length = reading.get("interval_length")
+            measure_type = reading.get("measure_type")
+            breaks.append({
+                "index": i,
+                "date": reading["date"],
+                "step": step,
+                "interval_length": interval_length,
+                "measure_type": measure_type,
+            })
+
+    return {
+        "start": first["date"],
+        "step": step_at(0, 0),
+        "interval_length": first.get("interval_length"),
+        "measure_type": first.get("measure_type"),
+        "values": values,
+        "breaks": breaks,
+    }
+
+
+def decode_columnar(columnar: dict[str, Any]) -> list[dict[str, Any]]:
+    """Interval readings of a columnar series (values as numbers, dates as "YYYY-MM-DD HH:MM:SS")"""
+    values = columnar["values"]
+    if not values:
+        return []
+
+    breaks = {b["index"]: b for b in columnar["breaks"]}
+    current = _parse_date(columnar["start"])
+    step = columnar["step"]
+    interval_length = columnar["interval_length"]
+    measure_type = columnar["measure_type"]
+    readings = []
+    for i, value in enumerate(values):
+        brk = breaks.get(i)
+        if brk:
+            current = _parse_date(brk["date"])
+            step = brk["step"]
+            interval_length = brk["interval_length"]
+            measure_type = brk["measure_type"]
+        elif i:
+            current += timedelta(seconds=step)
+        readings.append({
+            "date": current.isoformat(sep=" "),
+            "value": value,
+            "interval_length": interval_length,
+            "measure_type": measure_type,
+        })
+    return readings
+
+
+def negotiate_format(request: Request, requested: Optional[str]) -> str:
+    """Response format from ``?format=`` first, then the ``Accept`` header"""
+    if requested:
+        requested = requested.lower()
+        return requested if requested in FORMATS else "json"
+    accept = request.headers.get("accept", "")
+    if any(media_type in accept for media_type in MSGPACK_MEDIA_TYPES):
+        return "msgpack"
+    if COLUMNAR_MEDIA_TYPE in accept:
+        return "columnar"
+    return "json"
+
+
+def to_columnar_payload(response: APIResponse) -> dict[str, Any]:
+    """APIResponse as a dict, with its load curve in columnar form"""
+    payload = response.model_dump(mode="json", exclude={"data"})
+    data = response.data
+    if isinstance(data, dict) and isinstance(data.get("meter_reading"), dict):
+        meter_reading = {k: v for k, v in data["meter_reading"].items() if k != "interval_reading"}
+        meter_reading["columnar"] = encode_columnar(data["meter_reading"].get("interval_reading") or [])
+        data = {**data, "meter_reading": meter_reading}
+    payload["data"] = data
+    return payload
+
+
+def render_load_curve(request: Request, response: APIResponse, requested: Optional[str]) -> APIResponse | Response:
+    """Load-curve response in the format negotiated with the client"""
+    response_format = negotiate_format(request, requested)
+    if response_format == "json" or not response.success:
+        return response
+
+    payload = to_columnar_payload(response)
+    if response_format == "msgpack":
+        try:
+            import msgpack
+        except ImportError:
+            logger.warning("[LOAD CURVE] msgpack requested but the 'msgpack' package is not installed, using columnar JSON")
+        else:
+            return Response(content=msgpack.packb(to_jsonable_python(payload)), media_type=MSGPACK_MEDIA_TYPES[0])
+    return Response(content=to_json(payload), media_type=COLUMNAR_MEDIA_TYPE)
+
+
+def _benchmark(days: int = 730) -> None:
+    import gzip
+    import json
+    import time
+
+    import msgpack
+    from fastapi.encoders import jsonable_encoder
+
+    start = datetime(2024, 1, 1, 0, 30)
+    readings = [
+        {
+            "value": str(500 + (i * 37) % 900),
+            "date": (start + timedelta(minutes=30 * i)).isoformat(sep=" "),
+            "interval_length": "PT30M",
+            "measure_type": "B",
+        }
+        for i in range(days * 48)
+    ]
+    response = APIResponse(success=True, data={"meter_reading": {"interval_reading": readings}})
+
+    def best(fn: Any, repeat: int = 5) -> tuple[Any, float]:
+        timings = []
+        for _ in range(repeat):
+            t0 = time.perf_counter()
+            result = fn()
+            timings.append(time.perf_counter() - t0)
+        return result, min(timings) * 1000
+
+    # JSON: what FastAPI does for response_model=APIResponse (jsonable_encoder + json.dumps)
+    body, json_server = best(lambda: json.dumps(jsonable_encoder(response)).encode())
+    _, json_client = best(lambda: json.loads(body))
+    columnar, columnar_server = best(lambda: to_json(to_columnar_payload(response)))
+    _, columnar_client = best(lambda: json.loads(columnar))
+    packed, msgpack_server = best(lambda: msgpack.packb(to_jsonable_python(to_columnar_payload(response))))
+    _, msgpack_client = best(lambda: msgpack.unpackb(packed))
+
+    assert decode_columnar(json.loads(columnar)["data"]["meter_reading"]["columnar"])[-1]["date"] == readings[-1]["date"]
+
+    print(f"{len(readings)} readings ({days} days)")
+    print(f"{'format':<10} {'bytes':>10} {'gzip':>10} {'encode ms':>10} {'decode ms':>10}")
+    for name, data, server, client in [
+        ("json", body, json_server, json_client),
+        ("columnar", columnar, columnar_server, columnar_client),
+        ("msgpack", packed, msgpack_server, msgpack_client),
+    ]:
+        print(f"{name:<10} {len(data):>10} {len(gzip.compress(data)):>10} {server:>10.1f} {client:>10.1f}")
+
+
+if __name__ == "__main__":
+    _benchmark()
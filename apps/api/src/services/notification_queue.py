@@ -0,0 +1,358 @@
+"""Outbound notification queue (emails and Slack), delivered by background workers.
+
+Layout (Redis):
+- ``notifications:queue``              : LIST of messages ready to be delivered
+- ``notifications:retry``              : ZSET of failed messages, scored by their next attempt time
+- ``notifications:dead``               : LIST of messages that exhausted their attempts (last 1000, expires
+                                         ``NOTIFICATION_DEAD_LETTER_TTL_SECONDS`` after the last one). Emails
+                                         are kept without their body (verification / reset links)
+- ``notifications:digests``            : ZSET of pending digest groups, scored by their flush time
+- ``notifications:digest:{kind}:{to}`` : LIST of messages of a digest group
+- ``notifications:workers``            : ZSET of worker ids, scored by their last heartbeat
+- ``notifications:processing:{worker}``: LIST of messages taken by a worker and not yet acknowledged
+
+Requests only enqueue: delivery latency (Mailgun, Slack) never lands in API response times.
+Workers deliver in batches over a shared HTTP client and retry failures with jittered backoff.
+Messages are moved (LMOVE) to the worker's processing list and removed from it only once delivered or
+rescheduled, so the processing list of a worker silent for ``NOTIFICATION_WORKER_LEASE_SECONDS``
+(replica killed mid-batch) is moved back to the queue and delivered again.
+Messages enqueued with a ``digest`` kind are held ``NOTIFICATION_DIGEST_WINDOW_SECONDS`` and every
+message of the same kind for the same recipient is sent as a single email.
+
+Without Redis or running workers (client mode, scripts), messages are delivered directly.
+"""
+import asyncio
+import json
+import logging
+import re
+import time
+import uuid
+from datetime import UTC, datetime
+from typing import Any, Optional
+
+import httpx
+
+from ..adapters.http_resilience import backoff_delay
+from ..config import settings
+from .cache import cache_service
+
+logger = logging.getLogger(__name__)
+
+QUEUE_KEY = "notifications:queue"
+RETRY_KEY = "notifications:retry"
+DEAD_KEY = "notifications:dead"
+DIGESTS_KEY = "notifications:digests"
+WORKERS_KEY = "notifications:workers"
+PROCESSING_KEY_PREFIX = "notifications:processing:"
+DEAD_LETTER_MAX = 1000
+
+# Move the due retries back to the queue (ZREM and RPUSH in one step: a message is never in neither)
+PROMOTE_RETRIES_SCRIPT = """
+local due = redis.call('ZRANGEBYSCORE', KEYS[1], '-inf', ARGV[1], 'LIMIT', 0, ARGV[2])
+for _, payload in ipairs(due) do
+    redis.call('ZREM', KEYS[1], payload)
+    redis.call('RPUSH', KEYS[2], payload)
+end
+return #due
+"""
+
+# Take a closed digest group into the worker's processing list. Returns its messages (empty if already taken)
+TAKE_DIGEST_SCRIPT = """
+if redis.call('ZREM', KEYS[1], ARGV[1]) == 0 then
+    return {}
+end
+local payloads = redis.call('LRANGE', KEYS[2], 0, -1)
+for _, payload in ipairs(payloads) do
+    redis.call('RPUSH', KEYS[3], payload)
+end
+redis.call('DEL', KEYS[2])
+return payloads
+"""
+
+# Requeue the processing lists of the workers whose heartbeat is older than ARGV[1], in their order
+REQUEUE_STALE_SCRIPT = """
+local moved = 0
+for _, worker in ipairs(redis.call('ZRANGEBYSCORE', KEYS[1], '-inf', ARGV[1])) do
+    while redis.call('LMOVE', ARGV[2] .. worker, KEYS[2], 'RIGHT', 'LEFT') do
+        moved = moved + 1
+    end
+    redis.call('ZREM', KEYS[1], worker)
+end
+return moved
+"""
+
+# Messages of a batch, with the payloads to acknowledge in the processing list once handled
+Batch = list[tuple[dict[str, Any], list[bytes]]]
+
+_BODY_RE = re.compile(r"<body[^>]*>(.*)</body>", re.DOTALL | re.IGNORECASE)
+
+
+def merge_digest(messages: list[dict[str, Any]]) -> dict[str, Any]:
+    """Combine the emails of a digest group into a single email (bodies one after the other)"""
+    if len(messages) == 1:
+        return messages[0]
+
+    first = messages[0]
+    sections = []
+    for message in messages:
+        match = _BODY_RE.search(message["html"])
+        sections.append(match.group(1) if match else message["html"])
+    separator = '<hr style="border: none; border-top: 2px solid #ddd; margin: 30px 0;">'
+    html = first["html"]
+    match = _BODY_RE.search(html)
+    if match:
+        html = html[: match.start(1)] + separator.join(sections) + html[match.end(1):]
+    else:
+        html = separator.join(sections)
+
+    return {
+        **first,
+        "id": uuid.uuid4().hex,
+        "subject": f"{first.get('digest_subject') or first['subject']} ({len(messages)})",
+        "html": html,
+        "text": "\n\n----------\n\n".join(m.get("text") or "" for m in messages),
+        "digest": None,
+        "attempts": 0,
+    }
+
+
+def dead_letter_entry(message: dict[str, Any]) -> dict[str, Any]:
+    """What is kept of a message that exhausted its attempts: email bodies may hold account tokens"""
+    entry = {**message, "failed_at": datetime.now(UTC).isoformat()}
+    if message["channel"] == "email":
+        entry.pop("html", None)
+        entry.pop("text", None)
+    return entry
+
+
+class NotificationQueue:
+    """Enqueue outbound notifications and deliver them from a worker pool"""
+
+    def __init__(self) -> None:
+        self._workers: list[asyncio.Task] = []
+        self._replica_id = uuid.uuid4().hex[:12]
+
+    def _digest_key(self, kind: str, to: str) -> str:
+        return f"notifications:digest:{kind}:{to}"
+
+    def _processing_key(self, worker_id: str) -> str:
+        return f"{PROCESSING_KEY_PREFIX}{worker_id}"
+
+    @property
+    def queued(self) -> bool:
+        """True when messages go through Redis to running workers"""
+        return cache_service.redis_client is not None and bool(self._workers)
+
+    async def enqueue_email(
+        self,
+        to: str,
+        subject: str,
+        html: str,
+        text: Optional[str] = None,
+        digest: Optional[str] = None,
+        digest_subject: Optional[str] = None,
+    ) -> bool:
+        """Queue an email. With ``digest``, emails of that kind to the same recipient are coalesced.
+
+        Returns:
+            True if queued (or delivered, without queue)
+        """
+        return await self._enqueue(
+            {"channel": "email", "to": to, "subject": subject, "html": html, "text": text or ""},
+            digest,
+            digest_subject,
+        )
+
+    async def enqueue_slack(self, message: str, blocks: Optional[list[dict[str, Any]]] = None) -> bool:
+        """Queue a Slack webhook notification"""
+        return await self._enqueue({"channel": "slack", "message": message, "blocks": blocks})
+
+    async def _enqueue(
+        self, message: dict[str, Any], digest: Optional[str] = None, digest_subject: Optional[str] = None
+    ) -> bool:
+        message = {
+            **message,
+            "id": uuid.uuid4().hex,
+            "attempts": 0,
+            "digest": digest,
+            "digest_subject": digest_subject,
+            "created_at": datetime.now(UTC).isoformat(),
+        }
+
+        if not self.queued:
+            return await self._deliver_local(message)
+
+        redis_client = cache_service.redis_client
+        try:
+            payload = json.dumps(message)
+            if digest and message["channel"] == "email":
+                flush_at = time.time() + settings.NOTIFICATION_DIGEST_WINDOW_SECONDS
+                async with redis_client.pipeline(transaction=False) as pipe:  # type: ignore[union-attr]
+                    pipe.rpush(self._digest_key(digest, message["to"]), payload)
+                    # NX: the window starts with the first message of the group
+                    pipe.zadd(DIGESTS_KEY, {f"{digest}:{message['to']}": flush_at}, nx=True)
+                    await pipe.execute()
+            else:
+                await redis_client.rpush(QUEUE_KEY, payload)  # type: ignore[union-attr]
+            return True
+        except Exception as e:
+            logger.error(f"[NOTIFICATIONS] Failed to enqueue {message['channel']} notification, sending now: {e}")
+            return await self._deliver_local(message)
+
+    async def _deliver_local(self, message: dict[str, Any]) -> bool:
+        async with httpx.AsyncClient(timeout=settings.NOTIFICATION_HTTP_TIMEOUT_SECONDS) as client:
+            return await self._deliver(message, client)
+
+    async def _deliver(self, message: dict[str, Any], client: httpx.AsyncClient) -> bool:
+        # Imported here: the email and Slack services enqueue through this module
+        from .email import email_service
+        from .slack import slack_service
+
+        if message["channel"] == "email":
+            return await email_service.deliver_email(
+                message["to"], message["subject"], message["html"], message.get("text"), client=client
+            )
+        return await slack_service.deliver(message["message"], message.get("blocks"), client=client)
+
+    async def _acknowledge(self, worker_id: str, payloads: list[bytes]) -> None:
+        """Remove handled messages from the worker's processing list"""
+        async with cache_service.redis_client.pipeline(transaction=False) as pipe:  # type: ignore[union-attr]
+            for payload in payloads:
+                pipe.lrem(self._processing_key(worker_id), 1, payload)
+            await pipe.execute()
+
+    async def _schedule_retry(
+        self, message: dict[str, Any], worker_id: str, payloads: list[bytes], error: Optional[str] = None
+    ) -> None:
+        """Reschedule (or dead-letter) a failed message and acknowledge it in the same transaction"""
+        message = {**message, "attempts": message["attempts"] + 1, "last_error": error}
+        async with cache_service.redis_client.pipeline(transaction=True) as pipe:  # type: ignore[union-attr]
+            if message["attempts"] >= settings.NOTIFICATION_MAX_ATTEMPTS:
+                logger.error(
+                    f"[NOTIFICATIONS] Giving up {message['channel']} notification {message['id']} "
+                    f"after {message['attempts']} attempts"
+                )
+                pipe.lpush(DEAD_KEY, json.dumps(dead_letter_entry(message)))
+                pipe.ltrim(DEAD_KEY, 0, DEAD_LETTER_MAX - 1)
+                pipe.expire(DEAD_KEY, settings.NOTIFICATION_DEAD_LETTER_TTL_SECONDS)
+            else:
+                delay = settings.NOTIFICATION_RETRY_BASE_SECONDS + backoff_delay(
+                    message["attempts"],
+                    settings.NOTIFICATION_RETRY_BASE_SECONDS,
+                    settings.NOTIFICATION_RETRY_MAX_SECONDS,
+                )
+                pipe.zadd(RETRY_KEY, {json.dumps(message): time.time() + delay})
+            for payload in payloads:
+                pipe.lrem(self._processing_key(worker_id), 1, payload)
+            await pipe.execute()
+
+    async def _promote_due(self, worker_id: str) -> Batch:
+        """Heartbeat, requeue the messages of stopped workers and the due retries, take the closed digest groups"""
+        redis_client = cache_service.redis_client
+        now = time.time()
+
+        await redis_client.zadd(WORKERS_KEY, {worker_id: now})  # type: ignore[union-attr]
+        requeue_stale = redis_client.register_script(REQUEUE_STALE_SCRIPT)  # type: ignore[union-attr]
+        stale_before = now - settings.NOTIFICATION_WORKER_LEASE_SECONDS
+        requeued = await requeue_stale(keys=[WORKERS_KEY, QUEUE_KEY], args=[stale_before, PROCESSING_KEY_PREFIX])
+        if requeued:
+            logger.warning(f"[NOTIFICATIONS] Requeued {requeued} messages taken by a stopped worker")
+
+        promote_retries = redis_client.register_script(PROMOTE_RETRIES_SCRIPT)  # type: ignore[union-attr]
+        await promote_retries(keys=[RETRY_KEY, QUEUE_KEY], args=[now, 100])
+
+        digests: Batch = []
+        take_digest = redis_client.register_script(TAKE_DIGEST_SCRIPT)  # type: ignore[union-attr]
+        for member in await redis_client.zrangebyscore(DIGESTS_KEY, 0, now, start=0, num=100):  # type: ignore[union-attr]
+            group = member.decode()
+            kind, to = group.split(":", 1)
+            # The group is moved to the processing list: its messages are requeued one by one if the worker dies
+            payloads = await take_digest(
+                keys=[DIGESTS_KEY, self._digest_key(kind, to), self._processing_key(worker_id)], args=[group]
+            )
+            if payloads:
+                digests.append((merge_digest([json.loads(p) for p in payloads]), payloads))
+        return digests
+
+    async def _take_batch(self, worker_id: str) -> Batch:
+        redis_client = cache_service.redis_client
+        processing_key = self._processing_key(worker_id)
+        payload = await redis_client.blmove(QUEUE_KEY, processing_key, 1, "LEFT", "RIGHT")  # type: ignore[union-attr]
+        if payload is None:
+            return []
+        payloads: list[bytes] = [payload]  # type: ignore[list-item]
+        async with redis_client.pipeline(transaction=False) as pipe:  # type: ignore[union-attr]
+            for _ in range(settings.NOTIFICATION_BATCH_SIZE - 1):
+                pipe.lmove(QUEUE_KEY, processing_key, "LEFT", "RIGHT")
+            payloads.extend(p for p in await pipe.execute() if p is not None)
+        return [(json.loads(p), [p]) for p in payloads]
+
+    async def _deliver_batch(self, worker_id: str, batch: Batch) -> None:
+        semaphore = asyncio.Semaphore(settings.NOTIFICATION_CONCURRENCY)
+
+        async def deliver(message: dict[str, Any], payloads: list[bytes], client: httpx.AsyncClient) -> None:
+            error = None
+            async with semaphore:
+                try:
+                    delivered = await self._deliver(message, client)
+                except Exception as e:
+                    logger.error(f"[NOTIFICATIONS] Delivery error for {message['id']}: {e}")
+                    delivered = False
+                    error = str(e)
+            if delivered:
+                await self._acknowledge(worker_id, payloads)
+            else:
+                await self._schedule_retry(message, worker_id, payloads, error or "not delivered")
+
+        async with httpx.AsyncClient(timeout=settings.NOTIFICATION_HTTP_TIMEOUT_SECONDS) as client:
+            await asyncio.gather(*(deliver(message, payloads, client) for message, payloads in batch))
+
+    async def _worker(self, index: int) -> None:
+        worker_id = f"{self._replica_id}:{index}"
+        while True:
+            try:
+                if not cache_service.redis_client:
+                    await asyncio.sleep(30)
+                    continue
+                batch = await self._promote_due(worker_id)
+                batch.extend(await self._take_batch(worker_id))
+                if batch:
+                    await self._deliver_batch(worker_id, batch)
+                    logger.debug(f"[NOTIFICATIONS] Worker {index} delivered a batch of {len(batch)}")
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"[NOTIFICATIONS] Worker {index} error: {e}")
+                await asyncio.sleep(5)
+
+    def start_workers(self) -> None:
+        """Start the delivery workers of this replica"""
+        for index in range(settings.NOTIFICATION_WORKERS):
+            self._workers.append(asyncio.create_task(self._worker(index)))
+
+    async def stats(self) -> dict[str, Any]:
+        """Queue depth per state"""
+        redis_client = cache_service.redis_client
+        if not redis_client:
+            return {"backend": "direct", "workers": 0}
+        worker_ids = await redis_client.zrange(WORKERS_KEY, 0, -1)
+        async with redis_client.pipeline(transaction=False) as pipe:
+            pipe.llen(QUEUE_KEY)
+            pipe.zcard(RETRY_KEY)
+            pipe.zcard(DIGESTS_KEY)
+            pipe.llen(DEAD_KEY)
+            for worker_id in worker_ids:
+                pipe.llen(self._processing_key(worker_id.decode()))
+            queued, retrying, digests, dead, *processing = await pipe.execute()
+        return {
+            "backend": "redis",
+            "workers": len(self._workers),
+            "queued": queued,
+            "processing": sum(processing),
+            "retrying": retrying,
+            "pending_digests": digests,
+            "dead": dead,
+        }
+
+
+notification_queue = NotificationQueue()
@@ -0,0 +1,245 @@
+"""Versioned snapshot of the current energy offer catalogue (GET /energy/offers).
+
+Layout (Redis, when available):
+- ``offer_catalogue:version``            : catalogue version, bumped by every offer write (``invalidate()``)
+- ``offer_catalogue:snapshot:{version}`` : JSON list of the serialised current offers of that version
+
+Each process keeps the snapshot of the current version in memory: every offer is serialised once
+to a JSON fragment, with per ``offer_type`` and per provider indexes. Responses are assembled from
+the fragments (no ORM load, no serialisation per request) and carry an ``ETag``; ``If-None-Match``
+is answered with 304.
+
+Current offers also expire by date (``valid_to >= now``): expired offers are filtered out when a
+snapshot is loaded, and the in-memory snapshot is rebuilt once the first ``valid_to`` it contains
+has passed.
+"""
+import asyncio
+import hashlib
+import json
+import logging
+import time
+from dataclasses import dataclass, field
+from datetime import UTC, datetime
+from typing import Any, Optional
+
+from fastapi import Request, Response
+from pydantic_core import to_json
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..config import settings
+from ..models import EnergyOffer
+from .cache import cache_service
+from .response_cache import etag_matches
+
+logger = logging.getLogger(__name__)
+
+VERSION_KEY = "offer_catalogue:version"
+
+
+def serialize_offer(o: EnergyOffer) -> dict[str, Any]:
+    """Public representation of an offer (GET /energy/offers)"""
+    return {
+        "id": o.id,
+        "provider_id": o.provider_id,
+        "name": o.name,
+        "offer_type": o.offer_type,
+        "description": o.description,
+        "subscription_price": o.subscription_price,
+        "base_price": o.base_price,
+        "hc_price": o.hc_price,
+        "hp_price": o.hp_price,
+        "base_price_weekend": o.base_price_weekend,
+        "hc_price_weekend": o.hc_price_weekend,
+        "hp_price_weekend": o.hp_price_weekend,
+        "tempo_blue_hc": o.tempo_blue_hc,
+        "tempo_blue_hp": o.tempo_blue_hp,
+        "tempo_white_hc": o.tempo_white_hc,
+        "tempo_white_hp": o.tempo_white_hp,
+        "tempo_red_hc": o.tempo_red_hc,
+        "tempo_red_hp": o.tempo_red_hp,
+        "ejp_normal": o.ejp_normal,
+        "ejp_peak": o.ejp_peak,
+        "hc_price_winter": o.hc_price_winter,
+        "hp_price_winter": o.hp_price_winter,
+        "hc_price_summer": o.hc_price_summer,
+        "hp_price_summer": o.hp_price_summer,
+        "peak_day_price": o.peak_day_price,
+        "hc_schedules": o.hc_schedules,
+        "power_kva": o.power_kva,
+        "price_updated_at": o.price_updated_at.isoformat() if o.price_updated_at else None,
+        "valid_from": o.valid_from.isoformat() if o.valid_from else None,
+        "valid_to": o.valid_to.isoformat() if o.valid_to else None,
+        "offer_url": o.offer_url,
+        "is_active": o.is_active,
+        "created_at": o.created_at.isoformat() if o.created_at else None,
+    }
+
+
+def _parse_valid_to(value: Optional[str]) -> Optional[float]:
+    if not value:
+        return None
+    valid_to = datetime.fromisoformat(value)
+    if valid_to.tzinfo is None:
+        valid_to = valid_to.replace(tzinfo=UTC)
+    return valid_to.timestamp()
+
+
+@dataclass
+class CatalogueSnapshot:
+    """Serialised current offers of one catalogue version, with lookup indexes"""
+
+    version: int
+    fragments: list[bytes]
+    by_type: dict[str, list[int]]
+    by_provider: dict[str, list[int]]
+    expires_at: float
+    # (provider_id, offer_type) -> (JSON array bytes, ETag), filled on first use
+    bodies: dict[tuple[Optional[str], Optional[str]], tuple[bytes, str]] = field(default_factory=dict)
+
+    @classmethod
+    def build(cls, version: int, offers: list[dict[str, Any]]) -> "CatalogueSnapshot":
+        now = time.time()
+        expires_at = now + settings.OFFER_CATALOGUE_TTL_SECONDS
+        fragments: list[bytes] = []
+        by_type: dict[str, list[int]] = {}
+        by_provider: dict[str, list[int]] = {}
+
+        for offer in offers:
+            valid_to = _parse_valid_to(offer.get("valid_to"))
+            if valid_to is not None:
+                if valid_to < now:
+                    continue  # Expired since the snapshot was stored
+                expires_at = min(expires_at, valid_to)
+            index = len(fragments)
+            fragments.append(to_json(offer))
+            by_type.setdefault(offer["offer_type"], []).append(index)
+            by_provider.setdefault(offer["provider_id"], []).append(index)
+
+        return cls(version, fragments, by_type, by_provider, expires_at)
+
+    def body(self, provider_id: Optional[str], offer_type: Optional[str]) -> tuple[bytes, str]:
+        """JSON array of the offers matching the filters, and its ETag"""
+        key = (provider_id, offer_type)
+        cached = self.bodies.get(key)
+        if cached:
+            return cached
+
+        if provider_id and offer_type:
+            of_type = set(self.by_type.get(offer_type, []))
+            indexes = [i for i in self.by_provider.get(provider_id, []) if i in of_type]
+        elif provider_id:
+            indexes = self.by_provider.get(provider_id, [])
+        elif offer_type:
+            indexes = self.by_type.get(offer_type, [])
+        else:
+            indexes = list(range(len(self.fragments)))
+
+        data = b"[" + b",".join(self.fragments[i] for i in indexes) + b"]"
+        etag = f'"{hashlib.sha1(data).hexdigest()}"'
+        self.bodies[key] = (data, etag)
+        return data, etag
+
+
+class OfferCatalogueService:
+    """Serve the current offer catalogue from a versioned, pre-serialised snapshot"""
+
+    def __init__(self) -> None:
+        self._snapshot: Optional[CatalogueSnapshot] = None
+        # Version used without Redis (client mode, single process)
+        self._local_version = 0
+        self._lock = asyncio.Lock()
+
+    def _snapshot_key(self, version: int) -> str:
+        return f"offer_catalogue:snapshot:{version}"
+
+    async def _current_version(self) -> int:
+        if cache_service.redis_client:
+            try:
+                version = await cache_service.redis_client.get(VERSION_KEY)
+                return int(version or 0)
+            except Exception as e:
+                logger.warning(f"[OFFER CATALOGUE] Failed to read version: {e}")
+        return self._local_version
+
+    async def invalidate(self) -> None:
+        """Drop the catalogue snapshot (called after every offer write)"""
+        self._local_version += 1
+        self._snapshot = None
+        if cache_service.redis_client:
+            try:
+                await cache_service.redis_client.incr(VERSION_KEY)
+            except Exception as e:
+                logger.warning(f"[OFFER CATALOGUE] Failed to bump version: {e}")
+
+    async def _load_offers(self, db: AsyncSession) -> list[dict[str, Any]]:
+        # Served by idx_energy_offers_active_valid_to
+        now = datetime.now(UTC)
+        result = await db.execute(
+            select(EnergyOffer)
+            .where(EnergyOffer.is_active.is_(True))
+            .where((EnergyOffer.valid_to.is_(None)) | (EnergyOffer.valid_to >= now))
+            .order_by(EnergyOffer.valid_from.desc())
+        )
+        # JSON types (Decimal -> str) as the API would return them
+        return json.loads(to_json([serialize_offer(o) for o in result.scalars().all()]))
+
+    async def _read_shared(self, version: int) -> Optional[list[dict[str, Any]]]:
+        if not cache_service.redis_client:
+            return None
+        try:
+            raw = await cache_service.redis_client.get(self._snapshot_key(version))
+            return json.loads(raw) if raw else None
+        except Exception as e:
+            logger.warning(f"[OFFER CATALOGUE] Failed to read snapshot {version}: {e}")
+            return None
+
+    async def _write_shared(self, version: int, offers: list[dict[str, Any]]) -> None:
+        if not cache_service.redis_client:
+            return
+        try:
+            await cache_service.redis_client.setex(
+                self._snapshot_key(version), settings.OFFER_CATALOGUE_TTL_SECONDS, to_json(offers)
+            )
+        except Exception as e:
+            logger.warning(f"[OFFER CATALOGUE] Failed to store snapshot {version}: {e}")
+
+    def _is_fresh(self, snapshot: Optional[CatalogueSnapshot], version: int) -> bool:
+        return snapshot is not None and snapshot.version == version and time.time() < snapshot.expires_at
+
+    async def get_snapshot(self, db: AsyncSession) -> CatalogueSnapshot:
+        """Snapshot of the current version: memory, then Redis, then database"""
+        version = await self._current_version()
+        if self._is_fresh(self._snapshot, version):
+            return self._snapshot  # type: ignore[return-value]
+
+        async with self._lock:
+            if self._is_fresh(self._snapshot, version):
+                return self._snapshot  # type: ignore[return-value]
+
+            offers = await self._read_shared(version)
+            if offers is None:
+                offers = await self._load_offers(db)
+                await self._write_shared(version, offers)
+                logger.info(f"[OFFER CATALOGUE] Built snapshot v{version} ({len(offers)} offers)")
+
+            self._snapshot = CatalogueSnapshot.build(version, offers)
+            return self._snapshot
+
+    async def serve(
+        self, request: Request, db: AsyncSession, provider_id: Optional[str], offer_type: Optional[str]
+    ) -> Response:
+        """APIResponse-shaped catalogue response, 304 when the client's ETag still matches"""
+        snapshot = await self.get_snapshot(db)
+        data, etag = snapshot.body(provider_id, offer_type)
+        headers = {"ETag": etag, "Cache-Control": "no-cache"}
+
+        if etag_matches(request.headers.get("if-none-match"), etag):
+            return Response(status_code=304, headers=headers)
+
+        # Same layout as APIResponse(success=True, data=...).model_dump_json()
+        body = b'{"success":true,"data":' + data + b',"error":null,"timestamp":' + to_json(datetime.utcnow()) + b"}"
+        return Response(content=body, media_type="application/json", headers=headers)
+
+
+offer_catalogue = OfferCatalogueService()
@@ -12,6 +12,7 @@ from datetime import time
 from decimal import Decimal
 from typing import ClassVar
 
+from ..offpeak import WEEKDAY_NAMES, compile_schedule
 from .base import (
     BaseOfferCalculator,
     ConsumptionData,
@@ -31,7 +32,7 @@ DEFAULT_HC_SCHEDULES = {
     "sunday": "22:30-06:30",
 }
 
-WEEKDAY_NAMES = ["monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday"]
+__all__ = ["DEFAULT_HC_SCHEDULES", "WEEKDAY_NAMES", "HcHpCalculator", "is_in_hc_period", "parse_time_range"]
 
 
 def parse_time_range(time_range: str) -> tuple[time, time]:
@@ -102,6 +103,8 @@ class HcHpCalculator(BaseOfferCalculator):
 
         # Utiliser les horaires personnalisés ou ceux de la consommation ou défaut
         schedules = hc_schedules or consumption.hc_schedules or DEFAULT_HC_SCHEDULES
+        # Horaires compilés une fois (jours absents = 22:30-06:30)
+        offpeak = compile_schedule(schedules, default="22:30-06:30")
 
         # Tarifs week-end (optionnels)
         hc_price_weekend = prices.get("hc_price_weekend")
@@ -119,16 +122,10 @@ class HcHpCalculator(BaseOfferCalculator):
         hp_cost_weekend = Decimal(0)
 
         for point in consumption.points:
-            weekday_name = WEEKDAY_NAMES[point.timestamp.weekday()]
             is_weekend = point.timestamp.weekday() >= 5
 
-            # Récupérer la plage HC pour ce jour
-            day_schedule = schedules.get(weekday_name, "22:30-06:30")
-            hc_start, hc_end = parse_time_range(day_schedule)
-
             # Déterminer si c'est HC ou HP
-            point_time = point.timestamp.time()
-            is_hc = is_in_hc_period(point_time, hc_start, hc_end)
+            is_hc = offpeak.at(point.timestamp)
 
             kwh = point.value_kwh
 
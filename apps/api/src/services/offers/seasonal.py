@@ -19,7 +19,8 @@ from .base import (
     CalculationResult,
     PeriodDetail,
 )
-from .hc_hp import parse_time_range, is_in_hc_period, WEEKDAY_NAMES, DEFAULT_HC_SCHEDULES
+from ..offpeak import compile_schedule
+from .hc_hp import DEFAULT_HC_SCHEDULES
 
 
 # Mois d'hiver (novembre à mars inclus)
@@ -89,6 +90,7 @@ class SeasonalCalculator(BaseOfferCalculator):
 
         # Horaires HC
         schedules = hc_schedules or consumption.hc_schedules or DEFAULT_HC_SCHEDULES
+        offpeak = compile_schedule(schedules, default="22:30-06:30")
 
         # Accumulateurs pour les 4-5 périodes
         totals = {
@@ -101,7 +103,6 @@ class SeasonalCalculator(BaseOfferCalculator):
 
         for point in consumption.points:
             point_date = point.timestamp.date()
-            weekday_name = WEEKDAY_NAMES[point.timestamp.weekday()]
 
             # Vérifier si c'est un jour de pointe
             if peak_price and point_date in self.peak_days:
@@ -114,9 +115,7 @@ class SeasonalCalculator(BaseOfferCalculator):
             is_winter = point_date.month in WINTER_MONTHS
 
             # Déterminer HC ou HP
-            day_schedule = schedules.get(weekday_name, "22:30-06:30")
-            hc_start, hc_end = parse_time_range(day_schedule)
-            is_hc = is_in_hc_period(point.timestamp.time(), hc_start, hc_end)
+            is_hc = offpeak.at(point.timestamp)
 
             # Clé de période
             season = "winter" if is_winter else "summer"
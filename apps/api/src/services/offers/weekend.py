@@ -17,7 +17,8 @@ from .base import (
     CalculationResult,
     PeriodDetail,
 )
-from .hc_hp import parse_time_range, is_in_hc_period, WEEKDAY_NAMES, DEFAULT_HC_SCHEDULES
+from ..offpeak import compile_schedule
+from .hc_hp import DEFAULT_HC_SCHEDULES
 
 
 class WeekendCalculator(BaseOfferCalculator):
@@ -70,6 +71,7 @@ class WeekendCalculator(BaseOfferCalculator):
 
         # Horaires HC
         schedules = hc_schedules or consumption.hc_schedules or DEFAULT_HC_SCHEDULES
+        offpeak = compile_schedule(schedules, default="22:30-06:30")
 
         # Accumulateurs pour les 4 périodes
         totals = {
@@ -80,15 +82,10 @@ class WeekendCalculator(BaseOfferCalculator):
         }
 
         for point in consumption.points:
-            weekday_name = WEEKDAY_NAMES[point.timestamp.weekday()]
             is_weekend = point.timestamp.weekday() >= 5  # samedi = 5, dimanche = 6
 
-            # Récupérer la plage HC pour ce jour
-            day_schedule = schedules.get(weekday_name, "22:30-06:30")
-            hc_start, hc_end = parse_time_range(day_schedule)
-
             # Déterminer HC ou HP
-            is_hc = is_in_hc_period(point.timestamp.time(), hc_start, hc_end)
+            is_hc = offpeak.at(point.timestamp)
 
             # Clé de période
             day_type = "weekend" if is_weekend else "weekday"
@@ -0,0 +1,202 @@
+"""Compiled off-peak (HC/HP) schedules.
+
+Every format found in the tree compiles to the same object:
+- per-weekday offer schedules: ``{"monday": "22:30-06:30", ...}`` (``hc_schedules``)
+- PDL ranges: ``{"ranges": ["22:00-06:00", ...]}`` or ``["22:00-06:00", ...]``
+- contract periods: ``[{"start": "22:00", "end": "06:00"}, ...]``
+- Enedis strings: ``"HC (22H00-6H00;12h00-14h00)"``, legacy ``{"default": "22h30-06h30"}``
+
+A schedule is a minute-resolution bitmap of the week (7 x 1440 bytes, 1 = off-peak). Compiled
+schedules are memoised by schedule content, so hot loops only pay a byte lookup per data point.
+
+Micro-benchmark (from apps/api): ``python -m src.services.offpeak``
+"""
+import json
+import re
+from datetime import datetime
+from functools import lru_cache
+from typing import Any, Iterable, Optional
+
+WEEKDAY_NAMES = ["monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday"]
+MINUTES_PER_DAY = 24 * 60
+
+# "22:30-06:30", "22H00-6H00", "22h30 - 06h30"
+_RANGE_RE = re.compile(r"(\d{1,2})[hH:](\d{2})\s*-\s*(\d{1,2})[hH:](\d{2})")
+
+
+def _minutes(hour: str, minute: str) -> int:
+    return min(int(hour) * 60 + int(minute), MINUTES_PER_DAY)
+
+
+def parse_ranges(value: Any) -> list[tuple[int, int]]:
+    """Off-peak ranges of one day as (start, end) minutes, from any supported format"""
+    if not value:
+        return []
+    if isinstance(value, str):
+        return [(_minutes(h1, m1), _minutes(h2, m2)) for h1, m1, h2, m2 in _RANGE_RE.findall(value)]
+    if isinstance(value, dict):
+        if "start" in value:
+            return parse_ranges(f"{value.get('start')}-{value.get('end')}")
+        if "ranges" in value:
+            return parse_ranges(value["ranges"])
+        return [r for v in value.values() for r in parse_ranges(v)]
+    if isinstance(value, (list, tuple)):
+        return [r for v in value for r in parse_ranges(v)]
+    return []
+
+
+def format_ranges(value: Any) -> list[str]:
+    """Off-peak ranges as "HH:MM-HH:MM" strings (storage format of ``PDL.offpeak_hours``)"""
+    return [f"{s // 60:02d}:{s % 60:02d}-{e // 60:02d}:{e % 60:02d}" for s, e in parse_ranges(value)]
+
+
+class OffpeakSchedule:
+    """Minute-resolution off-peak bitmap of a week"""
+
+    __slots__ = ("bitmap",)
+
+    def __init__(self, bitmap: bytes) -> None:
+        self.bitmap = bitmap
+
+    @classmethod
+    def from_days(cls, days: list[list[tuple[int, int]]]) -> "OffpeakSchedule":
+        bitmap = bytearray(7 * MINUTES_PER_DAY)
+        for weekday, ranges in enumerate(days):
+            offset = weekday * MINUTES_PER_DAY
+            for start, end in ranges:
+                if start < end:
+                    bitmap[offset + start:offset + end] = b"\x01" * (end - start)
+                elif start > end:
+                    # Période traversant minuit (ex: 22:30 -> 06:30): même jour calendaire
+                    bitmap[offset + start:offset + MINUTES_PER_DAY] = b"\x01" * (MINUTES_PER_DAY - start)
+                    bitmap[offset:offset + end] = b"\x01" * end
+        return cls(bytes(bitmap))
+
+    @property
+    def is_empty(self) -> bool:
+        return not any(self.bitmap)
+
+    def is_offpeak(self, minute: int, weekday: int = 0) -> bool:
+        """Off-peak state of a minute of the day (0-1439)"""
+        return self.bitmap[weekday * MINUTES_PER_DAY + minute] == 1
+
+    def at(self, timestamp: datetime) -> bool:
+        """Off-peak state of a timestamp (local time)"""
+        return self.bitmap[
+            timestamp.weekday() * MINUTES_PER_DAY + timestamp.hour * 60 + timestamp.minute
+        ] == 1
+
+    def interval(self, interval_start: Optional[str], weekday: int = 0) -> bool:
+        """Off-peak state of a detailed data slot ("HH:MM")"""
+        minute = _interval_minute(interval_start)
+        return minute is not None and self.bitmap[weekday * MINUTES_PER_DAY + minute] == 1
+
+    def flags(self, timestamps: Iterable[datetime]) -> bytes:
+        """Off-peak flags (0/1) of many timestamps at once"""
+        bitmap = self.bitmap
+        return bytes([bitmap[t.weekday() * MINUTES_PER_DAY + t.hour * 60 + t.minute] for t in timestamps])
+
+    def split(self, rows: Iterable[tuple[Optional[str], int]], weekday: int = 0) -> tuple[int, int]:
+        """(HP, HC) totals of (interval_start, value) rows"""
+        day = self.bitmap[weekday * MINUTES_PER_DAY:(weekday + 1) * MINUTES_PER_DAY]
+        totals = [0, 0]
+        for interval_start, value in rows:
+            minute = _interval_minute(interval_start)
+            totals[1 if minute is not None and day[minute] else 0] += value
+        return totals[0], totals[1]
+
+
+@lru_cache(maxsize=256)
+def _interval_minute(interval_start: Optional[str]) -> Optional[int]:
+    if not interval_start:
+        return None
+    try:
+        hour, minute = map(int, interval_start.split(":")[:2])
+    except ValueError:
+        return None
+    value = hour * 60 + minute
+    return value if 0 <= value < MINUTES_PER_DAY else None
+
+
+@lru_cache(maxsize=512)
+def _compile(key: str, default: Optional[str]) -> OffpeakSchedule:
+    spec = json.loads(key)
+    if not spec:
+        spec = default
+
+    if isinstance(spec, dict) and spec.keys() & set(WEEKDAY_NAMES):
+        # Horaires par jour de la semaine, jours absents = défaut
+        days = [parse_ranges(spec.get(name, default)) for name in WEEKDAY_NAMES]
+    else:
+        days = [parse_ranges(spec)] * 7
+    return OffpeakSchedule.from_days(days)
+
+
+def compile_schedule(spec: Any, default: Optional[str] = None) -> OffpeakSchedule:
+    """Compiled off-peak schedule of ``spec`` (any supported format), memoised by content
+
+    Args:
+        spec: Schedule in any supported format (None/empty: ``default``)
+        default: Ranges used when ``spec`` is empty, and for weekdays missing from a per-weekday schedule
+    """
+    return _compile(json.dumps(spec, sort_keys=True, default=str), default)
+
+
+def _benchmark(points: int = 200_000) -> None:
+    import timeit
+    from datetime import timedelta
+
+    from .offers.hc_hp import DEFAULT_HC_SCHEDULES, is_in_hc_period, parse_time_range
+
+    start = datetime(2025, 1, 1)
+    timestamps = [start + timedelta(minutes=30 * i) for i in range(points)]
+    slots = [(t.strftime("%H:%M"), 1000) for t in timestamps]
+    periods = [{"start": "22:00", "end": "06:00"}, {"start": "12:00", "end": "14:00"}]
+
+    def per_point_parse() -> int:
+        count = 0
+        for t in timestamps:
+            hc_start, hc_end = parse_time_range(DEFAULT_HC_SCHEDULES[WEEKDAY_NAMES[t.weekday()]])
+            count += is_in_hc_period(t.time(), hc_start, hc_end)
+        return count
+
+    def compiled_at() -> int:
+        schedule = compile_schedule(DEFAULT_HC_SCHEDULES)
+        return sum(schedule.at(t) for t in timestamps)
+
+    def compiled_flags() -> int:
+        return sum(compile_schedule(DEFAULT_HC_SCHEDULES).flags(timestamps))
+
+    def per_slot_periods() -> int:
+        hc = 0
+        for interval_start, value in slots:
+            hour, minute = map(int, interval_start.split(":"))
+            time_minutes = hour * 60 + minute
+            for period in periods:
+                start_h, start_m = map(int, period["start"].split(":"))
+                end_h, end_m = map(int, period["end"].split(":"))
+                s, e = start_h * 60 + start_m, end_h * 60 + end_m
+                if (s > e and (time_minutes >= s or time_minutes < e)) or s <= time_minutes < e:
+                    hc += value
+                    break
+        return hc
+
+    def compiled_split() -> int:
+        return compile_schedule(periods).split(slots)[1]
+
+    assert per_point_parse() == compiled_at() == compiled_flags()
+    assert per_slot_periods() == compiled_split()
+
+    for name, fn in [
+        ("per-point parse (timestamps)", per_point_parse),
+        ("compiled .at()", compiled_at),
+        ("compiled .flags()", compiled_flags),
+        ("per-slot periods (interval_start)", per_slot_periods),
+        ("compiled .split()", compiled_split),
+    ]:
+        best = min(timeit.repeat(fn, number=1, repeat=5))
+        print(f"{name:<36} {best * 1000:8.1f} ms  ({points} points)")
+
+
+if __name__ == "__main__":
+    _benchmark()
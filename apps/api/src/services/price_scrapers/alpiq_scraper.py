@@ -6,7 +6,7 @@ import pdfplumber
 import io
 from datetime import datetime, UTC
 
-from .base import BasePriceScraper, OfferData, run_sync_in_thread
+from .base import BasePriceScraper, OfferData
 
 
 class AlpiqScraper(BasePriceScraper):
@@ -70,7 +70,7 @@ class AlpiqScraper(BasePriceScraper):
                     if not url.lower().endswith('.pdf'):
                         continue
 
-                    response = await client.get(url)
+                    response = await self.download(client, url)
                     if response.status_code != 200:
                         error_msg = f"Échec du téléchargement du PDF Alpiq (HTTP {response.status_code}): {url}"
                         self.logger.warning(error_msg)
@@ -80,10 +80,10 @@ class AlpiqScraper(BasePriceScraper):
                     # Determine which parser to use based on URL
                     if "PRIX_STABLE" in url.upper():
                         # PDF with only Électricité Stable -21,5%
-                        offers = await run_sync_in_thread(self._parse_stable_21_pdf, response.content)
+                        offers = await self.parse_document(self._parse_stable_21_pdf, response)
                     else:
                         # General PDF with Stable -8% and Référence -4%
-                        offers = await run_sync_in_thread(self._parse_general_pdf, response.content)
+                        offers = await self.parse_document(self._parse_general_pdf, response)
 
                     if offers:
                         # Set offer_url for each offer
@@ -6,7 +6,7 @@ from io import BytesIO
 from pdfminer.high_level import extract_text
 from datetime import datetime, UTC
 
-from .base import BasePriceScraper, OfferData, run_sync_in_thread
+from .base import BasePriceScraper, OfferData
 
 
 def _extract_pdf_text(content: bytes) -> str:
@@ -104,7 +104,7 @@ class AlternaScraper(BasePriceScraper):
             for pdf_url, offer_name in pdf_configs:
                 try:
                     async with httpx.AsyncClient(timeout=30.0, follow_redirects=True) as client:
-                        response = await client.get(pdf_url)
+                        response = await self.download(client, pdf_url)
                         if response.status_code != 200:
                             error_msg = f"Échec du téléchargement du PDF Alterna {offer_name} (HTTP {response.status_code})"
                             self.logger.warning(error_msg)
@@ -112,7 +112,7 @@ class AlternaScraper(BasePriceScraper):
                             continue
 
                         # Parse PDF in thread pool to avoid blocking event loop
-                        text = await run_sync_in_thread(_extract_pdf_text, response.content)
+                        text = await self.parse_document(_extract_pdf_text, response)
                         parsed_offers = self._parse_pdf(text, offer_name)
 
                         if parsed_offers:
@@ -1,11 +1,19 @@
 """Base class for energy provider price scrapers"""
 from abc import ABC, abstractmethod
-from typing import List, Dict, Any, Callable, TypeVar
+from typing import List, Dict, Any, Callable, Iterator, TypeVar
 from datetime import datetime, UTC
 from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from urllib.parse import urlsplit
 import multiprocessing
 import asyncio
 import logging
+import time
+
+import httpx
+
+from ...config import settings
+from .document_cache import content_hash, document_cache, parsed_key
 
 logger = logging.getLogger(__name__)
 
@@ -41,6 +49,16 @@ async def run_sync_in_process(func: Callable[..., T], *args: Any) -> T:
 # Alias for backward compatibility
 run_sync_in_thread = run_sync_in_process
 
+# Politeness: concurrent requests per provider host, shared by all scrapers running concurrently
+_host_semaphores: Dict[str, asyncio.Semaphore] = {}
+
+
+def _host_semaphore(url: str) -> asyncio.Semaphore:
+    host = urlsplit(url).netloc.lower()
+    if host not in _host_semaphores:
+        _host_semaphores[host] = asyncio.Semaphore(settings.SCRAPER_PER_HOST_CONCURRENCY)
+    return _host_semaphores[host]
+
 
 class OfferData:
     """Data class for energy offer information"""
@@ -155,6 +173,62 @@ class OfferData:
 
         return result
 
+    @classmethod
+    def from_dict(cls, offer_dict: Dict[str, Any]) -> "OfferData":
+        """Rebuild an offer from ``to_dict(for_json=True)`` output (ISO dates parsed back)"""
+        dates = {}
+        for field in ("valid_from", "valid_to"):
+            try:
+                dates[field] = datetime.fromisoformat(offer_dict[field]) if offer_dict.get(field) else None
+            except (ValueError, TypeError):
+                dates[field] = None
+
+        return cls(
+            name=offer_dict["name"],
+            offer_type=offer_dict["offer_type"],
+            description=offer_dict.get("description"),
+            subscription_price=offer_dict.get("subscription_price", 0.0),
+            base_price=offer_dict.get("base_price"),
+            hc_price=offer_dict.get("hc_price"),
+            hp_price=offer_dict.get("hp_price"),
+            base_price_weekend=offer_dict.get("base_price_weekend"),
+            hp_price_weekend=offer_dict.get("hp_price_weekend"),
+            hc_price_weekend=offer_dict.get("hc_price_weekend"),
+            tempo_blue_hc=offer_dict.get("tempo_blue_hc"),
+            tempo_blue_hp=offer_dict.get("tempo_blue_hp"),
+            tempo_white_hc=offer_dict.get("tempo_white_hc"),
+            tempo_white_hp=offer_dict.get("tempo_white_hp"),
+            tempo_red_hc=offer_dict.get("tempo_red_hc"),
+            tempo_red_hp=offer_dict.get("tempo_red_hp"),
+            ejp_normal=offer_dict.get("ejp_normal"),
+            ejp_peak=offer_dict.get("ejp_peak"),
+            hc_price_winter=offer_dict.get("hc_price_winter"),
+            hp_price_winter=offer_dict.get("hp_price_winter"),
+            hc_price_summer=offer_dict.get("hc_price_summer"),
+            hp_price_summer=offer_dict.get("hp_price_summer"),
+            peak_day_price=offer_dict.get("peak_day_price"),
+            hc_schedules=offer_dict.get("hc_schedules"),
+            power_kva=offer_dict.get("power_kva"),
+            valid_from=dates["valid_from"],
+            valid_to=dates["valid_to"],
+            offer_url=offer_dict.get("offer_url"),
+        )
+
+
+def _encode_parsed(result: Any) -> Any:
+    """JSON form of a parser result (offers list or extracted text), None if not cacheable"""
+    if isinstance(result, str):
+        return {"text": result}
+    if isinstance(result, list) and all(isinstance(offer, OfferData) for offer in result):
+        return {"offers": [offer.to_dict(for_json=True) for offer in result]}
+    return None
+
+
+def _decode_parsed(value: Dict[str, Any]) -> Any:
+    if "text" in value:
+        return value["text"]
+    return [OfferData.from_dict(offer) for offer in value["offers"]]
+
 
 class BasePriceScraper(ABC):
     """Abstract base class for price scrapers"""
@@ -165,6 +239,79 @@ class BasePriceScraper(ABC):
         # Flag to indicate if fallback data was used (scraping failed)
         self.used_fallback = False
         self.fallback_reason: str | None = None
+        # Seconds spent per stage (download, parse, validate) and document cache counters
+        self.timings: Dict[str, float] = {}
+        self.cache_stats: Dict[str, int] = {"not_modified": 0, "parse_cache_hits": 0, "parsed": 0}
+
+    @contextmanager
+    def timed(self, stage: str) -> Iterator[None]:
+        """Accumulate the time spent in a stage"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.timings[stage] = self.timings.get(stage, 0.0) + time.perf_counter() - start
+
+    async def download(self, client: httpx.AsyncClient, url: str, **kwargs: Any) -> httpx.Response:
+        """GET a provider document, within the per-host concurrency limit
+
+        Documents whose parsed result is cached are requested conditionally. A 304 is
+        returned as an empty 200 marked with the cached result key, for ``parse_document``.
+        """
+        validators = await document_cache.get_validators(url)
+        headers = dict(kwargs.pop("headers", None) or {})
+        if validators:
+            if validators.get("etag"):
+                headers["If-None-Match"] = validators["etag"]
+            if validators.get("last_modified"):
+                headers["If-Modified-Since"] = validators["last_modified"]
+
+        with self.timed("download"):
+            async with _host_semaphore(url):
+                response = await client.get(url, headers=headers or None, **kwargs)
+
+        if response.status_code == 304 and validators:
+            self.cache_stats["not_modified"] += 1
+            response = httpx.Response(200, request=response.request, extensions={"parsed_key": validators["parsed_key"]})
+        # Validators are stored under the requested URL, not the one reached after redirects
+        response.extensions["document_url"] = url
+        return response
+
+    async def parse_document(self, parser: Callable[..., T], response: httpx.Response, *args: Any) -> T:
+        """Parse a downloaded document in the process pool, reusing the result cached for the same content
+
+        Args:
+            parser: Picklable parser called as ``parser(content, *args)``
+            response: Response returned by ``download``
+        """
+        parser_name = getattr(parser, "__qualname__", repr(parser))
+        key = response.extensions.get("parsed_key")
+        if not key:
+            key = parsed_key(parser_name, args, content_hash(response.content))
+
+        cached = await document_cache.get_parsed(key)
+        if cached is not None:
+            self.cache_stats["parse_cache_hits"] += 1
+            return _decode_parsed(cached)  # type: ignore[no-any-return]
+
+        if not response.content:
+            # 304 whose cached result just expired: the caller reports it like an empty download
+            raise ValueError(f"Document cache entry expired for {response.extensions.get('document_url')}")
+
+        with self.timed("parse"):
+            result = await run_sync_in_process(parser, response.content, *args)
+        self.cache_stats["parsed"] += 1
+
+        encoded = _encode_parsed(result)
+        if result and encoded is not None:
+            await document_cache.store(
+                response.extensions.get("document_url") or str(response.request.url),
+                key,
+                encoded,
+                response.headers.get("ETag"),
+                response.headers.get("Last-Modified"),
+            )
+        return result
 
     @abstractmethod
     async def fetch_offers(self) -> List[OfferData]:
@@ -206,7 +353,9 @@ class BasePriceScraper(ABC):
 
             self.logger.info(f"Found {len(offers)} offers for {self.provider_name}")
 
-            if not await self.validate_data(offers):
+            with self.timed("validate"):
+                valid = await self.validate_data(offers)
+            if not valid:
                 self.logger.error(f"Data validation failed for {self.provider_name}")
                 return []
 
@@ -0,0 +1,319 @@
+"""Offline benchmark and regression harness for the price scrapers.
+
+Each provider's HTTP responses (HTML pages, tariff PDFs) are recorded once into fixtures, then
+replayed through a local transport: no network is needed to run the scrapers afterwards.
+
+Layout (``tests/fixtures/price_scrapers``):
+- ``{provider_slug}/manifest.json`` : recorded URL -> status, content type and body file
+- ``{provider_slug}/NNN.bin``        : recorded bodies
+- ``baseline.json``                  : parse time, peak parse memory and output digest per provider
+
+Parsing is measured inside the ``pdf_executor`` workers by wrapping ``run_sync_in_process``, so
+timings and peak memory (tracemalloc) are those of the real parsing path.
+
+Usage (from apps/api):
+    python -m src.services.price_scrapers.benchmark record [provider ...]   # needs network
+    python -m src.services.price_scrapers.benchmark run [--margin 0.25] [--update-baseline]
+
+``run`` exits with status 1 when a provider parses slower than its baseline by more than the
+margin, or when the validated offers differ from the baseline.
+"""
+import argparse
+import asyncio
+import hashlib
+import json
+import logging
+import re
+import sys
+import time
+import tracemalloc
+import unicodedata
+from contextlib import contextmanager
+from datetime import UTC, datetime
+from pathlib import Path
+from typing import Any, Callable, Iterator, List, Optional
+from unittest import mock
+
+import httpx
+
+from . import base
+from .base import BasePriceScraper, OfferData
+
+logger = logging.getLogger(__name__)
+
+FIXTURES_DIR = Path(__file__).resolve().parents[3] / "tests" / "fixtures" / "price_scrapers"
+BASELINE_FILE = "baseline.json"
+DEFAULT_MARGIN = 0.25
+# Slowdowns below this many seconds are noise, whatever the relative margin
+MIN_SLOWDOWN_SECONDS = 0.05
+
+
+def provider_slug(provider_name: str) -> str:
+    ascii_name = unicodedata.normalize("NFKD", provider_name).encode("ascii", "ignore").decode()
+    return re.sub(r"[^a-z0-9]+", "_", ascii_name.lower()).strip("_")
+
+
+def new_scraper(provider_name: str) -> BasePriceScraper:
+    """Scraper of a provider with its default URLs"""
+    from ..price_update_service import PriceUpdateService
+
+    # Every registered scraper is a concrete subclass taking ``scraper_urls``
+    scraper_class: Callable[..., BasePriceScraper] = PriceUpdateService.SCRAPERS[provider_name]
+    return scraper_class(scraper_urls=None)
+
+
+def offers_digest(offers: List[OfferData]) -> str:
+    """Stable digest of scraped offers (scrape timestamp and month-derived ``valid_from`` excluded)"""
+    rows = []
+    for offer in offers:
+        row = offer.to_dict(for_json=True)
+        row.pop("price_updated_at", None)
+        row.pop("valid_from", None)
+        rows.append(json.dumps(row, sort_keys=True, default=str))
+    return hashlib.sha256("\n".join(sorted(rows)).encode()).hexdigest()
+
+
+# =========================================================================
+# Recording / replay
+# =========================================================================
+
+
+class RecordingTransport(httpx.AsyncBaseTransport):
+    """Forward requests to the network and keep every final response"""
+
+    def __init__(self) -> None:
+        self._inner = httpx.AsyncHTTPTransport(retries=1)
+        self.responses: dict[str, dict[str, Any]] = {}
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        response = await self._inner.handle_async_request(request)
+        content = await response.aread()
+        self.responses[str(request.url)] = {
+            "status": response.status_code,
+            "headers": {k: v for k, v in response.headers.items() if k.lower() in ("content-type", "location")},
+            "content": content,
+        }
+        # The body is already decoded: do not let the client decompress it again
+        headers = [(k, v) for k, v in response.headers.items() if k.lower() not in ("content-encoding", "content-length")]
+        return httpx.Response(response.status_code, headers=headers, content=content, request=request)
+
+
+class ReplayTransport(httpx.AsyncBaseTransport):
+    """Serve recorded responses; any other URL fails like an unreachable host"""
+
+    def __init__(self, responses: dict[str, dict[str, Any]]) -> None:
+        self.responses = responses
+        self.misses: list[str] = []
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        recorded = self.responses.get(str(request.url))
+        if recorded is None:
+            self.misses.append(str(request.url))
+            raise httpx.ConnectError(f"No recorded response for {request.url}", request=request)
+        return httpx.Response(
+            recorded["status"], headers=recorded["headers"], content=recorded["content"], request=request
+        )
+
+
+@contextmanager
+def use_transport(transport: httpx.AsyncBaseTransport) -> Iterator[None]:
+    """Route every ``httpx.AsyncClient`` created by the scrapers through ``transport``"""
+    client_class = httpx.AsyncClient
+
+    class _Client(client_class):  # type: ignore[misc, valid-type]
+        def __init__(self, *args: Any, **kwargs: Any) -> None:
+            kwargs.pop("verify", None)
+            super().__init__(*args, transport=transport, **kwargs)
+
+    with mock.patch.object(httpx, "AsyncClient", _Client):
+        yield
+
+
+def save_fixture(provider_name: str, responses: dict[str, dict[str, Any]], fixtures_dir: Path = FIXTURES_DIR) -> Path:
+    directory = fixtures_dir / provider_slug(provider_name)
+    directory.mkdir(parents=True, exist_ok=True)
+    for old_body in directory.glob("*.bin"):
+        old_body.unlink()
+
+    manifest: dict[str, Any] = {"provider": provider_name, "recorded_at": datetime.now(UTC).isoformat(), "responses": {}}
+    for index, (url, recorded) in enumerate(sorted(responses.items()), start=1):
+        body_file = f"{index:03d}.bin"
+        (directory / body_file).write_bytes(recorded["content"])
+        manifest["responses"][url] = {"status": recorded["status"], "headers": recorded["headers"], "file": body_file}
+
+    (directory / "manifest.json").write_text(json.dumps(manifest, indent=2, ensure_ascii=False) + "\n")
+    return directory
+
+
+def load_fixture(provider_name: str, fixtures_dir: Path = FIXTURES_DIR) -> Optional[dict[str, dict[str, Any]]]:
+    directory = fixtures_dir / provider_slug(provider_name)
+    manifest_file = directory / "manifest.json"
+    if not manifest_file.exists():
+        return None
+    manifest = json.loads(manifest_file.read_text())
+    return {
+        url: {"status": entry["status"], "headers": entry["headers"], "content": (directory / entry["file"]).read_bytes()}
+        for url, entry in manifest["responses"].items()
+    }
+
+
+def recorded_providers(fixtures_dir: Path = FIXTURES_DIR) -> list[str]:
+    from ..price_update_service import PriceUpdateService
+
+    return [name for name in PriceUpdateService.SCRAPERS if (fixtures_dir / provider_slug(name) / "manifest.json").exists()]
+
+
+# =========================================================================
+# Profiling
+# =========================================================================
+
+
+def profiled_call(func: Callable[..., Any], *args: Any) -> tuple[Any, float, int]:
+    """Run ``func`` in a pool worker and return (result, seconds, peak traced memory in bytes)"""
+    tracemalloc.start()
+    try:
+        start = time.perf_counter()
+        result = func(*args)
+        elapsed = time.perf_counter() - start
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return result, elapsed, peak
+
+
+@contextmanager
+def profile_parsing(samples: list[tuple[float, int]]) -> Iterator[None]:
+    """Measure every ``run_sync_in_process`` call made by the scrapers"""
+    original = base.run_sync_in_process
+
+    async def profiled_run_sync_in_process(func: Callable[..., Any], *args: Any) -> Any:
+        result, elapsed, peak = await original(profiled_call, func, *args)
+        samples.append((elapsed, peak))
+        return result
+
+    with mock.patch.object(base, "run_sync_in_process", profiled_run_sync_in_process):
+        yield
+
+
+async def benchmark_provider(provider_name: str, fixtures_dir: Path = FIXTURES_DIR, repeat: int = 3) -> dict[str, Any]:
+    """Replay a provider's fixtures through its scraper ``repeat`` times
+
+    Returns the fastest total parse time, the highest peak memory, and the digest of the validated offers.
+    """
+    from ..cache import cache_service
+
+    responses = load_fixture(provider_name, fixtures_dir)
+    if responses is None:
+        raise FileNotFoundError(f"No recorded fixtures for {provider_name}")
+
+    parse_times: list[float] = []
+    peaks: list[int] = []
+    offers: List[OfferData] = []
+    transport = ReplayTransport(responses)
+
+    # The parsed document cache would hide the parsing cost
+    with mock.patch.object(cache_service, "redis_client", None), use_transport(transport):
+        for _ in range(repeat):
+            samples: list[tuple[float, int]] = []
+            scraper = new_scraper(provider_name)
+            with profile_parsing(samples):
+                offers = await scraper.scrape()
+            parse_times.append(sum(elapsed for elapsed, _ in samples))
+            peaks.append(max((peak for _, peak in samples), default=0))
+
+    return {
+        "parse_seconds": round(min(parse_times), 4),
+        "peak_memory_bytes": max(peaks),
+        "offers_count": len(offers),
+        "offers_digest": offers_digest(offers),
+        "used_fallback": scraper.used_fallback,
+        "missing_urls": sorted(set(transport.misses)),
+    }
+
+
+def compare_to_baseline(result: dict[str, Any], baseline: dict[str, Any], margin: float = DEFAULT_MARGIN) -> list[str]:
+    """Regressions of a benchmark result against its baseline (empty list = OK)"""
+    regressions = []
+    allowed = baseline["parse_seconds"] * (1 + margin)
+    if result["parse_seconds"] > allowed and result["parse_seconds"] - baseline["parse_seconds"] > MIN_SLOWDOWN_SECONDS:
+        regressions.append(
+            f"parsing slowed down: {result['parse_seconds']:.3f}s > {baseline['parse_seconds']:.3f}s (+{margin:.0%})"
+        )
+    if result["offers_digest"] != baseline["offers_digest"]:
+        regressions.append(
+            f"validated offers changed ({baseline['offers_count']} -> {result['offers_count']} offers)"
+        )
+    if result["used_fallback"] and not baseline.get("used_fallback"):
+        regressions.append("scraper fell back to hardcoded offers")
+    return regressions
+
+
+def load_baseline(fixtures_dir: Path = FIXTURES_DIR) -> dict[str, Any]:
+    baseline_file = fixtures_dir / BASELINE_FILE
+    return json.loads(baseline_file.read_text()) if baseline_file.exists() else {}
+
+
+# =========================================================================
+# CLI
+# =========================================================================
+
+
+async def _record(providers: list[str], fixtures_dir: Path) -> None:
+    from ..cache import cache_service
+    from ..price_update_service import PriceUpdateService
+
+    for provider_name in providers or list(PriceUpdateService.SCRAPERS):
+        transport = RecordingTransport()
+        with mock.patch.object(cache_service, "redis_client", None), use_transport(transport):
+            scraper = new_scraper(provider_name)
+            offers = await scraper.scrape()
+        directory = save_fixture(provider_name, transport.responses, fixtures_dir)
+        print(f"{provider_name}: {len(transport.responses)} responses, {len(offers)} offers -> {directory}")
+
+
+async def _run(providers: list[str], fixtures_dir: Path, margin: float, update_baseline: bool, repeat: int) -> int:
+    baseline = load_baseline(fixtures_dir)
+    failures = 0
+    for provider_name in providers or recorded_providers(fixtures_dir):
+        result = await benchmark_provider(provider_name, fixtures_dir, repeat)
+        slug = provider_slug(provider_name)
+        status = "new"
+        if slug in baseline and not update_baseline:
+            regressions = compare_to_baseline(result, baseline[slug], margin)
+            status = "OK" if not regressions else "REGRESSION: " + "; ".join(regressions)
+            failures += bool(regressions)
+        print(
+            f"{provider_name:<16} parse {result['parse_seconds']:>7.3f}s  "
+            f"peak {result['peak_memory_bytes'] / 1_048_576:>6.1f} MiB  "
+            f"{result['offers_count']:>3} offers  {status}"
+        )
+        if update_baseline or slug not in baseline:
+            baseline[slug] = {k: v for k, v in result.items() if k != "missing_urls"}
+
+    if baseline and (update_baseline or failures == 0):
+        fixtures_dir.mkdir(parents=True, exist_ok=True)
+        (fixtures_dir / BASELINE_FILE).write_text(json.dumps(baseline, indent=2, sort_keys=True) + "\n")
+    return 1 if failures else 0
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--fixtures", type=Path, default=FIXTURES_DIR)
+    commands = parser.add_subparsers(dest="command", required=True)
+    record = commands.add_parser("record", help="Record provider responses (network required)")
+    record.add_argument("providers", nargs="*")
+    run = commands.add_parser("run", help="Replay fixtures and compare with the baseline")
+    run.add_argument("providers", nargs="*")
+    run.add_argument("--margin", type=float, default=DEFAULT_MARGIN, help="Allowed parse slowdown (0.25 = +25%%)")
+    run.add_argument("--repeat", type=int, default=3)
+    run.add_argument("--update-baseline", action="store_true")
+    args = parser.parse_args(argv)
+
+    if args.command == "record":
+        asyncio.run(_record(args.providers, args.fixtures))
+        return 0
+    return asyncio.run(_run(args.providers, args.fixtures, args.margin, args.update_baseline, args.repeat))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,104 @@
+"""Content-addressed cache of scraped tariff documents.
+
+Layout (``{generation}`` is ``{month}:{code version}``, see ``cache_generation``):
+- ``scraper:doc:{generation}:{sha1(url)}``                    : HASH ``etag``, ``last_modified``, ``parsed_key``
+                                                                of the last parsed download
+- ``scraper:parsed:{generation}:{parser}:{args}:{sha256(pdf)}`` : JSON result of the parser for this exact content
+
+Parsers date their offers (``valid_from`` = first day of the current month) and their code changes between
+releases: entries of another month or of other scraper sources are never read, documents are parsed again.
+
+A document is only downloaded conditionally (``If-None-Match`` / ``If-Modified-Since``) when its parsed
+result is still cached, so a 304 never leaves a scraper without data. A 200 whose content did not change
+(e.g. a server without validators) still skips parsing thanks to the content hash.
+"""
+import functools
+import hashlib
+import json
+import logging
+from datetime import UTC, datetime
+from pathlib import Path
+from typing import Any, Optional
+
+from ...config import settings
+from ..cache import cache_service
+
+logger = logging.getLogger(__name__)
+
+
+def content_hash(content: bytes) -> str:
+    return hashlib.sha256(content).hexdigest()
+
+
+@functools.lru_cache(maxsize=1)
+def _code_version() -> str:
+    """Digest of the scraper sources (parsers and their helpers) of this process"""
+    digest = hashlib.sha1()
+    for path in sorted(Path(__file__).parent.glob("*.py")):
+        digest.update(path.read_bytes())
+    return digest.hexdigest()[:12]
+
+
+def cache_generation() -> str:
+    """Current month and scraper code version: parsed results depend on both"""
+    return f"{datetime.now(UTC):%Y-%m}:{_code_version()}"
+
+
+def parsed_key(parser_name: str, args: tuple, digest: str) -> str:
+    """Key of a parser result: same document parsed with other arguments is another entry"""
+    args_digest = hashlib.sha1(repr(args).encode()).hexdigest()[:12]
+    return f"scraper:parsed:{cache_generation()}:{parser_name}:{args_digest}:{digest}"
+
+
+class DocumentCache:
+    """Download validators and parsed results of scraped documents (no-op without Redis)"""
+
+    def _doc_key(self, url: str) -> str:
+        return f"scraper:doc:{cache_generation()}:{hashlib.sha1(url.encode()).hexdigest()}"
+
+    async def get_validators(self, url: str) -> Optional[dict[str, str]]:
+        """Validators of the last parsed download of ``url`` if its parsed result is still cached"""
+        redis_client = cache_service.redis_client
+        if not redis_client:
+            return None
+        try:
+            stored = await redis_client.hgetall(self._doc_key(url))
+            validators = {k.decode(): v.decode() for k, v in stored.items()}
+            if not validators.get("parsed_key") or not await redis_client.exists(validators["parsed_key"]):
+                return None
+            return validators
+        except Exception as e:
+            logger.warning(f"[SCRAPER CACHE] Validators read failed for {url}: {e}")
+            return None
+
+    async def get_parsed(self, key: str) -> Optional[Any]:
+        redis_client = cache_service.redis_client
+        if not redis_client:
+            return None
+        try:
+            value = await redis_client.get(key)
+            return json.loads(value) if value else None
+        except Exception as e:
+            logger.warning(f"[SCRAPER CACHE] Parsed result read failed: {e}")
+            return None
+
+    async def store(self, url: str, key: str, value: Any, etag: Optional[str], last_modified: Optional[str]) -> None:
+        """Store a parsed result and the validators of the download it comes from"""
+        redis_client = cache_service.redis_client
+        if not redis_client:
+            return
+        ttl = settings.SCRAPER_DOCUMENT_CACHE_TTL_SECONDS
+        doc_key = self._doc_key(url)
+        validators = {"parsed_key": key, "etag": etag or "", "last_modified": last_modified or ""}
+        try:
+            async with redis_client.pipeline(transaction=False) as pipe:
+                pipe.setex(key, ttl, json.dumps(value))
+                pipe.delete(doc_key)
+                pipe.hset(doc_key, mapping=validators)
+                pipe.expire(doc_key, ttl)
+                await pipe.execute()
+        except Exception as e:
+            logger.warning(f"[SCRAPER CACHE] Write failed for {url}: {e}")
+
+
+document_cache = DocumentCache()
@@ -6,7 +6,7 @@ import io
 import re
 from datetime import datetime, UTC
 
-from .base import BasePriceScraper, OfferData, run_sync_in_thread
+from .base import BasePriceScraper, OfferData
 
 
 class EDFPriceScraper(BasePriceScraper):
@@ -143,14 +143,14 @@ class EDFPriceScraper(BasePriceScraper):
             # Fetch Tarif Bleu (regulated tariffs) - use first URL from database
             try:
                 tarif_bleu_url = self.scraper_urls[0] if len(self.scraper_urls) > 0 else self.TARIFF_BLEU_URL
-                response = await client.get(tarif_bleu_url)
+                response = await self.download(client, tarif_bleu_url)
                 if response.status_code != 200:
                     error_msg = f"Échec du téléchargement du PDF Tarif Bleu (HTTP {response.status_code})"
                     self.logger.error(error_msg)
                     errors.append(error_msg)
                 else:
                     # Run PDF parsing in thread pool to avoid blocking event loop
-                    tarif_bleu_offers = await run_sync_in_thread(self._parse_pdf, response.content)
+                    tarif_bleu_offers = await self.parse_document(self._parse_pdf, response)
                     if not tarif_bleu_offers:
                         error_msg = "Échec du parsing du PDF Tarif Bleu - aucune offre extraite"
                         self.logger.error(error_msg)
@@ -169,14 +169,14 @@ class EDFPriceScraper(BasePriceScraper):
             # Fetch Zen Week-End (market offer) - use second URL from database
             try:
                 zen_weekend_url = self.scraper_urls[1] if len(self.scraper_urls) > 1 else self.ZEN_WEEKEND_URL
-                response = await client.get(zen_weekend_url)
+                response = await self.download(client, zen_weekend_url)
                 if response.status_code != 200:
                     error_msg = f"Échec du téléchargement du PDF Zen Week-End (HTTP {response.status_code})"
                     self.logger.warning(error_msg)
                     errors.append(error_msg)
                 else:
                     # Run PDF parsing in thread pool to avoid blocking event loop
-                    zen_offers = await run_sync_in_thread(self._parse_zen_weekend_pdf, response.content)
+                    zen_offers = await self.parse_document(self._parse_zen_weekend_pdf, response)
                     if not zen_offers:
                         error_msg = "Échec du parsing du PDF Zen Week-End - aucune offre extraite"
                         self.logger.warning(error_msg)
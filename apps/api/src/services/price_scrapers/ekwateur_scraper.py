@@ -51,7 +51,7 @@ class EkwateurScraper(BasePriceScraper):
         try:
             url = self.scraper_urls[0] if self.scraper_urls else self.PRICING_URL
             async with httpx.AsyncClient(timeout=30.0, follow_redirects=True) as client:
-                response = await client.get(url)
+                response = await self.download(client, url)
                 if response.status_code != 200:
                     error_msg = f"Échec du téléchargement de la page Ekwateur (HTTP {response.status_code})"
                     self.logger.warning(error_msg)
@@ -84,7 +84,7 @@ class EngieScraper(BasePriceScraper):
         try:
             url = self.scraper_urls[0] if self.scraper_urls else self.HELLOWATT_URL
             async with httpx.AsyncClient(timeout=30.0, follow_redirects=True) as client:
-                response = await client.get(url)
+                response = await self.download(client, url)
                 if response.status_code != 200:
                     error_msg = f"Échec du téléchargement de la page HelloWatt Engie (HTTP {response.status_code})"
                     self.logger.warning(error_msg)
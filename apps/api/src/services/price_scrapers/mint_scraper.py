@@ -6,7 +6,7 @@ import pdfplumber
 import io
 from datetime import datetime, UTC
 
-from .base import BasePriceScraper, OfferData, run_sync_in_thread
+from .base import BasePriceScraper, OfferData
 
 
 class MintEnergieScraper(BasePriceScraper):
@@ -129,7 +129,7 @@ class MintEnergieScraper(BasePriceScraper):
             for i, url in enumerate(self.scraper_urls):
                 offer_key = self._get_offer_key_from_url(url)
                 try:
-                    response = await client.get(url)
+                    response = await self.download(client, url)
                     if response.status_code != 200:
                         error_msg = f"Échec du téléchargement du PDF {offer_key} (HTTP {response.status_code})"
                         self.logger.error(error_msg)
@@ -137,9 +137,7 @@ class MintEnergieScraper(BasePriceScraper):
                         continue
 
                     # Parse PDF in thread pool
-                    offers = await run_sync_in_thread(
-                        self._parse_pdf, response.content, offer_key, url
-                    )
+                    offers = await self.parse_document(self._parse_pdf, response, offer_key, url)
 
                     if not offers:
                         error_msg = f"Échec du parsing du PDF {offer_key} - aucune offre extraite"
@@ -101,7 +101,7 @@ class OctopusScraper(BasePriceScraper):
         async with httpx.AsyncClient(timeout=30.0, follow_redirects=True) as client:
             for url in self.scraper_urls:
                 try:
-                    response = await client.get(url, headers=headers)
+                    response = await self.download(client, url, headers=headers)
                     if response.status_code != 200:
                         error_msg = f"Échec du téléchargement de {url} (HTTP {response.status_code})"
                         self.logger.warning(error_msg)
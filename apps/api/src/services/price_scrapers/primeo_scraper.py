@@ -7,7 +7,7 @@ from io import BytesIO
 from pdfminer.high_level import extract_text
 from datetime import datetime, UTC
 
-from .base import BasePriceScraper, OfferData, run_sync_in_thread
+from .base import BasePriceScraper, OfferData
 
 
 def _extract_pdf_text(content: bytes) -> str:
@@ -68,14 +68,14 @@ class PrimeoEnergiePriceScraper(BasePriceScraper):
             # Download PDF (SSL verification disabled due to certificate issues)
             pdf_url = self.scraper_urls[0] if self.scraper_urls else self.TARIFF_PDF_URL
             async with httpx.AsyncClient(timeout=30.0, verify=False, follow_redirects=True) as client:
-                response = await client.get(pdf_url)
+                response = await self.download(client, pdf_url)
                 if response.status_code != 200:
                     error_msg = f"Échec du téléchargement du PDF Priméo Énergie (HTTP {response.status_code})"
                     self.logger.warning(error_msg)
                     errors.append(error_msg)
                 else:
                     # Parse PDF in thread pool to avoid blocking event loop
-                    text = await run_sync_in_thread(_extract_pdf_text, response.content)
+                    text = await self.parse_document(_extract_pdf_text, response)
                     offers = self._parse_pdf(text)
 
                     if not offers:
@@ -6,7 +6,7 @@ import io
 import re
 from datetime import datetime, UTC
 
-from .base import BasePriceScraper, OfferData, run_sync_in_thread
+from .base import BasePriceScraper, OfferData
 
 
 class TotalEnergiesPriceScraper(BasePriceScraper):
@@ -89,14 +89,14 @@ class TotalEnergiesPriceScraper(BasePriceScraper):
                 # Try to parse PDFs
                 for idx, pdf_url in enumerate(self.scraper_urls):
                     try:
-                        response = await client.get(pdf_url)
+                        response = await self.download(client, pdf_url)
                         if response.status_code != 200:
                             error_msg = f"Échec du téléchargement du PDF #{idx+1} (HTTP {response.status_code})"
                             self.logger.warning(error_msg)
                             errors.append(error_msg)
                         else:
                             # Parse PDF in thread pool to avoid blocking event loop
-                            offers = await run_sync_in_thread(self._parse_pdf, response.content, idx)
+                            offers = await self.parse_document(self._parse_pdf, response, idx)
 
                             if offers:
                                 # Set offer_url for each offer
@@ -3,12 +3,16 @@ from typing import Dict, List, Any
 from datetime import datetime, UTC
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, and_
+import asyncio
+import time
 import uuid
 import logging
 
+from ..config import settings
 from ..models import EnergyProvider, EnergyOffer
 from .price_scrapers import EDFPriceScraper, EnercoopPriceScraper, TotalEnergiesPriceScraper, PrimeoEnergiePriceScraper, EngieScraper, AlpiqScraper, AlternaScraper, EkwateurScraper, OctopusScraper, VattenfallScraper, MintEnergieScraper
-from .price_scrapers.base import OfferData
+from .offer_catalogue import offer_catalogue
+from .price_scrapers.base import BasePriceScraper, OfferData
 
 logger = logging.getLogger(__name__)
 
@@ -64,19 +68,51 @@ class PriceUpdateService:
         """
         Update prices for all providers
 
+        Scrapers (download + parsing) run concurrently, bounded by SCRAPER_MAX_CONCURRENT_PROVIDERS
+        and a per-host request limit. Database writes stay sequential on the shared session.
+
         Returns:
-            Dict with update results for each provider
+            Dict with update results for each provider (including time spent per stage)
         """
-        results = {}
+        results: Dict[str, Any] = {}
+        started = time.perf_counter()
 
+        providers: Dict[str, EnergyProvider] = {}
         for provider_name in self.SCRAPERS.keys():
             try:
-                result = await self.update_provider(provider_name)
-                results[provider_name] = result
+                providers[provider_name] = await self._get_or_create_provider(provider_name)
             except Exception as e:
                 logger.error(f"Error updating {provider_name}: {str(e)}", exc_info=True)
                 results[provider_name] = {"success": False, "error": str(e)}
 
+        semaphore = asyncio.Semaphore(settings.SCRAPER_MAX_CONCURRENT_PROVIDERS)
+
+        async def run_scraper(provider_name: str) -> tuple[BasePriceScraper, List[OfferData]]:
+            async with semaphore:
+                scraper = self.SCRAPERS[provider_name](scraper_urls=providers[provider_name].scraper_urls)  # type: ignore
+                scraper_started = time.perf_counter()
+                offers = await scraper.scrape()
+                scraper.timings["scrape"] = time.perf_counter() - scraper_started
+                return scraper, offers
+
+        scraped = await asyncio.gather(*(run_scraper(name) for name in providers), return_exceptions=True)
+
+        for provider_name, outcome in zip(providers, scraped):
+            if isinstance(outcome, BaseException):
+                logger.error(f"Error updating {provider_name}: {str(outcome)}", exc_info=outcome)
+                results[provider_name] = {"success": False, "error": str(outcome)}
+                continue
+            scraper, offers = outcome
+            result = await self._apply_offers(providers[provider_name], offers, scraper.timings)
+            result["document_cache"] = scraper.cache_stats
+            results[provider_name] = result
+
+        logger.info(
+            f"Updated {len(results)} providers in {time.perf_counter() - started:.1f}s: "
+            + ", ".join(
+                f"{name} {result.get('timings', {}).get('scrape', 0):.1f}s" for name, result in results.items()
+            )
+        )
         return results
 
     async def update_provider(
@@ -104,6 +140,7 @@ class PriceUpdateService:
             provider = await self._get_or_create_provider(provider_name)
 
             # Use cached offers if provided, otherwise scrape
+            timings: Dict[str, float] = {}
             if cached_offers:
                 logger.info(f"Using {len(cached_offers)} cached offers for {provider_name}")
                 offers = [self._offer_from_cache(offer) for offer in cached_offers]
@@ -111,10 +148,27 @@ class PriceUpdateService:
                 # Scrape prices (pass scraper_urls from database)
                 scraper_class = self.SCRAPERS[provider_name]
                 scraper = scraper_class(scraper_urls=provider.scraper_urls)  # type: ignore
+                scraper_started = time.perf_counter()
                 offers = await scraper.scrape()
+                timings = {**scraper.timings, "scrape": time.perf_counter() - scraper_started}
+
+            return await self._apply_offers(provider, offers, timings)
+
+        except Exception as e:
+            await self.db.rollback()
+            logger.error(f"Error updating {provider_name}: {str(e)}", exc_info=True)
+            return {"success": False, "error": str(e)}
 
-            if not offers:
-                return {"success": False, "error": "No offers found", "offers_updated": 0}
+    async def _apply_offers(
+        self, provider: EnergyProvider, offers: List[OfferData], timings: Dict[str, float]
+    ) -> Dict[str, Any]:
+        """Replace the active offers of a provider with the scraped ones and commit"""
+        provider_name = provider.name
+        if not offers:
+            return {"success": False, "error": "No offers found", "offers_updated": 0, "timings": timings}
+
+        try:
+            save_started = time.perf_counter()
 
             # Deactivate old offers
             await self._deactivate_old_offers(provider.id)
@@ -131,10 +185,13 @@ class PriceUpdateService:
                     updated_count += 1
 
             await self.db.commit()
+            await offer_catalogue.invalidate()
+            timings = {**timings, "save": time.perf_counter() - save_started}
 
             logger.info(
                 f"Successfully updated {provider_name}: "
-                f"{created_count} created, {updated_count} updated"
+                f"{created_count} created, {updated_count} updated "
+                f"({', '.join(f'{stage} {seconds:.2f}s' for stage, seconds in timings.items())})"
             )
 
             return {
@@ -144,6 +201,7 @@ class PriceUpdateService:
                 "offers_updated": updated_count,
                 "total_offers": len(offers),
                 "updated_at": datetime.now(UTC).isoformat(),
+                "timings": {stage: round(seconds, 3) for stage, seconds in timings.items()},
             }
 
         except Exception as e:
@@ -153,53 +211,7 @@ class PriceUpdateService:
 
     def _offer_from_cache(self, offer_dict: Dict[str, Any]) -> OfferData:
         """Convert cached offer dict back to OfferData, parsing ISO date strings"""
-        # Parse ISO date strings back to datetime objects
-        valid_from = None
-        valid_to = None
-
-        if offer_dict.get("valid_from"):
-            try:
-                # Use datetime.fromisoformat() - built-in since Python 3.7
-                valid_from = datetime.fromisoformat(offer_dict["valid_from"])
-            except (ValueError, TypeError):
-                pass
-
-        if offer_dict.get("valid_to"):
-            try:
-                valid_to = datetime.fromisoformat(offer_dict["valid_to"])
-            except (ValueError, TypeError):
-                pass
-
-        return OfferData(
-            name=offer_dict["name"],
-            offer_type=offer_dict["offer_type"],
-            description=offer_dict.get("description"),
-            subscription_price=offer_dict.get("subscription_price", 0.0),
-            base_price=offer_dict.get("base_price"),
-            hc_price=offer_dict.get("hc_price"),
-            hp_price=offer_dict.get("hp_price"),
-            base_price_weekend=offer_dict.get("base_price_weekend"),
-            hp_price_weekend=offer_dict.get("hp_price_weekend"),
-            hc_price_weekend=offer_dict.get("hc_price_weekend"),
-            tempo_blue_hc=offer_dict.get("tempo_blue_hc"),
-            tempo_blue_hp=offer_dict.get("tempo_blue_hp"),
-            tempo_white_hc=offer_dict.get("tempo_white_hc"),
-            tempo_white_hp=offer_dict.get("tempo_white_hp"),
-            tempo_red_hc=offer_dict.get("tempo_red_hc"),
-            tempo_red_hp=offer_dict.get("tempo_red_hp"),
-            ejp_normal=offer_dict.get("ejp_normal"),
-            ejp_peak=offer_dict.get("ejp_peak"),
-            hc_price_winter=offer_dict.get("hc_price_winter"),
-            hp_price_winter=offer_dict.get("hp_price_winter"),
-            hc_price_summer=offer_dict.get("hc_price_summer"),
-            hp_price_summer=offer_dict.get("hp_price_summer"),
-            peak_day_price=offer_dict.get("peak_day_price"),
-            hc_schedules=offer_dict.get("hc_schedules"),
-            power_kva=offer_dict.get("power_kva"),
-            valid_from=valid_from,
-            valid_to=valid_to,
-            offer_url=offer_dict.get("offer_url"),
-        )
+        return OfferData.from_dict(offer_dict)
 
     async def _get_or_create_provider(self, name: str) -> EnergyProvider:
         """Get existing provider or create new one with default values"""
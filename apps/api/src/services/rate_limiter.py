@@ -5,17 +5,26 @@ from .cache import cache_service
 from ..config import settings
 
 
+def _split_field(field: bytes | str) -> tuple[str, str]:
+    """Split a usage hash field ``{cached|no_cache}:{name}``"""
+    value = field.decode() if isinstance(field, bytes) else field
+    cache_type, _, name = value.partition(":")
+    return cache_type, name
+
+
 class RateLimiterService:
     """Service to track and limit user API calls per day"""
 
-    def _get_daily_key(self, user_id: str, cache_used: bool, endpoint: str | None = None) -> str:
+    def _get_daily_key(self, user_id: str, cache_used: bool) -> str:
         """Generate Redis key for daily counter"""
         today = datetime.now(UTC).strftime("%Y-%m-%d")
         cache_type = "cached" if cache_used else "no_cache"
-        if endpoint:
-            return f"rate_limit:{user_id}:{endpoint}:{cache_type}:{today}"
         return f"rate_limit:{user_id}:{cache_type}:{today}"
 
+    def _get_usage_keys(self, day: str) -> tuple[str, str, str]:
+        """Per-day usage hashes: users ({cache_type}:{user_id}), endpoints ({cache_type}:{endpoint}), totals"""
+        return f"usage_stats:{day}:users", f"usage_stats:{day}:endpoints", f"usage_stats:{day}:totals"
+
     async def increment_and_check(self, user_id: str, cache_used: bool, is_admin: bool = False, endpoint: str | None = None) -> Tuple[bool, int, int]:
         """
         Increment counter and check if limit is reached
@@ -42,24 +51,71 @@ class RateLimiterService:
         if current_count >= limit:
             return False, current_count, limit
 
-        # Increment counter (including for admins now, for statistics)
-        new_count = current_count + 1
-
-        # Set with TTL until end of day
+        # TTL until end of day for the limit counter
         now = datetime.now(UTC)
         end_of_day = datetime.combine(now.date() + timedelta(days=1), datetime.min.time(), tzinfo=UTC)
         ttl_seconds = int((end_of_day - now).total_seconds())
 
-        await cache_service.redis_client.setex(key, ttl_seconds, str(new_count))
-
-        # Also track per-endpoint stats if endpoint is provided
-        if endpoint:
-            endpoint_key = self._get_daily_key(user_id, cache_used, endpoint)
-            endpoint_current = await cache_service.redis_client.get(endpoint_key)
-            endpoint_count = int(endpoint_current) if endpoint_current else 0
-            await cache_service.redis_client.setex(endpoint_key, ttl_seconds, str(endpoint_count + 1))
-
-        return True, new_count, limit
+        # Increment counter (including for admins now, for statistics) and the usage history
+        cache_type = "cached" if cache_used else "no_cache"
+        users_key, endpoints_key, totals_key = self._get_usage_keys(now.strftime("%Y-%m-%d"))
+        history_ttl = ttl_seconds + settings.USAGE_STATS_RETENTION_DAYS * 86400
+        async with cache_service.redis_client.pipeline(transaction=False) as pipe:
+            pipe.incr(key)
+            pipe.expire(key, ttl_seconds)
+            pipe.hincrby(users_key, f"{cache_type}:{user_id}", 1)
+            pipe.hincrby(totals_key, cache_type, 1)
+            if endpoint:
+                pipe.hincrby(endpoints_key, f"{cache_type}:{endpoint}", 1)
+            for usage_key in (users_key, endpoints_key, totals_key):
+                pipe.expire(usage_key, history_ttl)
+            results = await pipe.execute()
+
+        return True, int(results[0]), limit
+
+    async def get_daily_usage(self, day: str) -> dict:
+        """Per-user and per-endpoint usage of a day ({name: {"cached", "no_cache", "total"}})"""
+        usage: dict = {"users": {}, "endpoints": {}}
+        if not cache_service.redis_client:
+            return usage
+
+        users_key, endpoints_key, _ = self._get_usage_keys(day)
+        async with cache_service.redis_client.pipeline(transaction=False) as pipe:
+            pipe.hgetall(users_key)
+            pipe.hgetall(endpoints_key)
+            users, endpoints = await pipe.execute()
+
+        for section, values in (("users", users), ("endpoints", endpoints)):
+            for field, count in values.items():
+                cache_type, name = _split_field(field)
+                stats = usage[section].setdefault(name, {"cached": 0, "no_cache": 0, "total": 0})
+                stats["cached" if cache_type == "cached" else "no_cache"] += int(count)
+                stats["total"] += int(count)
+        return usage
+
+    async def get_usage_history(self, days: int | None = None) -> list[dict]:
+        """Daily totals of the last days (oldest first), one pipelined HMGET per day"""
+        days = min(days or settings.USAGE_STATS_RETENTION_DAYS, settings.USAGE_STATS_RETENTION_DAYS)
+        today = datetime.now(UTC).date()
+        dates = [(today - timedelta(days=offset)).strftime("%Y-%m-%d") for offset in range(days - 1, -1, -1)]
+        if not cache_service.redis_client:
+            return [{"date": day, "cached": 0, "no_cache": 0, "total": 0} for day in dates]
+
+        async with cache_service.redis_client.pipeline(transaction=False) as pipe:
+            for day in dates:
+                pipe.hmget(self._get_usage_keys(day)[2], ["cached", "no_cache"])
+            results = await pipe.execute()
+
+        history = []
+        for day, (cached, no_cache) in zip(dates, results):
+            cached_count, no_cache_count = int(cached or 0), int(no_cache or 0)
+            history.append({
+                "date": day,
+                "cached": cached_count,
+                "no_cache": no_cache_count,
+                "total": cached_count + no_cache_count,
+            })
+        return history
 
     async def get_usage_stats(self, user_id: str) -> dict:
         """Get current usage statistics for a user"""
@@ -0,0 +1,101 @@
+"""Pre-serialised response cache for public RTE datasets (Tempo, EcoWatt, France consumption, generation forecast).
+
+Layout:
+- ``response_cache:version:{dataset}``           : data version, bumped when the RTE refresh writes the dataset
+- ``response_cache:{dataset}:{version}:{shape}`` : HASH ``body`` (JSON bytes), ``etag``, ``last_modified``
+
+The query shape is the route path, the sorted query string and the current day (default ranges are
+relative to today). Responses carry ``ETag`` / ``Last-Modified`` and ``If-None-Match`` is answered
+with 304, so polling clients neither hit the database nor download unchanged payloads.
+"""
+import hashlib
+import logging
+from datetime import UTC, datetime
+from email.utils import format_datetime
+from typing import Awaitable, Callable, Optional
+
+from fastapi import Request, Response
+
+from ..config import settings
+from ..schemas import APIResponse
+from .cache import cache_service
+
+logger = logging.getLogger(__name__)
+
+DATASETS = ("tempo", "ecowatt", "consumption_france", "generation_forecast")
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Whether an If-None-Match header matches the ETag (weak comparison)"""
+    if not if_none_match:
+        return False
+    candidates = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+    return "*" in candidates or etag.removeprefix("W/") in candidates
+
+
+class ResponseCacheService:
+    """Serve public dataset responses from pre-serialised JSON bytes"""
+
+    def _version_key(self, dataset: str) -> str:
+        return f"response_cache:version:{dataset}"
+
+    def _shape(self, request: Request) -> str:
+        query = "&".join(f"{k}={v}" for k, v in sorted(request.query_params.multi_items()))
+        shape = f"{request.url.path}?{query}|{datetime.now(UTC).date().isoformat()}"
+        return hashlib.sha1(shape.encode()).hexdigest()
+
+    async def bump_version(self, dataset: str) -> None:
+        """Invalidate every cached response of a dataset (called after the RTE refresh writes)"""
+        if not cache_service.redis_client:
+            return
+        try:
+            await cache_service.redis_client.incr(self._version_key(dataset))
+        except Exception as e:
+            logger.warning(f"[RESPONSE CACHE] Failed to bump {dataset} version: {e}")
+
+    async def serve(self, request: Request, dataset: str, build: Callable[[], Awaitable[APIResponse]]) -> Response:
+        """Return the cached response for the request shape, building (and caching) it on a miss"""
+        redis_client = cache_service.redis_client
+        # Client mode syncs its data from the gateway without bumping versions: do not store there
+        use_cache = redis_client is not None and not settings.CLIENT_MODE
+        if_none_match = request.headers.get("if-none-match")
+
+        cache_key = None
+        if use_cache:
+            try:
+                version = await redis_client.get(self._version_key(dataset))  # type: ignore[union-attr]
+                cache_key = f"response_cache:{dataset}:{int(version or 0)}:{self._shape(request)}"
+                body, etag, last_modified = await redis_client.hmget(  # type: ignore[union-attr]
+                    cache_key, ["body", "etag", "last_modified"]
+                )
+                if body and etag and last_modified:
+                    return self._response(body, etag.decode(), last_modified.decode(), if_none_match)
+            except Exception as e:
+                logger.warning(f"[RESPONSE CACHE] Read failed for {dataset}: {e}")
+                cache_key = None
+
+        result = await build()
+        body = result.model_dump_json().encode()
+        # ETag ignores the build timestamp so identical data keeps the same tag
+        etag = f'"{hashlib.sha1(result.model_dump_json(exclude={"timestamp"}).encode()).hexdigest()}"'
+        last_modified = format_datetime(datetime.now(UTC), usegmt=True)
+
+        if cache_key and result.success:
+            try:
+                async with redis_client.pipeline(transaction=False) as pipe:  # type: ignore[union-attr]
+                    pipe.hset(cache_key, mapping={"body": body, "etag": etag, "last_modified": last_modified})
+                    pipe.expire(cache_key, settings.RESPONSE_CACHE_TTL_SECONDS)
+                    await pipe.execute()
+            except Exception as e:
+                logger.warning(f"[RESPONSE CACHE] Write failed for {dataset}: {e}")
+
+        return self._response(body, etag, last_modified, if_none_match)
+
+    def _response(self, body: bytes, etag: str, last_modified: str, if_none_match: Optional[str]) -> Response:
+        headers = {"ETag": etag, "Last-Modified": last_modified, "Cache-Control": "no-cache"}
+        if etag_matches(if_none_match, etag):
+            return Response(status_code=304, headers=headers)
+        return Response(content=body, media_type="application/json", headers=headers)
+
+
+response_cache = ResponseCacheService()
@@ -14,6 +14,8 @@ from ..models import TempoColor, TempoDay
 from ..models.ecowatt import EcoWatt
 from ..models.consumption_france import ConsumptionFrance
 from ..models.generation_forecast import GenerationForecast
+from .response_cache import response_cache
+from .tempo_calendar import tempo_calendar
 
 logger = logging.getLogger(__name__)
 
@@ -251,6 +253,10 @@ class RTEService:
                     import traceback
                     traceback.print_exc()
 
+        await db.commit()
+        await response_cache.bump_version("tempo")
+        await tempo_calendar.invalidate()
+
         logger.info(f"[RTE] Total updated: {updated_count} days")
         return updated_count
 
@@ -302,7 +308,11 @@ class RTEService:
         return updated_count
 
     async def get_tempo_days(
-        self, db: AsyncSession, start_date: datetime | None = None, end_date: datetime | None = None
+        self,
+        db: AsyncSession,
+        start_date: datetime | None = None,
+        end_date: datetime | None = None,
+        updated_since: datetime | None = None,
     ) -> List[TempoDay]:
         """
         Get TEMPO days from database cache
@@ -311,6 +321,7 @@ class RTEService:
             db: Database session
             start_date: Optional start date filter
             end_date: Optional end date filter
+            updated_since: Optional delta filter (only days updated after this instant)
 
         Returns:
             List of TempoDay objects
@@ -321,6 +332,8 @@ class RTEService:
             query = query.where(TempoDay.date >= start_date)
         if end_date:
             query = query.where(TempoDay.date <= end_date)
+        if updated_since:
+            query = query.where(TempoDay.updated_at > updated_since)
 
         result = await db.execute(query)
         return list(result.scalars().all())
@@ -354,6 +367,8 @@ class RTEService:
         cutoff_date = datetime.now(UTC) - timedelta(days=days_to_keep)
         result = await db.execute(delete(TempoDay).where(TempoDay.date < cutoff_date))
         await db.commit()
+        await response_cache.bump_version("tempo")
+        await tempo_calendar.invalidate()
         return result.rowcount
 
     # ========== EcoWatt Methods ==========
@@ -478,6 +493,7 @@ class RTEService:
                     continue
 
             await db.commit()
+            await response_cache.bump_version("ecowatt")
             logger.info(f"[RTE] Updated {updated_count} EcoWatt signals")
             return updated_count
 
@@ -667,6 +683,7 @@ class RTEService:
                         continue
 
             await db.commit()
+            await response_cache.bump_version("consumption_france")
             logger.info(f"[RTE] Updated {updated_count} consumption records")
             return updated_count
 
@@ -684,6 +701,7 @@ class RTEService:
         consumption_type: str | None = None,
         start_date: datetime | None = None,
         end_date: datetime | None = None,
+        updated_since: datetime | None = None,
     ) -> List[ConsumptionFrance]:
         """
         Get French national consumption data from database cache
@@ -693,6 +711,7 @@ class RTEService:
             consumption_type: Optional type filter
             start_date: Optional start date filter
             end_date: Optional end date filter
+            updated_since: Optional delta filter (only records updated after this instant)
 
         Returns:
             List of ConsumptionFrance objects
@@ -708,6 +727,9 @@ class RTEService:
         if end_date:
             end_naive = end_date.replace(tzinfo=None) if end_date.tzinfo else end_date
             query = query.where(ConsumptionFrance.start_date <= end_naive)
+        if updated_since:
+            since_naive = updated_since.astimezone(UTC).replace(tzinfo=None) if updated_since.tzinfo else updated_since
+            query = query.where(ConsumptionFrance.updated_at > since_naive)
 
         result = await db.execute(query)
         return list(result.scalars().all())
@@ -923,6 +945,7 @@ class RTEService:
                         continue
 
             await db.commit()
+            await response_cache.bump_version("generation_forecast")
             logger.info(f"[RTE] Updated {updated_count} generation forecast records")
             return updated_count
 
@@ -941,6 +964,7 @@ class RTEService:
         forecast_type: str | None = None,
         start_date: datetime | None = None,
         end_date: datetime | None = None,
+        updated_since: datetime | None = None,
     ) -> List[GenerationForecast]:
         """
         Get French generation forecast data from database cache
@@ -951,6 +975,7 @@ class RTEService:
             forecast_type: Optional forecast type filter
             start_date: Optional start date filter
             end_date: Optional end date filter
+            updated_since: Optional delta filter (only records updated after this instant)
 
         Returns:
             List of GenerationForecast objects
@@ -968,6 +993,9 @@ class RTEService:
         if end_date:
             end_naive = end_date.replace(tzinfo=None) if end_date.tzinfo else end_date
             query = query.where(GenerationForecast.start_date <= end_naive)
+        if updated_since:
+            since_naive = updated_since.astimezone(UTC).replace(tzinfo=None) if updated_since.tzinfo else updated_since
+            query = query.where(GenerationForecast.updated_at > since_naive)
 
         result = await db.execute(query)
         return list(result.scalars().all())
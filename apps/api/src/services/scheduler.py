@@ -1,103 +1,32 @@
-"""Background scheduler for periodic tasks"""
-import asyncio
+"""Background scheduler for periodic tasks (run by the task coordinator, once per schedule across replicas)"""
 import logging
-from datetime import datetime, UTC, timedelta
+from datetime import datetime, UTC
 
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from ..models.database import async_session_maker
-from ..models.refresh_tracker import RefreshTracker
 from .rte import rte_service
+from .notification_queue import notification_queue
+from .scraper_jobs import scraper_jobs
+from .task_coordinator import PeriodicTask, task_coordinator
 
 logger = logging.getLogger(__name__)
 
 
-async def should_refresh(db: AsyncSession, cache_type: str, min_interval_minutes: int) -> bool:
-    """Check if cache should be refreshed based on last refresh time"""
-    result = await db.execute(
-        select(RefreshTracker).where(RefreshTracker.cache_type == cache_type)
-    )
-    tracker = result.scalar_one_or_none()
-
-    if not tracker:
-        return True  # Never refreshed
-
-    time_since_refresh = datetime.now(UTC) - tracker.last_refresh
-    return bool(time_since_refresh > timedelta(minutes=min_interval_minutes))
-
-
-async def update_refresh_time(db: AsyncSession, cache_type: str) -> None:
-    """Update the last refresh time for a cache type"""
-    result = await db.execute(
-        select(RefreshTracker).where(RefreshTracker.cache_type == cache_type)
-    )
-    tracker = result.scalar_one_or_none()
-
-    if tracker:
-        tracker.last_refresh = datetime.now(UTC)  # type: ignore[assignment]
-    else:
-        new_tracker = RefreshTracker(cache_type=cache_type, last_refresh=datetime.now(UTC))
-        db.add(new_tracker)
-
-    await db.commit()
-
-
-async def refresh_tempo_cache_task() -> None:
-    """Refresh TEMPO cache from RTE API (runs every 10 minutes)"""
-    while True:
-        try:
-            async with async_session_maker() as db:
-                # Check if we should refresh (minimum 10 minutes between refreshes)
-                if await should_refresh(db, 'tempo', 10):
-                    logger.info(f"[SCHEDULER] {datetime.now(UTC).isoformat()} - Starting TEMPO cache refresh...")
-
-                    # RTE API limitation: only today + tomorrow (after 6am)
-                    updated_count = await rte_service.update_tempo_cache(db)
-                    logger.info(f"[SCHEDULER] Successfully refreshed {updated_count} TEMPO days")
-
-                    # Update last refresh time
-                    await update_refresh_time(db, 'tempo')
-                else:
-                    logger.warning("[SCHEDULER] Skipping TEMPO refresh - last refresh too recent")
-
-        except Exception as e:
-            logger.error(f"[SCHEDULER ERROR] Failed to refresh TEMPO cache: {e}")
-            import traceback
-            traceback.print_exc()
-
-        # Wait 10 minutes before next check
-        await asyncio.sleep(600)
-
-
-async def refresh_ecowatt_cache_task() -> None:
-    """Refresh EcoWatt cache from RTE API (runs every hour)"""
-    while True:
-        try:
-            async with async_session_maker() as db:
-                # Check if we should refresh (minimum 60 minutes between refreshes)
-                if await should_refresh(db, 'ecowatt', 60):
-                    logger.info(f"[SCHEDULER] {datetime.now(UTC).isoformat()} - Starting EcoWatt cache refresh...")
+async def refresh_tempo_cache(db: AsyncSession) -> str:
+    """Refresh TEMPO cache from RTE API (RTE API limitation: only today + tomorrow, after 6am)"""
+    updated_count = await rte_service.update_tempo_cache(db)
+    return f"{updated_count} TEMPO days"
 
-                    updated_count = await rte_service.update_ecowatt_cache(db)
-                    logger.info(f"[SCHEDULER] Successfully refreshed {updated_count} EcoWatt signals")
 
-                    # Update last refresh time
-                    await update_refresh_time(db, 'ecowatt')
-                else:
-                    logger.debug("[SCHEDULER] Skipping EcoWatt refresh - last refresh too recent")
+async def refresh_ecowatt_cache(db: AsyncSession) -> str:
+    """Refresh EcoWatt cache from RTE API"""
+    updated_count = await rte_service.update_ecowatt_cache(db)
+    return f"{updated_count} EcoWatt signals"
 
-        except Exception as e:
-            logger.error(f"[SCHEDULER ERROR] Failed to refresh EcoWatt cache: {e}")
-            import traceback
-            traceback.print_exc()
 
-        # Wait 1 hour before next check
-        await asyncio.sleep(3600)
-
-
-async def refresh_tempo_forecast_cache_task() -> None:
-    """Refresh TEMPO forecast cache from RTE API (runs every 4 hours)
+async def refresh_tempo_forecast_cache(db: AsyncSession) -> str:
+    """Refresh TEMPO forecast cache from RTE API
 
     Les prévisions Tempo utilisent les API RTE Consumption et Generation Forecast.
     On rafraîchit le cache toutes les 4 heures (RTE met à jour les prévisions vers 11h et 19h30).
@@ -111,162 +40,152 @@ async def refresh_tempo_forecast_cache_task() -> None:
     from .cache import cache_service
     from .tempo_forecast import tempo_forecast_service
 
-    while True:
-        try:
-            async with async_session_maker() as db:
-                # Check if we should refresh (minimum 4 hours between refreshes)
-                if await should_refresh(db, 'tempo_forecast', 240):
-                    logger.info(f"[SCHEDULER] {datetime.now(UTC).isoformat()} - Starting TEMPO forecast refresh...")
-
-                    # Récupérer les statistiques de la saison
-                    current_date = date.today()
-                    if current_date.month >= 9:
-                        season_start = datetime(current_date.year, 9, 1, tzinfo=UTC)
-                    else:
-                        season_start = datetime(current_date.year - 1, 9, 1, tzinfo=UTC)
-
-                    # Compter les jours Tempo de la saison
-                    result = await db.execute(
-                        select(TempoDay.color, func.count(TempoDay.id))
-                        .where(TempoDay.date >= season_start.date())
-                        .group_by(TempoDay.color)
-                    )
-                    color_counts = {row[0]: row[1] for row in result.fetchall()}
-                    blue_used = color_counts.get("BLUE", 0)
-                    white_used = color_counts.get("WHITE", 0)
-                    red_used = color_counts.get("RED", 0)
-
-                    # Générer les prévisions pour 8 jours
-                    forecasts = await tempo_forecast_service.get_forecasts(
-                        days_ahead=8,
-                        blue_used=blue_used,
-                        white_used=white_used,
-                        red_used=red_used,
-                        reference_date=current_date,
-                    )
-
-                    # Construire les données de cache
-                    response_data = {
-                        "season": f"{season_start.year}/{season_start.year + 1}",
-                        "season_stats": {
-                            "blue_used": blue_used,
-                            "blue_remaining": 300 - blue_used,
-                            "white_used": white_used,
-                            "white_remaining": 43 - white_used,
-                            "red_used": red_used,
-                            "red_remaining": 22 - red_used,
-                        },
-                        "forecasts": [
-                            {
-                                "date": f.date,
-                                "day_in_season": f.day_in_season,
-                                "probability_blue": f.probability_blue,
-                                "probability_white": f.probability_white,
-                                "probability_red": f.probability_red,
-                                "most_likely": f.most_likely,
-                                "confidence": f.confidence,
-                                "threshold_white_red": f.threshold_white_red,
-                                "threshold_red": f.threshold_red,
-                                "normalized_consumption": f.normalized_consumption,
-                                "forecast_type": f.forecast_type,
-                                "factors": f.factors,
-                            }
-                            for f in forecasts
-                        ],
-                        "algorithm_info": {
-                            "description": "Algorithme basé sur les seuils RTE officiels",
-                            "params_blanc_rouge": {"A": 4.0, "B": 0.015, "C": 0.026},
-                            "params_rouge": {"A": 3.15, "B": 0.01, "C": 0.031},
-                            "formula_blanc_rouge": "Seuil = A - B × JourTempo - C × StockRestant(Blanc+Rouge)",
-                            "formula_rouge": "Seuil = A' - B' × JourTempo - C' × StockRestant(Rouge)",
-                        },
-                        "cached_at": datetime.now(UTC).isoformat(),
-                        "cache_ttl_hours": 4,
-                    }
-
-                    # Sauvegarder dans le cache (clé pour 8 jours)
-                    cache_key = f"tempo:forecast:{current_date.isoformat()}:8"
-                    await cache_service.set_raw(cache_key, json.dumps(response_data), ttl=4 * 3600)
-
-                    logger.info(f"[SCHEDULER] Successfully refreshed TEMPO forecast cache ({len(forecasts)} days)")
-
-                    # Update last refresh time
-                    await update_refresh_time(db, 'tempo_forecast')
-                else:
-                    logger.debug("[SCHEDULER] Skipping TEMPO forecast refresh - last refresh too recent")
-
-        except Exception as e:
-            logger.error(f"[SCHEDULER ERROR] Failed to refresh TEMPO forecast cache: {e}")
-            import traceback
-            traceback.print_exc()
-
-        # Wait 4 hours before next check
-        await asyncio.sleep(4 * 3600)
-
-
-async def refresh_consumption_france_cache_task() -> None:
-    """Refresh Consumption France cache from RTE API (runs every 15 minutes)
+    # Récupérer les statistiques de la saison
+    current_date = date.today()
+    if current_date.month >= 9:
+        season_start = datetime(current_date.year, 9, 1, tzinfo=UTC)
+    else:
+        season_start = datetime(current_date.year - 1, 9, 1, tzinfo=UTC)
+
+    # Compter les jours Tempo de la saison
+    result = await db.execute(
+        select(TempoDay.color, func.count(TempoDay.id))
+        .where(TempoDay.date >= season_start.date())
+        .group_by(TempoDay.color)
+    )
+    color_counts = {row[0]: row[1] for row in result.fetchall()}
+    blue_used = color_counts.get("BLUE", 0)
+    white_used = color_counts.get("WHITE", 0)
+    red_used = color_counts.get("RED", 0)
+
+    # Générer les prévisions pour 8 jours
+    forecasts = await tempo_forecast_service.get_forecasts(
+        days_ahead=8,
+        blue_used=blue_used,
+        white_used=white_used,
+        red_used=red_used,
+        reference_date=current_date,
+    )
+
+    # Construire les données de cache
+    response_data = {
+        "season": f"{season_start.year}/{season_start.year + 1}",
+        "season_stats": {
+            "blue_used": blue_used,
+            "blue_remaining": 300 - blue_used,
+            "white_used": white_used,
+            "white_remaining": 43 - white_used,
+            "red_used": red_used,
+            "red_remaining": 22 - red_used,
+        },
+        "forecasts": [
+            {
+                "date": f.date,
+                "day_in_season": f.day_in_season,
+                "probability_blue": f.probability_blue,
+                "probability_white": f.probability_white,
+                "probability_red": f.probability_red,
+                "most_likely": f.most_likely,
+                "confidence": f.confidence,
+                "threshold_white_red": f.threshold_white_red,
+                "threshold_red": f.threshold_red,
+                "normalized_consumption": f.normalized_consumption,
+                "forecast_type": f.forecast_type,
+                "factors": f.factors,
+            }
+            for f in forecasts
+        ],
+        "algorithm_info": {
+            "description": "Algorithme basé sur les seuils RTE officiels",
+            "params_blanc_rouge": {"A": 4.0, "B": 0.015, "C": 0.026},
+            "params_rouge": {"A": 3.15, "B": 0.01, "C": 0.031},
+            "formula_blanc_rouge": "Seuil = A - B × JourTempo - C × StockRestant(Blanc+Rouge)",
+            "formula_rouge": "Seuil = A' - B' × JourTempo - C' × StockRestant(Rouge)",
+        },
+        "cached_at": datetime.now(UTC).isoformat(),
+        "cache_ttl_hours": 4,
+    }
+
+    # Sauvegarder dans le cache (clé pour 8 jours)
+    cache_key = f"tempo:forecast:{current_date.isoformat()}:8"
+    await cache_service.set_raw(cache_key, json.dumps(response_data), ttl=4 * 3600)
+
+    return f"{len(forecasts)} forecast days"
+
+
+async def refresh_consumption_france_cache(db: AsyncSession) -> str:
+    """Refresh Consumption France cache from RTE API
 
     Les données de consommation nationale sont mises à jour toutes les 15 minutes.
     """
-    while True:
-        try:
-            async with async_session_maker() as db:
-                # Check if we should refresh (minimum 15 minutes between refreshes)
-                if await should_refresh(db, 'consumption_france', 15):
-                    logger.info(f"[SCHEDULER] {datetime.now(UTC).isoformat()} - Starting Consumption France cache refresh...")
+    updated_count = await rte_service.update_consumption_france_cache(db)
+    return f"{updated_count} Consumption France records"
 
-                    updated_count = await rte_service.update_consumption_france_cache(db)
-                    logger.info(f"[SCHEDULER] Successfully refreshed {updated_count} Consumption France records")
 
-                    # Update last refresh time
-                    await update_refresh_time(db, 'consumption_france')
-                else:
-                    logger.debug("[SCHEDULER] Skipping Consumption France refresh - last refresh too recent")
+async def refresh_generation_forecast_cache(db: AsyncSession) -> str:
+    """Refresh Generation Forecast cache from RTE API
 
-        except Exception as e:
-            logger.error(f"[SCHEDULER ERROR] Failed to refresh Consumption France cache: {e}")
-            import traceback
-            traceback.print_exc()
+    Les prévisions de production renouvelable sont mises à jour régulièrement.
+    """
+    updated_count = await rte_service.update_generation_forecast_cache(db)
+    return f"{updated_count} Generation Forecast records"
 
-        # Wait 15 minutes before next check
-        await asyncio.sleep(900)
 
+async def compact_detail_cache(db: AsyncSession) -> str:
+    """Compact legacy per-reading detail cache keys into per-day entries
 
-async def refresh_generation_forecast_cache_task() -> None:
-    """Refresh Generation Forecast cache from RTE API (runs every 30 minutes)
+    Les anciennes clés (une par mesure, ~48 par jour) sont réécrites au format
+    consumption:detail:daily:{pdl}:{date} puis supprimées.
+    """
+    from .detail_cache import compact_legacy_detail_keys
 
-    Les prévisions de production renouvelable sont mises à jour régulièrement.
+    stats = await compact_legacy_detail_keys()
+    return f"{stats['keys_deleted']} legacy keys removed, {stats['days_compacted']} days compacted"
+
+
+async def run_cache_maintenance(db: AsyncSession) -> str:
+    """Reconcile the cache accounting index and enforce cache quotas
+
+    Les entrées expirées sont retirées de l'index, puis les quotas par PDL et par
+    utilisateur sont appliqués (éviction des plages les moins récemment utilisées).
     """
-    while True:
-        try:
-            async with async_session_maker() as db:
-                # Check if we should refresh (minimum 30 minutes between refreshes)
-                if await should_refresh(db, 'generation_forecast', 30):
-                    logger.info(f"[SCHEDULER] {datetime.now(UTC).isoformat()} - Starting Generation Forecast cache refresh...")
+    from collections import defaultdict
 
-                    updated_count = await rte_service.update_generation_forecast_cache(db)
-                    logger.info(f"[SCHEDULER] Successfully refreshed {updated_count} Generation Forecast records")
+    from ..models import PDL
+    from .cache import cache_service
+    from .cache_accounting import cache_accounting
+
+    if not cache_service.redis_client:
+        return "skipped (Redis unavailable)"
 
-                    # Update last refresh time
-                    await update_refresh_time(db, 'generation_forecast')
-                else:
-                    logger.debug("[SCHEDULER] Skipping Generation Forecast refresh - last refresh too recent")
+    result = await db.execute(select(PDL.user_id, PDL.usage_point_id))
+    pdls_by_user: dict[str, list[str]] = defaultdict(list)
+    for user_id, usage_point_id in result.all():
+        pdls_by_user[user_id].append(usage_point_id)
 
-        except Exception as e:
-            logger.error(f"[SCHEDULER ERROR] Failed to refresh Generation Forecast cache: {e}")
-            import traceback
-            traceback.print_exc()
+    stats = await cache_accounting.run_maintenance(cache_service.redis_client, pdls_by_user)
+    return f"{stats['pdls']} PDLs, {stats['stale_entries']} stale entries, {stats['evicted']} evicted"
 
-        # Wait 30 minutes before next check
-        await asyncio.sleep(1800)
+
+PERIODIC_TASKS = [
+    PeriodicTask("tempo", 10 * 60, refresh_tempo_cache, "TEMPO days (RTE)"),
+    PeriodicTask("ecowatt", 60 * 60, refresh_ecowatt_cache, "EcoWatt signals (RTE)"),
+    PeriodicTask("tempo_forecast", 4 * 3600, refresh_tempo_forecast_cache, "TEMPO forecasts (8 days)"),
+    PeriodicTask("consumption_france", 15 * 60, refresh_consumption_france_cache, "French consumption (RTE)"),
+    PeriodicTask("generation_forecast", 30 * 60, refresh_generation_forecast_cache, "Renewable generation (RTE)"),
+    PeriodicTask("detail_cache_compaction", 6 * 3600, compact_detail_cache, "Legacy detail cache keys compaction"),
+    PeriodicTask("cache_maintenance", 60 * 60, run_cache_maintenance, "Cache accounting and quotas"),
+]
 
 
 def start_background_tasks() -> None:
     """Start all background tasks"""
-    asyncio.create_task(refresh_tempo_cache_task())
-    asyncio.create_task(refresh_ecowatt_cache_task())
-    asyncio.create_task(refresh_tempo_forecast_cache_task())
-    asyncio.create_task(refresh_consumption_france_cache_task())
-    asyncio.create_task(refresh_generation_forecast_cache_task())
-    logger.info("[SCHEDULER] Background tasks started (Tempo, EcoWatt, Tempo Forecast, Consumption France, Generation Forecast)")
+    for task in PERIODIC_TASKS:
+        task_coordinator.register(task)
+    task_coordinator.start()
+    scraper_jobs.start_workers()
+    notification_queue.start_workers()
+    logger.info(
+        f"[SCHEDULER] Background tasks started ({', '.join(task.name for task in PERIODIC_TASKS)}, "
+        "scraper jobs, notifications)"
+    )
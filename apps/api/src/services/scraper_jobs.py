@@ -0,0 +1,475 @@
+"""Job runner for energy offer scraping (preview / refresh), safe with several API replicas.
+
+Layout (Redis):
+- ``scraper_jobs:queue``       : LIST of queued job ids, consumed by the worker pool of any replica
+- ``scraper_jobs:job:{id}``    : HASH kind, provider, status, steps, progress, result... (TTL ``SCRAPER_JOB_TTL_SECONDS``)
+- ``scraper_jobs:lock``        : id of the job holding the distributed lock (one scraping job at a time),
+                                 taken at submission and renewed by the worker while the job runs. A job
+                                 that loses it is cancelled, and a running job without it is reported failed
+- ``scraped_offers:{provider}``: offers scraped by a preview, reused by the next refresh
+
+Progress is read from Redis, so any replica can answer status polling or stream it by job id.
+"""
+import asyncio
+import json
+import logging
+import uuid
+from itertools import chain
+from datetime import UTC, datetime
+from typing import Any, AsyncGenerator, Awaitable, Callable, List, Optional
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..config import settings
+from ..models.database import async_session_maker
+from ..schemas import APIResponse, ErrorDetail
+from .cache import cache_service
+from .price_update_service import PriceUpdateService
+
+logger = logging.getLogger(__name__)
+
+QUEUE_KEY = "scraper_jobs:queue"
+LOCK_KEY = "scraper_jobs:lock"
+JOB_KINDS = ("preview", "refresh")
+FINISHED_STATUSES = ("completed", "failed")
+
+# Cache pour les offres scrapées (évite de re-scraper entre preview et refresh)
+# TTL de 5 minutes - les offres scrapées sont réutilisées si le refresh est fait rapidement
+SCRAPED_OFFERS_CACHE_TTL = 300  # 5 minutes
+
+# Release the lock only if still owned by the job (it may have expired and been taken by another job)
+RELEASE_LOCK_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+# Extend the lock only if still owned by the job
+RENEW_LOCK_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('EXPIRE', KEYS[1], ARGV[2])
+end
+return 0
+"""
+
+# Write the final state of a job only if it still owns the lock
+FINISH_JOB_SCRIPT = """
+if redis.call('GET', KEYS[2]) ~= ARGV[1] then
+    return 0
+end
+redis.call('HSET', KEYS[1], unpack(ARGV, 2))
+return 1
+"""
+
+# Mark failed a job reported running while the lock is gone (replica stopped, lock expired)
+FAIL_ORPHANED_JOB_SCRIPT = """
+if redis.call('HGET', KEYS[1], 'status') == 'running' and redis.call('GET', KEYS[2]) ~= ARGV[1] then
+    redis.call('HSET', KEYS[1], unpack(ARGV, 2))
+end
+return 0
+"""
+
+ProgressCallback = Callable[[str, int], Awaitable[None]]
+
+
+class JobConflictError(Exception):
+    """A scraping job is already queued or running"""
+
+    def __init__(self, job: Optional[dict[str, Any]]) -> None:
+        self.job = job
+        provider = job.get("provider") if job else None
+        started_at = (job.get("started_at") or job.get("created_at")) if job else None
+        super().__init__(
+            f"Une synchronisation est déjà en cours pour le fournisseur '{provider}' depuis {started_at}"
+        )
+
+
+def _lock_lost_response() -> APIResponse:
+    return APIResponse(
+        success=False,
+        error=ErrorDetail(code="JOB_LOCK_LOST", message="Verrou perdu (expiré ou replica arrêté) : job interrompu"),
+    )
+
+
+def _finished_fields(response: APIResponse) -> dict[str, str]:
+    """Final state of a job, as stored in its hash"""
+    return {
+        "status": "completed" if response.success else "failed",
+        "result": response.model_dump_json(),
+        "error": response.error.message if response.error else "",
+        "finished_at": datetime.now(UTC).isoformat(),
+    }
+
+
+def _decode_job(raw: dict[bytes, bytes]) -> dict[str, Any]:
+    job: dict[str, Any] = {k.decode(): v.decode() for k, v in raw.items()}
+    job["progress"] = int(job.get("progress") or 0)
+    job["steps"] = json.loads(job.get("steps") or "[]")
+    job["result"] = json.loads(job["result"]) if job.get("result") else None
+    for field in ("started_at", "finished_at", "current_step", "error"):
+        job[field] = job.get(field) or None
+    return job
+
+
+async def cache_scraped_offers(provider: str, offers: List[dict]) -> None:
+    """Cache les offres scrapées pour éviter un double scraping"""
+    try:
+        if cache_service.redis_client:
+            await cache_service.redis_client.setex(f"scraped_offers:{provider}", SCRAPED_OFFERS_CACHE_TTL, json.dumps(offers))
+            logger.info(f"Cached {len(offers)} scraped offers for {provider} (TTL: {SCRAPED_OFFERS_CACHE_TTL}s)")
+    except Exception as e:
+        logger.error(f"Failed to cache offers for {provider}: {e}")
+
+
+async def get_cached_offers(provider: str) -> List[dict] | None:
+    """Récupère les offres scrapées du cache si disponibles"""
+    try:
+        if cache_service.redis_client:
+            cached = await cache_service.redis_client.get(f"scraped_offers:{provider}")
+            if cached:
+                offers: List[dict] = json.loads(cached)
+                logger.info(f"Found {len(offers)} cached offers for {provider}")
+                return offers
+    except Exception as e:
+        logger.error(f"Failed to get cached offers for {provider}: {e}")
+    return None
+
+
+async def clear_cached_offers(provider: str) -> None:
+    """Supprime les offres scrapées du cache après utilisation"""
+    try:
+        if cache_service.redis_client:
+            await cache_service.redis_client.delete(f"scraped_offers:{provider}")
+            logger.info(f"Cleared cached offers for {provider}")
+    except Exception as e:
+        logger.error(f"Failed to clear cached offers for {provider}: {e}")
+
+
+def _empty_preview(error: str) -> dict[str, Any]:
+    return {
+        "error": error,
+        "offers_to_create": [],
+        "offers_to_update": [],
+        "offers_to_deactivate": [],
+        "summary": {"total_offers": 0, "new": 0, "updated": 0, "deactivated": 0},
+    }
+
+
+def _preview_entry(preview_result: dict[str, Any], with_fallback: bool = False) -> dict[str, Any]:
+    entry = {
+        "offers_to_create": preview_result["offers_to_create"],
+        "offers_to_update": preview_result["offers_to_update"],
+        "offers_to_deactivate": preview_result["offers_to_deactivate"],
+        "summary": {
+            "total_offers": preview_result["summary"]["total_scraped"],
+            "new": preview_result["summary"]["new"],
+            "updated": preview_result["summary"]["updated"],
+            "deactivated": preview_result["summary"]["deactivated"],
+        },
+    }
+    if with_fallback:
+        entry["used_fallback"] = preview_result.get("used_fallback", False)
+        entry["fallback_reason"] = preview_result.get("fallback_reason")
+    return entry
+
+
+async def run_preview(db: AsyncSession, provider: Optional[str], progress: ProgressCallback) -> APIResponse:
+    """Scrape offers and compare them with the database (DRY RUN)"""
+    service = PriceUpdateService(db)
+
+    if provider:
+        await progress(f"Téléchargement des tarifs {provider}", 20)
+        preview_result = await service.preview_provider_update(provider)
+        await progress("Analyse des changements", 80)
+
+        if not preview_result.get("success"):
+            return APIResponse(
+                success=False,
+                error=ErrorDetail(code="PREVIEW_FAILED", message=preview_result.get("error", "Unknown error")),
+            )
+
+        # Cache scraped offers for later refresh (avoids re-scraping)
+        if preview_result.get("scraped_offers"):
+            await cache_scraped_offers(provider, preview_result["scraped_offers"])
+
+        return APIResponse(
+            success=True,
+            data={
+                "preview": {provider: _preview_entry(preview_result, with_fallback=True)},
+                "timestamp": datetime.now(UTC).isoformat(),
+            },
+        )
+
+    # Preview all providers
+    preview_results = {}
+    providers_list = list(PriceUpdateService.SCRAPERS.keys())
+    total_providers = len(providers_list)
+
+    for idx, provider_name in enumerate(providers_list):
+        await progress(
+            f"Téléchargement {provider_name} ({idx + 1}/{total_providers})", 10 + int((idx / total_providers) * 80)
+        )
+        try:
+            preview_result = await service.preview_provider_update(provider_name)
+            if preview_result.get("success"):
+                preview_results[provider_name] = _preview_entry(preview_result)
+            else:
+                preview_results[provider_name] = _empty_preview(preview_result.get("error", "Unknown error"))
+        except Exception as e:
+            logger.error(f"Error previewing {provider_name}: {e}", exc_info=True)
+            preview_results[provider_name] = _empty_preview(str(e))
+
+    return APIResponse(success=True, data={"preview": preview_results, "timestamp": datetime.now(UTC).isoformat()})
+
+
+async def run_refresh(db: AsyncSession, provider: Optional[str], progress: ProgressCallback) -> APIResponse:
+    """Scrape offers (or reuse the ones of the last preview) and save them"""
+    service = PriceUpdateService(db)
+
+    if provider:
+        # Check for cached offers from preview (avoids re-scraping)
+        cached_offers = await get_cached_offers(provider)
+
+        if cached_offers:
+            # Continue from where preview left off (80%)
+            # Preview: 0% → 20% (download) → 80% (analysis done)
+            # Refresh with cache: 80% → 90% (DB update) → 100% (done)
+            await progress(f"Utilisation des données en cache pour {provider}", 82)
+        else:
+            await progress(f"Téléchargement des tarifs {provider}", 20)
+
+        result = await service.update_provider(provider, cached_offers=cached_offers)
+
+        # Progress depends on whether we used cache
+        await progress("Mise à jour de la base de données", 90 if cached_offers else 80)
+
+        # Clear cache after use
+        if cached_offers:
+            await clear_cached_offers(provider)
+
+        if not result.get("success"):
+            return APIResponse(
+                success=False,
+                error=ErrorDetail(code="UPDATE_FAILED", message=result.get("error", "Unknown error")),
+            )
+
+        await progress("Terminé", 100)
+        return APIResponse(
+            success=True,
+            data={
+                "message": f"Successfully updated {provider}" + (" (from cache)" if cached_offers else ""),
+                "result": result,
+                "used_cache": cached_offers is not None,
+            },
+        )
+
+    # Update all providers
+    await progress("Mise à jour de tous les fournisseurs", 10)
+    results = await service.update_all_providers()
+
+    successful = sum(1 for r in results.values() if r.get("success"))
+    failed = len(results) - successful
+    total_created = sum(r.get("offers_created", 0) for r in results.values() if r.get("success"))
+    total_updated = sum(r.get("offers_updated", 0) for r in results.values() if r.get("success"))
+
+    await progress("Terminé", 100)
+    return APIResponse(
+        success=True,
+        data={
+            "message": f"Updated {successful} providers ({failed} failed)",
+            "providers_updated": successful,
+            "providers_failed": failed,
+            "total_offers_created": total_created,
+            "total_offers_updated": total_updated,
+            "results": results,
+        },
+    )
+
+
+RUNNERS: dict[str, Callable[[AsyncSession, Optional[str], ProgressCallback], Awaitable[APIResponse]]] = {
+    "preview": run_preview,
+    "refresh": run_refresh,
+}
+
+
+class ScraperJobService:
+    """Enqueue scraping jobs, run them in a worker pool and expose their progress"""
+
+    def __init__(self) -> None:
+        self._workers: list[asyncio.Task] = []
+
+    def _job_key(self, job_id: str) -> str:
+        return f"scraper_jobs:job:{job_id}"
+
+    @property
+    def _redis(self) -> Any:
+        if not cache_service.redis_client:
+            raise RuntimeError("Redis is required to run scraping jobs")
+        return cache_service.redis_client
+
+    async def submit(self, kind: str, provider: Optional[str]) -> dict[str, Any]:
+        """Take the distributed lock and enqueue a job
+
+        Raises:
+            JobConflictError: if another scraping job holds the lock
+        """
+        if kind not in JOB_KINDS:
+            raise ValueError(f"Unknown scraper job kind: {kind}")
+
+        redis_client = self._redis
+        job_id = uuid.uuid4().hex
+        if not await redis_client.set(LOCK_KEY, job_id, nx=True, ex=settings.SCRAPER_JOB_LOCK_TTL_SECONDS):
+            raise JobConflictError(await self.current_job())
+
+        job = {
+            "id": job_id,
+            "kind": kind,
+            "provider": provider or "all",
+            "status": "queued",
+            "created_at": datetime.now(UTC).isoformat(),
+            "current_step": "Initialisation",
+            "steps": json.dumps(["Initialisation"]),
+            "progress": 5,
+        }
+        async with redis_client.pipeline(transaction=False) as pipe:
+            pipe.hset(self._job_key(job_id), mapping=job)
+            pipe.expire(self._job_key(job_id), settings.SCRAPER_JOB_TTL_SECONDS)
+            pipe.rpush(QUEUE_KEY, job_id)
+            await pipe.execute()
+
+        logger.info(f"[SCRAPER JOBS] Queued {kind} job {job_id} for {job['provider']}")
+        return await self.get_job(job_id)  # type: ignore[return-value]
+
+    async def get_job(self, job_id: str) -> Optional[dict[str, Any]]:
+        """Job state. A running job whose lock is gone is marked failed (its worker stopped or lost the lock)"""
+        fail_orphaned = self._redis.register_script(FAIL_ORPHANED_JOB_SCRIPT)
+        fields = _finished_fields(_lock_lost_response())
+        await fail_orphaned(keys=[self._job_key(job_id), LOCK_KEY], args=[job_id, *chain(*fields.items())])
+        raw = await self._redis.hgetall(self._job_key(job_id))
+        return _decode_job(raw) if raw else None
+
+    async def current_job(self) -> Optional[dict[str, Any]]:
+        """Job holding the lock (queued or running), if any"""
+        job_id = await self._redis.get(LOCK_KEY)
+        return await self.get_job(job_id.decode()) if job_id else None
+
+    async def wait(self, job_id: str, timeout: float) -> Optional[dict[str, Any]]:
+        """Poll a job until it finishes (or the timeout expires) and return its last state"""
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        job = await self.get_job(job_id)
+        while job and job["status"] not in FINISHED_STATUSES and loop.time() < deadline:
+            await asyncio.sleep(settings.SCRAPER_JOB_POLL_SECONDS)
+            job = await self.get_job(job_id)
+        return job
+
+    async def stream(self, job_id: str) -> AsyncGenerator[dict[str, Any], None]:
+        """Yield the job state each time its progress changes, until it finishes or expires"""
+        last_state = None
+        while True:
+            job = await self.get_job(job_id)
+            if job is None:
+                return
+            state = (job["status"], job["current_step"], job["progress"])
+            if state != last_state:
+                last_state = state
+                yield job
+            if job["status"] in FINISHED_STATUSES:
+                return
+            await asyncio.sleep(settings.SCRAPER_JOB_POLL_SECONDS)
+
+    async def _update(self, job_id: str, **fields: Any) -> None:
+        await self._redis.hset(self._job_key(job_id), mapping=fields)
+
+    async def _execute(self, job: dict[str, Any], progress: ProgressCallback) -> APIResponse:
+        provider = None if job["provider"] == "all" else job["provider"]
+        async with async_session_maker() as db:
+            return await RUNNERS[job["kind"]](db, provider, progress)
+
+    async def _run(self, job_id: str) -> None:
+        job = await self.get_job(job_id)
+        if job is None:
+            logger.warning(f"[SCRAPER JOBS] Job {job_id} expired before it could run")
+            return
+
+        redis_client = self._redis
+        renew_lock = redis_client.register_script(RENEW_LOCK_SCRIPT)
+        release_lock = redis_client.register_script(RELEASE_LOCK_SCRIPT)
+        finish_job = redis_client.register_script(FINISH_JOB_SCRIPT)
+        steps: list[str] = job["steps"]
+        lock_lost = asyncio.Event()
+
+        async def renew() -> None:
+            """Extend the lock; cancel the job if another job holds it"""
+            if not await renew_lock(keys=[LOCK_KEY], args=[job_id, settings.SCRAPER_JOB_LOCK_TTL_SECONDS]):
+                logger.warning(f"[SCRAPER JOBS] Job {job_id} lost its lock, cancelling it")
+                lock_lost.set()
+                run_task.cancel()
+
+        async def progress(step: str, value: int) -> None:
+            if step not in steps:
+                steps.append(step)
+            await self._update(job_id, current_step=step, progress=value, steps=json.dumps(steps))
+            # Heartbeat: the lock stays held as long as the job makes progress
+            await renew()
+
+        async def heartbeat() -> None:
+            while not lock_lost.is_set():
+                await asyncio.sleep(settings.SCRAPER_JOB_LOCK_TTL_SECONDS / 3)
+                try:
+                    await renew()
+                except Exception as e:
+                    # The lock is still valid until its TTL: retry at the next beat
+                    logger.warning(f"[SCRAPER JOBS] Job {job_id}: lock renewal failed: {e}")
+
+        await self._update(job_id, status="running", started_at=datetime.now(UTC).isoformat())
+        run_task = asyncio.create_task(self._execute(job, progress))
+        heartbeat_task = asyncio.create_task(heartbeat())
+        try:
+            try:
+                response = await run_task
+                logger.info(
+                    f"[SCRAPER JOBS] Job {job_id} ({job['kind']} {job['provider']}) finished: {response.success}"
+                )
+            except asyncio.CancelledError:
+                # Cancelled on a lost lock: another job may run now. Any other cancellation propagates.
+                if not lock_lost.is_set():
+                    raise
+                response = _lock_lost_response()
+            except Exception as e:
+                logger.error(f"[SCRAPER JOBS] Job {job_id} failed: {e}", exc_info=True)
+                response = APIResponse(
+                    success=False, error=ErrorDetail(code=f"{job['kind'].upper()}_ERROR", message=str(e))
+                )
+
+            fields = _finished_fields(response)
+            if not await finish_job(keys=[self._job_key(job_id), LOCK_KEY], args=[job_id, *chain(*fields.items())]):
+                logger.warning(f"[SCRAPER JOBS] Job {job_id} lost its lock before finishing, result not recorded")
+                await self._update(job_id, **_finished_fields(_lock_lost_response()))
+        finally:
+            heartbeat_task.cancel()
+            await release_lock(keys=[LOCK_KEY], args=[job_id])
+
+    async def _worker(self, index: int) -> None:
+        while True:
+            try:
+                if not cache_service.redis_client:
+                    await asyncio.sleep(30)
+                    continue
+                popped = await cache_service.redis_client.blpop([QUEUE_KEY], timeout=5)
+                if popped:
+                    await self._run(popped[1].decode())
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"[SCRAPER JOBS] Worker {index} error: {e}")
+                await asyncio.sleep(5)
+
+    def start_workers(self) -> None:
+        """Start the worker pool of this replica"""
+        for index in range(settings.SCRAPER_JOB_WORKERS):
+            self._workers.append(asyncio.create_task(self._worker(index)))
+
+
+scraper_jobs = ScraperJobService()
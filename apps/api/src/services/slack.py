@@ -2,6 +2,7 @@ import httpx
 from typing import Any
 from ..config import settings
 from ..models import OfferContribution, User
+from .notification_queue import notification_queue
 import logging
 
 
@@ -18,14 +19,14 @@ class SlackService:
     async def send_notification(
         self, message: str, blocks: list[dict[str, Any]] | None = None
     ) -> bool:
-        """Send a notification to Slack
+        """Queue a notification to Slack (see services/notification_queue.py), or send it when no queue runs
 
         Args:
             message: Fallback text message
             blocks: Slack block kit blocks for rich formatting
 
         Returns:
-            True if message was sent successfully, False otherwise
+            True if message was queued or sent, False otherwise
         """
         if not self.enabled:
             logger.debug("[SLACK] Notifications disabled")
@@ -35,16 +36,35 @@ class SlackService:
             logger.warning("[SLACK] Webhook URL not configured")
             return False
 
+        if not notification_queue.queued:
+            return await self.deliver(message, blocks)
+        return await notification_queue.enqueue_slack(message, blocks)
+
+    async def deliver(
+        self, message: str, blocks: list[dict[str, Any]] | None = None, client: httpx.AsyncClient | None = None
+    ) -> bool:
+        """Post a notification to the Slack webhook (called by the notification workers)
+
+        Returns:
+            True if message was sent successfully, False otherwise
+        """
+        if not self.enabled or not self.webhook_url:
+            # Disabled since the message was queued: nothing to retry
+            return True
+
         try:
             payload: dict[str, Any] = {"text": message}
             if blocks:
                 payload["blocks"] = blocks
 
-            async with httpx.AsyncClient(timeout=5.0) as client:
-                response = await client.post(self.webhook_url, json=payload)
-                response.raise_for_status()
-                logger.info("[SLACK] Notification sent successfully")
-                return True
+            if client is None:
+                async with httpx.AsyncClient(timeout=5.0) as own_client:
+                    response = await own_client.post(self.webhook_url, json=payload)
+            else:
+                response = await client.post(self.webhook_url, json=payload, timeout=5.0)
+            response.raise_for_status()
+            logger.info("[SLACK] Notification sent successfully")
+            return True
         except httpx.TimeoutException:
             logger.error("[SLACK] Timeout while sending notification")
             return False
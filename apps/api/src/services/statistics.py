@@ -20,7 +20,8 @@ from sqlalchemy import func, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from ..models.client_mode import ConsumptionData, DataGranularity, ProductionData
-from ..models.tempo_day import TempoDay
+from .offpeak import compile_schedule
+from .tempo_calendar import tempo_calendar
 
 logger = logging.getLogger(__name__)
 
@@ -265,41 +266,6 @@ class StatisticsService:
     # HP/HC STATISTICS (Peak/Off-peak based on detailed data)
     # =========================================================================
 
-    def _is_offpeak_hour(self, interval_start: str | None, offpeak_hours: list[dict[str, str]]) -> bool:
-        """Check if an interval is during off-peak hours
-
-        Args:
-            interval_start: Time string like "00:00", "00:30", etc.
-            offpeak_hours: List of offpeak periods like [{"start": "22:00", "end": "06:00"}]
-
-        Returns:
-            True if the interval is during off-peak hours
-        """
-        if not interval_start or not offpeak_hours:
-            return False
-
-        try:
-            hour, minute = map(int, interval_start.split(":"))
-            time_minutes = hour * 60 + minute
-
-            for period in offpeak_hours:
-                start_h, start_m = map(int, period["start"].split(":"))
-                end_h, end_m = map(int, period["end"].split(":"))
-
-                start_minutes = start_h * 60 + start_m
-                end_minutes = end_h * 60 + end_m
-
-                # Handle overnight periods (e.g., 22:00 - 06:00)
-                if start_minutes > end_minutes:
-                    if time_minutes >= start_minutes or time_minutes < end_minutes:
-                        return True
-                elif start_minutes <= time_minutes < end_minutes:
-                    return True
-
-            return False
-        except (ValueError, KeyError):
-            return False
-
     async def get_hp_hc_year_total(
         self,
         usage_point_id: str,
@@ -330,16 +296,7 @@ class StatisticsService:
             .where(model.date <= end_date)
         )
 
-        hp_total = 0
-        hc_total = 0
-
-        for row in result.all():
-            if self._is_offpeak_hour(row.interval_start, offpeak_hours):
-                hc_total += row.value
-            else:
-                hp_total += row.value
-
-        return hp_total, hc_total
+        return compile_schedule(offpeak_hours).split(result.all())
 
     async def get_hp_hc_month_total(
         self,
@@ -377,16 +334,7 @@ class StatisticsService:
             .where(model.date <= end_date)
         )
 
-        hp_total = 0
-        hc_total = 0
-
-        for row in result.all():
-            if self._is_offpeak_hour(row.interval_start, offpeak_hours):
-                hc_total += row.value
-            else:
-                hp_total += row.value
-
-        return hp_total, hc_total
+        return compile_schedule(offpeak_hours).split(result.all())
 
     async def get_hp_hc_week_total(
         self,
@@ -416,16 +364,7 @@ class StatisticsService:
             .where(model.date <= end_date)
         )
 
-        hp_total = 0
-        hc_total = 0
-
-        for row in result.all():
-            if self._is_offpeak_hour(row.interval_start, offpeak_hours):
-                hc_total += row.value
-            else:
-                hp_total += row.value
-
-        return hp_total, hc_total
+        return compile_schedule(offpeak_hours).split(result.all())
 
     async def get_hp_hc_current_week_by_day(
         self,
@@ -441,6 +380,7 @@ class StatisticsService:
         model = self._get_model(direction)
         today = date.today()
         monday = today - timedelta(days=today.weekday())
+        offpeak = compile_schedule(offpeak_hours)
 
         result = {}
         for i, day_name in enumerate(DAY_NAMES):
@@ -453,16 +393,7 @@ class StatisticsService:
                 .where(model.date == day_date)
             )
 
-            hp_total = 0
-            hc_total = 0
-
-            for row in query_result.all():
-                if self._is_offpeak_hour(row.interval_start, offpeak_hours):
-                    hc_total += row.value
-                else:
-                    hp_total += row.value
-
-            result[day_name] = (hp_total, hc_total)
+            result[day_name] = offpeak.split(query_result.all())
 
         return result
 
@@ -483,38 +414,7 @@ class StatisticsService:
         Returns:
             Dict mapping color (BLUE, WHITE, RED) to Wh total
         """
-        model = self._get_model(direction)
-        start_date = date(year, 1, 1)
-        end_date = date(year, 12, 31)
-
-        # Get all Tempo days for the year (use ID for comparison - YYYY-MM-DD format)
-        tempo_result = await self.db.execute(
-            select(TempoDay.id, TempoDay.color)
-            .where(TempoDay.id >= start_date.isoformat())
-            .where(TempoDay.id <= end_date.isoformat())
-        )
-        # Map date string (YYYY-MM-DD) to color
-        tempo_days = {row.id: row.color.value if hasattr(row.color, 'value') else row.color for row in tempo_result.all()}
-
-        # Get all consumption for the year
-        consumption_result = await self.db.execute(
-            select(model.date, model.value)
-            .where(model.usage_point_id == usage_point_id)
-            .where(model.granularity == DataGranularity.DAILY)
-            .where(model.date >= start_date)
-            .where(model.date <= end_date)
-        )
-
-        totals = {"BLUE": 0, "WHITE": 0, "RED": 0}
-
-        for row in consumption_result.all():
-            # Convert date to ISO format to match tempo_days keys
-            date_str = row.date.isoformat() if hasattr(row.date, 'isoformat') else str(row.date)
-            color = tempo_days.get(date_str)
-            if color and color in totals:
-                totals[color] += row.value
-
-        return totals
+        return await self._get_tempo_totals(usage_point_id, date(year, 1, 1), date(year, 12, 31), direction)
 
     async def get_tempo_month_totals(
         self, usage_point_id: str, year: int, month: int, direction: str = "consumption"
@@ -524,23 +424,21 @@ class StatisticsService:
         Returns:
             Dict mapping color (BLUE, WHITE, RED) to Wh total
         """
-        model = self._get_model(direction)
         start_date = date(year, month, 1)
         if month == 12:
             end_date = date(year + 1, 1, 1) - timedelta(days=1)
         else:
             end_date = date(year, month + 1, 1) - timedelta(days=1)
 
-        # Get Tempo days (use ID for comparison - YYYY-MM-DD format)
-        tempo_result = await self.db.execute(
-            select(TempoDay.id, TempoDay.color)
-            .where(TempoDay.id >= start_date.isoformat())
-            .where(TempoDay.id <= end_date.isoformat())
-        )
-        # Map date string (YYYY-MM-DD) to color
-        tempo_days = {row.id: row.color.value if hasattr(row.color, 'value') else row.color for row in tempo_result.all()}
+        return await self._get_tempo_totals(usage_point_id, start_date, end_date, direction)
+
+    async def _get_tempo_totals(
+        self, usage_point_id: str, start_date: date, end_date: date, direction: str
+    ) -> dict[str, int]:
+        """Daily totals of [start_date, end_date] split by the colour of their day"""
+        model = self._get_model(direction)
+        calendar = await tempo_calendar.get(self.db)
 
-        # Get consumption
         consumption_result = await self.db.execute(
             select(model.date, model.value)
             .where(model.usage_point_id == usage_point_id)
@@ -548,17 +446,9 @@ class StatisticsService:
             .where(model.date >= start_date)
             .where(model.date <= end_date)
         )
+        rows = consumption_result.all()
 
-        totals = {"BLUE": 0, "WHITE": 0, "RED": 0}
-
-        for row in consumption_result.all():
-            # Convert date to ISO format to match tempo_days keys
-            date_str = row.date.isoformat() if hasattr(row.date, 'isoformat') else str(row.date)
-            color = tempo_days.get(date_str)
-            if color and color in totals:
-                totals[color] += row.value
-
-        return totals
+        return calendar.totals([row.date for row in rows], [row.value for row in rows])
 
     # =========================================================================
     # HELPER METHODS
@@ -17,7 +17,9 @@ from sqlalchemy import select, and_, func
 from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from ..adapters.http_resilience import CircuitOpenError, start_retry_budget
 from ..adapters.myelectricaldata import get_med_adapter
+from ..config import settings
 from ..models import PDL, EnergyProvider, EnergyOffer
 from ..models.ecowatt import EcoWatt
 from ..models.tempo_day import TempoDay, TempoColor
@@ -30,6 +32,8 @@ from ..models.client_mode import (
     SyncStatus,
     SyncStatusType,
 )
+from .offer_catalogue import offer_catalogue
+from .tempo_calendar import tempo_calendar
 
 logger = logging.getLogger(__name__)
 
@@ -41,12 +45,32 @@ MAX_DAILY_DAYS = 1095  # 3 years
 _energy_sync_lock = asyncio.Lock()
 
 
+def _parse_utc(value: Any) -> datetime | None:
+    """Parse an ISO 8601 timestamp from the gateway as an aware UTC datetime"""
+    if not value:
+        return None
+    parsed = datetime.fromisoformat(value.replace("Z", "+00:00")) if isinstance(value, str) else value
+    return parsed.replace(tzinfo=UTC) if parsed.tzinfo is None else parsed
+
+
+def _next_watermark(rows: list[dict[str, Any]], current: datetime | None) -> datetime | None:
+    """Highest ``updated_at`` among gateway rows: the ``since`` watermark of the next delta sync"""
+    watermark = _parse_utc(current) if current else None
+    for row in rows:
+        updated_at = _parse_utc(row.get("updated_at"))
+        if updated_at and (watermark is None or updated_at > watermark):
+            watermark = updated_at
+    return watermark
+
+
 class SyncService:
     """Service to sync data from MyElectricalData API to local PostgreSQL"""
 
     def __init__(self, db: AsyncSession) -> None:
         self.db = db
         self.adapter = get_med_adapter()
+        # Retries of transient gateway errors are shared by all requests of this sync run
+        start_retry_budget(settings.MED_RETRY_BUDGET_PER_SYNC)
 
     async def sync_pdl_list(self, user_id: str) -> list[dict[str, Any]]:
         """Sync PDL list from remote API to local database
@@ -152,6 +176,11 @@ class SyncService:
                 if not usage_point_id:
                     continue
 
+                if self.adapter.circuit_breaker.state == "open":
+                    logger.warning(f"[SYNC] Gateway unavailable (circuit open), skipping PDL {usage_point_id}")
+                    results["errors"].append({"pdl": usage_point_id, "error": "gateway unavailable"})
+                    continue
+
                 try:
                     result = await self.sync_pdl(usage_point_id)
                     results["pdls"][usage_point_id] = result
@@ -507,6 +536,8 @@ class SyncService:
         total_synced = 0
         errors = []
 
+        gateway_down = False
+
         try:
             chunk_size = 7 if granularity == DataGranularity.DETAILED else 365
 
@@ -534,6 +565,12 @@ class SyncService:
                             await self._upsert_energy_records(records, model_class)
                             total_synced += len(records)
 
+                    except CircuitOpenError as e:
+                        # Passerelle indisponible : inutile d'enchaîner les chunks suivants
+                        logger.warning(f"[SYNC] {data_type}/{granularity.value} pour {usage_point_id} interrompu: {e}")
+                        errors.append(str(e))
+                        gateway_down = True
+                        break
                     except Exception as e:
                         await self.db.rollback()
                         logger.warning(
@@ -544,6 +581,9 @@ class SyncService:
 
                     current_start = current_end
 
+                if gateway_down:
+                    break
+
             # Update sync status
             if errors:
                 sync_status.status = SyncStatusType.PARTIAL
@@ -856,6 +896,8 @@ class SyncService:
                     logger.info(f"[SYNC] Deleted provider: {local_provider.name}")
 
             await self.db.commit()
+            if result["deleted"]:
+                await offer_catalogue.invalidate()
             logger.info(
                 f"[SYNC] Providers sync complete: "
                 f"{result['created']} created, {result['updated']} updated, "
@@ -888,6 +930,9 @@ class SyncService:
 
         try:
             response = await self.adapter.get_energy_offers()
+            if response.get("not_modified"):
+                logger.info("[SYNC] Energy offers not modified on remote gateway, skipping")
+                return result
             remote_offers = response.get("data", [])
 
             if not remote_offers and response.get("success") is False:
@@ -979,6 +1024,11 @@ class SyncService:
                     logger.error(f"[SYNC] Error deleting offer {offer_id}: {e}")
 
             await self.db.commit()
+            if result["created"] or result["updated"] or result["deleted"]:
+                await offer_catalogue.invalidate()
+            if result["errors"]:
+                # Failed offers: fetch them again next time instead of getting a 304
+                self.adapter.forget_etags("/energy/offers")
             logger.info(
                 f"[SYNC] Offers sync complete: "
                 f"{result['created']} created, {result['updated']} updated, "
@@ -989,6 +1039,7 @@ class SyncService:
             await self.db.rollback()
             logger.error(f"[SYNC] Failed to sync offers: {e}")
             result["errors"].append(str(e))
+            self.adapter.forget_etags("/energy/offers")
 
         return result
 
@@ -1183,8 +1234,14 @@ class SyncService:
         try:
             # Update sync tracker
             await self._update_sync_tracker("ecowatt_client")
-            # Fetch EcoWatt forecast (includes current day + future days)
-            response = await self.adapter.get_ecowatt_forecast()
+            # Fetch EcoWatt forecast (includes current day + future days), only changes since the last sync
+            watermark = await self.get_sync_tracker("ecowatt_client_watermark")
+            response = await self.adapter.get_ecowatt_forecast(
+                since=watermark.isoformat() if watermark else None
+            )
+            if response.get("not_modified"):
+                logger.info("[SYNC] EcoWatt not modified on remote gateway, skipping")
+                return result
 
             # Handle different response formats
             if response.get("success") and response.get("data"):
@@ -1196,6 +1253,9 @@ class SyncService:
                 signals = response if isinstance(response, list) else []
 
             if not signals:
+                if watermark:
+                    logger.info("[SYNC] No EcoWatt change since last sync")
+                    return result
                 logger.warning("[SYNC] No EcoWatt data received from remote gateway")
                 result["errors"].append("No EcoWatt data received")
                 return result
@@ -1271,6 +1331,12 @@ class SyncService:
                     result["errors"].append(str(e))
 
             await self.db.commit()
+            new_watermark = _next_watermark(signals, watermark)
+            if result["errors"]:
+                # Failed rows: fetch them again next time instead of getting a 304
+                self.adapter.forget_etags("/ecowatt/forecast")
+            elif new_watermark:
+                await self._update_sync_tracker("ecowatt_client_watermark", new_watermark)
             logger.info(
                 f"[SYNC] EcoWatt sync complete: "
                 f"{result['created']} created, {result['updated']} updated"
@@ -1279,6 +1345,7 @@ class SyncService:
         except Exception as e:
             logger.error(f"[SYNC] Failed to sync EcoWatt: {e}")
             result["errors"].append(str(e))
+            self.adapter.forget_etags("/ecowatt/forecast")
 
         return result
 
@@ -1305,8 +1372,12 @@ class SyncService:
             # Update sync tracker
             await self._update_sync_tracker("tempo_client")
 
-            # Fetch Tempo calendar (current season)
-            response = await self.adapter.get_tempo_calendar()
+            # Fetch Tempo calendar (current season), only days changed since the last sync
+            watermark = await self.get_sync_tracker("tempo_client_watermark")
+            response = await self.adapter.get_tempo_calendar(since=watermark.isoformat() if watermark else None)
+            if response.get("not_modified"):
+                logger.info("[SYNC] Tempo not modified on remote gateway, skipping")
+                return result
 
             # Handle different response formats
             if response.get("success") and response.get("data"):
@@ -1317,6 +1388,9 @@ class SyncService:
                 calendar_data = response.get("calendar", [])
 
             if not calendar_data:
+                if watermark:
+                    logger.info("[SYNC] No Tempo change since last sync")
+                    return result
                 logger.warning("[SYNC] No Tempo data received from remote gateway")
                 result["errors"].append("No Tempo data received")
                 return result
@@ -1385,6 +1459,14 @@ class SyncService:
                     result["errors"].append(str(e))
 
             await self.db.commit()
+            if result["created"] or result["updated"]:
+                await tempo_calendar.invalidate()
+            new_watermark = _next_watermark(calendar_data, watermark)
+            if result["errors"]:
+                # Failed rows: fetch them again next time instead of getting a 304
+                self.adapter.forget_etags("/tempo/days")
+            elif new_watermark:
+                await self._update_sync_tracker("tempo_client_watermark", new_watermark)
             logger.info(
                 f"[SYNC] Tempo sync complete: "
                 f"{result['created']} created, {result['updated']} updated"
@@ -1393,6 +1475,7 @@ class SyncService:
         except Exception as e:
             logger.error(f"[SYNC] Failed to sync Tempo: {e}")
             result["errors"].append(str(e))
+            self.adapter.forget_etags("/tempo/days")
 
         return result
 
@@ -1445,23 +1528,25 @@ class SyncService:
 
         return result
 
-    async def _update_sync_tracker(self, cache_type: str) -> None:
+    async def _update_sync_tracker(self, cache_type: str, last_refresh: datetime | None = None) -> None:
         """Update the last sync time for a cache type
 
         Args:
             cache_type: The cache type key (e.g., 'tempo_client', 'ecowatt_client')
+            last_refresh: Value to store (defaults to now), e.g. a delta sync watermark
         """
         from ..models.refresh_tracker import RefreshTracker
 
+        last_refresh = last_refresh or datetime.now(UTC)
         result = await self.db.execute(
             select(RefreshTracker).where(RefreshTracker.cache_type == cache_type)
         )
         tracker = result.scalar_one_or_none()
 
         if tracker:
-            tracker.last_refresh = datetime.now(UTC)
+            tracker.last_refresh = last_refresh
         else:
-            new_tracker = RefreshTracker(cache_type=cache_type, last_refresh=datetime.now(UTC))
+            new_tracker = RefreshTracker(cache_type=cache_type, last_refresh=last_refresh)
             self.db.add(new_tracker)
 
         await self.db.commit()
@@ -1506,8 +1591,12 @@ class SyncService:
             # Update sync tracker
             await self._update_sync_tracker("consumption_france_client")
 
-            # Fetch consumption data from gateway
-            response = await self.adapter.get_consumption_france()
+            # Fetch consumption data from gateway, only records changed since the last sync
+            watermark = await self.get_sync_tracker("consumption_france_client_watermark")
+            response = await self.adapter.get_consumption_france(since=watermark.isoformat() if watermark else None)
+            if response.get("not_modified"):
+                logger.info("[SYNC] Consumption France not modified on remote gateway, skipping")
+                return result
 
             # Handle response format
             if response.get("success") and response.get("data"):
@@ -1517,6 +1606,9 @@ class SyncService:
 
             short_term = data.get("short_term", [])
             if not short_term:
+                if watermark:
+                    logger.info("[SYNC] No Consumption France change since last sync")
+                    return result
                 logger.warning("[SYNC] No Consumption France data received from remote gateway")
                 result["errors"].append("No Consumption France data received")
                 return result
@@ -1590,6 +1682,14 @@ class SyncService:
                         result["errors"].append(str(e))
 
             await self.db.commit()
+            new_watermark = _next_watermark(
+                [value for type_data in short_term for value in type_data.get("values", [])], watermark
+            )
+            if result["errors"]:
+                # Failed rows: fetch them again next time instead of getting a 304
+                self.adapter.forget_etags("/consumption-france")
+            elif new_watermark:
+                await self._update_sync_tracker("consumption_france_client_watermark", new_watermark)
             logger.info(
                 f"[SYNC] Consumption France sync complete: "
                 f"{result['created']} created, {result['updated']} updated"
@@ -1598,6 +1698,7 @@ class SyncService:
         except Exception as e:
             logger.error(f"[SYNC] Failed to sync Consumption France: {e}")
             result["errors"].append(str(e))
+            self.adapter.forget_etags("/consumption-france")
 
         return result
 
@@ -1625,8 +1726,12 @@ class SyncService:
             # Update sync tracker
             await self._update_sync_tracker("generation_forecast_client")
 
-            # Fetch generation forecast from gateway
-            response = await self.adapter.get_generation_forecast()
+            # Fetch generation forecast from gateway, only records changed since the last sync
+            watermark = await self.get_sync_tracker("generation_forecast_client_watermark")
+            response = await self.adapter.get_generation_forecast(since=watermark.isoformat() if watermark else None)
+            if response.get("not_modified"):
+                logger.info("[SYNC] Generation Forecast not modified on remote gateway, skipping")
+                return result
 
             # Handle response format
             if response.get("success") and response.get("data"):
@@ -1636,6 +1741,9 @@ class SyncService:
 
             forecasts = data.get("forecasts", [])
             if not forecasts:
+                if watermark:
+                    logger.info("[SYNC] No Generation Forecast change since last sync")
+                    return result
                 logger.warning("[SYNC] No Generation Forecast data received from remote gateway")
                 result["errors"].append("No Generation Forecast data received")
                 return result
@@ -1713,6 +1821,14 @@ class SyncService:
                         result["errors"].append(str(e))
 
             await self.db.commit()
+            new_watermark = _next_watermark(
+                [value for group in forecasts for value in group.get("values", [])], watermark
+            )
+            if result["errors"]:
+                # Failed rows: fetch them again next time instead of getting a 304
+                self.adapter.forget_etags("/generation-forecast")
+            elif new_watermark:
+                await self._update_sync_tracker("generation_forecast_client_watermark", new_watermark)
             logger.info(
                 f"[SYNC] Generation Forecast sync complete: "
                 f"{result['created']} created, {result['updated']} updated"
@@ -1721,5 +1837,6 @@ class SyncService:
         except Exception as e:
             logger.error(f"[SYNC] Failed to sync Generation Forecast: {e}")
             result["errors"].append(str(e))
+            self.adapter.forget_etags("/generation-forecast")
 
         return result
@@ -0,0 +1,302 @@
+"""Coordinator of the periodic background tasks (RTE caches, cache maintenance), safe with several API replicas.
+
+Layout (Redis):
+- ``tasks:{name}:lock``    : ``{fence}:{replica}`` of the run in progress (one run of a task at a time across
+                             replicas), renewed while the task runs
+- ``tasks:{name}:fence``   : fencing counter, incremented each time the lock is taken
+- ``tasks:{name}:history`` : LIST of the last ``TASK_HISTORY_SIZE`` runs (JSON, newest first)
+
+Every replica runs the same loop per task. A run starts only with the task lock held and once the schedule
+(``refresh_tracker.last_refresh``, shared by the replicas) has been read again under the lock, so a due run
+happens once. A run whose lock could not be renewed (replica paused past the TTL) is cancelled. A run that
+lost its lock anyway is not recorded: its fence must still be the current one, and the run start time is only
+recorded if no later run already was, so it cannot move the schedule back.
+
+- Schedules are jittered (``TASK_JITTER_RATIO`` of the wait, at most ``TASK_JITTER_MAX_SECONDS``) so the
+  replicas do not poll Redis and the database in lockstep
+- Missed runs are caught up: a task overdue at startup (every replica was down) runs right away, once
+- A failed run is retried after ``TASK_RETRY_SECONDS`` instead of a full interval
+
+Without Redis (single process), runs are serialised by an in-process lock and the history is kept in memory.
+"""
+import asyncio
+import json
+import logging
+import os
+import random
+import socket
+import time
+from collections import deque
+from dataclasses import dataclass
+from datetime import UTC, datetime, timedelta
+from typing import Any, Awaitable, Callable, Optional
+
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from ..config import settings
+from ..models.database import async_session_maker
+from ..models.refresh_tracker import RefreshTracker
+from .cache import cache_service
+from .scraper_jobs import RELEASE_LOCK_SCRIPT, RENEW_LOCK_SCRIPT
+
+logger = logging.getLogger(__name__)
+
+# Take the lock and its fencing token atomically (nil when another run holds the lock)
+ACQUIRE_LOCK_SCRIPT = """
+if redis.call('EXISTS', KEYS[1]) == 1 then
+    return false
+end
+local fence = redis.call('INCR', KEYS[2])
+redis.call('SET', KEYS[1], fence .. ':' .. ARGV[1], 'EX', ARGV[2])
+return fence
+"""
+
+# Returns a short summary of the run (counts), stored in the history
+TaskRunner = Callable[[AsyncSession], Awaitable[Optional[str]]]
+
+
+@dataclass(frozen=True)
+class PeriodicTask:
+    """A task run every ``interval_seconds``, its schedule stored under ``name`` in ``refresh_tracker``"""
+
+    name: str
+    interval_seconds: int
+    run: TaskRunner
+    description: str = ""
+
+
+async def record_refresh(
+    db: AsyncSession, cache_type: str, started_at: datetime, fence: Optional[int] = None
+) -> bool:
+    """Record a completed run, False for a stale run: a later run took the lock (``fence`` is not the current
+    fencing token) or started later and was already recorded"""
+    redis_client = cache_service.redis_client
+    if fence is not None and redis_client:
+        current = await redis_client.get(TaskCoordinator._key(cache_type, "fence"))
+        if current is not None and int(current) > fence:
+            return False
+
+    result = await db.execute(
+        update(RefreshTracker)
+        .where(RefreshTracker.cache_type == cache_type, RefreshTracker.last_refresh < started_at)
+        .values(last_refresh=started_at)
+    )
+    recorded = bool(result.rowcount)  # type: ignore[attr-defined]
+    if not recorded:
+        existing = await db.scalar(select(RefreshTracker.id).where(RefreshTracker.cache_type == cache_type))
+        if existing is None:
+            db.add(RefreshTracker(cache_type=cache_type, last_refresh=started_at))
+            recorded = True
+    await db.commit()
+    return recorded
+
+
+def _aware(value: Optional[datetime]) -> Optional[datetime]:
+    # SQLite returns naive datetimes
+    if value is not None and value.tzinfo is None:
+        return value.replace(tzinfo=UTC)
+    return value
+
+
+class TaskCoordinator:
+    """Run the registered periodic tasks, once per schedule across the replicas"""
+
+    def __init__(self, session_maker: async_sessionmaker[AsyncSession] = async_session_maker) -> None:
+        self._session_maker = session_maker
+        self.tasks: dict[str, PeriodicTask] = {}
+        self.replica = f"{socket.gethostname()}:{os.getpid()}"
+        self._loops: list[asyncio.Task[None]] = []
+        # Used without Redis (single process)
+        self._local_locks: dict[str, asyncio.Lock] = {}
+        self._local_fences: dict[str, int] = {}
+        self._local_history: dict[str, deque[dict[str, Any]]] = {}
+
+    def register(self, task: PeriodicTask) -> None:
+        self.tasks[task.name] = task
+        self._local_locks[task.name] = asyncio.Lock()
+        self._local_fences[task.name] = 0
+        self._local_history[task.name] = deque(maxlen=settings.TASK_HISTORY_SIZE)
+
+    def start(self) -> None:
+        """Start one scheduling loop per registered task"""
+        for task in self.tasks.values():
+            self._loops.append(asyncio.create_task(self._loop(task)))
+
+    @staticmethod
+    def _key(name: str, suffix: str) -> str:
+        return f"tasks:{name}:{suffix}"
+
+    @staticmethod
+    def _jitter(seconds: float) -> float:
+        return random.uniform(0, min(seconds * settings.TASK_JITTER_RATIO, settings.TASK_JITTER_MAX_SECONDS))
+
+    async def last_refresh(self, name: str) -> Optional[datetime]:
+        async with self._session_maker() as db:
+            last = await db.scalar(select(RefreshTracker.last_refresh).where(RefreshTracker.cache_type == name))
+        return _aware(last)
+
+    async def due_in(self, task: PeriodicTask) -> float:
+        """Seconds until the next run of a task (0 or less when due)"""
+        last = await self.last_refresh(task.name)
+        if last is None:
+            return 0
+        return (last + timedelta(seconds=task.interval_seconds) - datetime.now(UTC)).total_seconds()
+
+    async def _loop(self, task: PeriodicTask) -> None:
+        # Spread the first checks of the replicas; an overdue task is caught up right after
+        await asyncio.sleep(self._jitter(min(task.interval_seconds, settings.TASK_RETRY_SECONDS)))
+        while True:
+            try:
+                delay = await self._tick(task)
+            except Exception as e:
+                logger.error(f"[SCHEDULER] {task.name}: scheduling failed: {e}", exc_info=True)
+                delay = settings.TASK_RETRY_SECONDS
+            await asyncio.sleep(delay + self._jitter(delay))
+
+    async def _tick(self, task: PeriodicTask) -> float:
+        """Run the task if due, return the seconds to wait before the next check"""
+        due_in = await self.due_in(task)
+        if due_in > 0:
+            return due_in
+        run = await self.run_if_due(task)
+        if run is None:
+            # Running on another replica (or just ran): check again once it had time to finish
+            return min(task.interval_seconds, settings.TASK_RETRY_SECONDS)
+        if run["status"] != "success":
+            return min(task.interval_seconds, settings.TASK_RETRY_SECONDS)
+        # The schedule counts from the start of the run
+        return max(await self.due_in(task), 0)
+
+    async def run_if_due(self, task: PeriodicTask) -> Optional[dict[str, Any]]:
+        """Run the task under its lock if still due, None when another run holds the lock or already ran"""
+        redis_client = cache_service.redis_client
+        if not redis_client:
+            lock = self._local_locks[task.name]
+            if lock.locked():
+                return None
+            async with lock:
+                if await self.due_in(task) > 0:
+                    return None
+                self._local_fences[task.name] += 1
+                return await self._execute(task, self._local_fences[task.name])
+
+        acquire = redis_client.register_script(ACQUIRE_LOCK_SCRIPT)
+        renew_lock = redis_client.register_script(RENEW_LOCK_SCRIPT)
+        release_lock = redis_client.register_script(RELEASE_LOCK_SCRIPT)
+        lock_key = self._key(task.name, "lock")
+        ttl = settings.TASK_LOCK_TTL_SECONDS
+
+        fence = await acquire(keys=[lock_key, self._key(task.name, "fence")], args=[self.replica, ttl])
+        if fence is None:
+            return None
+        token = f"{fence}:{self.replica}"
+        lock_lost = asyncio.Event()
+
+        async def heartbeat(run_task: asyncio.Task[dict[str, Any]]) -> None:
+            while True:
+                await asyncio.sleep(ttl / 3)
+                if not await renew_lock(keys=[lock_key], args=[token, ttl]):
+                    logger.warning(f"[SCHEDULER] {task.name}: lock lost by run #{fence}, cancelling it")
+                    lock_lost.set()
+                    run_task.cancel()
+                    return
+
+        heartbeat_task: Optional[asyncio.Task[None]] = None
+        try:
+            # Re-check under the lock: another replica may have just finished a run
+            if await self.due_in(task) > 0:
+                return None
+            run_task = asyncio.create_task(self._execute(task, int(fence), lock_lost))
+            heartbeat_task = asyncio.create_task(heartbeat(run_task))
+            return await run_task
+        finally:
+            if heartbeat_task is not None:
+                heartbeat_task.cancel()
+            await release_lock(keys=[lock_key], args=[token])
+
+    async def _execute(
+        self, task: PeriodicTask, fence: int, lock_lost: Optional[asyncio.Event] = None
+    ) -> dict[str, Any]:
+        started_at = datetime.now(UTC)
+        t0 = time.perf_counter()
+        run: dict[str, Any] = {"fence": fence, "replica": self.replica, "started_at": started_at.isoformat()}
+        logger.info(f"[SCHEDULER] {task.name}: run #{fence} started")
+        try:
+            async with self._session_maker() as db:
+                run["summary"] = await task.run(db)
+                if not await record_refresh(db, task.name, started_at, fence):
+                    logger.warning(f"[SCHEDULER] {task.name}: run #{fence} superseded by a later run, not recorded")
+            run["status"] = "success"
+        except asyncio.CancelledError:
+            # Cancelled by the heartbeat: another replica may hold the lock now. Any other cancellation propagates.
+            if lock_lost is None or not lock_lost.is_set():
+                raise
+            run.update(status="cancelled", error="lock lost")
+        except Exception as e:
+            logger.error(f"[SCHEDULER] {task.name}: run #{fence} failed: {e}", exc_info=True)
+            run.update(status="failed", error=str(e))
+
+        run["finished_at"] = datetime.now(UTC).isoformat()
+        run["duration_ms"] = round((time.perf_counter() - t0) * 1000, 1)
+        logger.info(f"[SCHEDULER] {task.name}: run #{fence} {run['status']} in {run['duration_ms']} ms")
+        await self._append_history(task.name, run)
+        return run
+
+    async def _append_history(self, name: str, run: dict[str, Any]) -> None:
+        redis_client = cache_service.redis_client
+        if not redis_client:
+            self._local_history[name].appendleft(run)
+            return
+        try:
+            key = self._key(name, "history")
+            async with redis_client.pipeline(transaction=False) as pipe:
+                pipe.lpush(key, json.dumps(run))
+                pipe.ltrim(key, 0, settings.TASK_HISTORY_SIZE - 1)
+                await pipe.execute()
+        except Exception as e:
+            logger.warning(f"[SCHEDULER] {name}: failed to store run history: {e}")
+
+    async def history(self, name: str, limit: int = 20) -> list[dict[str, Any]]:
+        """Last runs of a task, newest first"""
+        redis_client = cache_service.redis_client
+        if not redis_client:
+            return list(self._local_history[name])[:limit]
+        entries = await redis_client.lrange(self._key(name, "history"), 0, limit - 1)
+        return [json.loads(entry) for entry in entries]
+
+    async def _running(self, name: str) -> Optional[dict[str, Any]]:
+        redis_client = cache_service.redis_client
+        if not redis_client:
+            if not self._local_locks[name].locked():
+                return None
+            return {"fence": self._local_fences[name], "replica": self.replica}
+        holder = await redis_client.get(self._key(name, "lock"))
+        if not holder:
+            return None
+        fence, _, replica = holder.decode().partition(":")
+        return {"fence": int(fence), "replica": replica}
+
+    async def status(self, runs: int = 10) -> list[dict[str, Any]]:
+        """Schedule, run in progress and recent runs (with durations) of every task"""
+        tasks = []
+        for task in self.tasks.values():
+            last = await self.last_refresh(task.name)
+            history = await self.history(task.name, runs)
+            durations = [run["duration_ms"] for run in history if run["status"] == "success"]
+            tasks.append({
+                "name": task.name,
+                "description": task.description,
+                "interval_seconds": task.interval_seconds,
+                "last_success_at": last.isoformat() if last else None,
+                "next_run_at": (last + timedelta(seconds=task.interval_seconds)).isoformat() if last else None,
+                "running": await self._running(task.name),
+                "last_run": history[0] if history else None,
+                "avg_duration_ms": round(sum(durations) / len(durations), 1) if durations else None,
+                "max_duration_ms": max(durations) if durations else None,
+                "recent_runs": history,
+            })
+        return tasks
+
+
+task_coordinator = TaskCoordinator()
@@ -0,0 +1,213 @@
+"""In-process index of the Tempo colour calendar (statistics, exporters).
+
+The whole ``tempo_days`` table (one row per day since 2014) is loaded once per process into a NumPy
+array indexed by day ordinal, one byte per day: 0 = unknown, 1 = BLUE, 2 = WHITE, 3 = RED.
+
+- ``color(day)``: O(1) lookup of one day
+- ``codes(days)`` / ``masks(days)``: colour codes / boolean masks for an array of days, so colour-split
+  aggregations (``totals(days, values)``, ``counts(start, end)``) are array operations
+
+``sync_tempo`` and ``RTEService.update_tempo_cache`` call ``invalidate()`` after writing: it bumps
+``tempo_calendar:version`` (Redis, shared by the workers) and every process reloads its index on the
+next read. ``TEMPO_CALENDAR_TTL_SECONDS`` bounds the staleness of writes made outside these paths.
+
+Micro-benchmark (from apps/api): ``python -m src.services.tempo_calendar``
+"""
+import asyncio
+import logging
+import time
+from dataclasses import dataclass
+from datetime import date, datetime
+from typing import Any, Iterable, Optional
+
+import numpy as np
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..config import settings
+from ..models.tempo_day import TempoDay
+from .cache import cache_service
+
+logger = logging.getLogger(__name__)
+
+VERSION_KEY = "tempo_calendar:version"
+COLORS = ("BLUE", "WHITE", "RED")
+
+_CODES = {color: code for code, color in enumerate(COLORS, start=1)}
+# datetime64[D] counts days since 1970-01-01
+_EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+
+
+def _ordinal(day: date | datetime | str) -> int:
+    if isinstance(day, str):
+        return date.fromisoformat(day[:10]).toordinal()
+    if isinstance(day, datetime):
+        return day.date().toordinal()
+    return day.toordinal()
+
+
+def _ordinals(days: Any) -> np.ndarray:
+    if isinstance(days, np.ndarray) and np.issubdtype(days.dtype, np.datetime64):
+        return days.astype("datetime64[D]").astype(np.int64) + _EPOCH_ORDINAL
+    # Much faster than letting NumPy convert date objects to datetime64
+    return np.fromiter(map(_ordinal, days), dtype=np.int64, count=len(days))
+
+
+def season_bounds(day: date) -> tuple[date, date]:
+    """Tempo season containing a day (Sept 1 to Aug 31)"""
+    start_year = day.year if day.month >= 9 else day.year - 1
+    return date(start_year, 9, 1), date(start_year + 1, 8, 31)
+
+
+@dataclass
+class TempoCalendar:
+    """Colour codes of consecutive days starting at ``first_ordinal``"""
+
+    version: int
+    first_ordinal: int
+    codes_by_day: np.ndarray
+    expires_at: float
+
+    @classmethod
+    def build(cls, version: int, rows: Iterable[tuple[Any, Any]], ttl: float = 0) -> "TempoCalendar":
+        """Build from (day, color) rows, day as ``date`` / ``datetime`` / ``YYYY-MM-DD``"""
+        days: list[int] = []
+        codes: list[int] = []
+        for day, color in rows:
+            code = _CODES.get(getattr(color, "value", color))
+            if code is None:
+                continue
+            days.append(_ordinal(day))
+            codes.append(code)
+
+        first = min(days) if days else 0
+        codes_by_day = np.zeros(max(days) - first + 1 if days else 0, dtype=np.uint8)
+        if days:
+            codes_by_day[np.asarray(days) - first] = codes
+        return cls(version, first, codes_by_day, time.time() + ttl)
+
+    @property
+    def known_days(self) -> int:
+        return int(np.count_nonzero(self.codes_by_day))
+
+    def color(self, day: date | datetime | str) -> Optional[str]:
+        """Colour of a day (BLUE, WHITE, RED), None when unknown"""
+        index = _ordinal(day) - self.first_ordinal
+        if 0 <= index < len(self.codes_by_day):
+            code = self.codes_by_day[index]
+            return COLORS[code - 1] if code else None
+        return None
+
+    def codes(self, days: Any) -> np.ndarray:
+        """Colour codes (0 = unknown) of a sequence of days (dates, ``YYYY-MM-DD`` or a datetime64 array)"""
+        ordinals = _ordinals(days) - self.first_ordinal
+        known = (ordinals >= 0) & (ordinals < len(self.codes_by_day))
+        codes = np.zeros(ordinals.shape, dtype=np.uint8)
+        codes[known] = self.codes_by_day[ordinals[known]]
+        return codes
+
+    def masks(self, days: Any) -> dict[str, np.ndarray]:
+        """One boolean mask per colour over an array of days"""
+        codes = self.codes(days)
+        return {color: codes == code for color, code in _CODES.items()}
+
+    def totals(self, days: Any, values: Any) -> dict[str, int]:
+        """Sum of ``values`` per colour of their day (days of unknown colour are ignored)"""
+        if len(days) == 0:
+            return dict.fromkeys(COLORS, 0)
+        sums = np.bincount(self.codes(days), weights=np.asarray(values, dtype=np.float64), minlength=len(COLORS) + 1)
+        return {color: int(round(sums[code])) for color, code in _CODES.items()}
+
+    def counts(self, start: date, end: date) -> dict[str, int]:
+        """Days per colour in [start, end]"""
+        lo = max(start.toordinal() - self.first_ordinal, 0)
+        hi = min(end.toordinal() - self.first_ordinal + 1, len(self.codes_by_day))
+        found = np.bincount(self.codes_by_day[lo:hi], minlength=len(COLORS) + 1) if hi > lo else [0] * (len(COLORS) + 1)
+        return {color: int(found[code]) for color, code in _CODES.items()}
+
+
+class TempoCalendarService:
+    """Keep the Tempo calendar index of the process in sync with the database"""
+
+    def __init__(self) -> None:
+        self._calendar: Optional[TempoCalendar] = None
+        # Version used without Redis (client mode, single process)
+        self._local_version = 0
+        self._lock = asyncio.Lock()
+
+    async def _current_version(self) -> int:
+        if cache_service.redis_client:
+            try:
+                version = await cache_service.redis_client.get(VERSION_KEY)
+                return int(version or 0)
+            except Exception as e:
+                logger.warning(f"[TEMPO CALENDAR] Failed to read version: {e}")
+        return self._local_version
+
+    async def invalidate(self) -> None:
+        """Drop the index (called after Tempo days are written)"""
+        self._local_version += 1
+        self._calendar = None
+        if cache_service.redis_client:
+            try:
+                await cache_service.redis_client.incr(VERSION_KEY)
+            except Exception as e:
+                logger.warning(f"[TEMPO CALENDAR] Failed to bump version: {e}")
+
+    def _is_fresh(self, calendar: Optional[TempoCalendar], version: int) -> bool:
+        return calendar is not None and calendar.version == version and time.time() < calendar.expires_at
+
+    async def get(self, db: AsyncSession) -> TempoCalendar:
+        """Index of the current version, loaded from the database when stale"""
+        version = await self._current_version()
+        if self._is_fresh(self._calendar, version):
+            return self._calendar  # type: ignore[return-value]
+
+        async with self._lock:
+            if self._is_fresh(self._calendar, version):
+                return self._calendar  # type: ignore[return-value]
+
+            result = await db.execute(select(TempoDay.id, TempoDay.color))
+            self._calendar = TempoCalendar.build(version, result.all(), settings.TEMPO_CALENDAR_TTL_SECONDS)
+            logger.info(f"[TEMPO CALENDAR] Loaded v{version} ({self._calendar.known_days} days)")
+            return self._calendar
+
+
+tempo_calendar = TempoCalendarService()
+
+
+def _benchmark() -> None:
+    from datetime import timedelta
+
+    rng = np.random.default_rng(0)
+    first = date(2014, 9, 1)
+    calendar_days = [first + timedelta(days=i) for i in range(12 * 365)]
+    colors = [COLORS[c] for c in rng.choice(3, size=len(calendar_days), p=[0.82, 0.12, 0.06])]
+    calendar = TempoCalendar.build(0, zip(calendar_days, colors))
+    by_date = {d.isoformat(): c for d, c in zip(calendar_days, colors)}
+
+    # Statistiques d'une année (conso journalière) et courbe de charge d'un an (48 points / jour)
+    for name, days in (
+        ("daily (1 year)", calendar_days[-365:]),
+        ("detail (1 year)", [d for d in calendar_days[-365:] for _ in range(48)]),
+    ):
+        values = rng.integers(100, 30000, size=len(days)).tolist()
+
+        t0 = time.perf_counter()
+        expected = dict.fromkeys(COLORS, 0)
+        for day, value in zip(days, values):
+            color = by_date.get(day.isoformat())
+            if color:
+                expected[color] += value
+        dict_ms = (time.perf_counter() - t0) * 1000
+
+        t0 = time.perf_counter()
+        totals = calendar.totals(days, values)
+        index_ms = (time.perf_counter() - t0) * 1000
+
+        assert totals == expected
+        print(f"{name:<16} {len(days):>7} points  dict {dict_ms:7.2f} ms  index {index_ms:6.2f} ms")
+
+
+if __name__ == "__main__":
+    _benchmark()
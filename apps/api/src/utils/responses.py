@@ -0,0 +1,187 @@
+"""JSON responses serialised with orjson.
+
+- ``FastJSONResponse``: default response class of the app (orjson, pydantic types via ``to_jsonable_python``)
+- ``event_stream_response``: NDJSON / Server-Sent Events stream of JSON events (long fetches)
+- ``APIResponseRoute``: route class of the routers. When an endpoint returns an ``APIResponse``, it is
+  serialised right away instead of being dumped, re-validated against ``response_model`` and dumped
+  again by FastAPI; ``response_model`` still documents the endpoint in OpenAPI.
+
+Benchmark (from apps/api): ``python -m src.utils.responses``
+"""
+import functools
+import inspect
+import logging
+from typing import Any, AsyncIterator, Callable, Optional
+
+from fastapi import Request, Response
+from fastapi.responses import JSONResponse, StreamingResponse
+from fastapi.routing import APIRoute
+from pydantic import BaseModel
+from pydantic_core import to_json, to_jsonable_python
+
+from ..schemas import APIResponse
+
+logger = logging.getLogger(__name__)
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson is a dependency, keep serving without it
+    orjson = None  # type: ignore[assignment]
+    logger.warning("[RESPONSES] 'orjson' package is not installed, using pydantic serialisation")
+
+
+def dumps(content: Any) -> bytes:
+    """JSON bytes of any API payload (dicts, lists, pydantic models, datetimes, Decimal, UUID)"""
+    if orjson is None:
+        return to_json(content)
+    if type(content) is APIResponse:
+        # No alias nor field serializer: its fields go straight to orjson
+        content = content.__dict__
+    elif isinstance(content, BaseModel):
+        # Pydantic serialises its models in one pass (field serializers, aliases)
+        return content.__pydantic_serializer__.to_json(content, by_alias=True)
+    # OPT_UTC_Z: UTC datetimes end with "Z" as in pydantic's output (naive ones already match)
+    return orjson.dumps(content, default=to_jsonable_python, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_UTC_Z)
+
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse rendered with orjson"""
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+SSE_MEDIA_TYPE = "text/event-stream"
+
+
+def wants_event_stream(request: Request, mode: Optional[str]) -> bool:
+    """SSE when ``mode=sse`` or, without ``mode``, when the client accepts ``text/event-stream``; NDJSON otherwise"""
+    if mode:
+        return mode.lower() == "sse"
+    return SSE_MEDIA_TYPE in request.headers.get("accept", "")
+
+
+def event_stream_response(events: AsyncIterator[dict[str, Any]], sse: bool = False) -> StreamingResponse:
+    """Stream JSON events (dicts with a ``type``) as NDJSON lines or SSE messages, one write per event"""
+
+    async def body() -> AsyncIterator[bytes]:
+        async for event in events:
+            if sse:
+                yield b"event: " + str(event.get("type", "message")).encode() + b"\ndata: " + dumps(event) + b"\n\n"
+            else:
+                yield dumps(event) + b"\n"
+
+    return StreamingResponse(
+        body(),
+        media_type=SSE_MEDIA_TYPE if sse else NDJSON_MEDIA_TYPE,
+        # Disable proxy buffering (nginx) so every event is delivered as soon as it is written
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+def _serialize_api_response(endpoint: Callable[..., Any], status_code: int | None) -> Callable[..., Any]:
+    @functools.wraps(endpoint)
+    async def wrapper(*args: Any, **kwargs: Any) -> Any:
+        result = await endpoint(*args, **kwargs)
+        if type(result) is APIResponse:
+            return FastJSONResponse(result, status_code=status_code or 200)
+        return result
+
+    return wrapper
+
+
+def _can_serialize_directly(endpoint: Callable[..., Any], kwargs: dict[str, Any]) -> bool:
+    if not inspect.iscoroutinefunction(endpoint) or kwargs.get("response_model") is not APIResponse:
+        return False
+    # Filtering options are applied by FastAPI's serialisation
+    if any(kwargs.get(option) for option in (
+        "response_model_include",
+        "response_model_exclude",
+        "response_model_exclude_unset",
+        "response_model_exclude_defaults",
+        "response_model_exclude_none",
+    )):
+        return False
+    # Headers and cookies set on an injected Response are only merged into serialised results
+    return not any(
+        isinstance(p.annotation, type) and issubclass(p.annotation, Response)
+        for p in inspect.signature(endpoint).parameters.values()
+    )
+
+
+class APIResponseRoute(APIRoute):
+    """APIRoute serialising ``APIResponse`` results without re-validation"""
+
+    def __init__(self, path: str, endpoint: Callable[..., Any], **kwargs: Any) -> None:
+        if _can_serialize_directly(endpoint, kwargs):
+            endpoint = _serialize_api_response(endpoint, kwargs.get("status_code"))
+        super().__init__(path, endpoint, **kwargs)
+
+
+def _benchmark() -> None:
+    import time
+    from datetime import date, datetime, timedelta
+    from decimal import Decimal
+
+    from fastapi import APIRouter, FastAPI
+    from fastapi.testclient import TestClient
+
+    from ..middleware.compression import CompressionMiddleware, brotli
+
+    start = datetime(2024, 1, 1, 0, 30)
+    payloads = {
+        # Courbe de charge : 1 an au pas 30 min (batch consumption/detail)
+        "consumption detail": {"meter_reading": {"usage_point_id": "12345678901234", "interval_reading": [
+            {"value": str(500 + (i * 37) % 900), "date": (start + timedelta(minutes=30 * i)).isoformat(sep=" "),
+             "interval_length": "PT30M", "measure_type": "B"}
+            for i in range(365 * 48)
+        ]}},
+        "offers list": [
+            {"id": f"offer-{i}", "name": f"Offre {i}", "offer_type": "HC_HP", "power_kva": 3 + i % 9,
+             "subscription_price": Decimal("12.34"), "hp_price": Decimal("0.2516"), "hc_price": Decimal("0.2068"),
+             "valid_from": datetime(2025, 2, 1), "valid_to": None, "is_active": True}
+            for i in range(600)
+        ],
+        "tempo": [
+            {"id": (date(2024, 9, 1) + timedelta(days=i)).isoformat(), "date": date(2024, 9, 1) + timedelta(days=i),
+             "color": ("BLUE", "WHITE", "RED")[i % 3], "updated_at": datetime(2024, 9, 1)}
+            for i in range(365)
+        ],
+    }
+
+    def build(fast: bool) -> TestClient:
+        app = FastAPI(default_response_class=FastJSONResponse) if fast else FastAPI()
+        router = APIRouter(route_class=APIResponseRoute) if fast else APIRouter()
+        for name, data in payloads.items():
+            def endpoint(data: Any = data) -> Callable[..., Any]:
+                async def handler() -> APIResponse:
+                    return APIResponse(success=True, data=data)
+                return handler
+            router.add_api_route(f"/{name.replace(' ', '-')}", endpoint(), response_model=APIResponse)
+        app.include_router(router)
+        if fast:
+            app.add_middleware(CompressionMiddleware)
+        return TestClient(app)
+
+    def best(client: TestClient, path: str, encoding: str, repeat: int = 10) -> tuple[int, float]:
+        timings = []
+        for _ in range(repeat):
+            t0 = time.perf_counter()
+            response = client.get(path, headers={"Accept-Encoding": encoding})
+            timings.append(time.perf_counter() - t0)
+        return int(response.headers.get("content-length", 0)), min(timings) * 1000
+
+    default, fast = build(False), build(True)
+    print(f"{'endpoint':<20} {'default ms':>10} {'orjson ms':>10} {'bytes':>10} {'gzip':>10} {'br':>10} {'gzip ms':>10}")
+    for name in payloads:
+        path = f"/{name.replace(' ', '-')}"
+        size, default_ms = best(default, path, "identity")
+        _, fast_ms = best(fast, path, "identity")
+        gzip_size, gzip_ms = best(fast, path, "gzip")
+        br_size = best(fast, path, "br")[0] if brotli is not None else "-"
+        print(f"{name:<20} {default_ms:>10.1f} {fast_ms:>10.1f} {size:>10} {gzip_size:>10} {br_size:>10} {gzip_ms:>10.1f}")
+
+
+if __name__ == "__main__":
+    _benchmark()
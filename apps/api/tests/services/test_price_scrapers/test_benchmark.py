@@ -0,0 +1,81 @@
+"""Offline scraper regression tests (replay of recorded provider responses)"""
+from datetime import UTC, datetime
+
+import httpx
+import pytest
+
+from src.services.price_scrapers.base import OfferData
+from src.services.price_scrapers.benchmark import (
+    DEFAULT_MARGIN,
+    ReplayTransport,
+    benchmark_provider,
+    compare_to_baseline,
+    load_baseline,
+    load_fixture,
+    new_scraper,
+    offers_digest,
+    provider_slug,
+    recorded_providers,
+    save_fixture,
+    use_transport,
+)
+
+
+def test_compare_to_baseline():
+    baseline = {"parse_seconds": 1.0, "offers_count": 2, "offers_digest": "abc", "used_fallback": False}
+
+    assert compare_to_baseline({**baseline, "parse_seconds": 1.2}, baseline) == []
+    assert len(compare_to_baseline({**baseline, "parse_seconds": 1.3}, baseline)) == 1
+    assert len(compare_to_baseline({**baseline, "offers_digest": "def"}, baseline)) == 1
+    assert len(compare_to_baseline({**baseline, "used_fallback": True}, baseline)) == 1
+    # Tiny absolute slowdowns are noise
+    tiny = {**baseline, "parse_seconds": 0.01}
+    assert compare_to_baseline({**tiny, "parse_seconds": 0.05}, tiny) == []
+
+
+def test_offers_digest_ignores_order():
+    offers = [OfferData(name="Base 6 kVA", offer_type="BASE", power_kva=6), OfferData(name="HC 6 kVA", offer_type="HC_HP")]
+    assert offers_digest(offers) == offers_digest(list(reversed(offers)))
+
+
+def test_offers_digest_ignores_month_of_scrape():
+    """Scrapers date offers with the current month: replays stay comparable after a month boundary"""
+    august = OfferData(name="Base 6 kVA", offer_type="BASE", power_kva=6, valid_from=datetime(2025, 8, 1, tzinfo=UTC))
+    september = OfferData(name="Base 6 kVA", offer_type="BASE", power_kva=6, valid_from=datetime(2025, 9, 1, tzinfo=UTC))
+    assert offers_digest([august]) == offers_digest([september])
+    assert offers_digest([august]) != offers_digest([OfferData(name="Base 9 kVA", offer_type="BASE", power_kva=9)])
+
+
+def test_new_scraper_uses_default_urls():
+    scraper = new_scraper("EDF")
+    assert scraper.provider_name == "EDF"
+    assert scraper.scraper_urls
+
+
+@pytest.mark.asyncio
+async def test_fixture_replay(tmp_path):
+    url = "https://www.example.org/grille-tarifaire.pdf"
+    save_fixture("Priméo Énergie", {url: {"status": 200, "headers": {"content-type": "application/pdf"}, "content": b"%PDF"}}, tmp_path)
+    assert (tmp_path / provider_slug("Priméo Énergie") / "manifest.json").exists()
+
+    transport = ReplayTransport(load_fixture("Priméo Énergie", tmp_path))
+    with use_transport(transport):
+        async with httpx.AsyncClient(verify=False) as client:
+            assert (await client.get(url)).content == b"%PDF"
+            with pytest.raises(httpx.ConnectError):
+                await client.get("https://www.example.org/other.pdf")
+    assert transport.misses == ["https://www.example.org/other.pdf"]
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("provider_name", recorded_providers() or [pytest.param(None, marks=pytest.mark.skip("no recorded fixtures"))])
+async def test_recorded_scraper_matches_baseline(provider_name):
+    """Replayed scrapers parse as fast and produce the same offers as the recorded baseline"""
+    baseline = load_baseline().get(provider_slug(provider_name))
+    if baseline is None:
+        pytest.skip(f"No baseline for {provider_name}")
+
+    result = await benchmark_provider(provider_name, repeat=1)
+
+    assert not result["missing_urls"]
+    assert compare_to_baseline(result, baseline, DEFAULT_MARGIN) == []
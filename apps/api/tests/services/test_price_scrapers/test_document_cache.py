@@ -0,0 +1,64 @@
+"""Tests for the scraped document cache serialisation"""
+from datetime import datetime, UTC
+
+from src.services.price_scrapers import document_cache
+from src.services.price_scrapers.base import OfferData, _decode_parsed, _encode_parsed
+from src.services.price_scrapers.document_cache import content_hash, parsed_key
+
+
+def test_parsed_offers_roundtrip():
+    """Cached parser results rebuild identical offers"""
+    offer = OfferData(
+        name="Tarif Bleu - Tempo 6 kVA",
+        offer_type="TEMPO",
+        subscription_price=15.5,
+        tempo_blue_hc=0.1325,
+        tempo_red_hp=0.7562,
+        hc_schedules={"lundi": "22h-6h"},
+        power_kva=6,
+        valid_from=datetime(2025, 8, 1, tzinfo=UTC),
+        offer_url="https://example.org/tarif.pdf",
+    )
+
+    decoded = _decode_parsed(_encode_parsed([offer]))
+
+    assert len(decoded) == 1
+    original = offer.to_dict()
+    restored = decoded[0].to_dict()
+    original.pop("price_updated_at")
+    restored.pop("price_updated_at")
+    assert restored == original
+
+
+def test_parsed_text_roundtrip():
+    assert _decode_parsed(_encode_parsed("Prix du kWh")) == "Prix du kWh"
+    assert _encode_parsed({"not": "cacheable"}) is None
+
+
+def test_parsed_key_depends_on_content_and_args():
+    digest = content_hash(b"%PDF-1.7")
+    assert parsed_key("Scraper._parse_pdf", (0,), digest) != parsed_key("Scraper._parse_pdf", (1,), digest)
+    assert parsed_key("Scraper._parse_pdf", (0,), digest) != parsed_key(
+        "Scraper._parse_pdf", (0,), content_hash(b"%PDF-1.6")
+    )
+
+
+def test_parsed_key_depends_on_month_and_scraper_code(monkeypatch):
+    """Parsers date offers with the current month: results of another month or code version are not reused"""
+    digest = content_hash(b"%PDF-1.7")
+    key = parsed_key("Scraper._parse_pdf", (), digest)
+
+    class NextMonth(datetime):
+        @classmethod
+        def now(cls, tz=None):
+            return datetime(2099, 1, 1, tzinfo=tz)
+
+    monkeypatch.setattr(document_cache, "datetime", NextMonth)
+    assert parsed_key("Scraper._parse_pdf", (), digest) != key
+    monkeypatch.undo()
+
+    monkeypatch.setattr(document_cache, "_code_version", lambda: "changed")
+    assert parsed_key("Scraper._parse_pdf", (), digest) != key
+    assert document_cache.DocumentCache()._doc_key("https://example.org/tarif.pdf").startswith(
+        f"scraper:doc:{datetime.now(UTC):%Y-%m}:changed:"
+    )
@@ -0,0 +1,117 @@
+"""Tests for the admin shared-cache viewer and Enedis fetch (daily range cache)"""
+from datetime import UTC, date, datetime, timedelta
+from typing import Any
+
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from src.adapters import enedis_adapter
+from src.models import PDL, Token, User
+from src.models.base import Base
+from src.models.database import build_engine
+from src.routers import admin
+from src.services.cache import cache_service
+
+
+class FakeDailyCache:
+    """In-memory stand-in for ``daily_cache`` (range reads and bulk writes)"""
+
+    def __init__(self) -> None:
+        self.readings: dict[tuple[str, str, str], dict[str, Any]] = {}
+        self.secrets: set[str] = set()
+
+    async def get_range(
+        self, data_type: str, usage_point_id: str, start: date, end: date, encryption_key: str
+    ) -> tuple[list[dict[str, Any]], list[str]]:
+        self.secrets.add(encryption_key)
+        days = [(start + timedelta(days=i)).isoformat() for i in range((end - start).days + 1)]
+        keys = [(data_type, usage_point_id, d) for d in days]
+        found = [self.readings[key] for key in keys if key in self.readings]
+        return found, [key[2] for key in keys if key not in self.readings]
+
+    async def set_readings(
+        self, data_type: str, usage_point_id: str, readings: list[dict[str, Any]], encryption_key: str
+    ) -> int:
+        self.secrets.add(encryption_key)
+        for reading in readings:
+            self.readings[(data_type, usage_point_id, reading["date"][:10])] = reading
+        return len(readings)
+
+
+@pytest.fixture
+async def db(tmp_path, monkeypatch):
+    monkeypatch.setattr(cache_service, "redis_client", None)
+    engine = build_engine(f"sqlite+aiosqlite:///{tmp_path / 'test.db'}")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    async with async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)() as session:
+        session.add_all([
+            User(
+                id="owner", email="owner@example.org", hashed_password="x", client_id="owner",
+                client_secret="owner-secret", admin_data_sharing=True,
+            ),
+            PDL(id="pdl-1", usage_point_id="12345678901234", user_id="owner"),
+            Token(
+                usage_point_id="__global__", access_token="token", token_type="Bearer",
+                expires_at=datetime.now(UTC) + timedelta(hours=1),
+            ),
+        ])
+        await session.commit()
+        yield session
+    await engine.dispose()
+
+
+@pytest.fixture
+def cache(monkeypatch):
+    fake = FakeDailyCache()
+    monkeypatch.setattr(admin, "daily_cache", fake)
+    return fake
+
+
+ADMIN = User(id="admin", email="admin@example.org", hashed_password="x", client_id="admin", client_secret="x")
+
+
+async def test_fetched_days_are_served_by_the_shared_cache_viewer(db, cache, monkeypatch):
+    async def get_consumption_daily(access_token: str, usage_point_id: str, start: str, end: str) -> dict:
+        days = [date(2025, 3, 1) + timedelta(days=i) for i in range(3)]
+        return {"meter_reading": {"interval_reading": [{"date": d.isoformat(), "value": "1000"} for d in days]}}
+
+    monkeypatch.setattr(enedis_adapter, "get_consumption_daily", get_consumption_daily)
+
+    fetched = await admin.admin_fetch_enedis_data(
+        user_id="owner", pdl_id="pdl-1", data_type="consumption", start_date="2025-03-01", end_date="2025-03-04",
+        current_user=ADMIN, db=db,
+    )
+    assert fetched.success and fetched.data["cached_days"] == 3
+
+    shared = await admin.get_user_shared_cache_data(
+        user_id="owner", pdl_id="pdl-1", data_type="consumption", start_date="2025-02-28", end_date="2025-03-02",
+        current_user=ADMIN, db=db,
+    )
+    assert shared.success
+    assert shared.data["cache_entries"] == 2
+    assert [entry["date"] for entry in shared.data["cached_data"]] == ["2025-03-01", "2025-03-02"]
+    # Encrypted and decrypted with the owner's secret, not the admin's
+    assert cache.secrets == {"owner-secret"}
+
+
+async def test_shared_cache_viewer_defaults_to_the_last_week_newest_first(db, cache):
+    today = datetime.now(UTC).date()
+    for days_ago in (0, 3, 10):
+        day = (today - timedelta(days=days_ago)).isoformat()
+        cache.readings[("production", "12345678901234", day)] = {"date": day, "value": "5"}
+
+    shared = await admin.get_user_shared_cache_data(
+        user_id="owner", pdl_id="pdl-1", data_type="production", start_date=None, end_date=None,
+        current_user=ADMIN, db=db,
+    )
+    assert [entry["date"] for entry in shared.data["cached_data"]] == [
+        today.isoformat(), (today - timedelta(days=3)).isoformat()
+    ]
+    assert shared.data["date_range"] is None
+
+    invalid = await admin.get_user_shared_cache_data(
+        user_id="owner", pdl_id="pdl-1", data_type="consumption", start_date="2025-13-01", end_date="2025-03-02",
+        current_user=ADMIN, db=db,
+    )
+    assert invalid.error.code == "INVALID_DATE_FORMAT"
@@ -0,0 +1,99 @@
+"""Tests for the server-side load-curve aggregation"""
+from datetime import datetime, timedelta
+
+import numpy as np
+import pytest
+
+from src.services.aggregation import (
+    AggregateQuery,
+    aggregate,
+    aggregate_cache_key,
+    compute,
+    load_curve_arrays,
+    lttb,
+    minmax,
+)
+from src.services.offpeak import compile_schedule
+
+
+def _readings(start: datetime, count: int, minutes: int = 30) -> list[dict]:
+    return [
+        {
+            "value": str(1000 + (i % 48) * 10),
+            "date": (start + timedelta(minutes=minutes * (i + 1))).isoformat(sep=" "),
+            "interval_length": f"PT{minutes}M",
+        }
+        for i in range(count)
+    ]
+
+
+def test_daily_buckets_match_a_python_loop():
+    readings = _readings(datetime(2025, 1, 6), 7 * 48)  # lundi -> dimanche
+    schedule = compile_schedule({"default": "22:00-06:00"})
+    buckets = aggregate(*load_curve_arrays(readings), "day", ("sum", "mean", "max", "p50"), offpeak=schedule)
+
+    assert [b["date"] for b in buckets] == [f"2025-01-{d:02d}" for d in range(6, 13)]
+    day = [r for r in readings if r["date"] <= "2025-01-07 00:00:00" and r["date"] > "2025-01-06 00:00:00"]
+    values = [float(r["value"]) for r in day]
+    assert buckets[0]["count"] == 48
+    assert buckets[0]["sum"] == pytest.approx(sum(values) / 2)
+    assert buckets[0]["mean"] == pytest.approx(np.mean(values))
+    assert buckets[0]["max"] == max(values)
+    assert buckets[0]["p50"] == pytest.approx(np.percentile(values, 50))
+
+    hc = sum(float(r["value"]) / 2 for r in day if schedule.at(datetime.fromisoformat(r["date"])))
+    assert buckets[0]["hc"] == pytest.approx(hc)
+    assert buckets[0]["hc"] + buckets[0]["hp"] == pytest.approx(buckets[0]["sum"])
+
+
+def test_week_and_month_buckets_and_duplicates():
+    readings = _readings(datetime(2025, 1, 27), 14 * 48)
+    arrays = load_curve_arrays(readings + readings[:10])
+    assert len(arrays[0]) == 14 * 48
+
+    weeks = aggregate(*arrays, "week", ("sum",))
+    assert [w["date"] for w in weeks] == ["2025-01-27", "2025-02-03"]
+    months = aggregate(*arrays, "month", ("sum",))
+    assert [m["date"] for m in months] == ["2025-01", "2025-02"]
+    assert sum(m["sum"] for m in months) == pytest.approx(sum(w["sum"] for w in weeks))
+
+
+def test_downsampling_keeps_extremes_and_size():
+    y = np.sin(np.linspace(0, 20, 5000))
+    y[1234] = 10
+    x = np.arange(5000, dtype=float)
+
+    kept = lttb(x, y, 200)
+    assert len(kept) == 200 and kept[0] == 0 and kept[-1] == 4999
+    assert 1234 in kept
+    assert 1234 in minmax(y, 200)
+    assert len(minmax(y, 200)) <= 200
+
+
+def test_query_validation():
+    assert AggregateQuery.parse("DAY", "p95,sum,sum", False, None, 1000).functions == ("p95", "sum")
+    with pytest.raises(ValueError):
+        AggregateQuery.parse("year", None, False, None, 1000)
+    with pytest.raises(ValueError):
+        AggregateQuery.parse("day", "median", False, None, 1000)
+    with pytest.raises(ValueError):
+        AggregateQuery.parse(None, None, False, None, 1000)
+
+    result = compute(_readings(datetime(2025, 1, 6), 96), AggregateQuery.parse(None, None, False, "lttb", 10))
+    assert result["readings"] == 96 and len(result["points"]) == 10 and "buckets" not in result
+
+
+def test_cache_key_follows_the_offpeak_schedule():
+    split = AggregateQuery.parse("day", "sum", True, None, 1000)
+    key = aggregate_cache_key("consumption", "12345678901234", "2025-01-01", "2025-02-01", split, ["22:00-06:00"])
+
+    assert key.startswith("consumption:aggregate:12345678901234:2025-01-01:2025-02-01:")
+    assert key == aggregate_cache_key(
+        "consumption", "12345678901234", "2025-01-01", "2025-02-01", split, {"default": "22h00-06h00"}
+    )
+    assert key != aggregate_cache_key(
+        "consumption", "12345678901234", "2025-01-01", "2025-02-01", split, ["23:00-07:00"]
+    )
+    # Without the HC/HP split the schedule does not change the result
+    total = AggregateQuery.parse("day", "sum", False, None, 1000)
+    assert total.cache_id(["22:00-06:00"]) == total.cache_id(["23:00-07:00"])
@@ -24,3 +24,34 @@ async def test_cache_encryption(cache_service):
     """Test that cache service properly initializes"""
     assert cache_service.ttl > 0
     assert cache_service.redis_client is None  # Not connected yet
+
+
+def test_ttl_for_day(cache_service):
+    """Test that historical days get a longer TTL than recent (still correctable) days"""
+    from datetime import datetime, timedelta
+    from src.config import settings
+
+    today = datetime.now().date()
+    assert cache_service.ttl_for_day(today) == cache_service.ttl
+    assert cache_service.ttl_for_day(today - timedelta(days=365)) == max(
+        cache_service.ttl, settings.CACHE_TTL_HISTORICAL_SECONDS
+    )
+
+
+def test_usage_point_id_from_key():
+    """Test that cache keys are attributed to the PDL they contain"""
+    from src.services.cache_accounting import usage_point_id_from_key
+
+    assert usage_point_id_from_key("consumption:daily:12345678901234:month:2024-01") == "12345678901234"
+    assert usage_point_id_from_key("12345678901234:contract") == "12345678901234"
+    assert usage_point_id_from_key("tempo:2024-01-01") is None
+
+
+def test_index_key_attribution():
+    """Test that index keys are never attributed to a PDL and markers are not accounted"""
+    from src.services.cache_accounting import is_accounted, usage_point_id_from_key
+
+    assert usage_point_id_from_key("cache_index:12345678901234:lru") is None
+    assert is_accounted("consumption:detail:daily:12345678901234:2024-01-01")
+    assert not is_accounted("consumption:daily:12345678901234:bitmap")
+    assert not is_accounted("enedis:blacklist:12345678901234:2024-01-01")
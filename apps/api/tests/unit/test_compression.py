@@ -0,0 +1,94 @@
+"""Tests for response compression and orjson serialisation"""
+import gzip
+import json
+import zlib
+from datetime import datetime
+from decimal import Decimal
+
+from fastapi import APIRouter, FastAPI, Response
+from fastapi.responses import StreamingResponse
+from fastapi.testclient import TestClient
+
+from src.middleware.compression import CompressionMiddleware, _accepted_encodings
+from src.schemas import APIResponse, ErrorDetail
+from src.utils.responses import APIResponseRoute, FastJSONResponse, dumps
+
+
+def _app() -> FastAPI:
+    app = FastAPI(default_response_class=FastJSONResponse)
+    router = APIRouter(route_class=APIResponseRoute)
+
+    @router.get("/large", response_model=APIResponse)
+    async def large() -> APIResponse:
+        return APIResponse(success=True, data={"values": [{"value": Decimal("1.5"), "n": i} for i in range(500)]})
+
+    @router.get("/small", response_model=APIResponse)
+    async def small() -> APIResponse:
+        return APIResponse(success=False, error=ErrorDetail(code="NOT_FOUND", message="Missing"))
+
+    @router.get("/cookie", response_model=APIResponse)
+    async def cookie(response: Response) -> APIResponse:
+        response.set_cookie("seen", "1")
+        return APIResponse(success=True)
+
+    @router.get("/stream")
+    async def stream() -> StreamingResponse:
+        async def lines():
+            for i in range(3):
+                yield json.dumps({"line": i, "padding": "x" * 600}) + "\n"
+
+        return StreamingResponse(lines(), media_type="application/x-ndjson")
+
+    app.include_router(router)
+    app.add_middleware(CompressionMiddleware, minimum_size=1024)
+    return app
+
+
+client = TestClient(_app())
+
+
+def test_accept_encoding_parsing():
+    assert _accepted_encodings("gzip, deflate, br;q=0") == {"gzip", "deflate"}
+    assert _accepted_encodings("") == {""}
+
+
+def test_large_response_is_gzipped():
+    response = client.get("/large", headers={"Accept-Encoding": "gzip"})
+
+    assert response.headers["content-encoding"] == "gzip"
+    assert "Accept-Encoding" in response.headers["vary"]
+    assert response.json()["data"]["values"][499] == {"value": "1.5", "n": 499}
+
+
+def test_small_and_unaccepted_responses_are_left_as_is():
+    small = client.get("/small", headers={"Accept-Encoding": "gzip"})
+    assert "content-encoding" not in small.headers
+    assert small.json()["error"]["code"] == "NOT_FOUND"
+
+    identity = client.get("/large", headers={"Accept-Encoding": "identity"})
+    assert "content-encoding" not in identity.headers
+
+
+def test_stream_is_flushed_chunk_by_chunk():
+    with client.stream("GET", "/stream", headers={"Accept-Encoding": "gzip"}) as response:
+        assert response.headers["content-encoding"] == "gzip"
+        assert "content-length" not in response.headers
+        chunks = list(response.iter_raw())
+
+    # Chaque chunk compressé se décompresse seul (Z_SYNC_FLUSH)
+    decoder = zlib.decompressobj(31)
+    first = decoder.decompress(chunks[0]).splitlines()
+    assert json.loads(first[0])["line"] == 0
+    assert len(gzip.decompress(b"".join(chunks)).splitlines()) == 3
+
+
+def test_injected_response_headers_are_kept():
+    response = client.get("/cookie")
+    assert response.cookies.get("seen") == "1"
+    assert response.json()["success"] is True
+
+
+def test_dumps_matches_pydantic():
+    payload = APIResponse(success=True, data={"date": datetime(2024, 1, 1, 0, 30), "value": Decimal("2.50")})
+    assert json.loads(dumps(payload)) == json.loads(payload.model_dump_json())
+    assert json.loads(dumps({1: "a"})) == {"1": "a"}
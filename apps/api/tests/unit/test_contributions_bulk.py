@@ -0,0 +1,130 @@
+"""Tests for the set-based bulk approve / reject of offer contributions"""
+from datetime import UTC, datetime
+
+import pytest
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from src.models import EnergyOffer, EnergyProvider, OfferContribution, User
+from src.models.base import Base
+from src.models.database import build_engine
+from src.routers import energy_offers
+from src.services.cache import cache_service
+
+
+@pytest.fixture
+async def db(tmp_path, monkeypatch):
+    monkeypatch.setattr(cache_service, "redis_client", None)
+    engine = build_engine(f"sqlite+aiosqlite:///{tmp_path / 'test.db'}")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    async with async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)() as session:
+        yield session
+    await engine.dispose()
+
+
+@pytest.fixture
+def notifications(monkeypatch):
+    sent: list = []
+
+    async def send_bulk_notifications(grouped, reason=None):
+        for user, contributions in grouped.values():
+            sent.append((user.email, sorted(c.id for c in contributions), reason))
+
+    monkeypatch.setattr(energy_offers, "send_bulk_notifications", send_bulk_notifications)
+    return sent
+
+
+def _user(email: str) -> User:
+    return User(id=email, email=email, hashed_password="x", client_id=email, client_secret="x", is_admin=True)
+
+
+def _contribution(contribution_id: str, offer_type: str, status: str = "pending") -> OfferContribution:
+    return OfferContribution(
+        id=contribution_id,
+        contributor_user_id="contributor@example.org",
+        contribution_type="NEW_OFFER",
+        status=status,
+        existing_provider_id="edf",
+        offer_name=f"Tarif {offer_type}",
+        offer_type=offer_type,
+        pricing_data={"subscription_price": 12.5, "base_price": 0.25},
+        power_kva=6,
+        price_sheet_url="https://example.org/tarif.pdf",
+        valid_from=datetime(2025, 8, 1, tzinfo=UTC),
+    )
+
+
+async def _seed(db: AsyncSession) -> User:
+    admin = _user("admin@example.org")
+    db.add_all([admin, _user("contributor@example.org"), EnergyProvider(id="edf", name="EDF")])
+    db.add(EnergyOffer(
+        id="old-base", provider_id="edf", name="Ancien Tarif BASE", offer_type="BASE", subscription_price=11
+    ))
+    db.add_all([
+        _contribution("base", "BASE"),
+        _contribution("hchp", "HC_HP"),
+        _contribution("done", "TEMPO", status="approved"),
+        _contribution("other", "EJP"),
+    ])
+    await db.commit()
+    return admin
+
+
+async def _statuses(db: AsyncSession) -> dict[str, str]:
+    db.expire_all()
+    result = await db.execute(select(OfferContribution.id, OfferContribution.status))
+    return dict(result.all())
+
+
+async def test_bulk_approve_touches_only_selected_pending_contributions(db, notifications):
+    admin = await _seed(db)
+
+    response = await energy_offers.bulk_approve_contributions(
+        body={"contribution_ids": ["base", "done", "missing", "base"]}, current_user=admin, db=db
+    )
+
+    assert response.success
+    assert response.data["processed"] == 1
+    assert response.data["skipped"] == 2
+    assert await _statuses(db) == {"base": "approved", "hchp": "pending", "done": "approved", "other": "pending"}
+    offers = {offer.name: offer for offer in (await db.execute(select(EnergyOffer))).scalars()}
+    assert set(offers) == {"Ancien Tarif BASE", "Tarif BASE"}
+    assert offers["Ancien Tarif BASE"].valid_to is not None
+    assert notifications == [("contributor@example.org", ["base"], None)]
+
+
+async def test_bulk_reject_touches_only_selected_pending_contributions(db, notifications):
+    admin = await _seed(db)
+
+    response = await energy_offers.bulk_reject_contributions(
+        body={"contribution_ids": ["hchp", "done"], "reason": "Tarifs erronés"}, current_user=admin, db=db
+    )
+
+    assert response.success
+    assert response.data["processed"] == 1
+    assert response.data["skipped"] == 1
+    assert await _statuses(db) == {"base": "pending", "hchp": "rejected", "done": "approved", "other": "pending"}
+    rejected = await db.get(OfferContribution, "hchp")
+    assert rejected.review_comment == "Tarifs erronés"
+    assert rejected.reviewed_by == "admin@example.org"
+    assert (await db.execute(select(EnergyOffer.id))).scalars().all() == ["old-base"]
+    assert notifications == [("contributor@example.org", ["hchp"], "Tarifs erronés")]
+
+
+async def test_bulk_provider_deletion_includes_offers_created_in_the_batch(db, notifications):
+    admin = await _seed(db)
+    deletion = _contribution("delete", "BASE")
+    deletion.contribution_type = "UPDATE_OFFER"
+    deletion.offer_name = "[SUPPRESSION FOURNISSEUR] EDF"
+    db.add(deletion)
+    await db.commit()
+
+    response = await energy_offers.bulk_approve_contributions(
+        body={"contribution_ids": ["hchp", "delete"]}, current_user=admin, db=db
+    )
+
+    assert response.success and response.data["processed"] == 2
+    db.expire_all()
+    assert (await db.execute(select(EnergyOffer))).scalars().all() == []
+    assert (await db.execute(select(EnergyProvider))).scalars().all() == []
@@ -0,0 +1,101 @@
+import json
+from datetime import date, datetime, timedelta
+
+import fakeredis
+import pytest
+
+from src.config import settings
+from src.services.cache import cache_service
+from src.services.daily_cache import BITMAP_EPOCH, daily_cache, day_offset, present_days_from_bitmap
+
+
+def test_day_offset():
+    """Test bitmap offsets are day ordinals since the epoch"""
+    assert day_offset(BITMAP_EPOCH) == 0
+    assert day_offset(date(2000, 1, 9)) == 8
+
+
+def test_present_days_from_bitmap():
+    """Test decoding a GETRANGE slice into present days"""
+    start = date(2024, 1, 1)
+    end = date(2024, 1, 20)
+
+    # Build the bitmap Redis would return for present days
+    present = {date(2024, 1, 1), date(2024, 1, 5), date(2024, 1, 20)}
+    first_byte = day_offset(start) // 8
+    bitmap = bytearray(day_offset(end) // 8 - first_byte + 1)
+    for day in present:
+        offset = day_offset(day)
+        bitmap[offset // 8 - first_byte] |= 0x80 >> (offset % 8)
+
+    assert present_days_from_bitmap(bytes(bitmap), start, end) == present
+
+
+def test_present_days_from_empty_bitmap():
+    """Test that a missing bitmap key means every day is a miss"""
+    assert present_days_from_bitmap(b"", date(2024, 1, 1), date(2024, 1, 31)) == set()
+
+
+PDL = "12345678901234"
+
+
+@pytest.fixture
+def redis_client(monkeypatch):
+    client = fakeredis.FakeAsyncRedis()
+    monkeypatch.setattr(cache_service, "redis_client", client)
+    return client
+
+
+def _reading(day: date) -> dict:
+    return {"date": day.isoformat(), "value": str(day.day * 100)}
+
+
+async def test_range_round_trip_across_months(redis_client):
+    """Test readings written over two months are read back in order, missing days reported"""
+    days = [date(2024, 1, 30), date(2024, 1, 31), date(2024, 2, 2)]
+    assert await daily_cache.set_readings("consumption", PDL, [_reading(d) for d in days], "secret") == 3
+
+    readings, missing = await daily_cache.get_range("consumption", PDL, date(2024, 1, 29), date(2024, 2, 3), "secret")
+
+    assert readings == [_reading(d) for d in days]
+    assert missing == ["2024-01-29", "2024-02-01", "2024-02-03"]
+    assert await redis_client.hkeys(f"consumption:daily:{PDL}:month:2024-01") == [b"30", b"31"]
+    # Encrypted with the owner's key: another key reads nothing
+    assert (await daily_cache.get_range("consumption", PDL, date(2024, 1, 30), date(2024, 1, 31), "other"))[0] == []
+
+
+async def test_bitmap_bit_without_month_field_is_a_miss(redis_client):
+    """Test a day marked in the bitmap whose month hash expired is reported missing"""
+    readings = [_reading(date(2024, 3, 1)), _reading(date(2024, 4, 1))]
+    await daily_cache.set_readings("production", PDL, readings, "secret")
+    await redis_client.delete(f"production:daily:{PDL}:month:2024-03")
+
+    readings, missing = await daily_cache.get_range("production", PDL, date(2024, 3, 1), date(2024, 4, 1), "secret")
+
+    assert readings == [_reading(date(2024, 4, 1))]
+    assert len(missing) == 31 and missing[0] == "2024-03-01"
+
+
+async def test_month_ttl_follows_its_last_day(redis_client):
+    """Test a month that can still hold recent days keeps the short TTL, older months the historical one"""
+    recent = datetime.now().date() - timedelta(days=1)
+    await daily_cache.set_readings("consumption", PDL, [_reading(recent), _reading(date(2024, 1, 10))], "secret")
+
+    recent_ttl = await redis_client.ttl(f"consumption:daily:{PDL}:month:{recent:%Y-%m}")
+    old_ttl = await redis_client.ttl(f"consumption:daily:{PDL}:month:2024-01")
+    assert 0 < recent_ttl <= settings.CACHE_TTL_SECONDS
+    assert settings.CACHE_TTL_SECONDS < old_ttl <= settings.CACHE_TTL_HISTORICAL_SECONDS
+
+
+async def test_legacy_per_day_keys_are_migrated_on_read(redis_client):
+    """Test a legacy per-day key is served, rewritten into the month hash and deleted"""
+    legacy_key = f"consumption:daily:{PDL}:2024-05-04"
+    cipher = cache_service._get_cipher("secret")
+    await redis_client.set(legacy_key, cipher.encrypt(json.dumps(_reading(date(2024, 5, 4))).encode()))
+
+    readings, missing = await daily_cache.get_range("consumption", PDL, date(2024, 5, 4), date(2024, 5, 5), "secret")
+
+    assert readings == [_reading(date(2024, 5, 4))]
+    assert missing == ["2024-05-05"]
+    assert not await redis_client.exists(legacy_key)
+    assert await redis_client.hkeys(f"consumption:daily:{PDL}:month:2024-05") == [b"04"]
@@ -0,0 +1,162 @@
+"""Tests for the database engine factory, the per-request session and read-replica routing"""
+from fastapi import Depends, FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import Column, Integer, MetaData, Table, insert, select, text
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from starlette.requests import HTTPConnection
+
+from src.middleware.read_your_writes import ReadYourWritesMiddleware
+from src.models import database
+from src.models.database import (
+    MeasuredQueuePool,
+    PrimarySession,
+    ReplicaRouter,
+    build_engine,
+    client_identity,
+    get_db,
+    pool_metrics,
+)
+
+
+async def test_sqlite_engine_uses_wal_and_records_checkouts(tmp_path):
+    engine = build_engine(f"sqlite+aiosqlite:///{tmp_path / 'test.db'}")
+    checkouts = pool_metrics.checkouts
+
+    async with engine.connect() as conn:
+        assert (await conn.execute(text("PRAGMA journal_mode"))).scalar() == "wal"
+        assert (await conn.execute(text("PRAGMA synchronous"))).scalar() == 1  # NORMAL
+        assert (await conn.execute(text("PRAGMA busy_timeout"))).scalar() == 5000
+
+    snapshot = pool_metrics.snapshot(engine.pool)
+    await engine.dispose()
+
+    assert isinstance(engine.pool, MeasuredQueuePool)
+    assert pool_metrics.checkouts == checkouts + 1
+    assert snapshot["checked_out"] == 0
+    assert snapshot["hold_ms_max"] >= 0
+
+
+def test_in_memory_sqlite_keeps_its_static_pool():
+    engine = build_engine("sqlite+aiosqlite://")
+    assert not isinstance(engine.pool, MeasuredQueuePool)
+
+
+def test_dependencies_share_the_request_session():
+    app = FastAPI()
+    sessions = []
+
+    async def first(db=Depends(get_db, use_cache=False)):
+        sessions.append(db)
+
+    async def second(db=Depends(get_db, use_cache=False)):
+        sessions.append(db)
+
+    @app.get("/")
+    async def endpoint(_a=Depends(first), _b=Depends(second), db=Depends(get_db)):
+        sessions.append(db)
+        return {}
+
+    client = TestClient(app)
+    client.get("/")
+    client.get("/")
+
+    assert len(sessions) == 6
+    assert sessions[0] is sessions[1] is sessions[2]
+    assert sessions[3] is not sessions[0]
+
+
+async def test_primary_session_tracks_committed_writes(tmp_path):
+    engine = build_engine(f"sqlite+aiosqlite:///{tmp_path / 'test.db'}")
+    table = Table("items", MetaData(), Column("id", Integer, primary_key=True))
+    async with engine.begin() as conn:
+        await conn.run_sync(table.metadata.create_all)
+    session_maker = async_sessionmaker(engine, class_=AsyncSession, sync_session_class=PrimarySession)
+
+    async with session_maker() as session:
+        await session.execute(select(table))
+        await session.commit()
+        assert "wrote" not in session.info
+
+        await session.execute(insert(table).values(id=1))
+        await session.rollback()
+        await session.commit()
+        assert "wrote" not in session.info
+
+        await session.execute(insert(table).values(id=1))
+        await session.commit()
+        assert session.info["wrote"] is True
+    await engine.dispose()
+
+
+def _connection(token: str | None = None) -> HTTPConnection:
+    headers = [(b"authorization", f"Bearer {token}".encode())] if token else []
+    return HTTPConnection({"type": "http", "headers": headers})
+
+
+async def test_replica_routing_is_lag_aware_and_reads_own_writes(tmp_path, monkeypatch):
+    replica = build_engine(f"sqlite+aiosqlite:///{tmp_path / 'replica.db'}")
+    monkeypatch.setattr(database, "replica_engine", replica)
+    monkeypatch.setattr(database, "replica_session_maker", async_sessionmaker(replica, class_=AsyncSession))
+    router = ReplicaRouter()
+
+    assert client_identity(_connection()) is None
+    assert client_identity(_connection("abc")) == client_identity(_connection("abc")) != client_identity(_connection("x"))
+
+    assert await router.use_replica(_connection("token")) is True
+    assert router.lag == 0.0
+
+    await router.mark_write(client_identity(_connection("token")))
+    assert await router.use_replica(_connection("token")) is False
+    assert await router.use_replica(_connection("other")) is True
+    assert await router.use_replica(_connection()) is True
+
+    # Lagging replica: everybody reads from the primary
+    router.lag = database.settings.DB_REPLICA_MAX_LAG_SECONDS + 1
+    assert await router.use_replica(_connection("other")) is False
+    await replica.dispose()
+
+
+async def test_write_pin_is_recorded_before_the_response_is_sent(tmp_path, monkeypatch):
+    engine = build_engine(f"sqlite+aiosqlite:///{tmp_path / 'test.db'}")
+    table = Table("items", MetaData(), Column("id", Integer, primary_key=True))
+    async with engine.begin() as conn:
+        await conn.run_sync(table.metadata.create_all)
+    session_maker = async_sessionmaker(engine, class_=AsyncSession, sync_session_class=PrimarySession)
+    monkeypatch.setattr(database, "async_session_maker", session_maker)
+    monkeypatch.setattr(database, "replica_engine", engine)
+    router = ReplicaRouter()
+    monkeypatch.setattr(database, "replica_router", router)
+
+    app = FastAPI()
+
+    @app.post("/items/{item_id}")
+    async def create(item_id: int, db=Depends(get_db)):
+        await db.execute(insert(table).values(id=item_id))
+        await db.commit()
+        return {}
+
+    async def pinned_when_sent(asgi_app, item_id: int) -> tuple[bool, bool]:
+        identity = client_identity(_connection("token"))
+        pinned = []
+        scope = {
+            "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "POST", "scheme": "http",
+            "path": f"/items/{item_id}", "raw_path": b"", "root_path": "", "query_string": b"",
+            "headers": [(b"authorization", b"Bearer token")], "server": ("test", 80), "client": ("test", 1),
+        }
+
+        async def receive():
+            return {"type": "http.request", "body": b"", "more_body": False}
+
+        async def send(message):
+            if message["type"] == "http.response.start":
+                pinned.append(await router.wrote_recently(identity))
+
+        await asgi_app(scope, receive, send)
+        pinned.append(await router.wrote_recently(identity))
+        router._recent_writes.clear()
+        return pinned[0], pinned[1]
+
+    # Without the middleware the session (and its pin) is only closed once the response was sent
+    assert await pinned_when_sent(app, 1) == (False, True)
+    assert await pinned_when_sent(ReadYourWritesMiddleware(app), 2) == (True, True)
+    await engine.dispose()
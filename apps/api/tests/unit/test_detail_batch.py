@@ -0,0 +1,193 @@
+"""Tests for the detail batch fetch (JSON and streaming) with a fake Enedis adapter"""
+import asyncio
+import json
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+from starlette.requests import Request
+
+from src.adapters.enedis import RateLimiter
+from src.routers import enedis
+from src.routers.enedis import (
+    DetailBatch,
+    collect_detail_batch,
+    fetch_detail_chunk,
+    get_consumption_detail,
+    iter_detail_batch,
+    stream_detail_batch,
+)
+from src.services.cache import cache_service
+
+
+class FakeAdapter:
+    """Returns 48 readings per day of the requested range (end excluded)"""
+
+    def __init__(self, fail_from: str | None = None, latency: float = 0.0, rate_limiter: RateLimiter | None = None) -> None:
+        self.calls: list[tuple[str, str]] = []
+        self.fail_from = fail_from
+        self.latency = latency
+        self.in_flight = 0
+        self.max_in_flight = 0
+        if rate_limiter:
+            self.rate_limiter = rate_limiter
+
+    async def get_consumption_detail(self, usage_point_id: str, start: str, end: str, token: str) -> dict:
+        if hasattr(self, "rate_limiter"):
+            await self.rate_limiter.acquire()
+        self.calls.append((start, end))
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        await asyncio.sleep(self.latency)
+        self.in_flight -= 1
+        if self.fail_from and start >= self.fail_from:
+            raise RuntimeError("Enedis unavailable")
+        day = datetime.strptime(start, "%Y-%m-%d")
+        readings = []
+        while day < datetime.strptime(end, "%Y-%m-%d"):
+            readings.extend(
+                {"date": (day + timedelta(minutes=30 * (i + 1))).isoformat(sep=" "), "value": "100", "interval_length": "PT30M"}
+                for i in range(48)
+            )
+            day += timedelta(days=1)
+        return {"meter_reading": {"interval_reading": readings}}
+
+
+USER = SimpleNamespace(id="user-1", is_admin=False, debug_mode=False)
+
+
+def _batch(adapter: FakeAdapter, days: int = 20) -> DetailBatch:
+    start = datetime(2025, 3, 1)
+    return DetailBatch(
+        data_type="consumption",
+        usage_point_id="12345678901234",
+        start="2025-03-01",
+        end=(start + timedelta(days=days - 1)).strftime("%Y-%m-%d"),
+        dates=[(start + timedelta(days=i)).strftime("%Y-%m-%d") for i in range(days)],
+        today=datetime(2025, 6, 1),
+        oldest_allowed=datetime(2023, 6, 1),
+        adapter=adapter,
+        is_demo=False,
+        access_token="token",
+        encryption_key="secret",
+        effective_user=USER,
+    )
+
+
+def _request(accept: str = "*/*") -> Request:
+    return Request({"type": "http", "method": "GET", "path": "/enedis/consumption/detail/stream/x",
+                    "headers": [(b"accept", accept.encode())], "query_string": b""})
+
+
+async def test_events_are_yielded_chunk_by_chunk():
+    adapter = FakeAdapter()
+    events = [e async for e in iter_detail_batch(_batch(adapter), _request(), False, USER)]
+
+    assert [e["type"] for e in events] == ["plan", "chunk", "chunk", "chunk"]
+    assert events[0]["to_fetch"] == 20 and events[0]["chunks"] == 3
+    assert [e["index"] for e in events[1:]] == [1, 2, 3]
+    assert len(adapter.calls) == 3
+
+
+async def test_collect_matches_the_streamed_readings():
+    response = await collect_detail_batch(_batch(FakeAdapter()), _request(), False, USER, None)
+    readings = response.data["meter_reading"]["interval_reading"]
+    assert response.success and response.error is None
+    assert readings == sorted(readings, key=lambda r: r["date"])
+
+    stream = stream_detail_batch(_batch(FakeAdapter()), _request(), False, USER, None)
+    lines = [json.loads(line) async for line in stream.body_iterator]
+    assert stream.media_type == "application/x-ndjson"
+    assert [line["type"] for line in lines[:3]] == ["start", "readings", "progress"]
+    assert lines[-1] == {"type": "end", "readings": len(readings), "partial": False}
+    assert [r for line in lines if line["type"] == "readings" for r in line["readings"]] == readings
+
+
+async def test_failed_chunks_make_the_result_partial():
+    response = await collect_detail_batch(_batch(FakeAdapter(fail_from="2025-03-08")), _request(), False, USER, None)
+    assert response.success and response.error.code == "PARTIAL_DATA"
+
+    stream = stream_detail_batch(
+        _batch(FakeAdapter(fail_from="2025-03-08")), _request("text/event-stream"), False, USER, None
+    )
+    body = b"".join([chunk async for chunk in stream.body_iterator]).decode()
+    assert stream.media_type == "text/event-stream"
+    assert "event: progress\ndata: {" in body and '"failed":true' in body
+    assert body.rstrip().endswith('"partial":true}')
+
+
+async def test_chunks_are_fetched_concurrently_and_reassembled_in_order():
+    latency = 0.05
+    adapter = FakeAdapter(latency=latency, rate_limiter=RateLimiter(max_calls=5, time_frame=latency))
+    batch = _batch(adapter, days=70)  # 10 chunks
+
+    events = [e async for e in iter_detail_batch(batch, _request(), False, USER)]
+
+    chunks = [e for e in events if e["type"] == "chunk"]
+    assert [e["index"] for e in chunks] == list(range(1, 11))
+    assert [e["start"] for e in chunks] == sorted(e["start"] for e in chunks)
+    assert adapter.max_in_flight == 5
+
+
+async def test_chunk_finishing_last_does_not_overwrite_the_next_chunks_first_day(monkeypatch):
+    cached: dict[str, dict] = {}
+
+    async def set_many(items: dict, encryption_key: str, ttl: int | None = None) -> int:
+        cached.update(items)
+        return len(items)
+
+    monkeypatch.setattr(cache_service, "set_many", set_many)
+
+    class SlowFirstChunk(FakeAdapter):
+        async def get_consumption_detail(self, usage_point_id: str, start: str, end: str, token: str) -> dict:
+            if start == "2025-03-01":
+                await asyncio.sleep(0.05)
+            return await super().get_consumption_detail(usage_point_id, start, end, token)
+
+    batch = _batch(SlowFirstChunk(), days=14)
+    # The second chunk completes first; the first one also gets the 2025-03-08 00:00 reading
+    await asyncio.gather(
+        fetch_detail_chunk(batch, True, 0, 2, "2025-03-01", "2025-03-07"),
+        fetch_detail_chunk(batch, True, 1, 2, "2025-03-08", "2025-03-14"),
+    )
+
+    days = {key.rsplit(":", 1)[1]: entry for key, entry in cached.items()}
+    assert sorted(days) == [f"2025-03-{d:02d}" for d in range(1, 15)]
+    assert days["2025-03-08"]["count"] == 47
+
+
+async def test_single_day_fetch_does_not_overwrite_the_next_cached_day(monkeypatch):
+    day = (datetime.now() - timedelta(days=30)).date()
+    next_day = (day + timedelta(days=1)).isoformat()
+    complete = {"readings": [{"date": f"{next_day} 00:30:00", "value": "1"}] * 48, "expected_count": 48, "count": 48}
+    cached: dict[str, dict] = {}
+
+    async def get_detail_days(data_type: str, usage_point_id: str, dates: list, encryption_key: str) -> dict:
+        return {next_day: complete}
+
+    async def set_many(items: dict, encryption_key: str, ttl: int | None = None) -> int:
+        cached.update(items)
+        return len(items)
+
+    async def get_valid_token(usage_point_id, user, db):
+        return "token"
+
+    async def check_rate_limit(*args):
+        return True, None
+
+    async def get_adapter_for_user(user):
+        return FakeAdapter(), False
+
+    monkeypatch.setattr(enedis, "get_detail_days", get_detail_days)
+    monkeypatch.setattr(enedis, "get_valid_token", get_valid_token)
+    monkeypatch.setattr(enedis, "check_rate_limit", check_rate_limit)
+    monkeypatch.setattr(enedis, "get_adapter_for_user", get_adapter_for_user)
+    monkeypatch.setattr(cache_service, "set_many", set_many)
+
+    # Only ``day`` is missing: its fetch is widened to ``next_day`` (start != end), which returns next_day 00:00
+    user = SimpleNamespace(**vars(USER), client_secret="secret")
+    response = await get_consumption_detail(
+        _request(), "12345678901234", day.isoformat(), next_day, True, user, None, db=None
+    )
+
+    assert response.success
+    assert [key.rsplit(":", 1)[1] for key in cached] == [day.isoformat()]
@@ -0,0 +1,88 @@
+import json
+
+import fakeredis
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from src.models import PDL, User
+from src.models.base import Base
+from src.models.database import build_engine
+from src.services import detail_cache
+from src.services.cache import cache_service
+from src.services.detail_cache import LEGACY_DETAIL_KEY_RE, build_daily_entries, is_day_complete
+
+
+def test_legacy_detail_key_pattern():
+    """Test that only legacy per-reading keys are matched by the compaction job"""
+    match = LEGACY_DETAIL_KEY_RE.match("consumption:detail:12345678901234:2024-10-08T20:30")
+    assert match is not None
+    assert match.groups() == ("consumption", "12345678901234", "2024-10-08", "20", "30")
+
+    assert LEGACY_DETAIL_KEY_RE.match("consumption:detail:daily:12345678901234:2024-10-08") is None
+
+
+def test_build_daily_entries():
+    """Test grouping readings into per-day cache entries"""
+    readings = [
+        {"date": "2024-10-08 23:30:00", "value": "1", "interval_length": "PT30M"},
+        {"date": "2024-10-09T00:00:00", "value": "2", "interval_length": "PT30M"},
+        {"date": "2024-10-09 00:30:00", "value": "3", "interval_length": "PT30M"},
+    ]
+    entries = build_daily_entries(readings)
+
+    assert set(entries) == {"2024-10-08", "2024-10-09"}
+    assert entries["2024-10-09"]["count"] == 2
+    assert entries["2024-10-09"]["expected_count"] == 48
+
+
+def test_is_day_complete():
+    """Test the 90% completeness rule"""
+    assert is_day_complete({"readings": [{}] * 44, "expected_count": 48})
+    assert not is_day_complete({"readings": [{}] * 40, "expected_count": 48})
+
+
+async def test_legacy_keys_are_compacted_one_scan_page_at_a_time(tmp_path, monkeypatch):
+    """Test that each SCAN page is written and deleted before the next one is read"""
+    engine = build_engine(f"sqlite+aiosqlite:///{tmp_path / 'test.db'}")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    session_maker = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    async with session_maker() as session:
+        session.add_all([
+            User(id="owner", email="owner@example.org", hashed_password="x", client_id="owner", client_secret="s"),
+            PDL(id="pdl-1", usage_point_id="12345678901234", user_id="owner"),
+        ])
+        await session.commit()
+    monkeypatch.setattr(detail_cache, "async_session_maker", session_maker)
+
+    redis_client = fakeredis.FakeAsyncRedis()
+    monkeypatch.setattr(cache_service, "redis_client", redis_client)
+    cipher = cache_service._get_cipher("s")
+    for slot in range(48):
+        timestamp = f"2024-10-08T{slot // 2:02d}:{slot % 2 * 30:02d}"
+        reading = {"date": timestamp.replace("T", " ") + ":00", "value": str(slot), "interval_length": "PT30M"}
+        legacy_key = f"consumption:detail:12345678901234:{timestamp}"
+        await redis_client.set(legacy_key, cipher.encrypt(json.dumps(reading).encode()))
+    await redis_client.set("consumption:detail:99999999999999:2024-10-08T00:00", b"orphan")
+
+    legacy_keys_seen_per_scan: list[int] = []
+    scan = redis_client.scan
+
+    async def counting_scan(cursor, match=None, count=None):
+        legacy_keys_seen_per_scan.append(len(await redis_client.keys("*:detail:[0-9]*T*")))
+        return await scan(cursor, match=match, count=count)
+
+    monkeypatch.setattr(redis_client, "scan", counting_scan)
+
+    stats = await detail_cache.compact_legacy_detail_keys(batch_size=2, scan_count=10)
+
+    assert stats == {"legacy_keys": 49, "days_compacted": 5, "keys_deleted": 49}
+    # Legacy keys shrink between SCAN calls: pages are not accumulated in memory
+    assert legacy_keys_seen_per_scan[1] < legacy_keys_seen_per_scan[0]
+    assert await redis_client.keys("*:detail:[0-9]*T*") == []
+
+    # The day split across pages is merged back into one complete entry
+    entry = json.loads(cipher.decrypt(await redis_client.get("consumption:detail:daily:12345678901234:2024-10-08")))
+    assert entry["count"] == 48
+    assert [r["value"] for r in entry["readings"]] == [str(slot) for slot in range(48)]
+    assert await redis_client.exists("consumption:detail:daily:99999999999999:2024-10-08") == 0
+    await engine.dispose()
@@ -0,0 +1,84 @@
+"""Tests for the columnar load-curve format"""
+import json
+from datetime import datetime, timedelta
+
+import pytest
+from starlette.requests import Request
+
+from src.schemas import APIResponse
+from src.services.load_curve import (
+    COLUMNAR_MEDIA_TYPE,
+    decode_columnar,
+    encode_columnar,
+    negotiate_format,
+    render_load_curve,
+)
+
+
+def _readings(start: datetime, count: int, minutes: int = 30, interval_length: str = "PT30M") -> list[dict]:
+    return [
+        {
+            "value": str(100 + i),
+            "date": (start + timedelta(minutes=minutes * i)).isoformat(sep=" "),
+            "interval_length": interval_length,
+            "measure_type": "B",
+        }
+        for i in range(count)
+    ]
+
+
+def _request(accept: str = "application/json") -> Request:
+    return Request({"type": "http", "headers": [(b"accept", accept.encode())], "query_string": b""})
+
+
+def test_regular_series_has_no_breaks():
+    readings = _readings(datetime(2024, 1, 1, 0, 30), 96)
+    columnar = encode_columnar(readings)
+
+    assert columnar["start"] == "2024-01-01 00:30:00"
+    assert columnar["step"] == 1800
+    assert columnar["values"][:2] == [100, 101]
+    assert columnar["breaks"] == []
+    assert decode_columnar(columnar) == [{**r, "value": int(r["value"])} for r in readings]
+
+
+def test_breaks_on_gaps_and_step_changes():
+    readings = (
+        _readings(datetime(2024, 1, 1, 0, 30), 10)
+        + _readings(datetime(2024, 1, 3, 0, 30), 10)  # Trou de deux jours
+        + _readings(datetime(2024, 1, 3, 5, 40), 12, minutes=10, interval_length="PT10M")
+    )
+    columnar = encode_columnar(readings)
+
+    assert [b["index"] for b in columnar["breaks"]] == [10, 20]
+    assert columnar["breaks"][1]["step"] == 600
+    assert decode_columnar(columnar) == [{**r, "value": int(r["value"])} for r in readings]
+    assert encode_columnar([])["values"] == []
+
+
+def test_negotiation_and_rendering():
+    assert negotiate_format(_request(), None) == "json"
+    assert negotiate_format(_request(COLUMNAR_MEDIA_TYPE), None) == "columnar"
+    assert negotiate_format(_request("application/msgpack"), None) == "msgpack"
+    assert negotiate_format(_request("application/msgpack"), "JSON") == "json"
+
+    readings = _readings(datetime(2024, 1, 1, 0, 30), 4)
+    response = APIResponse(success=True, data={"meter_reading": {"usage_point_id": "1", "interval_reading": readings}})
+    assert render_load_curve(_request(), response, None) is response
+
+    rendered = render_load_curve(_request(), response, "columnar")
+    body = json.loads(rendered.body)
+    assert rendered.media_type == COLUMNAR_MEDIA_TYPE
+    assert body["success"] is True
+    assert body["data"]["meter_reading"]["usage_point_id"] == "1"
+    assert "interval_reading" not in body["data"]["meter_reading"]
+    assert body["data"]["meter_reading"]["columnar"]["values"] == [100, 101, 102, 103]
+
+
+def test_msgpack_rendering():
+    msgpack = pytest.importorskip("msgpack")
+    response = APIResponse(success=True, data={"meter_reading": {"interval_reading": _readings(datetime(2024, 1, 1), 3)}})
+
+    rendered = render_load_curve(_request(), response, "msgpack")
+    assert rendered.media_type == "application/msgpack"
+    assert msgpack.unpackb(rendered.body)["data"]["meter_reading"]["columnar"]["values"] == [100, 101, 102]
@@ -0,0 +1,137 @@
+import asyncio
+
+import httpx
+import pytest
+
+from src.adapters.http_resilience import CircuitOpenError, parse_retry_after, start_retry_budget
+from src.adapters.myelectricaldata import MyElectricalDataAdapter
+from src.config import settings
+
+
+class FakeGateway:
+    """In-process gateway answering with a scripted sequence of failures, then 200"""
+
+    def __init__(self, failures: list) -> None:
+        self.failures = list(failures)
+        self.calls = 0
+
+    def __call__(self, request: httpx.Request) -> httpx.Response:
+        self.calls += 1
+        if self.failures:
+            failure = self.failures.pop(0)
+            if isinstance(failure, Exception):
+                raise failure
+            return failure
+        return httpx.Response(200, json={"success": True, "data": []})
+
+
+@pytest.fixture
+def no_backoff(monkeypatch):
+    monkeypatch.setattr(settings, "MED_RETRY_BACKOFF_BASE_SECONDS", 0.0)
+    monkeypatch.setattr(settings, "MED_RETRY_MAX_ATTEMPTS", 4)
+    monkeypatch.setattr(settings, "MED_CIRCUIT_FAILURE_THRESHOLD", 3)
+
+
+def make_adapter(gateway: FakeGateway) -> MyElectricalDataAdapter:
+    adapter = MyElectricalDataAdapter(transport=httpx.MockTransport(gateway))
+    adapter.client_secret = "secret"
+    return adapter
+
+
+@pytest.mark.asyncio
+async def test_get_retried_on_transient_errors(no_backoff):
+    """Timeouts and 5xx are retried, then the response is returned"""
+    gateway = FakeGateway([httpx.ReadTimeout("timeout"), httpx.Response(503)])
+    adapter = make_adapter(gateway)
+
+    response = await adapter.get_ecowatt_forecast()
+
+    assert response["success"] is True
+    assert gateway.calls == 3
+
+
+@pytest.mark.asyncio
+async def test_post_not_retried(no_backoff):
+    gateway = FakeGateway([httpx.Response(502)])
+    adapter = make_adapter(gateway)
+
+    with pytest.raises(httpx.HTTPStatusError):
+        await adapter._make_request("POST", "/contribute", json_data={})
+    assert gateway.calls == 1
+
+
+@pytest.mark.asyncio
+async def test_retry_budget_shared_by_requests(no_backoff):
+    """Once the sync budget is spent, failures are returned without retry"""
+    start_retry_budget(1)
+    gateway = FakeGateway([httpx.Response(429), httpx.Response(429), httpx.Response(429)])
+    adapter = make_adapter(gateway)
+
+    with pytest.raises(httpx.HTTPStatusError):
+        await adapter.get_ecowatt_forecast()
+    assert gateway.calls == 2
+
+
+@pytest.mark.asyncio
+async def test_long_retry_after_not_waited(no_backoff):
+    gateway = FakeGateway([httpx.Response(503, headers={"Retry-After": "3600"})])
+    adapter = make_adapter(gateway)
+
+    with pytest.raises(httpx.HTTPStatusError):
+        await adapter.get_ecowatt_forecast()
+    assert gateway.calls == 1
+
+
+@pytest.mark.asyncio
+async def test_circuit_opens_when_gateway_down(no_backoff):
+    gateway = FakeGateway([httpx.ConnectError("refused")] * 10)
+    adapter = make_adapter(gateway)
+
+    with pytest.raises(CircuitOpenError):
+        await adapter.get_ecowatt_forecast()
+    assert gateway.calls == 3
+
+    # Further calls fail fast without reaching the gateway
+    with pytest.raises(CircuitOpenError):
+        await adapter.get_tempo_calendar()
+    assert gateway.calls == 3
+
+
+@pytest.mark.asyncio
+async def test_cancelled_trial_does_not_keep_the_circuit_open(no_backoff):
+    """A half-open trial cancelled mid-request lets the next call try again"""
+    calls = 0
+
+    async def gateway(request: httpx.Request) -> httpx.Response:
+        nonlocal calls
+        calls += 1
+        if calls <= 3:
+            raise httpx.ConnectError("refused")
+        if calls == 4:
+            await asyncio.Event().wait()  # The trial hangs until cancelled
+        return httpx.Response(200, json={"success": True, "data": []})
+
+    adapter = MyElectricalDataAdapter(transport=httpx.MockTransport(gateway))
+    adapter.client_secret = "secret"
+    with pytest.raises(CircuitOpenError):
+        await adapter.get_ecowatt_forecast()
+
+    adapter.circuit_breaker.reset_timeout = 0  # Half-open: the next call is the trial
+    trial = asyncio.create_task(adapter.get_ecowatt_forecast())
+    while calls < 4:
+        await asyncio.sleep(0)
+    trial.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await trial
+
+    response = await adapter.get_ecowatt_forecast()
+    assert response["success"] is True
+    assert calls == 5
+    assert adapter.circuit_breaker.state == "closed"
+
+
+def test_parse_retry_after():
+    assert parse_retry_after("120") == 120.0
+    assert parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT") == 0.0
+    assert parse_retry_after("soon") is None
+    assert parse_retry_after(None) is None
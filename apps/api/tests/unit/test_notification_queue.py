@@ -0,0 +1,131 @@
+"""Tests for the notification digests, dead letters and redelivery"""
+import json
+import time
+
+import fakeredis
+import pytest
+
+from src.services import notification_queue as queue_module
+from src.services.cache import cache_service
+from src.services.notification_queue import NotificationQueue, dead_letter_entry, merge_digest
+
+
+def _email(index: int) -> dict:
+    return {
+        "id": str(index),
+        "channel": "email",
+        "to": "contributor@example.com",
+        "subject": f"Contribution {index} approuvée",
+        "html": f"<html><head><meta charset=\"UTF-8\"></head><body><p>Offre {index}</p></body></html>",
+        "text": f"Offre {index}",
+        "digest": "contribution_reviewed",
+        "digest_subject": "Vos contributions ont été examinées",
+        "attempts": 2,
+    }
+
+
+def test_single_message_is_sent_as_is():
+    assert merge_digest([_email(1)]) == _email(1)
+
+
+def test_digest_merges_bodies_into_one_email():
+    merged = merge_digest([_email(1), _email(2), _email(3)])
+
+    assert merged["to"] == "contributor@example.com"
+    assert merged["subject"] == "Vos contributions ont été examinées (3)"
+    assert merged["html"].count("<body>") == 1
+    assert all(f"<p>Offre {i}</p>" in merged["html"] for i in (1, 2, 3))
+    assert merged["html"].startswith("<html><head><meta charset=\"UTF-8\"></head>")
+    assert merged["text"].count("Offre") == 3
+    assert merged["digest"] is None
+    assert merged["attempts"] == 0
+
+
+def test_dead_letter_keeps_no_email_body():
+    entry = dead_letter_entry({**_email(1), "html": "<a href=\"/reset?token=secret\">", "last_error": "HTTP 500"})
+
+    assert "html" not in entry and "text" not in entry
+    assert entry["to"] == "contributor@example.com"
+    assert entry["subject"] == "Contribution 1 approuvée"
+    assert entry["last_error"] == "HTTP 500"
+    assert entry["failed_at"]
+    slack = {"channel": "slack", "message": "Nouvelle contribution"}
+    assert dead_letter_entry(slack)["message"] == "Nouvelle contribution"
+
+
+@pytest.fixture
+def redis_client(monkeypatch):
+    client = fakeredis.FakeAsyncRedis()
+    monkeypatch.setattr(cache_service, "redis_client", client)
+    return client
+
+
+def _delivering(queue: NotificationQueue, delivered: bool, sent: list) -> None:
+    async def deliver(message, client):
+        sent.append(message["id"])
+        return delivered
+
+    queue._deliver = deliver  # type: ignore[method-assign]
+
+
+async def test_message_taken_but_not_acknowledged_is_delivered_again(redis_client):
+    await redis_client.rpush(queue_module.QUEUE_KEY, json.dumps({**_email(1), "digest": None}))
+
+    # Worker "a" takes the message and dies before delivering it
+    crashed = NotificationQueue()
+    await crashed._promote_due("a")
+    assert [message["id"] for message, _ in await crashed._take_batch("a")] == ["1"]
+    assert await redis_client.llen(queue_module.QUEUE_KEY) == 0
+
+    survivor = NotificationQueue()
+    assert await survivor._promote_due("b") == []
+    assert await survivor._take_batch("b") == []  # Worker "a" is still within its lease
+
+    await redis_client.zadd(queue_module.WORKERS_KEY, {"a": time.time() - 3600})
+    await survivor._promote_due("b")
+    batch = await survivor._take_batch("b")
+    sent: list = []
+    _delivering(survivor, True, sent)
+    await survivor._deliver_batch("b", batch)
+
+    assert sent == ["1"]
+    assert await redis_client.llen(survivor._processing_key("b")) == 0
+    assert await redis_client.exists(survivor._processing_key("a")) == 0
+    assert await redis_client.zrange(queue_module.WORKERS_KEY, 0, -1) == [b"b"]
+
+
+async def test_failed_delivery_is_rescheduled_and_acknowledged(redis_client):
+    queue = NotificationQueue()
+    await redis_client.rpush(queue_module.QUEUE_KEY, json.dumps({**_email(1), "digest": None, "attempts": 0}))
+    sent: list = []
+    _delivering(queue, False, sent)
+
+    await queue._deliver_batch("a", await queue._take_batch("a"))
+
+    assert sent == ["1"]
+    assert await redis_client.llen(queue._processing_key("a")) == 0
+    [(payload, _)] = await redis_client.zrange(queue_module.RETRY_KEY, 0, -1, withscores=True)
+    assert json.loads(payload)["attempts"] == 1
+
+    # Due retries go back to the queue
+    await redis_client.zadd(queue_module.RETRY_KEY, {payload: 0})
+    await queue._promote_due("a")
+    assert await redis_client.zcard(queue_module.RETRY_KEY) == 0
+    assert await redis_client.lrange(queue_module.QUEUE_KEY, 0, -1) == [payload]
+
+
+async def test_digest_group_is_held_in_the_processing_list_until_delivered(redis_client):
+    queue = NotificationQueue()
+    digest_key = queue._digest_key("contribution_reviewed", "contributor@example.com")
+    await redis_client.rpush(digest_key, json.dumps(_email(1)), json.dumps(_email(2)))
+    await redis_client.zadd(queue_module.DIGESTS_KEY, {"contribution_reviewed:contributor@example.com": 0})
+
+    [(merged, payloads)] = await queue._promote_due("a")
+
+    assert merged["subject"] == "Vos contributions ont été examinées (2)"
+    assert await redis_client.exists(digest_key) == 0
+    assert await redis_client.lrange(queue._processing_key("a"), 0, -1) == payloads
+    assert await queue._promote_due("a") == []
+
+    await queue._acknowledge("a", payloads)
+    assert await redis_client.llen(queue._processing_key("a")) == 0
@@ -0,0 +1,45 @@
+"""Tests for the offer catalogue snapshot"""
+import json
+from datetime import datetime, UTC, timedelta
+
+from src.services.offer_catalogue import CatalogueSnapshot
+
+
+def _offer(offer_id: str, provider_id: str, offer_type: str, valid_to: datetime | None = None) -> dict:
+    return {
+        "id": offer_id,
+        "provider_id": provider_id,
+        "offer_type": offer_type,
+        "subscription_price": "12.50000",
+        "valid_to": valid_to.isoformat() if valid_to else None,
+    }
+
+
+def test_snapshot_indexes_and_bodies():
+    snapshot = CatalogueSnapshot.build(
+        3,
+        [_offer("1", "edf", "BASE"), _offer("2", "edf", "TEMPO"), _offer("3", "engie", "BASE")],
+    )
+
+    def ids(provider_id, offer_type):
+        data, _ = snapshot.body(provider_id, offer_type)
+        return [o["id"] for o in json.loads(data)]
+
+    assert ids(None, None) == ["1", "2", "3"]
+    assert ids("edf", None) == ["1", "2"]
+    assert ids(None, "BASE") == ["1", "3"]
+    assert ids("edf", "BASE") == ["1"]
+    assert ids("octopus", None) == []
+    # Same content, same ETag
+    assert snapshot.body("edf", None)[1] == CatalogueSnapshot.build(4, [_offer("1", "edf", "BASE"), _offer("2", "edf", "TEMPO")]).body(None, None)[1]
+
+
+def test_snapshot_drops_expired_offers_and_expires_with_them():
+    now = datetime.now(UTC)
+    snapshot = CatalogueSnapshot.build(
+        1,
+        [_offer("1", "edf", "BASE", now - timedelta(minutes=1)), _offer("2", "edf", "BASE", now + timedelta(minutes=5))],
+    )
+
+    assert [o["id"] for o in json.loads(snapshot.body(None, None)[0])] == ["2"]
+    assert snapshot.expires_at <= (now + timedelta(minutes=5)).timestamp()
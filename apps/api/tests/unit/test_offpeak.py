@@ -0,0 +1,38 @@
+"""Tests for the compiled off-peak schedules"""
+from datetime import datetime, timedelta
+
+from src.services.offers.hc_hp import DEFAULT_HC_SCHEDULES, WEEKDAY_NAMES, is_in_hc_period, parse_time_range
+from src.services.offpeak import compile_schedule, format_ranges
+
+
+def test_all_formats_compile_to_the_same_schedule():
+    expected = compile_schedule(["22:00-06:00", "12:00-14:00"])
+
+    assert compile_schedule({"ranges": ["22:00-06:00", "12:00-14:00"]}).bitmap == expected.bitmap
+    assert compile_schedule([{"start": "22:00", "end": "06:00"}, {"start": "12:00", "end": "14:00"}]).bitmap == expected.bitmap
+    assert compile_schedule("HC (22H00-6H00;12h00-14h00)").bitmap == expected.bitmap
+    assert compile_schedule({"default": "HC (22H00-6H00;12h00-14h00)"}).bitmap == expected.bitmap
+    assert compile_schedule({day: "22h00-06h00 12h00-14h00" for day in WEEKDAY_NAMES}).bitmap == expected.bitmap
+    assert format_ranges("HC (22H00-6H00;12h00-14h00)") == ["22:00-06:00", "12:00-14:00"]
+
+
+def test_matches_per_point_parsing():
+    schedules = {**DEFAULT_HC_SCHEDULES, "saturday": "02:00-08:00"}
+    del schedules["sunday"]
+    schedule = compile_schedule(schedules, default="22:30-06:30")
+
+    start = datetime(2025, 1, 6)  # lundi
+    timestamps = [start + timedelta(minutes=15 * i) for i in range(7 * 96)]
+    for t in timestamps:
+        hc_start, hc_end = parse_time_range(schedules.get(WEEKDAY_NAMES[t.weekday()], "22:30-06:30"))
+        assert schedule.at(t) == is_in_hc_period(t.time(), hc_start, hc_end), t
+    assert schedule.flags(timestamps) == bytes(schedule.at(t) for t in timestamps)
+    assert compile_schedule(dict(schedules), default="22:30-06:30") is schedule
+
+
+def test_split_intervals():
+    schedule = compile_schedule([{"start": "22:00", "end": "06:00"}])
+
+    assert schedule.split([("05:30", 10), ("06:00", 20), ("22:00", 30), (None, 40), ("bad", 50)]) == (110, 40)
+    assert compile_schedule(None).split([("23:00", 10)]) == (10, 0)
+    assert compile_schedule([], default="22:00-06:00").is_offpeak(23 * 60)
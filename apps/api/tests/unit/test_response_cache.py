@@ -0,0 +1,12 @@
+from src.services.response_cache import etag_matches
+
+
+def test_etag_matches():
+    """Test If-None-Match comparison (weak tags, lists and wildcard)"""
+    etag = '"abc"'
+    assert etag_matches('"abc"', etag)
+    assert etag_matches('W/"abc"', etag)
+    assert etag_matches('"other", "abc"', etag)
+    assert etag_matches("*", etag)
+    assert not etag_matches('"other"', etag)
+    assert not etag_matches(None, etag)
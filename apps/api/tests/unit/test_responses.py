@@ -0,0 +1,45 @@
+"""Tests for the orjson responses: same JSON as pydantic's serialisation"""
+import uuid
+from datetime import UTC, date, datetime, time, timedelta, timezone
+from decimal import Decimal
+
+from fastapi import APIRouter, FastAPI
+from fastapi.testclient import TestClient
+
+from src.schemas import APIResponse
+from src.utils.responses import APIResponseRoute, FastJSONResponse, dumps
+
+RESPONSE = APIResponse(
+    success=True,
+    data={
+        "utc": datetime(2024, 1, 1, 0, 30, tzinfo=UTC),
+        "paris": datetime(2024, 7, 1, 0, 30, 0, 123, tzinfo=timezone(timedelta(hours=2))),
+        "naive": datetime(2024, 1, 1, 0, 30),
+        "day": date(2024, 1, 1),
+        "time": time(1, 2),
+        "price": Decimal("0.2516"),
+        "id": uuid.UUID(int=5),
+        "interval": timedelta(minutes=30),
+        "values": [1.5, None, True, 10**17],
+        3: "non-string key",
+    },
+)
+
+
+def test_dumps_matches_pydantic():
+    assert dumps(RESPONSE) == RESPONSE.model_dump_json().encode()
+
+
+def test_api_response_route_matches_pydantic():
+    app = FastAPI(default_response_class=FastJSONResponse)
+    router = APIRouter(route_class=APIResponseRoute)
+
+    @router.get("/data", response_model=APIResponse)
+    async def data() -> APIResponse:
+        return RESPONSE
+
+    app.include_router(router)
+    response = TestClient(app).get("/data")
+
+    assert response.content == RESPONSE.model_dump_json().encode()
+    assert response.json()["data"]["utc"] == "2024-01-01T00:30:00Z"
@@ -0,0 +1,106 @@
+"""Tests for the scraper job state stored in Redis"""
+import asyncio
+import json
+from contextlib import asynccontextmanager
+
+import fakeredis
+import pytest
+
+from src.schemas import APIResponse
+from src.services import scraper_jobs as jobs_module
+from src.services.cache import cache_service
+from src.services.scraper_jobs import LOCK_KEY, JobConflictError, ScraperJobService, _decode_job
+
+
+def test_decode_job():
+    raw = {
+        b"id": b"abc",
+        b"kind": b"preview",
+        b"provider": b"EDF",
+        b"status": b"completed",
+        b"progress": b"100",
+        b"steps": json.dumps(["Initialisation", "Téléchargement des tarifs EDF"]).encode(),
+        b"result": b'{"success": true, "data": {"preview": {}}}',
+        b"error": b"",
+    }
+
+    job = _decode_job(raw)
+
+    assert job["progress"] == 100
+    assert job["steps"] == ["Initialisation", "Téléchargement des tarifs EDF"]
+    assert job["result"] == {"success": True, "data": {"preview": {}}}
+    assert job["error"] is None
+    assert job["started_at"] is None
+
+
+def test_conflict_error_mentions_running_job():
+    error = JobConflictError({"provider": "EDF", "started_at": "2025-01-01T10:00:00+00:00", "created_at": None})
+    assert "EDF" in str(error)
+    assert "2025-01-01T10:00:00+00:00" in str(error)
+
+
+@pytest.fixture
+def redis_client(monkeypatch):
+    client = fakeredis.FakeAsyncRedis()
+    monkeypatch.setattr(cache_service, "redis_client", client)
+
+    @asynccontextmanager
+    async def session_maker():
+        yield None
+
+    monkeypatch.setattr(jobs_module, "async_session_maker", session_maker)
+    return client
+
+
+async def test_job_losing_its_lock_is_cancelled(redis_client, monkeypatch):
+    service = ScraperJobService()
+    reached_end = False
+
+    async def runner(db, provider, progress):
+        nonlocal reached_end
+        await redis_client.set(LOCK_KEY, "other-job")
+        await progress("Téléchargement des tarifs EDF", 20)
+        await asyncio.sleep(1)
+        reached_end = True
+        return APIResponse(success=True)
+
+    monkeypatch.setitem(jobs_module.RUNNERS, "preview", runner)
+    job = await service.submit("preview", "EDF")
+    await service._run(job["id"])
+
+    job = await service.get_job(job["id"])
+    assert not reached_end
+    assert job["status"] == "failed"
+    assert job["result"]["error"]["code"] == "JOB_LOCK_LOST"
+    assert await redis_client.get(LOCK_KEY) == b"other-job"
+
+
+async def test_result_is_not_recorded_without_the_lock(redis_client, monkeypatch):
+    service = ScraperJobService()
+
+    async def runner(db, provider, progress):
+        await redis_client.delete(LOCK_KEY)
+        return APIResponse(success=True, data={"preview": {}})
+
+    monkeypatch.setitem(jobs_module.RUNNERS, "preview", runner)
+    job = await service.submit("preview", "EDF")
+    await service._run(job["id"])
+
+    job = await service.get_job(job["id"])
+    assert job["status"] == "failed"
+    assert job["result"]["error"]["code"] == "JOB_LOCK_LOST"
+
+
+async def test_running_job_without_lock_is_reported_failed(redis_client):
+    service = ScraperJobService()
+    job = await service.submit("refresh", "EDF")
+    await service._update(job["id"], status="running")
+    assert (await service.get_job(job["id"]))["status"] == "running"
+    assert (await service.current_job())["id"] == job["id"]
+
+    await redis_client.delete(LOCK_KEY)  # Lock expired: the replica running the job stopped
+
+    job = await service.get_job(job["id"])
+    assert job["status"] == "failed"
+    assert job["error"] and job["finished_at"]
+    assert await service.current_job() is None
@@ -0,0 +1,74 @@
+"""Tests for conditional (ETag) requests between client mode and the gateway"""
+import httpx
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from src.adapters.myelectricaldata import MyElectricalDataAdapter
+from src.config import settings
+from src.models.database import build_engine
+from src.models.ecowatt import EcoWatt
+from src.models.refresh_tracker import RefreshTracker
+from src.services.sync import SyncService
+
+SIGNAL = {"periode": "2025-01-10T00:00:00+01:00", "dvalue": 1, "values": [1] * 24, "updated_at": "2025-01-09T12:00:00Z"}
+
+
+class ETagGateway:
+    """In-process gateway answering 304 when the client sends the current ETag"""
+
+    def __init__(self, signals: list) -> None:
+        self.signals = signals
+        self.if_none_match: list = []
+
+    def __call__(self, request: httpx.Request) -> httpx.Response:
+        self.if_none_match.append(request.headers.get("If-None-Match"))
+        if request.headers.get("If-None-Match") == '"v1"':
+            return httpx.Response(304)
+        return httpx.Response(200, json={"success": True, "data": self.signals}, headers={"ETag": '"v1"'})
+
+
+def make_adapter(gateway: ETagGateway) -> MyElectricalDataAdapter:
+    adapter = MyElectricalDataAdapter(transport=httpx.MockTransport(gateway))
+    adapter.client_secret = "secret"
+    return adapter
+
+
+async def test_unchanged_resource_answers_not_modified(monkeypatch):
+    gateway = ETagGateway([SIGNAL])
+    adapter = make_adapter(gateway)
+
+    assert (await adapter.get_ecowatt_forecast())["data"] == [SIGNAL]
+    assert await adapter.get_ecowatt_forecast() == {"success": True, "not_modified": True}
+    assert gateway.if_none_match == [None, '"v1"']
+
+    # One ETag per ``since`` value, least recently used dropped
+    monkeypatch.setattr(settings, "MED_ETAG_CACHE_SIZE", 2)
+    await adapter.get_ecowatt_forecast(since="2025-01-01")
+    await adapter.get_ecowatt_forecast(since="2025-01-02")
+    assert len(adapter._etags) == 2
+    assert (await adapter.get_ecowatt_forecast())["data"] == [SIGNAL]
+
+
+@pytest.fixture
+async def db(tmp_path):
+    engine = build_engine(f"sqlite+aiosqlite:///{tmp_path / 'test.db'}")
+    async with engine.begin() as conn:
+        await conn.run_sync(EcoWatt.__table__.create)
+        await conn.run_sync(RefreshTracker.__table__.create)
+    async with async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)() as session:
+        yield session
+    await engine.dispose()
+
+
+async def test_failed_rows_are_fetched_again(db):
+    gateway = ETagGateway([{**SIGNAL, "periode": "not a date"}, {**SIGNAL, "periode": "2025-01-11T00:00:00+01:00"}])
+    service = SyncService(db)
+    service.adapter = make_adapter(gateway)
+
+    result = await service.sync_ecowatt()
+    assert result["created"] == 1 and len(result["errors"]) == 1
+    assert await service.get_sync_tracker("ecowatt_client_watermark") is None
+
+    # No If-None-Match: the full response is sent again instead of a 304
+    await service.sync_ecowatt()
+    assert gateway.if_none_match == [None, None]
@@ -0,0 +1,159 @@
+"""Tests for the periodic task coordinator (in-process lock and history, fake Redis lock scripts)"""
+import asyncio
+from datetime import UTC, datetime, timedelta
+
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from src.config import settings
+from src.models.database import build_engine
+from src.models.refresh_tracker import RefreshTracker
+from src.services.cache import cache_service
+from src.services.scraper_jobs import RELEASE_LOCK_SCRIPT, RENEW_LOCK_SCRIPT
+from src.services.task_coordinator import ACQUIRE_LOCK_SCRIPT, PeriodicTask, TaskCoordinator, record_refresh
+
+
+@pytest.fixture
+async def session_maker(tmp_path, monkeypatch):
+    monkeypatch.setattr(cache_service, "redis_client", None)
+    engine = build_engine(f"sqlite+aiosqlite:///{tmp_path / 'test.db'}")
+    async with engine.begin() as conn:
+        await conn.run_sync(RefreshTracker.__table__.create)
+    yield async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    await engine.dispose()
+
+
+async def test_due_task_runs_once(session_maker):
+    calls = []
+
+    async def run(db: AsyncSession) -> str:
+        calls.append(db)
+        await asyncio.sleep(0.01)
+        return "done"
+
+    coordinator = TaskCoordinator(session_maker)
+    task = PeriodicTask("tempo", 600, run)
+    coordinator.register(task)
+
+    first, concurrent = await asyncio.gather(coordinator.run_if_due(task), coordinator.run_if_due(task))
+    assert concurrent is None
+    assert first["status"] == "success" and first["summary"] == "done" and first["fence"] == 1
+    # Recorded: not due before the next interval
+    assert await coordinator.run_if_due(task) is None
+    assert 590 < await coordinator.due_in(task) <= 600
+    assert len(calls) == 1
+
+    [status] = await coordinator.status()
+    assert status["name"] == "tempo"
+    assert status["running"] is None
+    assert status["last_run"] == first
+    assert status["avg_duration_ms"] == first["duration_ms"]
+    assert status["next_run_at"] > status["last_success_at"]
+
+
+async def test_failed_run_is_kept_due(session_maker):
+    async def run(db: AsyncSession) -> None:
+        raise RuntimeError("RTE unavailable")
+
+    coordinator = TaskCoordinator(session_maker)
+    task = PeriodicTask("ecowatt", 3600, run)
+    coordinator.register(task)
+
+    assert await coordinator._tick(task) == 120
+    assert await coordinator.due_in(task) == 0
+    [run_info] = await coordinator.history("ecowatt")
+    assert run_info["status"] == "failed"
+    assert run_info["error"] == "RTE unavailable"
+
+
+async def test_stale_run_does_not_move_the_schedule_back(session_maker):
+    now = datetime.now(UTC)
+    async with session_maker() as db:
+        assert await record_refresh(db, "tempo", now)
+        assert not await record_refresh(db, "tempo", now - timedelta(minutes=5))
+        assert await record_refresh(db, "tempo", now + timedelta(minutes=5))
+
+    coordinator = TaskCoordinator(session_maker)
+    assert await coordinator.last_refresh("tempo") == now + timedelta(minutes=5)
+
+
+class FakeRedis:
+    """Lock scripts, fencing counter and history of the coordinator, lock renewal answered by ``renew``"""
+
+    def __init__(self, renew: bool = True) -> None:
+        self.renew = renew
+        self.fence = 0
+        self.history: list = []
+
+    def register_script(self, script: str):
+        async def acquire(keys, args):
+            self.fence += 1
+            return self.fence
+
+        async def renew(keys, args):
+            return int(self.renew)
+
+        async def release(keys, args):
+            return 1
+
+        return {ACQUIRE_LOCK_SCRIPT: acquire, RENEW_LOCK_SCRIPT: renew, RELEASE_LOCK_SCRIPT: release}[script]
+
+    async def get(self, key: str):
+        return str(self.fence).encode() if key.endswith(":fence") else None
+
+    def pipeline(self, transaction: bool = True) -> "FakePipeline":
+        return FakePipeline(self.history)
+
+
+class FakePipeline:
+    def __init__(self, history: list) -> None:
+        self.history = history
+
+    async def __aenter__(self) -> "FakePipeline":
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        return None
+
+    def lpush(self, key: str, value: str) -> None:
+        self.history.insert(0, value)
+
+    def ltrim(self, key: str, start: int, end: int) -> None:
+        del self.history[end + 1:]
+
+    async def execute(self) -> list:
+        return []
+
+
+async def test_run_is_cancelled_when_its_lock_is_lost(session_maker, monkeypatch):
+    redis_client = FakeRedis(renew=False)
+    monkeypatch.setattr(cache_service, "redis_client", redis_client)
+    monkeypatch.setattr(settings, "TASK_LOCK_TTL_SECONDS", 0.03)
+
+    async def run(db: AsyncSession) -> str:
+        await asyncio.sleep(5)
+        return "done"
+
+    coordinator = TaskCoordinator(session_maker)
+    task = PeriodicTask("tempo", 600, run)
+    coordinator.register(task)
+
+    result = await asyncio.wait_for(coordinator.run_if_due(task), 1)
+    assert result["status"] == "cancelled" and result["error"] == "lock lost"
+    assert len(redis_client.history) == 1
+    # Not recorded: still due
+    assert await coordinator.due_in(task) == 0
+
+
+async def test_superseded_fence_is_not_recorded(session_maker, monkeypatch):
+    redis_client = FakeRedis()
+    redis_client.fence = 3
+    monkeypatch.setattr(cache_service, "redis_client", redis_client)
+    now = datetime.now(UTC)
+
+    async with session_maker() as db:
+        assert not await record_refresh(db, "tempo", now, fence=2)
+        assert await record_refresh(db, "tempo", now, fence=3)
+
+    coordinator = TaskCoordinator(session_maker)
+    assert await coordinator.last_refresh("tempo") == now
@@ -0,0 +1,90 @@
+"""Tests for the Tempo calendar index"""
+from datetime import UTC, date, datetime, timedelta
+
+import numpy as np
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from src.models import TempoDay, User
+from src.models.base import Base
+from src.models.database import build_engine
+from src.models.tempo_day import TempoColor
+from src.routers import tempo
+from src.services.cache import cache_service
+from src.services.response_cache import response_cache
+from src.services.rte import rte_service
+from src.services.tempo_calendar import TempoCalendar, season_bounds, tempo_calendar
+
+ROWS = [
+    ("2024-12-30", TempoColor.BLUE),
+    ("2024-12-31", TempoColor.WHITE),
+    ("2025-01-02", TempoColor.RED),  # 1er janvier inconnu
+    ("2025-01-03", "BLUE"),
+]
+
+
+def test_lookup():
+    calendar = TempoCalendar.build(1, ROWS)
+
+    assert calendar.known_days == 4
+    assert calendar.color(date(2024, 12, 31)) == "WHITE"
+    assert calendar.color("2025-01-02") == "RED"
+    assert calendar.color(datetime(2025, 1, 3, 23, 30, tzinfo=UTC)) == "BLUE"
+    assert calendar.color(date(2025, 1, 1)) is None
+    assert calendar.color(date(2024, 1, 1)) is None
+    assert calendar.color(date(2026, 1, 1)) is None
+    assert TempoCalendar.build(0, []).color(date(2025, 1, 1)) is None
+
+
+def test_vectorised_codes_and_totals():
+    calendar = TempoCalendar.build(1, ROWS)
+    days = [date(2024, 12, 29), date(2024, 12, 30), date(2024, 12, 31), date(2025, 1, 1), date(2025, 1, 2), date(2025, 1, 3)]
+
+    assert calendar.codes(days).tolist() == [0, 1, 2, 0, 3, 1]
+    assert calendar.codes(np.array(days, dtype="datetime64[D]")).tolist() == [0, 1, 2, 0, 3, 1]
+    assert calendar.masks(days)["BLUE"].tolist() == [False, True, False, False, False, True]
+    assert calendar.totals(days, [1, 10, 100, 1000, 10000, 100000]) == {"BLUE": 100010, "WHITE": 100, "RED": 10000}
+    assert calendar.totals([], []) == {"BLUE": 0, "WHITE": 0, "RED": 0}
+
+
+def test_counts_and_seasons():
+    calendar = TempoCalendar.build(1, ROWS)
+
+    assert calendar.counts(date(2024, 9, 1), date(2025, 8, 31)) == {"BLUE": 2, "WHITE": 1, "RED": 1}
+    assert calendar.counts(date(2025, 1, 1), date(2025, 1, 2)) == {"BLUE": 0, "WHITE": 0, "RED": 1}
+    assert calendar.counts(date(2025, 2, 1), date(2025, 1, 1)) == {"BLUE": 0, "WHITE": 0, "RED": 0}
+    assert season_bounds(date(2025, 1, 15)) == (date(2024, 9, 1), date(2025, 8, 31))
+    assert season_bounds(date(2025, 9, 1)) == (date(2025, 9, 1), date(2026, 8, 31))
+
+
+async def test_clearing_tempo_days_invalidates_the_caches(tmp_path, monkeypatch):
+    monkeypatch.setattr(cache_service, "redis_client", None)
+    bumped: list[str] = []
+
+    async def bump_version(dataset: str) -> None:
+        bumped.append(dataset)
+
+    monkeypatch.setattr(response_cache, "bump_version", bump_version)
+    engine = build_engine(f"sqlite+aiosqlite:///{tmp_path / 'test.db'}")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    async with async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)() as db:
+        today = datetime.now(UTC).replace(hour=0, minute=0, second=0, microsecond=0)
+        for days_ago in (1, 60):
+            day = today - timedelta(days=days_ago)
+            db.add(TempoDay(id=day.date().isoformat(), date=day, color=TempoColor.BLUE))
+        await db.commit()
+
+        tempo_calendar._calendar = TempoCalendar.build(1, ROWS)
+        assert await rte_service.clear_old_data(db, days_to_keep=30) == 1
+        assert bumped == ["tempo"]
+        assert tempo_calendar._calendar is None
+
+        tempo_calendar._calendar = TempoCalendar.build(2, ROWS)
+        admin = User(id="admin", email="admin@example.org", hashed_password="x", client_id="a", client_secret="x")
+        response = await tempo.clear_all_tempo_data(current_user=admin, db=db)
+        assert response.success and response.data["count"] == 1
+        assert bumped == ["tempo", "tempo"]
+        assert tempo_calendar._calendar is None
+        assert await db.scalar(select(func.count()).select_from(TempoDay)) == 0
+    await engine.dispose()